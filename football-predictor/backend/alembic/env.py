@@ -0,0 +1,68 @@
+"""
+Alembic migration environment
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.config import settings
+from app.core.database import Base, create_db_engine
+import app.models  # noqa: F401  (registers every model on Base.metadata)
+
+config = context.config
+
+# Reuse a connection handed in by init_db(); otherwise we are running from the CLI
+connection = config.attributes.get("connection")
+
+if connection is None and config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """Emit migration SQL without connecting to the database"""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run migrations against a live connection"""
+    if connection is not None:
+        _run_with_connection(connection)
+        return
+    
+    engine = create_db_engine(settings.DATABASE_URL)
+    try:
+        with engine.connect() as conn:
+            _run_with_connection(conn)
+    finally:
+        engine.dispose()
+
+
+def _run_with_connection(conn) -> None:
+    """Configure the context on a connection and run pending migrations"""
+    context.configure(
+        connection=conn,
+        target_metadata=target_metadata,
+        # SQLite cannot ALTER most constraints in place; batch mode recreates tables
+        render_as_batch=True,
+    )
+    
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
\ No newline at end of file
@@ -0,0 +1,226 @@
+"""Initial schema, matching the tables init_db() used to create
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 06:43:11.816390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('leagues',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('external_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('country', sa.String(length=50), nullable=True),
+    sa.Column('type', sa.String(length=20), nullable=True),
+    sa.Column('logo_url', sa.String(length=500), nullable=True),
+    sa.Column('flag_url', sa.String(length=500), nullable=True),
+    sa.Column('current_season', sa.Integer(), nullable=True),
+    sa.Column('season_start', sa.DateTime(), nullable=True),
+    sa.Column('season_end', sa.DateTime(), nullable=True),
+    sa.Column('is_active', sa.String(length=10), nullable=True),
+    sa.Column('is_current', sa.String(length=10), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('leagues', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_leagues_external_id'), ['external_id'], unique=True)
+        batch_op.create_index(batch_op.f('ix_leagues_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_leagues_name'), ['name'], unique=False)
+    
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('telegram_id', sa.Integer(), nullable=True),
+    sa.Column('username', sa.String(length=50), nullable=True),
+    sa.Column('email', sa.String(length=100), nullable=True),
+    sa.Column('full_name', sa.String(length=100), nullable=True),
+    sa.Column('hashed_password', sa.String(length=255), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('preferred_leagues', sa.Text(), nullable=True),
+    sa.Column('notification_enabled', sa.Boolean(), nullable=True),
+    sa.Column('language', sa.String(length=5), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_login', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_users_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_users_telegram_id'), ['telegram_id'], unique=True)
+        batch_op.create_index(batch_op.f('ix_users_username'), ['username'], unique=True)
+    
+    op.create_table('teams',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('external_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('short_name', sa.String(length=10), nullable=True),
+    sa.Column('country', sa.String(length=50), nullable=True),
+    sa.Column('founded', sa.Integer(), nullable=True),
+    sa.Column('venue', sa.String(length=100), nullable=True),
+    sa.Column('website', sa.String(length=200), nullable=True),
+    sa.Column('logo_url', sa.String(length=500), nullable=True),
+    sa.Column('league_id', sa.Integer(), nullable=True),
+    sa.Column('matches_played', sa.Integer(), nullable=True),
+    sa.Column('wins', sa.Integer(), nullable=True),
+    sa.Column('draws', sa.Integer(), nullable=True),
+    sa.Column('losses', sa.Integer(), nullable=True),
+    sa.Column('goals_for', sa.Integer(), nullable=True),
+    sa.Column('goals_against', sa.Integer(), nullable=True),
+    sa.Column('points', sa.Integer(), nullable=True),
+    sa.Column('position', sa.Integer(), nullable=True),
+    sa.Column('home_form', sa.String(length=10), nullable=True),
+    sa.Column('away_form', sa.String(length=10), nullable=True),
+    sa.Column('overall_form', sa.String(length=10), nullable=True),
+    sa.Column('avg_goals_scored', sa.Float(), nullable=True),
+    sa.Column('avg_goals_conceded', sa.Float(), nullable=True),
+    sa.Column('clean_sheets', sa.Integer(), nullable=True),
+    sa.Column('failed_to_score', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['league_id'], ['leagues.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('teams', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_teams_external_id'), ['external_id'], unique=True)
+        batch_op.create_index(batch_op.f('ix_teams_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_teams_name'), ['name'], unique=False)
+    
+    op.create_table('user_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_predictions', sa.Integer(), nullable=True),
+    sa.Column('correct_predictions', sa.Integer(), nullable=True),
+    sa.Column('incorrect_predictions', sa.Integer(), nullable=True),
+    sa.Column('void_predictions', sa.Integer(), nullable=True),
+    sa.Column('overall_accuracy', sa.Float(), nullable=True),
+    sa.Column('win_rate', sa.Float(), nullable=True),
+    sa.Column('current_streak', sa.Integer(), nullable=True),
+    sa.Column('longest_winning_streak', sa.Integer(), nullable=True),
+    sa.Column('longest_losing_streak', sa.Integer(), nullable=True),
+    sa.Column('recent_accuracy', sa.Float(), nullable=True),
+    sa.Column('monthly_predictions', sa.Integer(), nullable=True),
+    sa.Column('monthly_correct', sa.Integer(), nullable=True),
+    sa.Column('monthly_accuracy', sa.Float(), nullable=True),
+    sa.Column('global_rank', sa.Integer(), nullable=True),
+    sa.Column('monthly_rank', sa.Integer(), nullable=True),
+    sa.Column('total_points', sa.Integer(), nullable=True),
+    sa.Column('monthly_points', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_prediction_date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    with op.batch_alter_table('user_stats', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_stats_id'), ['id'], unique=False)
+    
+    op.create_table('matches',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('external_id', sa.Integer(), nullable=True),
+    sa.Column('home_team_id', sa.Integer(), nullable=False),
+    sa.Column('away_team_id', sa.Integer(), nullable=False),
+    sa.Column('league_id', sa.Integer(), nullable=False),
+    sa.Column('match_date', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.Enum('SCHEDULED', 'TIMED', 'IN_PLAY', 'PAUSED', 'FINISHED', 'POSTPONED', 'SUSPENDED', 'CANCELED', name='matchstatus'), nullable=True),
+    sa.Column('matchday', sa.Integer(), nullable=True),
+    sa.Column('stage', sa.String(length=50), nullable=True),
+    sa.Column('group', sa.String(length=50), nullable=True),
+    sa.Column('home_score', sa.Integer(), nullable=True),
+    sa.Column('away_score', sa.Integer(), nullable=True),
+    sa.Column('home_score_penalties', sa.Integer(), nullable=True),
+    sa.Column('away_score_penalties', sa.Integer(), nullable=True),
+    sa.Column('home_score_extra_time', sa.Integer(), nullable=True),
+    sa.Column('away_score_extra_time', sa.Integer(), nullable=True),
+    sa.Column('statistics', sa.Text(), nullable=True),
+    sa.Column('venue', sa.String(length=100), nullable=True),
+    sa.Column('referee', sa.String(length=100), nullable=True),
+    sa.Column('prediction_available', sa.String(length=10), nullable=True),
+    sa.Column('prediction_confidence', sa.String(length=10), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['away_team_id'], ['teams.id'], ),
+    sa.ForeignKeyConstraint(['home_team_id'], ['teams.id'], ),
+    sa.ForeignKeyConstraint(['league_id'], ['leagues.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_matches_external_id'), ['external_id'], unique=True)
+        batch_op.create_index(batch_op.f('ix_matches_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_matches_match_date'), ['match_date'], unique=False)
+        batch_op.create_index(batch_op.f('ix_matches_status'), ['status'], unique=False)
+    
+    op.create_table('predictions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('match_id', sa.Integer(), nullable=False),
+    sa.Column('prediction_type', sa.Enum('WIN_DRAW_WIN', 'OVER_UNDER', 'BOTH_TEAMS_SCORE', 'CORRECT_SCORE', 'DOUBLE_CHANCE', name='predictiontype'), nullable=False),
+    sa.Column('prediction_value', sa.String(length=50), nullable=False),
+    sa.Column('confidence', sa.Float(), nullable=False),
+    sa.Column('odds', sa.Float(), nullable=True),
+    sa.Column('stake', sa.Float(), nullable=True),
+    sa.Column('result', sa.Enum('PENDING', 'WON', 'LOST', 'VOID', name='predictionresult'), nullable=True),
+    sa.Column('is_correct', sa.String(length=10), nullable=True),
+    sa.Column('additional_data', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['match_id'], ['matches.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('predictions', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_predictions_id'), ['id'], unique=False)
+
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('predictions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_predictions_id'))
+    
+    op.drop_table('predictions')
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_matches_status'))
+        batch_op.drop_index(batch_op.f('ix_matches_match_date'))
+        batch_op.drop_index(batch_op.f('ix_matches_id'))
+        batch_op.drop_index(batch_op.f('ix_matches_external_id'))
+    
+    op.drop_table('matches')
+    with op.batch_alter_table('user_stats', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_stats_id'))
+    
+    op.drop_table('user_stats')
+    with op.batch_alter_table('teams', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_teams_name'))
+        batch_op.drop_index(batch_op.f('ix_teams_id'))
+        batch_op.drop_index(batch_op.f('ix_teams_external_id'))
+    
+    op.drop_table('teams')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_username'))
+        batch_op.drop_index(batch_op.f('ix_users_telegram_id'))
+        batch_op.drop_index(batch_op.f('ix_users_id'))
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+    
+    op.drop_table('users')
+    with op.batch_alter_table('leagues', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_leagues_name'))
+        batch_op.drop_index(batch_op.f('ix_leagues_id'))
+        batch_op.drop_index(batch_op.f('ix_leagues_external_id'))
+    
+    op.drop_table('leagues')
\ No newline at end of file
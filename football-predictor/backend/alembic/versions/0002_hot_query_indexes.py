@@ -0,0 +1,68 @@
+"""Composite indexes for the hot query shapes
+
+Covers prediction history per user/match ordered by created_at, one
+prediction per (user, match), and match lists filtered by status, league or
+team and ordered by match_date. The single-column status index is replaced
+by (status, match_date).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 06:43:29.659285
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+logger = logging.getLogger(__name__)
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the oldest prediction if duplicates slipped in before the unique index
+    duplicates = "FROM predictions WHERE id NOT IN (SELECT MIN(id) FROM predictions GROUP BY user_id, match_id)"
+    if op.get_context().as_sql:
+        op.execute(f"DELETE {duplicates}")
+        removed = []
+    else:
+        removed = op.get_bind().execute(sa.text(f"SELECT id, user_id, match_id {duplicates} ORDER BY id")).all()
+    if removed:
+        logger.warning(
+            f"Deleting {len(removed)} duplicate predictions to add uq_predictions_user_match "
+            f"(id, user_id, match_id): {', '.join(str(tuple(row)) for row in removed)}"
+        )
+        op.execute(f"DELETE {duplicates}")
+    
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.drop_index('ix_matches_status')
+        batch_op.create_index('ix_matches_away_team_date', ['away_team_id', 'match_date'], unique=False)
+        batch_op.create_index('ix_matches_home_team_date', ['home_team_id', 'match_date'], unique=False)
+        batch_op.create_index('ix_matches_league_date', ['league_id', 'match_date'], unique=False)
+        batch_op.create_index('ix_matches_status_date', ['status', 'match_date'], unique=False)
+    
+    with op.batch_alter_table('predictions', schema=None) as batch_op:
+        batch_op.create_index('ix_predictions_match_created', ['match_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_predictions_user_created', ['user_id', 'created_at'], unique=False)
+        batch_op.create_index('uq_predictions_user_match', ['user_id', 'match_id'], unique=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('predictions', schema=None) as batch_op:
+        batch_op.drop_index('uq_predictions_user_match')
+        batch_op.drop_index('ix_predictions_user_created')
+        batch_op.drop_index('ix_predictions_match_created')
+    
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.drop_index('ix_matches_status_date')
+        batch_op.drop_index('ix_matches_league_date')
+        batch_op.drop_index('ix_matches_home_team_date')
+        batch_op.drop_index('ix_matches_away_team_date')
+        batch_op.create_index('ix_matches_status', ['status'], unique=False)
\ No newline at end of file
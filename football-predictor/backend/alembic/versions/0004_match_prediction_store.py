@@ -0,0 +1,41 @@
+"""Precomputed prediction store
+
+One row per fixture with the engine's output, the model version that
+produced it and a fingerprint of the inputs it read, so predictions are
+served by primary key and only recomputed when something they depend on
+changes.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 11:02:37.590214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('match_predictions',
+    sa.Column('match_id', sa.Integer(), nullable=False),
+    sa.Column('model_version', sa.String(length=50), nullable=False),
+    sa.Column('input_fingerprint', sa.String(length=64), nullable=False),
+    sa.Column('confidence', sa.Float(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['match_id'], ['matches.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('match_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('match_predictions')
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""Team Elo ratings and rating history
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 12:14:51.207733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('team_ratings',
+    sa.Column('team_id', sa.Integer(), nullable=False),
+    sa.Column('rating', sa.Float(), nullable=False),
+    sa.Column('matches_rated', sa.Integer(), nullable=True),
+    sa.Column('last_match_date', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('team_id')
+    )
+    
+    op.create_table('team_rating_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=False),
+    sa.Column('match_id', sa.Integer(), nullable=False),
+    sa.Column('match_date', sa.DateTime(), nullable=False),
+    sa.Column('rating_before', sa.Float(), nullable=False),
+    sa.Column('rating_after', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['match_id'], ['matches.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('team_rating_history', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_team_rating_history_id'), ['id'], unique=False)
+        batch_op.create_index('ix_team_rating_history_team_date', ['team_id', 'match_date'], unique=False)
+        batch_op.create_index('uq_team_rating_history_match_team', ['match_id', 'team_id'], unique=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('team_rating_history', schema=None) as batch_op:
+        batch_op.drop_index('uq_team_rating_history_match_team')
+        batch_op.drop_index('ix_team_rating_history_team_date')
+        batch_op.drop_index(batch_op.f('ix_team_rating_history_id'))
+    
+    op.drop_table('team_rating_history')
+    op.drop_table('team_ratings')
\ No newline at end of file
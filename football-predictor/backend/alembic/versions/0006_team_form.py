@@ -0,0 +1,44 @@
+"""Rolling team form windows
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 13:26:08.731945
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('team_form',
+    sa.Column('team_id', sa.Integer(), nullable=False),
+    sa.Column('venue', sa.String(length=10), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('played', sa.Integer(), nullable=True),
+    sa.Column('wins', sa.Integer(), nullable=True),
+    sa.Column('draws', sa.Integer(), nullable=True),
+    sa.Column('losses', sa.Integer(), nullable=True),
+    sa.Column('goals_for', sa.Integer(), nullable=True),
+    sa.Column('goals_against', sa.Integer(), nullable=True),
+    sa.Column('clean_sheets', sa.Integer(), nullable=True),
+    sa.Column('failed_to_score', sa.Integer(), nullable=True),
+    sa.Column('form', sa.String(length=10), nullable=True),
+    sa.Column('results', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('team_id', 'venue', 'size')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('team_form')
\ No newline at end of file
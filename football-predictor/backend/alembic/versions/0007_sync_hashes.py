@@ -0,0 +1,42 @@
+"""Provider payload digests for bulk sync upserts
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 15:02:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('leagues', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sync_hash', sa.String(length=32), nullable=True))
+    
+    with op.batch_alter_table('teams', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sync_hash', sa.String(length=32), nullable=True))
+        batch_op.add_column(sa.Column('standings_hash', sa.String(length=32), nullable=True))
+    
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sync_hash', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.drop_column('sync_hash')
+    
+    with op.batch_alter_table('teams', schema=None) as batch_op:
+        batch_op.drop_column('standings_hash')
+        batch_op.drop_column('sync_hash')
+    
+    with op.batch_alter_table('leagues', schema=None) as batch_op:
+        batch_op.drop_column('sync_hash')
\ No newline at end of file
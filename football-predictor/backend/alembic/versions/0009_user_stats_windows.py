@@ -0,0 +1,32 @@
+"""Rolling recent-results window and month marker on user stats
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 19:12:05.640219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('user_stats', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('recent_results', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('recent_count', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('stats_month', sa.String(length=7), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('user_stats', schema=None) as batch_op:
+        batch_op.drop_column('stats_month')
+        batch_op.drop_column('recent_count')
+        batch_op.drop_column('recent_results')
\ No newline at end of file
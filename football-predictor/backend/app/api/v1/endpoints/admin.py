@@ -2,12 +2,19 @@
 Admin endpoints for system management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from sqlalchemy import case, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict
+from datetime import datetime, timedelta
 
-from app.core.database import get_db
+from app.core.cache import response_cache
+from app.core.database import get_async_db
 from app.services.data_sync_service import DataSyncService
+from app.services.fetch_scheduler import football_data_scheduler
+from app.services.leaderboard import leaderboard
+from app.services.football_data_service import football_data_stats
+from app.services.prediction_workers import prediction_workers
 from app.models.user import User
 from app.models.prediction import Prediction
 from app.models.match import Match
@@ -16,13 +23,17 @@ router = APIRouter()
 
 
 @router.post("/sync-data")
-async def sync_data(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def sync_data(
+    background_tasks: BackgroundTasks,
+    full: bool = Query(False, description="Fetch everything instead of only what may have changed"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Trigger data synchronization with external APIs"""
     
     try:
         # Add sync task to background
         data_sync_service = DataSyncService()
-        background_tasks.add_task(data_sync_service.sync_all_data)
+        background_tasks.add_task(data_sync_service.sync_all_data, full)
         
         return {
             "message": "Data synchronization started",
@@ -37,34 +48,30 @@ async def sync_data(background_tasks: BackgroundTasks, db: Session = Depends(get
 
 
 @router.get("/system-stats")
-async def get_system_stats(db: Session = Depends(get_db)):
+async def get_system_stats(db: AsyncSession = Depends(get_async_db)):
     """Get system statistics"""
     
     try:
         # Get basic counts
-        total_users = db.query(User).count()
-        total_predictions = db.query(Prediction).count()
-        total_matches = db.query(Match).count()
+        total_users = await db.scalar(select(func.count(User.id)))
+        total_matches = await db.scalar(select(func.count(Match.id)))
         
         # Get active users (last 30 days)
-        from datetime import datetime, timedelta
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        active_users = db.query(User).filter(
-            User.last_login >= thirty_days_ago
-        ).count()
-        
-        # Get predictions by result
-        won_predictions = db.query(Prediction).filter(
-            Prediction.result == "WON"
-        ).count()
-        
-        lost_predictions = db.query(Prediction).filter(
-            Prediction.result == "LOST"
-        ).count()
+        active_users = await db.scalar(
+            select(func.count(User.id)).where(User.last_login >= thirty_days_ago)
+        )
         
-        pending_predictions = db.query(Prediction).filter(
-            Prediction.result == "PENDING"
-        ).count()
+        # Get predictions by result in a single pass over the table
+        prediction_counts = (await db.execute(
+            select(
+                func.count(Prediction.id),
+                func.count(case((Prediction.result == "WON", 1))),
+                func.count(case((Prediction.result == "LOST", 1))),
+                func.count(case((Prediction.result == "PENDING", 1))),
+            )
+        )).one()
+        total_predictions, won_predictions, lost_predictions, pending_predictions = prediction_counts
         
         # Calculate accuracy
         total_resolved = won_predictions + lost_predictions
@@ -88,8 +95,34 @@ async def get_system_stats(db: Session = Depends(get_db)):
         )
 
 
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """Get response cache hit/miss counters"""
+    
+    return response_cache.stats()
+
+
+@router.get("/worker-stats")
+async def get_worker_stats():
+    """Get prediction worker pool counters"""
+    
+    return prediction_workers.stats()
+
+
+@router.get("/fetch-stats")
+async def get_fetch_stats():
+    """Get external data provider request budget, latency and retry counters"""
+    
+    return {
+        "football_data": {
+            "budget": football_data_scheduler.stats(),
+            "endpoints": football_data_stats.snapshot()
+        }
+    }
+
+
 @router.post("/update-match-results")
-async def update_match_results(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def update_match_results(background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
     """Update match results for finished matches"""
     
     try:
@@ -108,8 +141,147 @@ async def update_match_results(background_tasks: BackgroundTasks, db: Session =
         )
 
 
+@router.post("/settle-predictions")
+async def settle_predictions(background_tasks: BackgroundTasks):
+    """Settle pending predictions of matches already finished, postponed or canceled"""
+    
+    try:
+        data_sync_service = DataSyncService()
+        background_tasks.add_task(data_sync_service.settle_predictions)
+        
+        return {
+            "message": "Prediction settlement started",
+            "status": "running"
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to settle predictions: {str(e)}"
+        )
+
+
+@router.post("/rollover-user-stats")
+async def rollover_user_stats(background_tasks: BackgroundTasks):
+    """Reset monthly user statistics at the start of a month"""
+    
+    try:
+        data_sync_service = DataSyncService()
+        background_tasks.add_task(data_sync_service.rollover_user_stats)
+        
+        return {
+            "message": "User stats rollover started",
+            "status": "running"
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to roll user stats over: {str(e)}"
+        )
+
+
+@router.post("/rebuild-user-stats")
+async def rebuild_user_stats(background_tasks: BackgroundTasks):
+    """Recompute all user statistics from settled predictions"""
+    
+    try:
+        data_sync_service = DataSyncService()
+        background_tasks.add_task(data_sync_service.rebuild_user_stats)
+        
+        return {
+            "message": "User stats rebuild started",
+            "status": "running"
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to rebuild user stats: {str(e)}"
+        )
+
+
+@router.post("/reload-leaderboard")
+async def reload_leaderboard(background_tasks: BackgroundTasks):
+    """Rebuild the all-time and monthly leaderboards from user statistics"""
+    
+    try:
+        background_tasks.add_task(leaderboard.reload)
+        
+        return {
+            "message": "Leaderboard reload started",
+            "status": "running"
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to reload the leaderboard: {str(e)}"
+        )
+
+
+@router.post("/refresh-predictions")
+async def refresh_predictions(background_tasks: BackgroundTasks):
+    """Recompute the stored predictions of every scheduled match"""
+    
+    try:
+        data_sync_service = DataSyncService()
+        background_tasks.add_task(data_sync_service.refresh_predictions, all_fixtures=True)
+        
+        return {
+            "message": "Prediction refresh started",
+            "status": "running"
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to refresh predictions: {str(e)}"
+        )
+
+
+@router.post("/replay-ratings")
+async def replay_ratings(background_tasks: BackgroundTasks):
+    """Rebuild team Elo ratings from the full match history"""
+    
+    try:
+        data_sync_service = DataSyncService()
+        background_tasks.add_task(data_sync_service.replay_ratings)
+        
+        return {
+            "message": "Rating replay started",
+            "status": "running"
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to replay ratings: {str(e)}"
+        )
+
+
+@router.post("/rebuild-team-features")
+async def rebuild_team_features(background_tasks: BackgroundTasks):
+    """Rebuild rolling team form windows from the full match history"""
+    
+    try:
+        data_sync_service = DataSyncService()
+        background_tasks.add_task(data_sync_service.rebuild_team_features)
+        
+        return {
+            "message": "Team feature rebuild started",
+            "status": "running"
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to rebuild team features: {str(e)}"
+        )
+
+
 @router.post("/cleanup-data")
-async def cleanup_data(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def cleanup_data(background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
     """Clean up old data"""
     
     try:
@@ -129,12 +301,12 @@ async def cleanup_data(background_tasks: BackgroundTasks, db: Session = Depends(
 
 
 @router.get("/health-check")
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
     """Comprehensive health check"""
     
     try:
         # Test database connection
-        db.execute("SELECT 1")
+        await db.execute(text("SELECT 1"))
         
         # Test external API connection
         from app.services.football_data_service import FootballDataService
@@ -2,73 +2,107 @@
 League endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.cache import LEAGUES, SIMULATIONS, TEAMS, response_cache
+from app.core.config import settings
+from app.core.conditional import body_validator, latest_change, not_modified
+from app.core.database import get_async_db
+from app.core.pagination import keyset_paginate, set_next_cursor, split_page
 from app.models.league import League
+from app.models.team import Team
 from app.schemas.league import LeagueResponse, LeagueCreate, LeagueUpdate
+from app.services.prediction_workers import PredictionQueueFull, prediction_workers, simulate_season
 
 router = APIRouter()
 
 
+async def _get_league_or_404(db: AsyncSession, league_id: int) -> League:
+    """Load a league or raise 404"""
+    league = await db.get(League, league_id, populate_existing=True)
+    
+    if not league:
+        raise HTTPException(
+            status_code=404,
+            detail="League not found"
+        )
+    
+    return league
+
+
 @router.get("/", response_model=List[LeagueResponse])
 async def get_leagues(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     country: Optional[str] = None,
     is_active: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get leagues with optional filters"""
     
-    query = db.query(League)
+    query = select(League)
     
     # Apply filters
     if country:
-        query = query.filter(League.country.ilike(f"%{country}%"))
+        query = query.where(League.country.ilike(f"%{country}%"))
     
     if is_active:
-        query = query.filter(League.is_active == is_active)
+        query = query.where(League.is_active == is_active)
+    
+    key_parts = ("list", skip, limit, cursor, country, is_active)
+    
+    async def load():
+        # Order by name and apply pagination
+        page_query = keyset_paginate(query, League.name, League.id, cursor, skip, limit)
+        result = await db.execute(page_query)
+        leagues, next_cursor = split_page(result.scalars(), limit, League.name)
+        body = [LeagueResponse.model_validate(league).model_dump(mode="json") for league in leagues]
+        
+        # Cached with the page so the ETag always describes it
+        return {
+            "validator": body_validator(key_parts, [body, next_cursor], latest_change(leagues)),
+            "body": body,
+            "next_cursor": next_cursor
+        }
     
-    # Order by name
-    query = query.order_by(League.name)
+    entry = await response_cache.get_or_load(LEAGUES, key_parts, load)
+    set_next_cursor(response, entry["next_cursor"])
     
-    # Apply pagination
-    leagues = query.offset(skip).limit(limit).all()
+    # Answer polling clients from the cached validator when nothing changed
+    unchanged = not_modified(request, response, entry["validator"])
+    if unchanged:
+        return unchanged
     
-    return leagues
+    return entry["body"]
 
 
 @router.get("/{league_id}", response_model=LeagueResponse)
-async def get_league(league_id: int, db: Session = Depends(get_db)):
+async def get_league(league_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific league by ID"""
     
-    league = db.query(League).filter(League.id == league_id).first()
-    
-    if not league:
-        raise HTTPException(
-            status_code=404,
-            detail="League not found"
-        )
+    async def load():
+        league = await _get_league_or_404(db, league_id)
+        return LeagueResponse.model_validate(league).model_dump(mode="json")
     
-    return league
+    return await response_cache.get_or_load(LEAGUES, (league_id,), load)
 
 
 @router.get("/{league_id}/teams", response_model=List[dict])
-async def get_league_teams(league_id: int, db: Session = Depends(get_db)):
+async def get_league_teams(league_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get all teams in a league"""
     
-    league = db.query(League).filter(League.id == league_id).first()
-    
-    if not league:
-        raise HTTPException(
-            status_code=404,
-            detail="League not found"
-        )
+    await _get_league_or_404(db, league_id)
     
-    teams = db.query(league.teams).order_by(League.teams.property.mapper.class_.position).all()
+    result = await db.execute(
+        select(Team).where(Team.league_id == league_id).order_by(Team.position)
+    )
+    teams = result.scalars().all()
     
     return [
         {
@@ -91,39 +125,99 @@ async def get_league_teams(league_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{league_id}/table", response_model=dict)
-async def get_league_table(league_id: int, db: Session = Depends(get_db)):
+async def get_league_table(league_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get league table/standings"""
     
-    league = db.query(League).filter(League.id == league_id).first()
+    async def load():
+        league = await _get_league_or_404(db, league_id)
+        
+        # Standings as of the last sync; teams without a position yet go last
+        result = await db.execute(
+            select(Team).where(Team.league_id == league_id)
+            .order_by(Team.position.is_(None), Team.position, Team.name)
+        )
+        
+        return {
+            "league": {
+                "id": league.id,
+                "name": league.name,
+                "country": league.country,
+                "season": league.current_season
+            },
+            "standings": [
+                {
+                    "position": team.position,
+                    "team": {
+                        "id": team.id,
+                        "name": team.name,
+                        "short_name": team.short_name,
+                        "logo_url": team.logo_url
+                    },
+                    "matches_played": team.matches_played,
+                    "wins": team.wins,
+                    "draws": team.draws,
+                    "losses": team.losses,
+                    "goals_for": team.goals_for,
+                    "goals_against": team.goals_against,
+                    "goal_difference": team.goal_difference,
+                    "points": team.points,
+                    "form": team.overall_form
+                }
+                for team in result.scalars()
+            ]
+        }
     
-    if not league:
+    return await response_cache.get_or_load(TEAMS, ("table", league_id), load)
+
+
+@router.get("/{league_id}/projection", response_model=dict)
+async def get_league_projection(
+    league_id: int,
+    runs: Optional[int] = Query(None, ge=1000, le=1000000, description="Simulated seasons, defaults to SIMULATION_RUNS"),
+    model: Optional[str] = Query(None, description="Registered model name, defaults to SIMULATION_MODEL"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Simulate the rest of the season: finishing position, title, top-4 and relegation odds per team"""
+    
+    await _get_league_or_404(db, league_id)
+    
+    key_parts = ("projection", league_id, runs or settings.SIMULATION_RUNS, model or settings.SIMULATION_MODEL)
+    
+    async def load():
+        return await prediction_workers.run(key_parts, simulate_season, league_id, runs, model)
+    
+    try:
+        # Kept until a sync changes standings, fixtures or predictions
+        return await response_cache.get_or_load(SIMULATIONS, key_parts, load, ttl=settings.SIMULATION_CACHE_TTL)
+        
+    except PredictionQueueFull as e:
         raise HTTPException(
-            status_code=404,
-            detail="League not found"
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to simulate season: {str(e)}"
         )
-    
-    # This would typically be a more complex query
-    # For now, return basic league info
-    return {
-        "league": {
-            "id": league.id,
-            "name": league.name,
-            "country": league.country,
-            "season": league.current_season
-        },
-        "standings": []  # Would be populated with team standings
-    }
 
 
 @router.post("/", response_model=LeagueResponse)
-async def create_league(league_data: LeagueCreate, db: Session = Depends(get_db)):
+async def create_league(league_data: LeagueCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new league (admin only)"""
     
     # Create league
     db_league = League(**league_data.dict())
     db.add(db_league)
-    db.commit()
-    db.refresh(db_league)
+    await db.commit()
+    await db.refresh(db_league)
+    await response_cache.invalidate(LEAGUES)
     
     return db_league
 
@@ -132,23 +226,18 @@ async def create_league(league_data: LeagueCreate, db: Session = Depends(get_db)
 async def update_league(
     league_id: int,
     league_data: LeagueUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a league (admin only)"""
     
-    league = db.query(League).filter(League.id == league_id).first()
-    
-    if not league:
-        raise HTTPException(
-            status_code=404,
-            detail="League not found"
-        )
+    league = await _get_league_or_404(db, league_id)
     
     # Update fields
     for field, value in league_data.dict(exclude_unset=True).items():
         setattr(league, field, value)
     
-    db.commit()
-    db.refresh(league)
+    await db.commit()
+    await db.refresh(league)
+    await response_cache.invalidate(LEAGUES)
     
     return league
\ No newline at end of file
@@ -2,12 +2,19 @@
 Match endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 
-from app.core.database import get_db
+from app.core.cache import MATCHES, response_cache
+from app.core.conditional import body_validator, last_changed, latest_change, not_modified, result_set_validator
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.pagination import keyset_paginate, next_page
+from app.core.serialization import fast_json_response
 from app.models.match import Match, MatchStatus
 from app.models.team import Team
 from app.models.league import League
@@ -15,103 +22,191 @@ from app.schemas.match import MatchResponse, MatchCreate, MatchUpdate
 
 router = APIRouter()
 
+# Relationships read by MatchResponse, joined into the same SELECT so a page
+# costs one query whatever its size (lazy loads are unavailable on AsyncSession)
+MATCH_RELATIONS = (
+    joinedload(Match.home_team),
+    joinedload(Match.away_team),
+    joinedload(Match.league),
+)
+
+
+async def _get_match_or_404(db: AsyncSession, match_id: int) -> Match:
+    """Load a match with its relations or raise 404"""
+    result = await db.execute(
+        select(Match)
+        .options(*MATCH_RELATIONS)
+        .where(Match.id == match_id)
+        .execution_options(populate_existing=True)
+    )
+    match = result.scalar_one_or_none()
+    
+    if not match:
+        raise HTTPException(
+            status_code=404,
+            detail="Match not found"
+        )
+    
+    return match
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    """A timestamp as naive UTC, comparable with datetime.utcnow()"""
+    return moment.astimezone(timezone.utc).replace(tzinfo=None) if moment.tzinfo else moment
+
+
+async def _match_list_validator(db: AsyncSession, key_parts: tuple, *conditions) -> dict:
+    """ETag/Last-Modified for a match list, covering the teams and league nested in it"""
+    home_team, away_team = aliased(Team), aliased(Team)
+    
+    query = (
+        select(Match)
+        .join(home_team, Match.home_team_id == home_team.id)
+        .join(away_team, Match.away_team_id == away_team.id)
+        .join(League, Match.league_id == League.id)
+        .where(*conditions)
+    )
+    
+    return await result_set_validator(
+        db,
+        query,
+        (last_changed(Match), last_changed(home_team), last_changed(away_team), last_changed(League)),
+        key_parts
+    )
+
 
 @router.get("/", response_model=List[MatchResponse])
 async def get_matches(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     league_id: Optional[int] = None,
     team_id: Optional[int] = None,
     status: Optional[MatchStatus] = None,
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get matches with optional filters"""
     
-    query = db.query(Match)
+    query = select(Match).options(*MATCH_RELATIONS)
     
     # Apply filters
     if league_id:
-        query = query.filter(Match.league_id == league_id)
+        query = query.where(Match.league_id == league_id)
     
     if team_id:
-        query = query.filter(
+        query = query.where(
             (Match.home_team_id == team_id) | (Match.away_team_id == team_id)
         )
     
     if status:
-        query = query.filter(Match.status == status)
+        query = query.where(Match.status == status)
     
     if date_from:
-        query = query.filter(Match.match_date >= date_from)
+        query = query.where(Match.match_date >= date_from)
     
     if date_to:
-        query = query.filter(Match.match_date <= date_to)
+        query = query.where(Match.match_date <= date_to)
     
-    # Order by match date
-    query = query.order_by(Match.match_date)
+    # Order by match date and apply pagination
+    query = keyset_paginate(query, Match.match_date, Match.id, cursor, skip, limit)
+    result = await db.execute(query)
+    matches = next_page(result.scalars(), limit, Match.match_date, response)
     
-    # Apply pagination
-    matches = query.offset(skip).limit(limit).all()
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json_response(matches, MatchResponse, response)
     
     return matches
 
 
 @router.get("/upcoming", response_model=List[MatchResponse])
 async def get_upcoming_matches(
+    request: Request,
+    response: Response,
     limit: int = Query(10, ge=1, le=100),
     league_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get upcoming matches"""
     
-    query = db.query(Match).filter(
+    conditions = [
         Match.status.in_([MatchStatus.SCHEDULED, MatchStatus.TIMED]),
         Match.match_date > datetime.utcnow()
-    )
+    ]
     
     if league_id:
-        query = query.filter(Match.league_id == league_id)
-    
-    matches = query.order_by(Match.match_date).limit(limit).all()
-    
-    return matches
+        conditions.append(Match.league_id == league_id)
+    
+    key_parts = ("upcoming", limit, league_id)
+    
+    async def load():
+        query = select(Match).options(*MATCH_RELATIONS).where(*conditions)
+        result = await db.execute(query.order_by(Match.match_date).limit(limit))
+        matches = result.scalars().all()
+        body = [MatchResponse.model_validate(match).model_dump(mode="json") for match in matches]
+        
+        # Cached with the body so the ETag always describes it; the list is
+        # only valid until its first match kicks off
+        return {
+            "validator": body_validator(key_parts, body, latest_change(
+                row for match in matches for row in (match, match.home_team, match.away_team, match.league)
+            )),
+            "body": body,
+            "valid_until": _naive_utc(matches[0].match_date).isoformat() if matches else None
+        }
+    
+    entry = await response_cache.get_or_load(MATCHES, key_parts, load, ttl=settings.CACHE_UPCOMING_TTL)
+    if entry["valid_until"] and datetime.fromisoformat(entry["valid_until"]) <= datetime.utcnow():
+        # A listed match has kicked off, which changes every upcoming list
+        await response_cache.invalidate(MATCHES)
+        entry = await response_cache.get_or_load(MATCHES, key_parts, load, ttl=settings.CACHE_UPCOMING_TTL)
+    
+    # Answer polling clients from the cached validator when nothing changed
+    unchanged = not_modified(request, response, entry["validator"])
+    if unchanged:
+        return unchanged
+    
+    return entry["body"]
 
 
 @router.get("/live", response_model=List[MatchResponse])
-async def get_live_matches(db: Session = Depends(get_db)):
+async def get_live_matches(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get currently live matches"""
     
-    matches = db.query(Match).filter(
-        Match.status.in_([MatchStatus.IN_PLAY, MatchStatus.PAUSED])
-    ).order_by(Match.match_date).all()
+    live = Match.status.in_([MatchStatus.IN_PLAY, MatchStatus.PAUSED])
     
-    return matches
+    validator = await _match_list_validator(db, ("live",), live)
+    unchanged = not_modified(request, response, validator)
+    if unchanged:
+        return unchanged
+    
+    result = await db.execute(
+        select(Match).options(*MATCH_RELATIONS).where(live).order_by(Match.match_date)
+    )
+    
+    return result.scalars().all()
 
 
 @router.get("/{match_id}", response_model=MatchResponse)
-async def get_match(match_id: int, db: Session = Depends(get_db)):
+async def get_match(match_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific match by ID"""
     
-    match = db.query(Match).filter(Match.id == match_id).first()
-    
-    if not match:
-        raise HTTPException(
-            status_code=404,
-            detail="Match not found"
-        )
-    
-    return match
+    return await _get_match_or_404(db, match_id)
 
 
 @router.post("/", response_model=MatchResponse)
-async def create_match(match_data: MatchCreate, db: Session = Depends(get_db)):
+async def create_match(match_data: MatchCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new match (admin only)"""
     
     # Verify teams exist
-    home_team = db.query(Team).filter(Team.id == match_data.home_team_id).first()
-    away_team = db.query(Team).filter(Team.id == match_data.away_team_id).first()
+    home_team = await db.get(Team, match_data.home_team_id)
+    away_team = await db.get(Team, match_data.away_team_id)
     
     if not home_team or not away_team:
         raise HTTPException(
@@ -120,7 +215,7 @@ async def create_match(match_data: MatchCreate, db: Session = Depends(get_db)):
         )
     
     # Verify league exists
-    league = db.query(League).filter(League.id == match_data.league_id).first()
+    league = await db.get(League, match_data.league_id)
     if not league:
         raise HTTPException(
             status_code=400,
@@ -130,33 +225,27 @@ async def create_match(match_data: MatchCreate, db: Session = Depends(get_db)):
     # Create match
     db_match = Match(**match_data.dict())
     db.add(db_match)
-    db.commit()
-    db.refresh(db_match)
+    await db.commit()
+    await response_cache.invalidate(MATCHES)
     
-    return db_match
+    return await _get_match_or_404(db, db_match.id)
 
 
 @router.put("/{match_id}", response_model=MatchResponse)
 async def update_match(
     match_id: int,
     match_data: MatchUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a match (admin only)"""
     
-    match = db.query(Match).filter(Match.id == match_id).first()
-    
-    if not match:
-        raise HTTPException(
-            status_code=404,
-            detail="Match not found"
-        )
+    match = await _get_match_or_404(db, match_id)
     
     # Update fields
     for field, value in match_data.dict(exclude_unset=True).items():
         setattr(match, field, value)
     
-    db.commit()
-    db.refresh(match)
+    await db.commit()
+    await response_cache.invalidate(MATCHES)
     
-    return match
\ No newline at end of file
+    return await _get_match_or_404(db, match_id)
\ No newline at end of file
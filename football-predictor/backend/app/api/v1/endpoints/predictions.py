@@ -2,51 +2,100 @@
 Prediction endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List, Optional
+from datetime import datetime
+import json
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.config import settings
+from app.core.pagination import keyset_paginate, next_page
+from app.core.serialization import fast_json_response
 from app.models.prediction import Prediction, PredictionType, PredictionResult
+from app.models.match import Match, MatchStatus
+from app.models.match_prediction import MatchPrediction
 from app.models.user import User
+from app.models.user_stats import UserStats
 from app.schemas.prediction import PredictionResponse, PredictionCreate, PredictionUpdate
+from app.services.leaderboard import ALL_TIME, MONTHLY, leaderboard
 from app.services.prediction_engine import PredictionEngine
+from app.services.prediction_workers import PredictionQueueFull, predict_batch_json, predict_match, prediction_workers
 
 router = APIRouter()
 
+# Relationships read by PredictionResponse, including the match's teams and
+# league, joined into the same SELECT so a page costs one query
+PREDICTION_RELATIONS = (
+    joinedload(Prediction.user),
+    joinedload(Prediction.match).options(
+        joinedload(Match.home_team),
+        joinedload(Match.away_team),
+        joinedload(Match.league),
+    ),
+)
+
+
+async def _get_prediction_or_404(db: AsyncSession, prediction_id: int) -> Prediction:
+    """Load a prediction with its relations or raise 404"""
+    result = await db.execute(
+        select(Prediction)
+        .options(*PREDICTION_RELATIONS)
+        .where(Prediction.id == prediction_id)
+        .execution_options(populate_existing=True)
+    )
+    prediction = result.scalar_one_or_none()
+    
+    if not prediction:
+        raise HTTPException(
+            status_code=404,
+            detail="Prediction not found"
+        )
+    
+    return prediction
+
 
 @router.get("/", response_model=List[PredictionResponse])
 async def get_predictions(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     user_id: Optional[int] = None,
     match_id: Optional[int] = None,
     prediction_type: Optional[PredictionType] = None,
     result: Optional[PredictionResult] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get predictions with optional filters"""
     
-    query = db.query(Prediction)
+    query = select(Prediction).options(*PREDICTION_RELATIONS)
     
     # Apply filters
     if user_id:
-        query = query.filter(Prediction.user_id == user_id)
+        query = query.where(Prediction.user_id == user_id)
     
     if match_id:
-        query = query.filter(Prediction.match_id == match_id)
+        query = query.where(Prediction.match_id == match_id)
     
     if prediction_type:
-        query = query.filter(Prediction.prediction_type == prediction_type)
+        query = query.where(Prediction.prediction_type == prediction_type)
     
     if result:
-        query = query.filter(Prediction.result == result)
+        query = query.where(Prediction.result == result)
     
-    # Order by creation date
-    query = query.order_by(Prediction.created_at.desc())
+    # Order by creation date and apply pagination
+    query = keyset_paginate(
+        query, Prediction.created_at, Prediction.id, cursor, skip, limit, descending=True
+    )
+    rows = await db.execute(query)
+    predictions = next_page(rows.scalars(), limit, Prediction.created_at, response)
     
-    # Apply pagination
-    predictions = query.offset(skip).limit(limit).all()
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json_response(predictions, PredictionResponse, response)
     
     return predictions
 
@@ -54,23 +103,33 @@ async def get_predictions(
 @router.get("/user/{user_id}", response_model=List[PredictionResponse])
 async def get_user_predictions(
     user_id: int,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get predictions for a specific user"""
     
     # Verify user exists
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=404,
             detail="User not found"
         )
     
-    predictions = db.query(Prediction).filter(
+    query = select(Prediction).options(*PREDICTION_RELATIONS).where(
         Prediction.user_id == user_id
-    ).order_by(Prediction.created_at.desc()).offset(skip).limit(limit).all()
+    )
+    query = keyset_paginate(
+        query, Prediction.created_at, Prediction.id, cursor, skip, limit, descending=True
+    )
+    result = await db.execute(query)
+    predictions = next_page(result.scalars(), limit, Prediction.created_at, response)
+    
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json_response(predictions, PredictionResponse, response)
     
     return predictions
 
@@ -78,68 +137,78 @@ async def get_user_predictions(
 @router.get("/match/{match_id}", response_model=List[PredictionResponse])
 async def get_match_predictions(
     match_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all predictions for a specific match"""
     
-    predictions = db.query(Prediction).filter(
-        Prediction.match_id == match_id
-    ).order_by(Prediction.created_at.desc()).all()
+    result = await db.execute(
+        select(Prediction).options(*PREDICTION_RELATIONS).where(
+            Prediction.match_id == match_id
+        ).order_by(Prediction.created_at.desc())
+    )
     
-    return predictions
+    return result.scalars().all()
+
+
+async def _has_prediction(db: AsyncSession, user_id: int, match_id: int) -> bool:
+    """Check whether a user already has a prediction for a match"""
+    result = await db.execute(
+        select(Prediction.id).where(
+            Prediction.user_id == user_id,
+            Prediction.match_id == match_id
+        ).limit(1)
+    )
+    
+    return result.first() is not None
 
 
 @router.post("/", response_model=PredictionResponse)
 async def create_prediction(
     prediction_data: PredictionCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new prediction"""
     
     # Verify user exists
-    user = db.query(User).filter(User.id == prediction_data.user_id).first()
+    user = await db.get(User, prediction_data.user_id)
     if not user:
         raise HTTPException(
             status_code=404,
             detail="User not found"
         )
     
-    # Check if user already has a prediction for this match
-    existing_prediction = db.query(Prediction).filter(
-        Prediction.user_id == prediction_data.user_id,
-        Prediction.match_id == prediction_data.match_id
-    ).first()
+    duplicate = HTTPException(
+        status_code=400,
+        detail="User already has a prediction for this match"
+    )
     
-    if existing_prediction:
-        raise HTTPException(
-            status_code=400,
-            detail="User already has a prediction for this match"
-        )
+    # Check if user already has a prediction for this match
+    if await _has_prediction(db, prediction_data.user_id, prediction_data.match_id):
+        raise duplicate
     
-    # Create prediction
+    # Create prediction; a concurrent duplicate is caught by uq_predictions_user_match
     db_prediction = Prediction(**prediction_data.dict())
     db.add(db_prediction)
-    db.commit()
-    db.refresh(db_prediction)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        if await _has_prediction(db, prediction_data.user_id, prediction_data.match_id):
+            raise duplicate
+        raise
     
-    return db_prediction
+    return await _get_prediction_or_404(db, db_prediction.id)
 
 
 @router.put("/{prediction_id}", response_model=PredictionResponse)
 async def update_prediction(
     prediction_id: int,
     prediction_data: PredictionUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a prediction"""
     
-    prediction = db.query(Prediction).filter(Prediction.id == prediction_id).first()
-    
-    if not prediction:
-        raise HTTPException(
-            status_code=404,
-            detail="Prediction not found"
-        )
+    prediction = await _get_prediction_or_404(db, prediction_id)
     
     # Don't allow updates to resolved predictions
     if prediction.is_resolved:
@@ -152,54 +221,145 @@ async def update_prediction(
     for field, value in prediction_data.dict(exclude_unset=True).items():
         setattr(prediction, field, value)
     
-    db.commit()
-    db.refresh(prediction)
+    await db.commit()
     
-    return prediction
+    return await _get_prediction_or_404(db, prediction_id)
+
+
+async def _leaderboard_rows(db: AsyncSession, entries: List[dict]) -> List[dict]:
+    """Leaderboard entries with each user's name and prediction count, in one query"""
+    user_ids = [entry["user_id"] for entry in entries]
+    if not user_ids:
+        return []
+    
+    result = await db.execute(
+        select(User.id, User.username, User.full_name, UserStats.total_predictions)
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .where(User.id.in_(user_ids))
+    )
+    users = {row.id: row for row in result}
+    
+    rows = []
+    for entry in entries:
+        user = users.get(entry["user_id"])
+        rows.append({
+            **entry,
+            "username": user.username if user else None,
+            "full_name": user.full_name if user else None,
+            "total_predictions": (user.total_predictions or 0) if user else 0
+        })
+    return rows
 
 
 @router.get("/leaderboard/", response_model=List[dict])
 async def get_leaderboard(
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    offset: int = Query(0, ge=0),
+    board: str = Query(ALL_TIME, pattern=f"^({ALL_TIME}|{MONTHLY})$"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get prediction leaderboard"""
-    
-    # This would typically use the UserStats model
-    # For now, return a simple implementation
-    
-    leaderboard = db.query(
-        User.id,
-        User.username,
-        User.full_name
-    ).limit(limit).all()
-    
-    return [
-        {
-            "user_id": user.id,
-            "username": user.username,
-            "full_name": user.full_name,
-            "accuracy": 0.0,  # Would be calculated from UserStats
-            "total_predictions": 0,  # Would be calculated from UserStats
-            "rank": i + 1
-        }
-        for i, user in enumerate(leaderboard)
-    ]
+    """Get the prediction leaderboard, ranked by points and then accuracy"""
+    
+    entries = await leaderboard.top(board, limit, offset)
+    return await _leaderboard_rows(db, entries)
 
 
-@router.get("/generate/{match_id}")
-async def generate_prediction(
-    match_id: int,
-    db: Session = Depends(get_db)
+@router.get("/leaderboard/users/{user_id}", response_model=dict)
+async def get_leaderboard_position(
+    user_id: int,
+    radius: int = Query(5, ge=0, le=50),
+    board: str = Query(ALL_TIME, pattern=f"^({ALL_TIME}|{MONTHLY})$"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Generate AI prediction for a match"""
+    """Get a user's rank and the users ranked around them"""
+    
+    around = await leaderboard.around(board, user_id, radius)
+    rows = await _leaderboard_rows(db, around)
+    
+    return {
+        "user_id": user_id,
+        "board": board,
+        "rank": next((row["rank"] for row in rows if row["user_id"] == user_id), None),
+        "around": rows
+    }
+
+
+@router.get("/generate/batch", response_model=List[dict])
+async def generate_batch_predictions(
+    match_ids: Optional[List[int]] = Query(None),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    league_id: Optional[int] = None,
+    model: Optional[str] = Query(None, description="Registered model name, defaults to PREDICTION_MODEL")
+):
+    """Generate AI predictions for every scheduled match in a slate"""
     
     try:
-        prediction_engine = PredictionEngine()
-        prediction = prediction_engine.generate_prediction(match_id)
+        # Encoded in the worker; a large slate would otherwise be validated and
+        # serialized on the event loop
+        body = await prediction_workers.run(
+            ("batch", tuple(sorted(match_ids)) if match_ids else None, date_from, date_to, league_id, model),
+            predict_batch_json, match_ids, date_from, date_to, league_id, model
+        )
+        return Response(content=body, media_type="application/json")
         
-        return prediction
+    except PredictionQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate predictions: {str(e)}"
+        )
+
+
+@router.get("/generate/{match_id}")
+async def generate_prediction(match_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get the AI prediction for a match from the precomputed store"""
+    
+    # Primary-key lookup of the match and its stored prediction
+    stored = (await db.execute(
+        select(Match.status, MatchPrediction.model_version, MatchPrediction.payload)
+        .outerjoin(MatchPrediction, MatchPrediction.match_id == Match.id)
+        .where(Match.id == match_id)
+    )).first()
+    
+    if stored is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Match {match_id} not found"
+        )
+    
+    if stored.status not in (MatchStatus.SCHEDULED, MatchStatus.TIMED):
+        raise HTTPException(
+            status_code=400,
+            detail="Can only predict scheduled matches"
+        )
+    
+    if stored.payload is not None and stored.model_version == PredictionEngine.model_version():
+        return json.loads(stored.payload)
+    
+    # Not stored yet (or stored by an older model): compute and store it now,
+    # once for all concurrent requests for this match
+    try:
+        return await prediction_workers.run(
+            ("match", match_id, PredictionEngine.model_version()), predict_match, match_id
+        )
         
+    except PredictionQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=400,
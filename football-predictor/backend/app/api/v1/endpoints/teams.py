@@ -2,104 +2,152 @@
 Team endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.cache import TEAMS, response_cache
+from app.core.database import get_async_db
+from app.core.pagination import keyset_paginate, set_next_cursor, split_page
 from app.models.team import Team
+from app.models.team_form import TeamForm
+from app.models.team_rating import TeamRating
 from app.models.league import League
 from app.schemas.team import TeamResponse, TeamCreate, TeamUpdate
 
 router = APIRouter()
 
 
+async def _get_team_or_404(db: AsyncSession, team_id: int) -> Team:
+    """Load a team with its league or raise 404"""
+    result = await db.execute(
+        select(Team)
+        .options(joinedload(Team.league))
+        .where(Team.id == team_id)
+        .execution_options(populate_existing=True)
+    )
+    team = result.scalar_one_or_none()
+    
+    if not team:
+        raise HTTPException(
+            status_code=404,
+            detail="Team not found"
+        )
+    
+    return team
+
+
 @router.get("/", response_model=List[TeamResponse])
 async def get_teams(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     league_id: Optional[int] = None,
     country: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get teams with optional filters"""
     
-    query = db.query(Team)
-    
-    # Apply filters
-    if league_id:
-        query = query.filter(Team.league_id == league_id)
-    
-    if country:
-        query = query.filter(Team.country.ilike(f"%{country}%"))
-    
-    # Order by name
-    query = query.order_by(Team.name)
-    
-    # Apply pagination
-    teams = query.offset(skip).limit(limit).all()
+    async def load():
+        query = select(Team).options(joinedload(Team.league))
+        
+        # Apply filters
+        if league_id:
+            query = query.where(Team.league_id == league_id)
+        
+        if country:
+            query = query.where(Team.country.ilike(f"%{country}%"))
+        
+        # Order by name and apply pagination
+        query = keyset_paginate(query, Team.name, Team.id, cursor, skip, limit)
+        result = await db.execute(query)
+        teams, next_cursor = split_page(result.scalars(), limit, Team.name)
+        
+        return [TeamResponse.model_validate(team).model_dump(mode="json") for team in teams], next_cursor
+    
+    teams, next_cursor = await response_cache.get_or_load(
+        TEAMS, ("list", skip, limit, cursor, league_id, country), load
+    )
+    set_next_cursor(response, next_cursor)
     
     return teams
 
 
 @router.get("/{team_id}", response_model=TeamResponse)
-async def get_team(team_id: int, db: Session = Depends(get_db)):
+async def get_team(team_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific team by ID"""
     
-    team = db.query(Team).filter(Team.id == team_id).first()
+    async def load():
+        team = await _get_team_or_404(db, team_id)
+        return TeamResponse.model_validate(team).model_dump(mode="json")
     
-    if not team:
-        raise HTTPException(
-            status_code=404,
-            detail="Team not found"
-        )
-    
-    return team
+    return await response_cache.get_or_load(TEAMS, (team_id,), load)
 
 
 @router.get("/{team_id}/stats", response_model=dict)
-async def get_team_stats(team_id: int, db: Session = Depends(get_db)):
+async def get_team_stats(team_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get detailed statistics for a team"""
     
-    team = db.query(Team).filter(Team.id == team_id).first()
-    
-    if not team:
-        raise HTTPException(
-            status_code=404,
-            detail="Team not found"
+    async def load():
+        team = await _get_team_or_404(db, team_id)
+        rating = await db.scalar(select(TeamRating.rating).where(TeamRating.team_id == team_id))
+        windows = await db.execute(
+            select(TeamForm).where(TeamForm.team_id == team_id).order_by(TeamForm.venue, TeamForm.size)
         )
-    
-    return {
-        "team_id": team.id,
-        "team_name": team.name,
-        "league": team.league.name if team.league else None,
-        "matches_played": team.matches_played,
-        "wins": team.wins,
-        "draws": team.draws,
-        "losses": team.losses,
-        "goals_for": team.goals_for,
-        "goals_against": team.goals_against,
-        "goal_difference": team.goal_difference,
-        "points": team.points,
-        "position": team.position,
-        "win_percentage": team.win_percentage,
-        "home_form": team.home_form,
-        "away_form": team.away_form,
-        "overall_form": team.overall_form,
-        "avg_goals_scored": team.avg_goals_scored,
-        "avg_goals_conceded": team.avg_goals_conceded,
-        "clean_sheets": team.clean_sheets,
-        "failed_to_score": team.failed_to_score
-    }
+        
+        # Rolling windows keyed by venue, then by size
+        form_windows = {}
+        for window in windows.scalars():
+            form_windows.setdefault(window.venue, {})[str(window.size)] = {
+                "played": window.played,
+                "wins": window.wins,
+                "draws": window.draws,
+                "losses": window.losses,
+                "goals_for": window.goals_for,
+                "goals_against": window.goals_against,
+                "clean_sheets": window.clean_sheets,
+                "failed_to_score": window.failed_to_score,
+                "form": window.form
+            }
+        
+        return {
+            "team_id": team.id,
+            "team_name": team.name,
+            "league": team.league.name if team.league else None,
+            "matches_played": team.matches_played,
+            "wins": team.wins,
+            "draws": team.draws,
+            "losses": team.losses,
+            "goals_for": team.goals_for,
+            "goals_against": team.goals_against,
+            "goal_difference": team.goal_difference,
+            "points": team.points,
+            "position": team.position,
+            "win_percentage": team.win_percentage,
+            "home_form": team.home_form,
+            "away_form": team.away_form,
+            "overall_form": team.overall_form,
+            "avg_goals_scored": team.avg_goals_scored,
+            "avg_goals_conceded": team.avg_goals_conceded,
+            "clean_sheets": team.clean_sheets,
+            "failed_to_score": team.failed_to_score,
+            "rating": rating,
+            "form_windows": form_windows
+        }
+    
+    return await response_cache.get_or_load(TEAMS, ("stats", team_id), load)
 
 
 @router.post("/", response_model=TeamResponse)
-async def create_team(team_data: TeamCreate, db: Session = Depends(get_db)):
+async def create_team(team_data: TeamCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new team (admin only)"""
     
     # Verify league exists
     if team_data.league_id:
-        league = db.query(League).filter(League.id == team_data.league_id).first()
+        league = await db.get(League, team_data.league_id)
         if not league:
             raise HTTPException(
                 status_code=400,
@@ -109,33 +157,27 @@ async def create_team(team_data: TeamCreate, db: Session = Depends(get_db)):
     # Create team
     db_team = Team(**team_data.dict())
     db.add(db_team)
-    db.commit()
-    db.refresh(db_team)
+    await db.commit()
+    await response_cache.invalidate(TEAMS)
     
-    return db_team
+    return await _get_team_or_404(db, db_team.id)
 
 
 @router.put("/{team_id}", response_model=TeamResponse)
 async def update_team(
     team_id: int,
     team_data: TeamUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a team (admin only)"""
     
-    team = db.query(Team).filter(Team.id == team_id).first()
-    
-    if not team:
-        raise HTTPException(
-            status_code=404,
-            detail="Team not found"
-        )
+    team = await _get_team_or_404(db, team_id)
     
     # Update fields
     for field, value in team_data.dict(exclude_unset=True).items():
         setattr(team, field, value)
     
-    db.commit()
-    db.refresh(team)
+    await db.commit()
+    await response_cache.invalidate(TEAMS)
     
-    return team
\ No newline at end of file
+    return await _get_team_or_404(db, team_id)
\ No newline at end of file
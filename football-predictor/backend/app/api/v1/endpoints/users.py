@@ -2,71 +2,76 @@
 User endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.pagination import keyset_paginate, next_page
 from app.models.user import User
+from app.models.user_stats import UserStats
 from app.schemas.user import UserResponse, UserUpdate
+from app.services.leaderboard import ALL_TIME, MONTHLY, leaderboard
+from app.services.user_stats_service import month_of, new_stats
 
 router = APIRouter()
 
 
+async def _get_user_or_404(db: AsyncSession, user_id: int) -> User:
+    """Load a user or raise 404"""
+    user = await db.get(User, user_id, populate_existing=True)
+    
+    if not user:
+        raise HTTPException(
+            status_code=404,
+            detail="User not found"
+        )
+    
+    return user
+
+
 @router.get("/", response_model=List[UserResponse])
 async def get_users(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     is_active: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get users with optional filters (admin only)"""
     
-    query = db.query(User)
+    query = select(User)
     
     # Apply filters
     if is_active is not None:
-        query = query.filter(User.is_active == is_active)
-    
-    # Order by creation date
-    query = query.order_by(User.created_at.desc())
+        query = query.where(User.is_active == is_active)
     
-    # Apply pagination
-    users = query.offset(skip).limit(limit).all()
+    # Order by creation date and apply pagination
+    query = keyset_paginate(query, User.created_at, User.id, cursor, skip, limit, descending=True)
+    result = await db.execute(query)
     
-    return users
+    return next_page(result.scalars(), limit, User.created_at, response)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific user by ID"""
     
-    user = db.query(User).filter(User.id == user_id).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=404,
-            detail="User not found"
-        )
-    
-    return user
+    return await _get_user_or_404(db, user_id)
 
 
 @router.put("/{user_id}", response_model=UserResponse)
 async def update_user(
     user_id: int,
     user_data: UserUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a user"""
     
-    user = db.query(User).filter(User.id == user_id).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=404,
-            detail="User not found"
-        )
+    user = await _get_user_or_404(db, user_id)
     
     # Update fields
     for field, value in user_data.dict(exclude_unset=True).items():
@@ -77,69 +82,66 @@ async def update_user(
         else:
             setattr(user, field, value)
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     return user
 
 
 @router.delete("/{user_id}")
-async def delete_user(user_id: int, db: Session = Depends(get_db)):
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a user (admin only)"""
     
-    user = db.query(User).filter(User.id == user_id).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=404,
-            detail="User not found"
-        )
+    user = await _get_user_or_404(db, user_id)
     
     # Soft delete - mark as inactive
     user.is_active = False
-    db.commit()
+    await db.commit()
     
     return {"message": "User deactivated successfully"}
 
 
 @router.get("/{user_id}/stats", response_model=dict)
-async def get_user_stats(user_id: int, db: Session = Depends(get_db)):
-    """Get user statistics"""
+async def get_user_stats(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get user statistics, kept up to date as predictions settle"""
     
-    user = db.query(User).filter(User.id == user_id).first()
+    # One row: the user joined to their stats, which may not exist yet
+    result = await db.execute(
+        select(User.id, UserStats).outerjoin(UserStats, UserStats.user_id == User.id).where(User.id == user_id)
+    )
+    row = result.first()
     
-    if not user:
+    if row is None:
         raise HTTPException(
             status_code=404,
             detail="User not found"
         )
     
-    # Get user stats
-    user_stats = user.user_stats
-    
-    if not user_stats:
-        return {
-            "user_id": user_id,
-            "total_predictions": 0,
-            "correct_predictions": 0,
-            "accuracy": 0.0,
-            "current_streak": 0,
-            "global_rank": None
-        }
+    month = month_of(datetime.utcnow())
+    user_stats = row.UserStats or new_stats(user_id, month)
+    # Ranks come live from the leaderboard index rather than the stored snapshot
+    global_rank = await leaderboard.rank(ALL_TIME, user_id)
+    monthly_rank = await leaderboard.rank(MONTHLY, user_id)
+    # Monthly columns still counting an earlier month read as a new month
+    this_month = user_stats.stats_month == month
     
     return {
         "user_id": user_id,
         "total_predictions": user_stats.total_predictions,
         "correct_predictions": user_stats.correct_predictions,
         "incorrect_predictions": user_stats.incorrect_predictions,
+        "void_predictions": user_stats.void_predictions,
         "accuracy": user_stats.overall_accuracy,
         "win_rate": user_stats.win_rate,
         "current_streak": user_stats.current_streak,
         "longest_winning_streak": user_stats.longest_winning_streak,
         "longest_losing_streak": user_stats.longest_losing_streak,
         "recent_accuracy": user_stats.recent_accuracy,
-        "global_rank": user_stats.global_rank,
-        "monthly_rank": user_stats.monthly_rank,
+        "monthly_predictions": user_stats.monthly_predictions if this_month else 0,
+        "monthly_correct": user_stats.monthly_correct if this_month else 0,
+        "monthly_accuracy": user_stats.monthly_accuracy if this_month else 0.0,
+        "global_rank": global_rank["rank"] if global_rank else None,
+        "monthly_rank": monthly_rank["rank"] if monthly_rank else None,
         "total_points": user_stats.total_points,
-        "monthly_points": user_stats.monthly_points
+        "monthly_points": user_stats.monthly_points if this_month else 0
     }
\ No newline at end of file
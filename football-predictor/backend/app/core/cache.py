@@ -0,0 +1,252 @@
+"""
+Read-through response cache for reference data
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Cached namespaces
+LEAGUES = "leagues"
+TEAMS = "teams"
+MATCHES = "matches"
+SIMULATIONS = "simulations"
+
+# Teams embed their league and matches embed both, so invalidating a
+# namespace also invalidates every namespace that nests its data. Season
+# simulations are built from standings and fixtures and go with either.
+DEPENDENT_NAMESPACES = {
+    LEAGUES: (LEAGUES, TEAMS, MATCHES, SIMULATIONS),
+    TEAMS: (TEAMS, MATCHES, SIMULATIONS),
+    MATCHES: (MATCHES, SIMULATIONS),
+    SIMULATIONS: (SIMULATIONS,),
+}
+
+
+class MemoryCacheBackend:
+    """Per-process LRU store with per-entry expiry"""
+    
+    name = "memory"
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+    
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    async def set(self, key: str, value: Any, ttl: int):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    async def get_version(self, namespace: str) -> int:
+        return self._versions.get(namespace, 0)
+    
+    async def incr_version(self, namespace: str):
+        self._versions[namespace] = self._versions.get(namespace, 0) + 1
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions
+        }
+    
+    async def close(self):
+        self._entries.clear()
+
+
+class RedisCacheBackend:
+    """Shared store for multi-worker deployments; Redis handles expiry and eviction"""
+    
+    name = "redis"
+    
+    def __init__(self, url: str, prefix: str = "fp:cache:"):
+        import redis.asyncio as redis
+        
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+    
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+    
+    async def set(self, key: str, value: Any, ttl: int):
+        await self._client.set(self.prefix + key, json.dumps(value), ex=ttl)
+    
+    async def get_version(self, namespace: str) -> int:
+        version = await self._client.get(f"{self.prefix}version:{namespace}")
+        return int(version or 0)
+    
+    async def incr_version(self, namespace: str):
+        await self._client.incr(f"{self.prefix}version:{namespace}")
+    
+    def stats(self) -> Dict[str, int]:
+        return {}
+    
+    async def close(self):
+        await self._client.aclose()
+
+
+class ResponseCache:
+    """Read-through cache with TTL, namespace invalidation and single-flight loads
+    
+    Keys embed a per-namespace version, so invalidation is one counter bump and
+    stale entries simply stop being read until TTL or LRU drops them. Concurrent
+    misses on the same key within a process wait for the first loader instead of
+    querying the database themselves. Backend failures are logged and treated
+    as misses so the API keeps serving from the database.
+    """
+    
+    def __init__(self, backend, default_ttl: int):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.errors = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    async def _versioned_key(self, namespace: str, key_parts: Iterable) -> str:
+        version = await self.backend.get_version(namespace)
+        return f"{namespace}:v{version}:" + ":".join(str(part) for part in key_parts)
+    
+    async def get_or_load(
+        self,
+        namespace: str,
+        key_parts: Iterable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None
+    ) -> Any:
+        """Return the cached value for the key, loading and storing it on a miss"""
+        if self.backend is None:
+            return await loader()
+        
+        try:
+            key = await self._versioned_key(namespace, key_parts)
+            value = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Cache read failed for {namespace}: {e}")
+            self.errors += 1
+            return await loader()
+        
+        if value is not None:
+            self.hits += 1
+            return value
+        
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The first request was cancelled mid-load; load for ourselves
+                return await loader()
+        
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        # Mark failures as retrieved even when nobody else was waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        
+        future.set_result(value)
+        
+        if value is not None:
+            try:
+                await self.backend.set(key, value, ttl or self.default_ttl)
+            except Exception as e:
+                logger.warning(f"Cache write failed for {namespace}: {e}")
+                self.errors += 1
+        
+        return value
+    
+    async def invalidate(self, *namespaces: str):
+        """Drop everything cached under the namespaces and those that embed them"""
+        if self.backend is None:
+            return
+        
+        targets = {dependent for namespace in namespaces for dependent in DEPENDENT_NAMESPACES[namespace]}
+        
+        for namespace in sorted(targets):
+            try:
+                await self.backend.incr_version(namespace)
+                self.invalidations += 1
+            except Exception as e:
+                logger.error(f"Cache invalidation failed for {namespace}: {e}")
+                self.errors += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses + self.coalesced
+        
+        return {
+            "backend": self.backend.name if self.backend else "none",
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            **(self.backend.stats() if self.backend else {})
+        }
+    
+    async def close(self):
+        """Release the backend's connections"""
+        if self.backend is not None:
+            await self.backend.close()
+
+
+def create_response_cache() -> ResponseCache:
+    """Build the cache selected by CACHE_BACKEND ("memory", "redis" or "none")"""
+    backend_name = settings.CACHE_BACKEND.strip().lower()
+    
+    if backend_name == "redis":
+        backend = RedisCacheBackend(settings.REDIS_URL)
+    elif backend_name == "memory":
+        backend = MemoryCacheBackend(settings.CACHE_MAX_ENTRIES)
+    elif backend_name == "none":
+        backend = None
+    else:
+        raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND}")
+    
+    return ResponseCache(backend, settings.CACHE_TTL)
+
+
+response_cache = create_response_cache()
\ No newline at end of file
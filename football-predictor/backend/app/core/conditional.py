@@ -0,0 +1,108 @@
+"""
+Conditional GET support: weak ETags, Last-Modified and 304 responses
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def last_changed(model):
+    """Column expression for when a row last changed (updated_at is NULL until the first update)"""
+    return func.coalesce(model.updated_at, model.created_at)
+
+
+async def result_set_validator(
+    db: AsyncSession,
+    from_query,
+    timestamp_columns: Iterable,
+    key_parts: Iterable = ()
+) -> Dict[str, Optional[str]]:
+    """Build validators for a result set from its row count and latest change
+    
+    ``from_query`` supplies the FROM/WHERE of the result set; one aggregate row
+    with the count and the max of each timestamp column replaces loading and
+    serializing the rows. Timestamp columns of joined tables (e.g. the teams
+    and league nested in a match) make the validator change when embedded
+    data changes too.
+    """
+    maxima = [func.max(column) for column in timestamp_columns]
+    row = (await db.execute(
+        from_query.with_only_columns(func.count(), *maxima).order_by(None)
+    )).one()
+    
+    count, timestamps = row[0], [ts for ts in row[1:] if ts is not None]
+    last_modified = max(timestamps) if timestamps else None
+    
+    return build_validator([*key_parts, count, *row[1:]], last_modified)
+
+
+def latest_change(rows: Iterable) -> Optional[datetime]:
+    """When the latest of some loaded rows last changed, or None for no rows"""
+    timestamps = [row.updated_at or row.created_at for row in rows if row is not None]
+    timestamps = [ts for ts in timestamps if ts is not None]
+    return max(timestamps) if timestamps else None
+
+
+def body_validator(key_parts: Iterable, body: Any, last_modified: Optional[datetime] = None) -> Dict[str, Optional[str]]:
+    """Validators hashed from a serialized response body
+    
+    Cache them in the same entry as the body: they then describe exactly the
+    body they are sent with, however long the entry lives.
+    """
+    return build_validator([*key_parts, json.dumps(body, sort_keys=True, default=str)], last_modified)
+
+
+def build_validator(parts: Iterable, last_modified: Optional[datetime] = None) -> Dict[str, Optional[str]]:
+    """Hash the parts into a weak ETag; naive timestamps are taken as UTC"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    
+    if last_modified is not None and last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    
+    return {
+        "etag": f'W/"{digest}"',
+        "last_modified": format_datetime(last_modified, usegmt=True) if last_modified else None
+    }
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag"""
+    if if_none_match.strip() == "*":
+        return True
+    
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any((tag[2:] if tag.startswith("W/") else tag) == opaque for tag in candidates)
+
+
+def not_modified(request: Request, response: Response, validator: Dict[str, Optional[str]]) -> Optional[Response]:
+    """Set the validator headers and return a 304 response if the client copy is current
+    
+    If-None-Match takes precedence; If-Modified-Since is only consulted when
+    the request carries no ETag, as RFC 9110 requires.
+    """
+    headers = {"ETag": validator["etag"]}
+    if validator.get("last_modified"):
+        headers["Last-Modified"] = validator["last_modified"]
+    response.headers.update(headers)
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, validator["etag"])
+    elif request.headers.get("if-modified-since") and validator.get("last_modified"):
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"])
+            fresh = parsedate_to_datetime(validator["last_modified"]) <= since
+        except (TypeError, ValueError):
+            fresh = False
+    else:
+        fresh = False
+    
+    return Response(status_code=304, headers=headers) if fresh else None
\ No newline at end of file
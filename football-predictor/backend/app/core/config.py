@@ -31,6 +31,16 @@ class Settings(BaseSettings):
     
     # Database Configuration
     DATABASE_URL: str = "sqlite:///./football_predictor.db"
+    DATABASE_POOL_SIZE: int = 8  # Connections kept open per process
+    DATABASE_MAX_OVERFLOW: int = 4
+    DATABASE_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    
+    # SQLite tuning (file-backed databases only)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE: int = -64000  # Negative = KiB, so ~64 MB page cache
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MB
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -45,17 +55,61 @@ class Settings(BaseSettings):
     # External APIs
     FOOTBALL_DATA_API_KEY: Optional[str] = None
     FOOTBALL_DATA_BASE_URL: str = "https://api.football-data.org/v4"
+    FOOTBALL_DATA_COMPETITIONS: List[int] = [2021, 2014, 2002, 2019, 2015]  # Synced competitions (free plan tier)
+    
+    FOOTBALL_DATA_PLAN: str = "free"  # Request budget: "free", "standard" or "advanced"
+    FOOTBALL_DATA_RATE_LIMIT: Optional[int] = None  # Requests per minute, overriding the plan's
+    FETCH_MAX_CONCURRENCY: int = 4  # Provider requests in flight at once
+    FETCH_NEAR_KICKOFF_HOURS: int = 3  # Leagues with a kick-off this soon are fetched first
+    FOOTBALL_DATA_TIMEOUT: float = 30.0  # seconds per request
+    FOOTBALL_DATA_KEEPALIVE: float = 60.0  # seconds an idle pooled connection stays open
+    FOOTBALL_DATA_HTTP2: bool = True  # Needs the h2 package (httpx[http2])
+    FOOTBALL_DATA_MAX_RETRIES: int = 4  # Retries after a 429, 5xx or connection error
+    FETCH_BACKOFF_BASE: float = 1.0  # seconds; doubled per retry, with full jitter
+    FETCH_BACKOFF_MAX: float = 60.0  # seconds; a Retry-After header takes precedence
+    
+    # Incremental sync: how long a synced provider resource is trusted before it is fetched again
+    SYNC_STATIC_HOURS: int = 24  # Competitions and teams
+    SYNC_STANDINGS_HOURS: int = 24  # Sooner once a fixture could have finished
+    SYNC_FIXTURES_HOURS: int = 6  # Fixtures ahead, for newly published and rescheduled ones
+    SYNC_FIXTURES_WEEKS: int = 6  # Fixture window, from the start of the current week
+    SYNC_RECENT_DAYS: int = 7  # Unsettled fixtures up to this old are polled for results
     
     API_SPORTS_KEY: Optional[str] = None
     API_SPORTS_BASE_URL: str = "https://v3.football.api-sports.io"
     
-    # Redis Configuration (for Celery)
+    # Redis Configuration (for Celery and the shared response cache)
     REDIS_URL: str = "redis://localhost:6379/0"
     
+    # Response cache for leagues, teams and upcoming matches
+    CACHE_BACKEND: str = "memory"  # "memory" (per process), "redis" (shared) or "none"
+    CACHE_TTL: int = 300  # seconds
+    CACHE_UPCOMING_TTL: int = 60  # upcoming fixtures drop out at kick-off
+    CACHE_MAX_ENTRIES: int = 2048  # memory backend only
+    
+    # Leaderboard rank index
+    LEADERBOARD_BACKEND: str = "memory"  # "memory" (per process, rebuilt from user_stats) or "redis" (shared, persisted)
+    LEADERBOARD_REFRESH_SECONDS: float = 5.0  # Memory boards reload this soon after another worker changes user_stats
+    
+    # Serialize match/prediction list pages with orjson straight from the ORM
+    # rows, skipping response_model re-validation
+    FAST_JSON_RESPONSES: bool = False
+    
     # Prediction Engine
     PREDICTION_CONFIDENCE_THRESHOLD: float = 0.6
+    PREDICTION_MODEL: str = "heuristic"  # Model the prediction store serves: "heuristic", "poisson" or "poisson_elo"
     MAX_PREDICTIONS_PER_USER: int = 100
     
+    # Pool running prediction and simulation work off the event loop
+    PREDICTION_WORKER_MODE: str = "process"  # "process", or "thread" (model work then still holds the GIL)
+    PREDICTION_WORKERS: int = 4
+    PREDICTION_QUEUE_SIZE: int = 64  # Distinct jobs queued or running; more are refused with 503
+    
+    # Season simulator behind /leagues/{id}/projection; needs a model with draw probabilities
+    SIMULATION_MODEL: str = "poisson"
+    SIMULATION_RUNS: int = 100000
+    SIMULATION_CACHE_TTL: int = 86400  # seconds; syncs that change standings or fixtures invalidate sooner
+    
     # Rate Limiting
     RATE_LIMIT_REQUESTS: int = 100
     RATE_LIMIT_WINDOW: int = 60  # seconds
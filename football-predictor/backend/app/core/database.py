@@ -2,35 +2,212 @@
 Database configuration and session management
 """
 
-from sqlalchemy import create_engine
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 
 from app.core.config import settings
 
-# Create SQLite engine with proper configuration
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},  # SQLite specific
-    poolclass=StaticPool,  # For SQLite
-    echo=settings.DEBUG,  # Log SQL queries in debug mode
-)
+
+def _is_memory_sqlite(url) -> bool:
+    """Check whether a SQLite URL points at an in-memory database"""
+    return url.database in (None, "", ":memory:") or "mode=memory" in str(url)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection for concurrent readers and one writer"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+# Packages providing the drivers of non-SQLite URLs, which requirements.txt leaves optional
+DRIVER_PACKAGES = {
+    "postgresql": "psycopg2-binary",
+    "postgresql+psycopg2": "psycopg2-binary",
+    "postgresql+asyncpg": "asyncpg",
+    "mysql": "mysqlclient",
+    "mysql+pymysql": "pymysql",
+    "mysql+aiomysql": "aiomysql",
+}
+
+
+def _create_server_engine(create, database_url: str, **kwargs):
+    """Create a non-SQLite engine, naming the driver package to install if it is missing"""
+    try:
+        return create(database_url, **kwargs)
+    except ModuleNotFoundError as e:
+        drivername = make_url(database_url).drivername
+        package = DRIVER_PACKAGES.get(drivername, e.name)
+        raise ValueError(
+            f"DATABASE_URL uses the {drivername} driver, which needs the {package} package: "
+            f"pip install {package} (see the optional drivers in requirements.txt)"
+        ) from e
+
+
+def create_db_engine(database_url: str) -> Engine:
+    """Create an engine whose pooling strategy matches the database URL
+    
+    * ``sqlite://`` / ``sqlite:///:memory:`` keep the single shared connection
+      (``StaticPool``), since every new connection would see an empty database.
+    * File-backed SQLite runs in WAL mode with a bounded ``QueuePool``: each
+      thread checks out its own connection, readers proceed while a writer
+      holds the lock, and ``busy_timeout`` absorbs writer contention.
+    * Any other backend gets a regular bounded pool with pre-ping.
+    """
+    url = make_url(database_url)
+    
+    if url.get_backend_name() != "sqlite":
+        return _create_server_engine(
+            create_engine,
+            database_url,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_pre_ping=True,
+            echo=settings.DEBUG,
+        )
+    
+    if _is_memory_sqlite(url):
+        return create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+            echo=settings.DEBUG,
+        )
+    
+    sqlite_engine = create_engine(
+        database_url,
+        # Connections are handed between threads by the pool, never shared
+        # by two threads at once, so the sqlite3 thread check is not needed.
+        connect_args={
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
+        poolclass=QueuePool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        echo=settings.DEBUG,
+    )
+    event.listen(sqlite_engine, "connect", _apply_sqlite_pragmas)
+    
+    return sqlite_engine
+
+
+# Async drivers used when the configured URL names a sync driver
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """Translate a sync database URL into its async-driver equivalent"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    
+    if url.drivername in ASYNC_DRIVERS.values() or backend not in ASYNC_DRIVERS:
+        return database_url
+    
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(database_url: str) -> AsyncEngine:
+    """Create the async counterpart of create_db_engine"""
+    async_url = to_async_url(database_url)
+    url = make_url(async_url)
+    
+    if url.get_backend_name() != "sqlite":
+        return _create_server_engine(
+            create_async_engine,
+            async_url,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_pre_ping=True,
+            echo=settings.DEBUG,
+        )
+    
+    if _is_memory_sqlite(url):
+        return create_async_engine(async_url, poolclass=StaticPool, echo=settings.DEBUG)
+    
+    sqlite_engine = create_async_engine(
+        async_url,
+        connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        echo=settings.DEBUG,
+    )
+    event.listen(sqlite_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    
+    return sqlite_engine
+
+
+# Create engine with pooling selected from DATABASE_URL
+engine = create_db_engine(settings.DATABASE_URL)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory for the API endpoints
+async_engine = create_async_db_engine(settings.DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Create base class for models
 Base = declarative_base()
 
 
+# Alembic revision matching the schema that create_all() produced before migrations
+BASELINE_REVISION = "0001"
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def run_migrations():
+    """Upgrade the database to the latest Alembic revision"""
+    from alembic import command
+    from alembic.config import Config
+    
+    alembic_cfg = Config(str(ALEMBIC_INI))
+    alembic_cfg.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    
+    with engine.begin() as connection:
+        alembic_cfg.attributes["connection"] = connection
+        
+        # Databases created by the old create_all() have tables but no version row
+        tables = set(inspect(connection).get_table_names())
+        if "alembic_version" not in tables and "matches" in tables:
+            command.stamp(alembic_cfg, BASELINE_REVISION)
+        
+        command.upgrade(alembic_cfg, "head")
+
+
 async def init_db():
     """Initialize database tables"""
     # Import all models here to ensure they are registered
     from app.models import user, match, prediction, team, league
     
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    # Bring the schema up to date through the migration history
+    run_migrations()
 
 
 def get_db():
@@ -39,4 +216,10 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Keyset (cursor) pagination for list endpoints
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, and_, literal, or_, select, tuple_
+
+# Response header carrying the cursor of the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _cursor_key(sort_column) -> str:
+    """Name of the ordering a cursor belongs to, e.g. "predictions.created_at" """
+    return f"{sort_column.table.name}.{sort_column.key}"
+
+
+def _sorts_by_datetime(sort_column) -> bool:
+    return sort_column.type.python_type is datetime
+
+
+def encode_cursor(sort_column, row) -> str:
+    """Build an opaque cursor pointing after the given row, carrying its sort value"""
+    value = getattr(row, sort_column.key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"k": _cursor_key(sort_column), "v": value, "id": row.id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(sort_column, cursor: str) -> Tuple[Any, int]:
+    """Return the anchor row's sort value and ID of a cursor, or raise 400 if it is not ours
+    
+    Cursors issued before they carried the sort value decode to (None, id).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["k"] == _cursor_key(sort_column) and isinstance(payload["id"], int):
+            value = payload.get("v")
+            if value is not None and _sorts_by_datetime(sort_column):
+                value = datetime.fromisoformat(value)
+            elif value is not None and not isinstance(value, sort_column.type.python_type):
+                raise TypeError(value)
+            return value, payload["id"]
+    except (binascii.Error, ValueError, KeyError, TypeError, NotImplementedError):
+        pass
+    
+    raise HTTPException(
+        status_code=400,
+        detail="Invalid cursor"
+    )
+
+
+def _after(sort_column, id_column, value, anchor_id: int, descending: bool):
+    """Rows after (value, anchor_id) in the (sort_column, id) order"""
+    if _sorts_by_datetime(sort_column):
+        # SQLite stores CURRENT_TIMESTAMP defaults to the second but bound datetimes
+        # to the microsecond, so a row sorting level with the cursor may hold either
+        # text: count everything in (value - 1us, value] as level with it
+        before = value - timedelta(microseconds=1)
+        if descending:
+            return and_(sort_column <= value, or_(sort_column <= before, id_column < anchor_id))
+        return and_(sort_column > before, or_(sort_column > value, id_column > anchor_id))
+    
+    anchor = tuple_(literal(value, sort_column.type), literal(anchor_id))
+    keys = tuple_(sort_column, id_column)
+    return keys < anchor if descending else keys > anchor
+
+
+def keyset_paginate(
+    query: Select,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    skip: int,
+    limit: int,
+    descending: bool = False
+) -> Select:
+    """Order a query by (sort_column, id) and start it after the cursor's row
+    
+    The page starts after the (sort value, ID) carried in the cursor, so it
+    does not depend on the anchor row still existing, and the database seeks
+    straight to it through the sort column's index. One extra row is fetched
+    so next_page() can tell whether another page exists.
+    ``skip`` is still honoured for offset clients but ignored with a cursor.
+    """
+    keys = tuple_(sort_column, id_column)
+    
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column, id_column)
+    
+    if cursor:
+        value, anchor_id = decode_cursor(sort_column, cursor)
+        if value is None:
+            # Older cursor: read the anchor row's sort value back in the statement
+            anchor = select(sort_column, id_column).where(id_column == anchor_id).scalar_subquery()
+            query = query.where(keys < anchor if descending else keys > anchor)
+        else:
+            query = query.where(_after(sort_column, id_column, value, anchor_id, descending))
+    elif skip:
+        query = query.offset(skip)
+    
+    return query.limit(limit + 1)
+
+
+def split_page(rows, limit: int, sort_column) -> Tuple[List, Optional[str]]:
+    """Drop the look-ahead row and return the page with the next cursor, if any"""
+    rows = list(rows)
+    
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(sort_column, rows[-1])
+    
+    return rows, None
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    """Advertise the next page's cursor in the response headers"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+def next_page(rows, limit: int, sort_column, response: Response) -> List:
+    """Drop the look-ahead row and advertise the next cursor in the response"""
+    rows, next_cursor = split_page(rows, limit, sort_column)
+    set_next_cursor(response, next_cursor)
+    
+    return rows
\ No newline at end of file
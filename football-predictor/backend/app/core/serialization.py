@@ -0,0 +1,62 @@
+"""
+Fast JSON responses for large pages of trusted ORM rows
+"""
+
+import typing
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple, Type
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+# Aware UTC datetimes as "...Z", the way Pydantic writes them
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+FieldPlan = Tuple[Tuple[str, Any, Optional["FieldPlan"]], ...]
+
+
+def _nested_schema(annotation) -> Optional[Type[BaseModel]]:
+    """Return the schema of a nested model field, unwrapping Optional[...]"""
+    for candidate in (annotation, *typing.get_args(annotation)):
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+
+@lru_cache(maxsize=None)
+def _field_plan(schema: Type[BaseModel]) -> FieldPlan:
+    """Field names, defaults and nested plans of a response schema, built once per schema"""
+    plan = []
+    for name, field in schema.model_fields.items():
+        nested = _nested_schema(field.annotation)
+        default = None if field.is_required() else field.default
+        plan.append((name, default, _field_plan(nested) if nested else None))
+    return tuple(plan)
+
+
+def _dump(obj, plan: FieldPlan) -> dict:
+    row = {}
+    for name, default, nested in plan:
+        value = getattr(obj, name, default)
+        if nested is not None and value is not None:
+            value = _dump(value, nested)
+        row[name] = value
+    return row
+
+
+def dump_rows(rows: Iterable, schema: Type[BaseModel]) -> List[dict]:
+    """Read the schema's fields straight off ORM rows, without validating them"""
+    plan = _field_plan(schema)
+    return [_dump(row, plan) for row in rows]
+
+
+def fast_json_response(rows: Iterable, schema: Type[BaseModel], response: Response) -> Response:
+    """orjson-encoded list shaped like ``schema``, keeping headers already set on ``response``
+    
+    The rows come from our own database through the ORM, so the field values
+    already have the schema's types; enums, datetimes and nested summaries are
+    encoded by orjson exactly as the response_model path would render them.
+    """
+    body = orjson.dumps(dump_rows(rows, schema), option=ORJSON_OPTIONS)
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
\ No newline at end of file
@@ -8,6 +8,10 @@ from .league import League
 from .match import Match
 from .prediction import Prediction
 from .user_stats import UserStats
+from .match_prediction import MatchPrediction
+from .team_rating import TeamRating, TeamRatingHistory
+from .team_form import TeamForm
+from .sync_watermark import SyncWatermark
 
 __all__ = [
     "User",
@@ -15,5 +19,10 @@ __all__ = [
     "League",
     "Match",
     "Prediction",
-    "UserStats"
+    "UserStats",
+    "MatchPrediction",
+    "TeamRating",
+    "TeamRatingHistory",
+    "TeamForm",
+    "SyncWatermark"
 ]
\ No newline at end of file
@@ -36,6 +36,9 @@ class League(Base):
     # Additional info
     description = Column(Text, nullable=True)
     
+    # Digest of the provider payload last written, so unchanged rows are skipped
+    sync_hash = Column(String(32), nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
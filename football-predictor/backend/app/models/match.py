@@ -2,7 +2,7 @@
 Match model for storing match information
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -26,6 +26,15 @@ class Match(Base):
     """Match model for storing match information"""
     
     __tablename__ = "matches"
+    __table_args__ = (
+        # Upcoming/live/finished lists ordered by kickoff
+        Index("ix_matches_status_date", "status", "match_date"),
+        # League fixtures ordered by kickoff
+        Index("ix_matches_league_date", "league_id", "match_date"),
+        # Team history; an OR over both sides becomes a union of two range scans
+        Index("ix_matches_home_team_date", "home_team_id", "match_date"),
+        Index("ix_matches_away_team_date", "away_team_id", "match_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     external_id = Column(Integer, unique=True, index=True)  # ID from external API
@@ -39,7 +48,7 @@ class Match(Base):
     
     # Match details
     match_date = Column(DateTime, nullable=False, index=True)
-    status = Column(Enum(MatchStatus), default=MatchStatus.SCHEDULED, index=True)
+    status = Column(Enum(MatchStatus), default=MatchStatus.SCHEDULED)
     matchday = Column(Integer, nullable=True)
     stage = Column(String(50), nullable=True)
     group = Column(String(50), nullable=True)
@@ -63,6 +72,9 @@ class Match(Base):
     prediction_available = Column(String(10), default="true")
     prediction_confidence = Column(String(10), nullable=True)  # HIGH, MEDIUM, LOW
     
+    # Digest of the provider payload last written, so unchanged rows are skipped
+    sync_hash = Column(String(32), nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -72,6 +84,9 @@ class Match(Base):
     away_team = relationship("Team", foreign_keys=[away_team_id], back_populates="away_matches")
     league = relationship("League", back_populates="matches")
     predictions = relationship("Prediction", back_populates="match")
+    stored_prediction = relationship(
+        "MatchPrediction", back_populates="match", uselist=False, cascade="all, delete-orphan"
+    )
     
     def __repr__(self):
         return f"<Match(id={self.id}, {self.home_team.name} vs {self.away_team.name}, {self.match_date})>"
@@ -0,0 +1,35 @@
+"""
+Precomputed match prediction model
+"""
+
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+
+
+class MatchPrediction(Base):
+    """Engine output for one fixture, refreshed when its inputs change"""
+    
+    __tablename__ = "match_predictions"
+    
+    match_id = Column(Integer, ForeignKey("matches.id", ondelete="CASCADE"), primary_key=True)
+    
+    # Which model produced the payload and a hash of the inputs it read
+    model_version = Column(String(50), nullable=False)
+    input_fingerprint = Column(String(64), nullable=False)
+    
+    # Headline 1X2 confidence and the full response body (JSON string)
+    confidence = Column(Float, nullable=False)
+    payload = Column(Text, nullable=False)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Relationships
+    match = relationship("Match", back_populates="stored_prediction")
+    
+    def __repr__(self):
+        return f"<MatchPrediction(match_id={self.match_id}, model={self.model_version})>"
\ No newline at end of file
@@ -2,7 +2,7 @@
 Prediction model for storing user predictions
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -31,6 +31,15 @@ class Prediction(Base):
     """Prediction model for storing user predictions"""
     
     __tablename__ = "predictions"
+    __table_args__ = (
+        # One prediction per user and match; also serves user_id lookups
+        Index("uq_predictions_user_match", "user_id", "match_id", unique=True),
+        # User history and match predictions, newest first
+        Index("ix_predictions_user_created", "user_id", "created_at"),
+        Index("ix_predictions_match_created", "match_id", "created_at"),
+        # Global feed, newest first (keyset pagination)
+        Index("ix_predictions_created", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -0,0 +1,39 @@
+"""
+Per-competition, per-resource provider sync state
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class SyncWatermark(Base):
+    """What the last sync of one provider resource saw, so the next one can skip it
+    
+    Keyed by the provider's competition ID (0 for the competitions list) and
+    the resource: competitions, teams, standings, fixtures or results.
+    """
+    
+    __tablename__ = "sync_watermarks"
+    
+    competition_id = Column(Integer, primary_key=True)
+    resource = Column(String(20), primary_key=True)
+    
+    # Request the validators belong to, e.g. the date window of a matches query
+    params = Column(String(100), default="")
+    
+    # Validators of the last response and a digest of its body
+    etag = Column(String(200))
+    last_modified = Column(String(64))
+    content_hash = Column(String(32))
+    
+    checked_at = Column(DateTime)  # Last response, changed or not
+    changed_at = Column(DateTime)  # Last response whose body changed
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<SyncWatermark(competition_id={self.competition_id}, resource='{self.resource}', checked_at={self.checked_at})>"
\ No newline at end of file
@@ -44,12 +44,16 @@ class Team(Base):
     away_form = Column(String(10), nullable=True)  # Last 5 away matches (W/D/L)
     overall_form = Column(String(10), nullable=True)  # Last 5 matches overall
     
-    # Advanced statistics
+    # Advanced statistics (last 10 matches, kept by the team feature store)
     avg_goals_scored = Column(Float, default=0.0)
     avg_goals_conceded = Column(Float, default=0.0)
     clean_sheets = Column(Integer, default=0)
     failed_to_score = Column(Integer, default=0)
     
+    # Digests of the provider payloads last written (team details, standings row)
+    sync_hash = Column(String(32), nullable=True)
+    standings_hash = Column(String(32), nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -58,6 +62,7 @@ class Team(Base):
     league = relationship("League", back_populates="teams")
     home_matches = relationship("Match", foreign_keys="Match.home_team_id", back_populates="home_team")
     away_matches = relationship("Match", foreign_keys="Match.away_team_id", back_populates="away_team")
+    rating = relationship("TeamRating", back_populates="team", uselist=False)
     
     def __repr__(self):
         return f"<Team(id={self.id}, name='{self.name}', league_id={self.league_id})>"
@@ -0,0 +1,39 @@
+"""
+Rolling team form windows maintained from synced results
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class TeamForm(Base):
+    """Aggregates over a team's last `size` finished matches at a venue"""
+    
+    __tablename__ = "team_form"
+    
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True)
+    venue = Column(String(10), primary_key=True)  # overall, home, away
+    size = Column(Integer, primary_key=True)  # 5 or 10 matches
+    
+    # Aggregates over the window
+    played = Column(Integer, default=0)
+    wins = Column(Integer, default=0)
+    draws = Column(Integer, default=0)
+    losses = Column(Integer, default=0)
+    goals_for = Column(Integer, default=0)
+    goals_against = Column(Integer, default=0)
+    clean_sheets = Column(Integer, default=0)
+    failed_to_score = Column(Integer, default=0)
+    form = Column(String(10), default="")  # W/D/L, newest first
+    
+    # Matches in the window (JSON string of [match_id, kick-off, scored, conceded], newest first)
+    results = Column(Text, default="[]")
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<TeamForm(team_id={self.team_id}, {self.venue}/{self.size}, form='{self.form}')>"
\ No newline at end of file
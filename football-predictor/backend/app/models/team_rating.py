@@ -0,0 +1,58 @@
+"""
+Team rating models for Elo strength tracking
+"""
+
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+
+
+class TeamRating(Base):
+    """Current Elo rating of a team"""
+    
+    __tablename__ = "team_ratings"
+    
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True)
+    rating = Column(Float, nullable=False)
+    matches_rated = Column(Integer, default=0)
+    
+    # Last result applied (kick-off of that match)
+    last_match_date = Column(DateTime, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Relationships
+    team = relationship("Team", back_populates="rating")
+    
+    def __repr__(self):
+        return f"<TeamRating(team_id={self.team_id}, rating={self.rating:.1f})>"
+
+
+class TeamRatingHistory(Base):
+    """Rating change of one team caused by one finished match"""
+    
+    __tablename__ = "team_rating_history"
+    __table_args__ = (
+        # A match moves each side's rating once
+        Index("uq_team_rating_history_match_team", "match_id", "team_id", unique=True),
+        # Rating chart of a team over time
+        Index("ix_team_rating_history_team_date", "team_id", "match_date"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
+    match_id = Column(Integer, ForeignKey("matches.id", ondelete="CASCADE"), nullable=False)
+    match_date = Column(DateTime, nullable=False)
+    
+    rating_before = Column(Float, nullable=False)
+    rating_after = Column(Float, nullable=False)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<TeamRatingHistory(team_id={self.team_id}, match_id={self.match_id}, {self.rating_before:.1f}->{self.rating_after:.1f})>"
\ No newline at end of file
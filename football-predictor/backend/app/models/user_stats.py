@@ -2,12 +2,15 @@
 User statistics model for tracking user performance
 """
 
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, String
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from typing import Optional
 
 from app.core.database import Base
 
+RECENT_WINDOW = 10  # Decided predictions behind recent_accuracy
+
 
 class UserStats(Base):
     """User statistics model for tracking prediction performance"""
@@ -34,11 +37,14 @@ class UserStats(Base):
     
     # Recent performance (last 10 predictions)
     recent_accuracy = Column(Float, default=0.0)
+    recent_results = Column(Integer, default=0)  # Bit per decided prediction, newest lowest, 1 = won
+    recent_count = Column(Integer, default=0)  # Decided predictions in recent_results
     
     # Monthly statistics
     monthly_predictions = Column(Integer, default=0)
     monthly_correct = Column(Integer, default=0)
     monthly_accuracy = Column(Float, default=0.0)
+    stats_month = Column(String(7), nullable=True)  # "YYYY-MM" the monthly columns count
     
     # Ranking
     global_rank = Column(Integer, nullable=True)
@@ -72,4 +78,44 @@ class UserStats(Base):
         if resolved > 0:
             self.win_rate = (self.correct_predictions / resolved) * 100
         else:
-            self.win_rate = 0.0
\ No newline at end of file
+            self.win_rate = 0.0
+    
+    def reset_month(self, month: str):
+        """Start counting a new month"""
+        self.stats_month = month
+        self.monthly_predictions = 0
+        self.monthly_correct = 0
+        self.monthly_accuracy = 0.0
+        self.monthly_points = 0
+    
+    def record_result(self, won: Optional[bool], points: int, month: str):
+        """Count one settled prediction in O(1): won True, lost False, void None"""
+        if self.stats_month != month:
+            self.reset_month(month)
+        
+        self.total_predictions += 1
+        self.monthly_predictions += 1
+        
+        if won is None:
+            self.void_predictions += 1
+        elif won:
+            self.correct_predictions += 1
+            self.monthly_correct += 1
+            self.total_points += points
+            self.monthly_points += points
+            self.current_streak = self.current_streak + 1 if self.current_streak > 0 else 1
+            self.longest_winning_streak = max(self.longest_winning_streak, self.current_streak)
+        else:
+            self.incorrect_predictions += 1
+            self.current_streak = self.current_streak - 1 if self.current_streak < 0 else -1
+            self.longest_losing_streak = max(self.longest_losing_streak, -self.current_streak)
+        
+        # Void predictions neither break a streak nor enter the recent window
+        if won is not None:
+            self.recent_results = (((self.recent_results or 0) << 1) | int(won)) & ((1 << RECENT_WINDOW) - 1)
+            self.recent_count = min((self.recent_count or 0) + 1, RECENT_WINDOW)
+            self.recent_accuracy = bin(self.recent_results).count("1") / self.recent_count * 100
+        
+        self.update_accuracy()
+        self.update_win_rate()
+        self.monthly_accuracy = self.monthly_correct / self.monthly_predictions * 100
\ No newline at end of file
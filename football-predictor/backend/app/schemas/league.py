@@ -23,6 +23,17 @@ class LeagueBase(BaseModel):
     description: Optional[str] = None
 
 
+class LeagueSummary(BaseModel):
+    """Compact league schema for nesting in other responses"""
+    id: int
+    name: str
+    country: Optional[str] = None
+    logo_url: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
 class LeagueCreate(LeagueBase):
     """Schema for league creation"""
     pass
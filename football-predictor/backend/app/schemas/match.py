@@ -6,6 +6,8 @@ from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 from app.models.match import MatchStatus
+from app.schemas.league import LeagueSummary
+from app.schemas.team import TeamSummary
 
 
 class MatchBase(BaseModel):
@@ -20,6 +22,21 @@ class MatchBase(BaseModel):
     group: Optional[str] = None
 
 
+class MatchSummary(BaseModel):
+    """Compact match schema for nesting in other responses"""
+    id: int
+    match_date: datetime
+    status: MatchStatus
+    home_score: Optional[int] = None
+    away_score: Optional[int] = None
+    home_team: Optional[TeamSummary] = None
+    away_team: Optional[TeamSummary] = None
+    league: Optional[LeagueSummary] = None
+    
+    class Config:
+        from_attributes = True
+
+
 class MatchCreate(MatchBase):
     """Schema for match creation"""
     pass
@@ -67,9 +84,9 @@ class MatchResponse(MatchBase):
     updated_at: Optional[datetime] = None
     
     # Related data
-    home_team: Optional[dict] = None
-    away_team: Optional[dict] = None
-    league: Optional[dict] = None
+    home_team: Optional[TeamSummary] = None
+    away_team: Optional[TeamSummary] = None
+    league: Optional[LeagueSummary] = None
     
     class Config:
         from_attributes = True
\ No newline at end of file
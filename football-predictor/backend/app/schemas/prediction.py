@@ -6,6 +6,8 @@ from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 from app.models.prediction import PredictionType, PredictionResult
+from app.schemas.match import MatchSummary
+from app.schemas.user import UserSummary
 
 
 class PredictionBase(BaseModel):
@@ -46,8 +48,8 @@ class PredictionResponse(PredictionBase):
     updated_at: Optional[datetime] = None
     
     # Related data
-    user: Optional[dict] = None
-    match: Optional[dict] = None
+    user: Optional[UserSummary] = None
+    match: Optional[MatchSummary] = None
     
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -5,6 +5,7 @@ Team schemas for API requests and responses
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
+from app.schemas.league import LeagueSummary
 
 
 class TeamBase(BaseModel):
@@ -20,6 +21,17 @@ class TeamBase(BaseModel):
     league_id: Optional[int] = None
 
 
+class TeamSummary(BaseModel):
+    """Compact team schema for nesting in other responses"""
+    id: int
+    name: str
+    short_name: Optional[str] = None
+    logo_url: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
 class TeamCreate(TeamBase):
     """Schema for team creation"""
     pass
@@ -75,7 +87,7 @@ class TeamResponse(TeamBase):
     updated_at: Optional[datetime] = None
     
     # Related data
-    league: Optional[dict] = None
+    league: Optional[LeagueSummary] = None
     
     class Config:
         from_attributes = True
\ No newline at end of file
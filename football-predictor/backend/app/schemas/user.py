@@ -15,6 +15,16 @@ class UserBase(BaseModel):
     telegram_id: Optional[int] = None
 
 
+class UserSummary(BaseModel):
+    """Compact user schema for nesting in other responses"""
+    id: int
+    username: Optional[str] = None
+    full_name: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
 class UserCreate(UserBase):
     """Schema for user creation"""
     username: str
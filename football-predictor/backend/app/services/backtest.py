@@ -0,0 +1,366 @@
+"""
+Offline backtests of the prediction models over historical results
+"""
+
+import csv
+import logging
+import math
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import create_engine, select
+
+from app.models.match import Match, MatchStatus
+from app.services.prediction_engine import PredictionEngine
+from app.services.rating_service import RatingService
+from app.services.team_feature_service import TEAM_STATS_WINDOW, summarise
+
+logger = logging.getLogger(__name__)
+
+MARKETS = ("WIN_DRAW_WIN", "OVER_UNDER", "BOTH_TEAMS_SCORE", "DOUBLE_CHANCE", "CORRECT_SCORE")
+
+# Seasons start in July: a match in May 2025 belongs to season 2024
+SEASON_START_MONTH = 7
+
+# Probabilities are clipped to [EPSILON, 1 - EPSILON] so log-loss stays finite
+EPSILON = 1e-15
+
+# Fixture columns, one entry per finished match ordered by kick-off
+FIXTURE_COLUMNS = {
+    "match_id": np.int64,
+    "league_id": np.int64,
+    "season": np.int32,
+    "kickoff": "datetime64[s]",
+    "home_team": np.int64,
+    "away_team": np.int64,
+    "home_score": np.int32,
+    "away_score": np.int32,
+}
+
+Fixtures = Dict[str, np.ndarray]
+
+
+def season_of(kickoff: datetime) -> int:
+    """Season a kick-off belongs to, named by its starting year"""
+    return kickoff.year if kickoff.month >= SEASON_START_MONTH else kickoff.year - 1
+
+
+def _fixture_columns(rows: List[Tuple]) -> Fixtures:
+    """Columnar fixtures from (match_id, league_id, kickoff, home, away, home_score, away_score) rows"""
+    columns = {name: [] for name in FIXTURE_COLUMNS}
+    for match_id, league_id, kickoff, home_team, away_team, home_score, away_score in rows:
+        columns["match_id"].append(match_id)
+        columns["league_id"].append(league_id)
+        columns["season"].append(season_of(kickoff))
+        columns["kickoff"].append(kickoff)
+        columns["home_team"].append(home_team)
+        columns["away_team"].append(away_team)
+        columns["home_score"].append(home_score)
+        columns["away_score"].append(away_score)
+    
+    fixtures = {name: np.array(values, dtype=FIXTURE_COLUMNS[name]) for name, values in columns.items()}
+    order = np.lexsort((fixtures["match_id"], fixtures["kickoff"]))
+    return {name: values[order] for name, values in fixtures.items()}
+
+
+def load_sqlite(path: str) -> Fixtures:
+    """Finished matches of a SQLite snapshot of the application database, opened read-only"""
+    engine = create_engine(f"sqlite:///file:{path}?mode=ro&uri=true")
+    try:
+        with engine.connect() as connection:
+            rows = connection.execute(
+                select(
+                    Match.id, Match.league_id, Match.match_date, Match.home_team_id,
+                    Match.away_team_id, Match.home_score, Match.away_score
+                ).where(
+                    Match.status == MatchStatus.FINISHED,
+                    Match.home_score.isnot(None),
+                    Match.away_score.isnot(None)
+                )
+            ).all()
+    finally:
+        engine.dispose()
+    
+    logger.info(f"Loaded {len(rows)} finished matches from {path}")
+    return _fixture_columns(rows)
+
+
+def load_csv(path: str) -> Fixtures:
+    """Finished matches from a CSV fixture set
+    
+    Required columns are date (ISO 8601), home_team, away_team, home_score
+    and away_score; league and match_id are optional. Teams and leagues are
+    identified by name and rows without both scores are skipped.
+    """
+    teams: Dict[str, int] = {}
+    leagues: Dict[str, int] = {}
+    rows = []
+    
+    with open(path, newline="", encoding="utf-8") as handle:
+        for number, row in enumerate(csv.DictReader(handle), start=1):
+            if not row.get("home_score") or not row.get("away_score"):
+                continue
+            
+            home_team = teams.setdefault(row["home_team"], len(teams) + 1)
+            away_team = teams.setdefault(row["away_team"], len(teams) + 1)
+            league_id = leagues.setdefault(row.get("league") or "", len(leagues) + 1)
+            rows.append((
+                int(row.get("match_id") or number), league_id, datetime.fromisoformat(row["date"]),
+                home_team, away_team, int(row["home_score"]), int(row["away_score"])
+            ))
+    
+    logger.info(f"Loaded {len(rows)} finished matches, {len(teams)} teams and {len(leagues)} leagues from {path}")
+    return _fixture_columns(rows)
+
+
+def point_in_time_features(fixtures: Fixtures) -> Dict[str, np.ndarray]:
+    """Engine features of both sides of every fixture as they stood at kick-off
+    
+    Row 2i describes the home side of fixture i and row 2i + 1 the away side,
+    in the _load_team_features layout. Results are folded in after each
+    kick-off time, so fixtures never see their own result or that of a
+    match kicking off at the same moment. Season totals and the table reset
+    every season; form windows and Elo ratings carry over.
+    """
+    n = len(fixtures["match_id"])
+    rows = {name: np.zeros(2 * n) for name in (
+        "position", "goals_for", "goals_against", "avg_goals_scored", "matches_played", "rating",
+        "form_played", "form_wins", "form_draws", "home_played", "home_goals",
+        "away_played", "away_goals", "recent_played", "recent_scored", "recent_conceded",
+    )}
+    
+    table: Dict[int, List[int]] = {}  # played, goals for, goals against, points
+    windows: Dict[Tuple[int, str], deque] = {}
+    ratings: Dict[int, float] = {}
+    season = None
+    
+    kickoffs = fixtures["kickoff"]
+    boundaries = np.flatnonzero(kickoffs[1:] != kickoffs[:-1]) + 1
+    for group in np.split(np.arange(n), boundaries) if n else []:
+        if fixtures["season"][group[0]] != season:
+            season = fixtures["season"][group[0]]
+            table = {}
+        
+        standings = sorted(table, key=lambda team: (-table[team][3], table[team][2] - table[team][1], -table[team][1], team))
+        positions = {team: rank for rank, team in enumerate(standings, start=1)}
+        
+        for i in group:
+            for row, team_id in ((2 * i, fixtures["home_team"][i]), (2 * i + 1, fixtures["away_team"][i])):
+                played, goals_for, goals_against, _ = table.get(team_id, (0, 0, 0, 0))
+                overall = list(windows.get((team_id, "overall"), ()))
+                form = summarise(overall[:5])
+                recent = summarise(overall[:TEAM_STATS_WINDOW])
+                home = summarise(list(windows.get((team_id, "home"), ())))
+                away = summarise(list(windows.get((team_id, "away"), ())))
+                
+                # Same defaults as _load_team_features for values not known yet
+                rows["position"][row] = positions.get(team_id, 20)
+                rows["goals_for"][row] = goals_for
+                rows["goals_against"][row] = goals_against or 1
+                rows["matches_played"][row] = played
+                rows["avg_goals_scored"][row] = round(recent["goals_for"] / recent["played"], 2) if recent["played"] else 0
+                rows["rating"][row] = ratings.get(team_id, RatingService.INITIAL_RATING)
+                rows["form_played"][row] = form["played"]
+                rows["form_wins"][row] = form["wins"]
+                rows["form_draws"][row] = form["draws"]
+                rows["home_played"][row] = home["played"]
+                rows["home_goals"][row] = home["goals_for"]
+                rows["away_played"][row] = away["played"]
+                rows["away_goals"][row] = away["goals_for"]
+                rows["recent_played"][row] = recent["played"]
+                rows["recent_scored"][row] = recent["goals_for"]
+                rows["recent_conceded"][row] = recent["goals_against"]
+        
+        for i in group:
+            match_id, kickoff = int(fixtures["match_id"][i]), kickoffs[i].item().isoformat()
+            home_team, away_team = int(fixtures["home_team"][i]), int(fixtures["away_team"][i])
+            home_score, away_score = int(fixtures["home_score"][i]), int(fixtures["away_score"][i])
+            
+            for team_id, venue, scored, conceded in (
+                (home_team, "home", home_score, away_score),
+                (away_team, "away", away_score, home_score),
+            ):
+                entry = (match_id, kickoff, scored, conceded)
+                for window_venue in ("overall", venue):
+                    windows.setdefault((team_id, window_venue), deque(maxlen=TEAM_STATS_WINDOW)).appendleft(entry)
+                
+                points = 3 if scored > conceded else 1 if scored == conceded else 0
+                standing = table.setdefault(team_id, [0, 0, 0, 0])
+                standing[0] += 1
+                standing[1] += scored
+                standing[2] += conceded
+                standing[3] += points
+            
+            home_rating = ratings.get(home_team, RatingService.INITIAL_RATING)
+            away_rating = ratings.get(away_team, RatingService.INITIAL_RATING)
+            change = float(RatingService.rating_change(home_rating, away_rating, home_score, away_score))
+            ratings[home_team], ratings[away_team] = home_rating + change, away_rating - change
+    
+    return rows
+
+
+def _clip(probability: float) -> float:
+    return min(max(probability, EPSILON), 1 - EPSILON)
+
+
+def score_prediction(prediction: Dict, home_score: int, away_score: int) -> Tuple[bool, float, float, float]:
+    """Whether a market's pick was right, its probability, Brier score and log-loss
+    
+    1X2 is scored on its three-way probabilities (Brier summed over the three
+    results, 0 to 2). The other markets are scored on the picked outcome with
+    the confidence as its probability, which for the two-way over/under and
+    BTTS markets is the whole distribution.
+    """
+    result = "1" if home_score > away_score else "X" if home_score == away_score else "2"
+    pick = prediction["prediction"]
+    probability = _clip(prediction["confidence"])
+    
+    if prediction["type"] == "WIN_DRAW_WIN":
+        probabilities = prediction["probabilities"]
+        forecast = {"1": probabilities["home_win"], "X": probabilities["draw"], "2": probabilities["away_win"]}
+        brier = sum((value - (outcome == result)) ** 2 for outcome, value in forecast.items())
+        return pick == result, probability, brier, -math.log(_clip(forecast[result]))
+    
+    if prediction["type"] == "OVER_UNDER":
+        direction, line = pick.split()
+        correct = (home_score + away_score > float(line)) == (direction == "Over")
+    elif prediction["type"] == "BOTH_TEAMS_SCORE":
+        correct = (home_score > 0 and away_score > 0) == (pick == "Yes")
+    elif prediction["type"] == "DOUBLE_CHANCE":
+        correct = result in pick
+    else:
+        correct = pick == f"{home_score}-{away_score}"
+    
+    brier = (probability - correct) ** 2
+    return correct, probability, brier, -math.log(probability if correct else 1 - probability)
+
+
+def run_shard(fixtures: Fixtures, season: int, models: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Backtest one league season; earlier seasons of the league only warm up the features
+    
+    Returns one row per fixture, model and market of the season.
+    """
+    features = point_in_time_features(fixtures)
+    scored = np.flatnonzero(fixtures["season"] == season)
+    engine = PredictionEngine()
+    
+    rows = {name: [] for name in ("fixture", "model", "market", "correct", "probability", "brier", "log_loss")}
+    try:
+        for model_code, model in enumerate(models):
+            predictions = engine.predict_features(features, 2 * scored, 2 * scored + 1, model)
+            for i, fixture_predictions in zip(scored, predictions):
+                home_score, away_score = int(fixtures["home_score"][i]), int(fixtures["away_score"][i])
+                for prediction in fixture_predictions:
+                    correct, probability, brier, log_loss = score_prediction(prediction, home_score, away_score)
+                    rows["fixture"].append(i)
+                    rows["model"].append(model_code)
+                    rows["market"].append(MARKETS.index(prediction["type"]))
+                    rows["correct"].append(correct)
+                    rows["probability"].append(probability)
+                    rows["brier"].append(brier)
+                    rows["log_loss"].append(log_loss)
+    finally:
+        engine.db.close()
+    
+    fixture = np.array(rows.pop("fixture"), dtype=np.int64)
+    return {
+        "match_id": fixtures["match_id"][fixture],
+        "league_id": fixtures["league_id"][fixture],
+        "season": fixtures["season"][fixture],
+        "kickoff": fixtures["kickoff"][fixture],
+        "model": np.array(rows["model"], dtype=np.int8),
+        "market": np.array(rows["market"], dtype=np.int8),
+        "correct": np.array(rows["correct"], dtype=bool),
+        "probability": np.array(rows["probability"], dtype=np.float32),
+        "brier": np.array(rows["brier"], dtype=np.float32),
+        "log_loss": np.array(rows["log_loss"], dtype=np.float32),
+    }
+
+
+def shards(fixtures: Fixtures, seasons: Optional[Iterable[int]] = None) -> List[Tuple[int, int]]:
+    """(league_id, season) pairs present in the fixtures, optionally limited to some seasons"""
+    pairs = sorted(set(zip(fixtures["league_id"].tolist(), fixtures["season"].tolist())))
+    if seasons is not None:
+        seasons = set(seasons)
+        pairs = [pair for pair in pairs if pair[1] in seasons]
+    return pairs
+
+
+def run_backtest(
+    fixtures: Fixtures,
+    models: Optional[Sequence[str]] = None,
+    seasons: Optional[Iterable[int]] = None,
+    workers: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """Backtest every league season in a process pool and return the combined columns
+    
+    Each shard gets its league's fixtures up to the end of its season, so
+    shards are independent and can run in any order. ``workers=1`` runs them
+    in this process. Rows are ordered by kick-off, match, model and market;
+    ``model`` and ``market`` are indexes into the returned ``models`` and
+    ``markets`` arrays.
+    """
+    models = tuple(models or PredictionEngine.MODEL_VERSIONS)
+    for model in models:
+        PredictionEngine.model_version(model)
+    
+    jobs = []
+    for league_id, season in shards(fixtures, seasons):
+        mask = (fixtures["league_id"] == league_id) & (fixtures["season"] <= season)
+        jobs.append(({name: values[mask] for name, values in fixtures.items()}, season))
+    
+    # Largest shards first so the pool is not left waiting on a long tail
+    jobs.sort(key=lambda job: len(job[0]["match_id"]), reverse=True)
+    
+    if workers == 1 or len(jobs) <= 1:
+        parts = [run_shard(shard, season, models) for shard, season in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_shard, shard, season, models) for shard, season in jobs]
+            parts = [future.result() for future in futures]
+    
+    logger.info(f"Backtested {len(jobs)} league seasons with models {', '.join(models)}")
+    
+    if not parts:
+        empty = run_shard({name: np.array([], dtype=dtype) for name, dtype in FIXTURE_COLUMNS.items()}, 0, models)
+        parts = [empty]
+    
+    results = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    order = np.lexsort((results["market"], results["model"], results["match_id"], results["kickoff"]))
+    results = {name: values[order] for name, values in results.items()}
+    results["models"] = np.array(models)
+    results["markets"] = np.array(MARKETS)
+    return results
+
+
+def save_results(results: Dict[str, np.ndarray], path: str) -> None:
+    """Write result columns to a compressed .npz file, one array per column"""
+    np.savez_compressed(path, **results)
+
+
+def load_results(path: str) -> Dict[str, np.ndarray]:
+    """Read result columns written by save_results"""
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def market_summary(results: Dict[str, np.ndarray]) -> List[Dict]:
+    """Fixtures, accuracy, mean Brier score and mean log-loss per model and market"""
+    summary = []
+    for model_code, model in enumerate(results["models"].tolist()):
+        for market_code, market in enumerate(results["markets"].tolist()):
+            selected = (results["model"] == model_code) & (results["market"] == market_code)
+            if not selected.any():
+                continue
+            summary.append({
+                "model": model,
+                "market": market,
+                "fixtures": int(selected.sum()),
+                "accuracy": float(results["correct"][selected].mean()),
+                "brier": float(results["brier"][selected].astype(np.float64).mean()),
+                "log_loss": float(results["log_loss"][selected].astype(np.float64).mean()),
+            })
+    return summary
\ No newline at end of file
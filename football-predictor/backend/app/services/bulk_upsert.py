@@ -0,0 +1,186 @@
+"""
+Bulk upserts of provider rows keyed by external ID
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+CONFLICT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def payload_hash(row: Dict[str, Any], columns: Sequence[str]) -> str:
+    """32-character digest of a row's provider columns"""
+    values = json.dumps([row.get(column) for column in columns], default=str, separators=(",", ":"))
+    return hashlib.blake2b(values.encode(), digest_size=16).hexdigest()
+
+
+def conflict_upsert_statement(model, rows: List[Dict[str, Any]], update_columns: Sequence[str], dialect_name: str):
+    """INSERT ... ON CONFLICT (external_id) DO UPDATE of ``update_columns`` for a batch of rows"""
+    statement = CONFLICT_INSERTS[dialect_name](model).values(rows)
+    changes = {column: statement.excluded[column] for column in update_columns}
+    if "updated_at" in model.__table__.c:
+        changes["updated_at"] = datetime.utcnow()
+    return statement.on_conflict_do_update(index_elements=[model.external_id], set_=changes)
+
+
+class UpsertResult:
+    """What one upsert did: row IDs inserted and updated, and tracked values before each update"""
+    
+    def __init__(self):
+        self.inserted: Dict[Any, int] = {}  # external ID -> row ID
+        self.updated: Dict[Any, int] = {}
+        self.previous: Dict[int, Dict[str, Any]] = {}  # row ID -> tracked columns before the update
+        self.unchanged = 0
+        self.missing = 0  # Update-only rows with no existing row
+    
+    def counts(self) -> Dict[str, int]:
+        return {
+            "inserted": len(self.inserted),
+            "updated": len(self.updated),
+            "unchanged": self.unchanged,
+            "missing": self.missing
+        }
+
+
+class BulkUpserter:
+    """Writes provider rows with one preload and a few batched statements per entity type
+    
+    Each row's provider columns are hashed and the digest stored alongside
+    them. The existing external_id -> (id, digest) map is loaded once per
+    model and digest column and kept current as rows are written, so
+    unchanged rows cost nothing, and new or changed rows are written with
+    batched INSERT ... ON CONFLICT DO UPDATE statements (or bulk INSERT and
+    UPDATE by primary key on other dialects). The caller commits.
+    """
+    
+    MAX_PARAMETERS = 900  # Bound parameters per statement; older SQLite builds allow 999
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self._existing: Dict[Tuple[type, str], Dict[Any, Tuple[int, Optional[str]]]] = {}
+    
+    def upsert(
+        self,
+        model,
+        rows: List[Dict[str, Any]],
+        columns: Sequence[str],
+        hash_column: str = "sync_hash",
+        insert_new: bool = True,
+        track: Sequence[str] = ()
+    ) -> UpsertResult:
+        """Insert new rows, update changed ones and skip rows whose digest is unchanged
+        
+        ``rows`` carry ``external_id`` and ``columns``; later rows with the
+        same external ID win. With ``insert_new`` off, rows without an
+        existing match are counted as missing instead of inserted.
+        ``track`` columns are read back before updating, for callers that
+        react to particular changes.
+        """
+        existing = self._load(model, hash_column)
+        result = UpsertResult()
+        
+        incoming: Dict[Any, Dict[str, Any]] = {}
+        for row in rows:
+            values = {column: row.get(column) for column in columns}
+            values["external_id"] = row["external_id"]
+            values[hash_column] = payload_hash(row, columns)
+            incoming[row["external_id"]] = values
+        
+        new_rows, changed_rows = [], []
+        for external_id, values in incoming.items():
+            current = existing.get(external_id)
+            if current is None:
+                if insert_new:
+                    new_rows.append(values)
+                else:
+                    result.missing += 1
+            elif current[1] == values[hash_column]:
+                result.unchanged += 1
+            else:
+                changed_rows.append({**values, "id": current[0]})
+        
+        if track and changed_rows:
+            result.previous = self._read(model, [row["id"] for row in changed_rows], track)
+        
+        write_columns = list(columns) + [hash_column]
+        dialect_name = self.db.get_bind().dialect.name
+        
+        if insert_new and dialect_name in CONFLICT_INSERTS:
+            # One statement shape for both: conflicts update, the rest insert
+            batch_rows = [{k: v for k, v in row.items() if k != "id"} for row in changed_rows] + new_rows
+            for batch in self._batches(batch_rows, len(write_columns) + 1):
+                self.db.execute(conflict_upsert_statement(model, batch, write_columns, dialect_name))
+        else:
+            if new_rows:
+                self.db.execute(insert(model), new_rows)
+            if changed_rows:
+                timestamps = {"updated_at": datetime.utcnow()} if "updated_at" in model.__table__.c else {}
+                self.db.execute(update(model), [
+                    {"id": row["id"], **{column: row[column] for column in write_columns}, **timestamps}
+                    for row in changed_rows
+                ])
+        
+        if new_rows:
+            result.inserted = self._ids(model, [row["external_id"] for row in new_rows])
+        result.updated = {row["external_id"]: row["id"] for row in changed_rows}
+        
+        for external_id, row_id in {**result.inserted, **result.updated}.items():
+            existing[external_id] = (row_id, incoming[external_id][hash_column])
+        
+        logger.info(f"Upserted {model.__tablename__}: {result.counts()}")
+        return result
+    
+    def known_ids(self, model, hash_column: str = "sync_hash") -> Dict[Any, int]:
+        """Row ID per external ID of every existing row, from the preloaded map"""
+        return {external_id: row_id for external_id, (row_id, _) in self._load(model, hash_column).items()}
+    
+    def reset(self):
+        """Forget preloaded maps, e.g. after the caller rolled back"""
+        self._existing.clear()
+    
+    def _load(self, model, hash_column: str) -> Dict[Any, Tuple[int, Optional[str]]]:
+        key = (model, hash_column)
+        if key not in self._existing:
+            rows = self.db.execute(
+                select(model.external_id, model.id, getattr(model, hash_column))
+                .where(model.external_id.is_not(None))
+            ).all()
+            self._existing[key] = {external_id: (row_id, digest) for external_id, row_id, digest in rows}
+        return self._existing[key]
+    
+    def _read(self, model, ids: List[int], columns: Sequence[str]) -> Dict[int, Dict[str, Any]]:
+        """Current values of ``columns`` per row ID"""
+        values = {}
+        for batch in self._batches(ids, 1):
+            for row in self.db.execute(
+                select(model.id, *(getattr(model, column) for column in columns)).where(model.id.in_(batch))
+            ):
+                values[row[0]] = dict(zip(columns, row[1:]))
+        return values
+    
+    def _ids(self, model, external_ids: List[Any]) -> Dict[Any, int]:
+        """Row ID per external ID"""
+        ids = {}
+        for batch in self._batches(external_ids, 1):
+            ids.update(self.db.execute(
+                select(model.external_id, model.id).where(model.external_id.in_(batch))
+            ).tuples().all())
+        return ids
+    
+    def _batches(self, items: List[Any], parameters_per_item: int):
+        size = max(1, self.MAX_PARAMETERS // parameters_per_item)
+        for start in range(0, len(items), size):
+            yield items[start:start + size]
\ No newline at end of file
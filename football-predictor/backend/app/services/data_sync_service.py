@@ -2,60 +2,142 @@
 Data synchronization service for keeping local data in sync with external APIs
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload
 
+from app.core.cache import LEAGUES, MATCHES, TEAMS, response_cache
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.models.league import League
 from app.models.team import Team
 from app.models.match import Match, MatchStatus
+from app.models.user_stats import UserStats
+from app.services.bulk_upsert import BulkUpserter
+from app.services.fetch_scheduler import PRIORITY_LIVE, PRIORITY_NEAR_KICKOFF, PRIORITY_NORMAL
 from app.services.football_data_service import FootballDataService
+from app.services.prediction_workers import (
+    prediction_workers, rebuild_team_form, refresh_stored_predictions, replay_team_ratings
+)
+from app.services.rating_service import RatingService
+from app.services.settlement_service import SETTLED_STATUSES, SettlementService
+from app.services.sync_watermarks import ALL_COMPETITIONS, SyncWatermarks
+from app.services.team_feature_service import TeamFeatureService
+from app.services.user_stats_service import UserStatsService
+from app.services.leaderboard import STATS_COLUMNS, leaderboard
 
 logger = logging.getLogger(__name__)
 
+# Provider columns written by each sync step; they also make up the row's payload hash
+LEAGUE_COLUMNS = ("name", "country", "type", "logo_url", "current_season", "is_active", "is_current")
+TEAM_COLUMNS = ("name", "short_name", "country", "founded", "venue", "website", "logo_url", "league_id")
+MATCH_COLUMNS = (
+    "home_team_id", "away_team_id", "league_id", "match_date", "status", "matchday", "stage", "group",
+    "home_score", "away_score", "venue", "referee"
+)
+STANDINGS_COLUMNS = (
+    "position", "points", "matches_played", "wins", "draws", "losses", "goals_for", "goals_against"
+)
+
+# Fixtures that should have a result by now but may not yet
+OPEN_STATUSES = (MatchStatus.SCHEDULED, MatchStatus.TIMED, MatchStatus.IN_PLAY, MatchStatus.PAUSED, MatchStatus.SUSPENDED)
+# Kick-off to a settled result at the provider, with stoppages and a margin
+MATCH_LENGTH = timedelta(hours=3)
+
+
+def window_params(date_from, date_to) -> str:
+    """Watermark params of a matches request over a date window"""
+    return f"dateFrom={date_from:%Y-%m-%d}&dateTo={date_to:%Y-%m-%d}"
+
 
 class DataSyncService:
     """Service for synchronizing data with external APIs"""
     
-    def __init__(self):
-        self.football_data_service = FootballDataService()
+    def __init__(self, football_data_service: Optional[FootballDataService] = None):
+        self.football_data_service = football_data_service or FootballDataService()
+        # Each job closes the session when it ends, returning its connection to the pool;
+        # a closed session opens a new one if the service is used again
         self.db = SessionLocal()
+        self.upserter = BulkUpserter(self.db)
+        self.watermarks = SyncWatermarks(self.db)
+        # Rows inserted, updated and unchanged per sync step in this run
+        self.row_counts: Dict[str, Dict[str, int]] = {}
+        # Teams whose prediction inputs changed since the last refresh
+        self.affected_team_ids: Set[int] = set()
+        # User predictions settled in this run
+        self.predictions_settled = 0
     
-    async def sync_all_data(self) -> Dict[str, int]:
-        """Sync all data from external APIs"""
+    async def sync_all_data(self, full: bool = False) -> Dict[str, int]:
+        """Sync what may have changed at the provider since the last run
+        
+        Competitions and teams are fetched every SYNC_STATIC_HOURS, standings
+        once a fixture may have finished since they were last fetched, the
+        fixtures ahead every SYNC_FIXTURES_HOURS and results while fixtures are
+        live or unsettled; ``full`` fetches everything. Requests are
+        conditional either way, and unchanged payloads are skipped unparsed.
+        """
         results = {
+            "requests_planned": 0,
             "leagues_synced": 0,
             "teams_synced": 0,
             "matches_synced": 0,
             "standings_updated": 0,
+            "predictions_refreshed": 0,
+            "predictions_settled": 0,
+            "rows": self.row_counts,
             "errors": []
         }
         
         try:
             # Sync competitions/leagues
-            leagues_synced = await self.sync_leagues()
-            results["leagues_synced"] = leagues_synced
+            if full or self.watermarks.due(ALL_COMPETITIONS, "competitions", timedelta(hours=settings.SYNC_STATIC_HOURS)):
+                leagues_synced = await self.sync_leagues()
+                results["leagues_synced"] = leagues_synced
+                results["requests_planned"] += 1
+            
+            # Fetch every league's due teams, fixtures and standings at once so
+            # the requests share the budget concurrently, then apply them in order
+            leagues = self.db.query(League).all()
+            plan = self._plan(leagues, full)
+            results["requests_planned"] += (
+                len(plan["teams"]) + len(plan["standings"]) + sum(map(len, plan["windows"].values()))
+            )
+            logger.info(f"Sync plan: {results['requests_planned']} requests for {len(leagues)} leagues")
+            
+            teams_fetched, matches_fetched, standings_fetched = await asyncio.gather(
+                self._fetch_teams(plan["teams"]),
+                self._fetch_matches(leagues, plan["windows"]),
+                self._fetch_standings(plan["standings"])
+            )
             
             # Sync teams for each league
-            teams_synced = await self.sync_teams()
+            teams_synced = await self.sync_teams(teams_fetched)
             results["teams_synced"] = teams_synced
             
             # Sync matches
-            matches_synced = await self.sync_matches()
+            matches_synced = await self.sync_matches(matches_fetched)
             results["matches_synced"] = matches_synced
             
             # Update standings
-            standings_updated = await self.update_standings()
+            standings_updated = await self.update_standings(standings_fetched)
             results["standings_updated"] = standings_updated
             
+            # Recompute stored predictions touched by the above
+            predictions_refreshed = await self.refresh_predictions()
+            results["predictions_refreshed"] = predictions_refreshed
+            results["predictions_settled"] = self.predictions_settled
+            
             logger.info(f"Data sync completed: {results}")
             
         except Exception as e:
             logger.error(f"Error in sync_all_data: {e}")
             results["errors"].append(str(e))
-        
+            
         finally:
             self.db.close()
         
@@ -64,233 +146,535 @@ class DataSyncService:
     async def sync_leagues(self) -> int:
         """Sync leagues from external API"""
         try:
-            competitions = await self.football_data_service.get_competitions()
-            synced_count = 0
-            
-            for comp_data in competitions:
-                # Check if league already exists
-                existing_league = self.db.query(League).filter(
-                    League.external_id == comp_data["external_id"]
-                ).first()
-                
-                if existing_league:
-                    # Update existing league
-                    for key, value in comp_data.items():
-                        if hasattr(existing_league, key):
-                            setattr(existing_league, key, value)
-                    existing_league.updated_at = datetime.utcnow()
-                else:
-                    # Create new league
-                    new_league = League(**comp_data)
-                    self.db.add(new_league)
-                
-                synced_count += 1
+            competitions = await self._fetch_conditional(
+                ALL_COMPETITIONS, "competitions", "", self.football_data_service.get_competitions
+            )
+            if competitions is None:
+                competitions = []  # Unchanged since the last sync
             
+            result = self.upserter.upsert(League, competitions, LEAGUE_COLUMNS)
+            self.watermarks.save("competitions")
             self.db.commit()
-            logger.info(f"Synced {synced_count} leagues")
-            return synced_count
+            
+            self.row_counts["leagues"] = result.counts()
+            if result.inserted or result.updated:
+                await response_cache.invalidate(LEAGUES)
+            logger.info(f"Synced {len(competitions)} leagues: {result.counts()}")
+            return len(competitions)
             
         except Exception as e:
             logger.error(f"Error syncing leagues: {e}")
             self.db.rollback()
+            self.upserter.reset()
+            self.watermarks.reset()
             return 0
     
-    async def sync_teams(self) -> int:
-        """Sync teams from external API"""
+    async def sync_teams(self, fetched: Optional[Dict[int, List[Dict]]] = None) -> int:
+        """Sync teams from external API, or from payloads already fetched per league ID"""
         try:
             leagues = self.db.query(League).all()
-            synced_count = 0
+            if fetched is None:
+                fetched = await self._fetch_teams(leagues)
             
+            rows = []
             for league in leagues:
-                teams_data = await self.football_data_service.get_teams(league.external_id)
-                
-                for team_data in teams_data:
-                    # Check if team already exists
-                    existing_team = self.db.query(Team).filter(
-                        Team.external_id == team_data["external_id"]
-                    ).first()
-                    
-                    if existing_team:
-                        # Update existing team
-                        for key, value in team_data.items():
-                            if hasattr(existing_team, key):
-                                setattr(existing_team, key, value)
-                        existing_team.updated_at = datetime.utcnow()
-                    else:
-                        # Create new team
-                        team_data["league_id"] = league.id
-                        new_team = Team(**team_data)
-                        self.db.add(new_team)
-                    
-                    synced_count += 1
+                for team_data in fetched.get(league.id, []):
+                    # The provider's payload carries its competition ID, not ours
+                    rows.append({**team_data, "league_id": league.id})
             
+            result = self.upserter.upsert(Team, rows, TEAM_COLUMNS, track=("name",))
+            self.watermarks.save("teams")
             self.db.commit()
-            logger.info(f"Synced {synced_count} teams")
-            return synced_count
+            
+            # Team names are part of the stored predictions
+            names = {row["external_id"]: row["name"] for row in rows}
+            for external_id, team_id in result.updated.items():
+                if result.previous[team_id]["name"] != names[external_id]:
+                    self.affected_team_ids.add(team_id)
+            
+            self.row_counts["teams"] = result.counts()
+            if result.inserted or result.updated:
+                await response_cache.invalidate(TEAMS)
+            logger.info(f"Synced {len(rows)} teams: {result.counts()}")
+            return len(rows)
             
         except Exception as e:
             logger.error(f"Error syncing teams: {e}")
             self.db.rollback()
+            self.upserter.reset()
+            self.watermarks.reset()
             return 0
     
-    async def sync_matches(self) -> int:
-        """Sync matches from external API"""
+    async def sync_matches(self, fetched: Optional[Dict[int, List[Dict]]] = None) -> int:
+        """Sync matches from external API, or from payloads already fetched per league ID"""
         try:
             leagues = self.db.query(League).all()
-            synced_count = 0
+            if fetched is None:
+                fetched = await self._fetch_matches(leagues)
+            
+            # Provider team ID -> row ID, shared with sync_teams' preload, so no per-match team queries
+            team_ids = self.upserter.known_ids(Team)
             
+            rows = []
+            unresolved: Dict[Any, str] = {}
+            unresolved_competitions = set()
+            skipped = 0
             for league in leagues:
-                # Get matches for the next 30 days
-                matches_data = await self.football_data_service.get_upcoming_matches(
-                    league.external_id, days_ahead=30
-                )
-                
-                # Also get recent finished matches
-                recent_matches = await self.football_data_service.get_matches(
-                    league.external_id,
-                    date_from=(datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d"),
-                    date_to=datetime.now().strftime("%Y-%m-%d")
-                )
-                
-                all_matches = matches_data + recent_matches
-                
-                for match_data in all_matches:
-                    # Find teams
-                    home_team = self.db.query(Team).filter(
-                        Team.name == match_data["home_team_name"],
-                        Team.league_id == league.id
-                    ).first()
-                    
-                    away_team = self.db.query(Team).filter(
-                        Team.name == match_data["away_team_name"],
-                        Team.league_id == league.id
-                    ).first()
+                for match_data in fetched.get(league.id, []):
+                    home_team_id = team_ids.get(match_data["home_team_external_id"])
+                    away_team_id = team_ids.get(match_data["away_team_external_id"])
                     
-                    if not home_team or not away_team:
-                        logger.warning(f"Teams not found for match: {match_data['home_team_name']} vs {match_data['away_team_name']}")
+                    if not home_team_id or not away_team_id:
+                        for side in ("home", "away"):
+                            external_id = match_data[f"{side}_team_external_id"]
+                            if external_id not in team_ids:
+                                unresolved[external_id] = match_data[f"{side}_team_name"]
+                        unresolved_competitions.add(league.external_id)
+                        skipped += 1
                         continue
                     
-                    # Check if match already exists
-                    existing_match = self.db.query(Match).filter(
-                        Match.external_id == match_data["external_id"]
-                    ).first()
-                    
-                    if existing_match:
-                        # Update existing match
-                        existing_match.home_score = match_data.get("home_score")
-                        existing_match.away_score = match_data.get("away_score")
-                        existing_match.status = match_data.get("status", "SCHEDULED")
-                        existing_match.venue = match_data.get("venue")
-                        existing_match.referee = match_data.get("referee")
-                        existing_match.updated_at = datetime.utcnow()
-                    else:
-                        # Create new match
-                        new_match = Match(
-                            external_id=match_data["external_id"],
-                            home_team_id=home_team.id,
-                            away_team_id=away_team.id,
-                            league_id=league.id,
-                            match_date=datetime.fromisoformat(match_data["match_date"].replace('Z', '+00:00')),
-                            status=match_data.get("status", "SCHEDULED"),
-                            matchday=match_data.get("matchday"),
-                            stage=match_data.get("stage"),
-                            group=match_data.get("group"),
-                            home_score=match_data.get("home_score"),
-                            away_score=match_data.get("away_score"),
-                            venue=match_data.get("venue"),
-                            referee=match_data.get("referee")
-                        )
-                        self.db.add(new_match)
-                    
-                    synced_count += 1
+                    kickoff = datetime.fromisoformat(match_data["match_date"].replace('Z', '+00:00'))
+                    rows.append({
+                        **match_data,
+                        "home_team_id": home_team_id,
+                        "away_team_id": away_team_id,
+                        "league_id": league.id,
+                        "match_date": kickoff.astimezone(timezone.utc).replace(tzinfo=None),
+                        "status": match_data.get("status") or MatchStatus.SCHEDULED.value
+                    })
             
+            if unresolved:
+                teams = ", ".join(f"{name} ({external_id})" for external_id, name in list(unresolved.items())[:20])
+                more = f" and {len(unresolved) - 20} more" if len(unresolved) > 20 else ""
+                logger.warning(f"Skipped {skipped} matches with {len(unresolved)} unknown teams: {teams}{more}")
+            
+            result = self.upserter.upsert(Match, rows, MATCH_COLUMNS, track=("status", "home_score", "away_score"))
+            # Payloads with fixtures left out are fetched in full again next run
+            for resource in ("fixtures", "results"):
+                self.watermarks.save(resource, skip=frozenset(unresolved_competitions))
             self.db.commit()
-            logger.info(f"Synced {synced_count} matches")
-            return synced_count
+            
+            # A new result changes both teams' form
+            by_external_id = {row["external_id"]: row for row in rows}
+            finished_ids = []
+            settled_ids = []
+            for external_id, match_id in {**result.inserted, **result.updated}.items():
+                row = by_external_id[external_id]
+                outcome = (row["status"], row.get("home_score"), row.get("away_score"))
+                previous = result.previous.get(match_id)
+                if previous is not None and (previous["status"], previous["home_score"], previous["away_score"]) == outcome:
+                    continue
+                self.affected_team_ids.update((row["home_team_id"], row["away_team_id"]))
+                if outcome[0] == MatchStatus.FINISHED:
+                    finished_ids.append(match_id)
+                if outcome[0] in SETTLED_STATUSES:
+                    settled_ids.append(match_id)
+            
+            # Ratings and form live on teams; invalidating teams also drops matches
+            teams_changed = self._apply_results(finished_ids)
+            await self._settle(settled_ids)
+            if teams_changed or result.inserted or result.updated:
+                await response_cache.invalidate(TEAMS if teams_changed else MATCHES)
+            
+            self.row_counts["matches"] = result.counts()
+            logger.info(f"Synced {len(rows)} matches: {result.counts()}")
+            return len(rows)
             
         except Exception as e:
             logger.error(f"Error syncing matches: {e}")
             self.db.rollback()
+            self.upserter.reset()
+            self.watermarks.reset()
             return 0
     
-    async def update_standings(self) -> int:
-        """Update team standings from external API"""
+    async def update_standings(self, fetched: Optional[Dict[int, List[Dict]]] = None) -> int:
+        """Update team standings from external API, or from payloads already fetched per league ID"""
         try:
             leagues = self.db.query(League).all()
-            updated_count = 0
+            if fetched is None:
+                fetched = await self._fetch_standings(leagues)
             
-            for league in leagues:
-                standings_data = await self.football_data_service.get_standings(league.external_id)
-                
-                for standing in standings_data:
-                    team = self.db.query(Team).filter(
-                        Team.external_id == standing["team_external_id"]
-                    ).first()
-                    
-                    if team:
-                        # Update team statistics
-                        team.position = standing.get("position")
-                        team.points = standing.get("points", 0)
-                        team.matches_played = standing.get("matches_played", 0)
-                        team.wins = standing.get("wins", 0)
-                        team.draws = standing.get("draws", 0)
-                        team.losses = standing.get("losses", 0)
-                        team.goals_for = standing.get("goals_for", 0)
-                        team.goals_against = standing.get("goals_against", 0)
-                        team.updated_at = datetime.utcnow()
-                        
-                        updated_count += 1
+            rows = [
+                {
+                    "external_id": standing["team_external_id"],
+                    "position": standing.get("position"),
+                    "points": standing.get("points", 0),
+                    "matches_played": standing.get("matches_played", 0),
+                    "wins": standing.get("wins", 0),
+                    "draws": standing.get("draws", 0),
+                    "losses": standing.get("losses", 0),
+                    "goals_for": standing.get("goals_for", 0),
+                    "goals_against": standing.get("goals_against", 0)
+                }
+                for league in leagues
+                for standing in fetched.get(league.id, [])
+            ]
             
+            # Standings only touch teams the team sync created
+            result = self.upserter.upsert(
+                Team, rows, STANDINGS_COLUMNS, hash_column="standings_hash", insert_new=False, track=STANDINGS_COLUMNS
+            )
+            self.watermarks.save("standings")
             self.db.commit()
-            logger.info(f"Updated {updated_count} team standings")
+            
+            by_external_id = {row["external_id"]: row for row in rows}
+            for external_id, team_id in result.updated.items():
+                after = by_external_id[external_id]
+                if any(result.previous[team_id][column] != after[column] for column in STANDINGS_COLUMNS):
+                    self.affected_team_ids.add(team_id)
+            
+            self.row_counts["standings"] = result.counts()
+            if result.updated:
+                await response_cache.invalidate(TEAMS)
+            updated_count = len(result.updated) + result.unchanged
+            logger.info(f"Updated {updated_count} team standings: {result.counts()}")
             return updated_count
             
         except Exception as e:
             logger.error(f"Error updating standings: {e}")
             self.db.rollback()
+            self.upserter.reset()
+            self.watermarks.reset()
             return 0
     
     async def update_match_results(self) -> int:
         """Update match results for finished matches"""
         try:
             # Get matches that are finished but don't have scores
-            finished_matches = self.db.query(Match).filter(
+            finished_matches = self.db.query(Match).options(joinedload(Match.league)).filter(
                 Match.status == MatchStatus.FINISHED,
                 Match.home_score.is_(None)
             ).all()
             
             updated_count = 0
+            updated_matches = []
+            
+            # One request per league and match day, all issued concurrently
+            days = sorted({(match.league.external_id, match.match_date.strftime("%Y-%m-%d")) for match in finished_matches})
+            fetched = await asyncio.gather(*(
+                self.football_data_service.get_matches(competition_id, date_from=day, date_to=day)
+                for competition_id, day in days
+            ))
+            by_external_id = {match_data["external_id"]: match_data for matches_data in fetched for match_data in matches_data}
             
             for match in finished_matches:
-                # Get updated match data from API
-                matches_data = await self.football_data_service.get_matches(
-                    match.league.external_id,
-                    date_from=match.match_date.strftime("%Y-%m-%d"),
-                    date_to=match.match_date.strftime("%Y-%m-%d")
-                )
+                match_data = by_external_id.get(match.external_id)
+                if match_data is None:
+                    continue
+                
+                # Update match with results
+                self.affected_team_ids.update((match.home_team_id, match.away_team_id))
+                match.home_score = match_data.get("home_score")
+                match.away_score = match_data.get("away_score")
+                match.status = match_data.get("status", "FINISHED")
+                match.updated_at = datetime.utcnow()
                 
-                # Find the specific match
-                for match_data in matches_data:
-                    if (match_data["home_team_name"] == match.home_team.name and
-                        match_data["away_team_name"] == match.away_team.name):
-                        
-                        # Update match with results
-                        match.home_score = match_data.get("home_score")
-                        match.away_score = match_data.get("away_score")
-                        match.status = match_data.get("status", "FINISHED")
-                        match.updated_at = datetime.utcnow()
-                        
-                        updated_count += 1
-                        break
+                updated_matches.append(match)
+                updated_count += 1
             
             self.db.commit()
+            
+            teams_changed = self._apply_results([match.id for match in updated_matches])
+            await self._settle([match.id for match in updated_matches])
+            await response_cache.invalidate(TEAMS if teams_changed else MATCHES)
             logger.info(f"Updated {updated_count} match results")
+            
+            await self.refresh_predictions()
             return updated_count
             
         except Exception as e:
             logger.error(f"Error updating match results: {e}")
             self.db.rollback()
             return 0
+            
+        finally:
+            self.db.close()
+    
+    def _league_priorities(self, leagues: List[League]) -> Dict[int, int]:
+        """Fetch priority per league ID: live matches first, then kick-offs within FETCH_NEAR_KICKOFF_HOURS"""
+        now = datetime.utcnow()
+        rows = self.db.execute(
+            select(Match.league_id, Match.status, func.min(Match.match_date))
+            .where(
+                Match.league_id.in_([league.id for league in leagues]),
+                Match.status.in_([MatchStatus.IN_PLAY, MatchStatus.PAUSED, MatchStatus.SCHEDULED, MatchStatus.TIMED]),
+                Match.match_date <= now + timedelta(hours=settings.FETCH_NEAR_KICKOFF_HOURS)
+            )
+            .group_by(Match.league_id, Match.status)
+        ).all()
+        
+        priorities = {league.id: PRIORITY_NORMAL for league in leagues}
+        for league_id, status, kickoff in rows:
+            if status in (MatchStatus.IN_PLAY, MatchStatus.PAUSED):
+                priorities[league_id] = PRIORITY_LIVE
+            elif kickoff >= now:
+                priorities[league_id] = min(priorities[league_id], PRIORITY_NEAR_KICKOFF)
+        return priorities
+    
+    def _plan(self, leagues: List[League], full: bool = False) -> Dict[str, Any]:
+        """Leagues whose teams and standings are due, and the fixture date windows due per league ID"""
+        now = datetime.utcnow()
+        today = now.date()
+        # Anchored to the week so the request, and its validators, stay the same all week
+        week_start = today - timedelta(days=today.weekday())
+        fixtures_window = (week_start, week_start + timedelta(weeks=settings.SYNC_FIXTURES_WEEKS))
+        recent_from = now - timedelta(days=settings.SYNC_RECENT_DAYS)
+        
+        # Fixtures that kicked off recently, for every league in one query
+        kickoffs = defaultdict(list)
+        for league_id, status, kickoff in self.db.execute(
+            select(Match.league_id, Match.status, Match.match_date)
+            .where(Match.match_date >= recent_from, Match.match_date <= now)
+        ):
+            kickoffs[league_id].append((status, kickoff))
+        
+        plan = {"teams": [], "standings": [], "windows": {}}
+        for league in leagues:
+            competition_id = league.external_id
+            
+            if full or self.watermarks.due(competition_id, "teams", timedelta(hours=settings.SYNC_STATIC_HOURS)):
+                plan["teams"].append(league)
+            
+            # A fixture still running at the last fetch may have moved the table since
+            standings_at = self.watermarks.checked_at(competition_id, "standings")
+            if (full or self.watermarks.due(competition_id, "standings", timedelta(hours=settings.SYNC_STANDINGS_HOURS))
+                    or any(kickoff + MATCH_LENGTH > standings_at for _, kickoff in kickoffs[league.id])):
+                plan["standings"].append(league)
+            
+            windows = []
+            if full or self.watermarks.due(
+                competition_id, "fixtures", timedelta(hours=settings.SYNC_FIXTURES_HOURS), window_params(*fixtures_window)
+            ):
+                windows.append(("fixtures", *fixtures_window))
+            
+            # Live and unsettled fixtures, and ones that ended since the last fetch
+            results_at = self.watermarks.checked_at(competition_id, "results")
+            if full or results_at is None:
+                windows.append(("results", recent_from.date(), today))
+            else:
+                pending = [
+                    kickoff for status, kickoff in kickoffs[league.id]
+                    if status in OPEN_STATUSES or kickoff + MATCH_LENGTH > results_at
+                ]
+                if pending:
+                    windows.append(("results", min(pending).date(), today))
+            
+            if windows:
+                plan["windows"][league.id] = windows
+        
+        return plan
+    
+    async def _fetch_conditional(
+        self,
+        competition_id: int,
+        resource: str,
+        params: str,
+        fetch: Callable[..., Awaitable[Optional[List[Dict]]]]
+    ) -> Optional[List[Dict]]:
+        """Run fetch(validators=...) with the resource's watermark validators; None if unchanged"""
+        validators = self.watermarks.validators(competition_id, resource, params)
+        result = await fetch(validators=validators)
+        self.watermarks.seen(competition_id, resource, params, validators)
+        return result
+    
+    async def _fetch_per_league(
+        self,
+        leagues: List[League],
+        fetch: Callable[[League, int], Awaitable[Optional[List[Any]]]]
+    ) -> Dict[int, List[Any]]:
+        """Run fetch(league, priority) for every league concurrently under the shared request budget
+        
+        Leagues whose payload was unchanged (fetch returned None) are left out.
+        """
+        priorities = self._league_priorities(leagues)
+        results = await asyncio.gather(*(fetch(league, priorities[league.id]) for league in leagues))
+        return {league.id: result for league, result in zip(leagues, results) if result is not None}
+    
+    async def _fetch_teams(self, leagues: List[League]) -> Dict[int, List[Dict]]:
+        """Teams per league ID"""
+        return await self._fetch_per_league(leagues, lambda league, priority: self._fetch_conditional(
+            league.external_id, "teams", "", partial(self.football_data_service.get_teams, league.external_id, priority)
+        ))
+    
+    async def _fetch_matches(
+        self,
+        leagues: List[League],
+        windows: Optional[Dict[int, List[tuple]]] = None
+    ) -> Dict[int, List[Dict]]:
+        """Fixtures per league ID over its (resource, date_from, date_to) windows, by default all of them"""
+        if windows is None:
+            windows = self._plan(leagues, full=True)["windows"]
+        
+        async def fetch(league: League, priority: int) -> Optional[List[Dict]]:
+            fetched = await asyncio.gather(*(
+                self._fetch_conditional(
+                    league.external_id, resource, window_params(date_from, date_to),
+                    partial(
+                        self.football_data_service.get_matches, league.external_id,
+                        date_from=f"{date_from:%Y-%m-%d}", date_to=f"{date_to:%Y-%m-%d}", priority=priority
+                    )
+                )
+                for resource, date_from, date_to in windows[league.id]
+            ))
+            changed = [matches for matches in fetched if matches is not None]
+            return [match for matches in changed for match in matches] if changed else None
+        
+        return await self._fetch_per_league([league for league in leagues if league.id in windows], fetch)
+    
+    async def _fetch_standings(self, leagues: List[League]) -> Dict[int, List[Dict]]:
+        """Standings per league ID"""
+        return await self._fetch_per_league(leagues, lambda league, priority: self._fetch_conditional(
+            league.external_id, "standings", "",
+            partial(self.football_data_service.get_standings, league.external_id, priority)
+        ))
+    
+    def _apply_results(self, match_ids: List[int]) -> Set[int]:
+        """Fold newly finished results into team ratings and form; return the teams that changed"""
+        if not match_ids:
+            return set()
+        
+        changed = set()
+        
+        for service_class in (RatingService, TeamFeatureService):
+            try:
+                changed |= service_class(self.db).apply_results(match_ids)
+            except Exception as e:
+                logger.error(f"Error applying results with {service_class.__name__}: {e}")
+        
+        self.affected_team_ids |= changed
+        return changed
+    
+    async def _settle(self, match_ids: List[int]) -> int:
+        """Settle pending user predictions of newly decided matches and move their users on the leaderboard"""
+        if not match_ids:
+            return 0
+        
+        try:
+            settlement_service = SettlementService(self.db)
+            settled = sum(settlement_service.settle(match_ids).values())
+            await self._update_leaderboard(settlement_service.settled_user_ids)
+        except Exception as e:
+            logger.error(f"Error settling predictions: {e}")
+            return 0
+        
+        self.predictions_settled += settled
+        return settled
+    
+    async def _update_leaderboard(self, user_ids: Set[int]):
+        """Push the committed stats of users whose predictions settled to the leaderboard"""
+        if not user_ids:
+            return
+        
+        user_ids = sorted(user_ids)
+        rows = []
+        for start in range(0, len(user_ids), 500):
+            rows += self.db.execute(
+                select(*STATS_COLUMNS).where(UserStats.user_id.in_(user_ids[start:start + 500]))
+            ).all()
+        await leaderboard.update(rows)
+    
+    async def settle_predictions(self) -> int:
+        """Settle every pending prediction whose match is already decided"""
+        try:
+            settlement_service = SettlementService(self.db)
+            settled = sum(settlement_service.settle_pending().values())
+            await self._update_leaderboard(settlement_service.settled_user_ids)
+            logger.info(f"Settled {settled} pending predictions")
+            return settled
+            
+        except Exception as e:
+            logger.error(f"Error settling pending predictions: {e}")
+            return 0
+            
+        finally:
+            self.db.close()
+    
+    async def rollover_user_stats(self) -> int:
+        """Start the new month's counters and leaderboard"""
+        try:
+            reset = UserStatsService(self.db).rollover()
+            await leaderboard.reload()
+            await leaderboard.write_ranks(self.db)
+            return reset
+            
+        except Exception as e:
+            logger.error(f"Error rolling user stats over: {e}")
+            return 0
+            
+        finally:
+            self.db.close()
+    
+    async def rebuild_user_stats(self) -> int:
+        """Recompute every user's stats from their settled predictions, then the leaderboard"""
+        try:
+            rebuilt = UserStatsService(self.db).rebuild()
+            await leaderboard.reload()
+            await leaderboard.write_ranks(self.db)
+            return rebuilt
+            
+        except Exception as e:
+            logger.error(f"Error rebuilding user stats: {e}")
+            return 0
+            
+        finally:
+            self.db.close()
+    
+    async def replay_ratings(self) -> int:
+        """Rebuild all team ratings from the match history and refresh predictions"""
+        try:
+            replayed_count = await prediction_workers.run(("replay-ratings",), replay_team_ratings)
+            await response_cache.invalidate(TEAMS)
+            await self.refresh_predictions(all_fixtures=True)
+            return replayed_count
+            
+        except Exception as e:
+            logger.error(f"Error replaying team ratings: {e}")
+            return 0
+            
+        finally:
+            self.db.close()
+    
+    async def rebuild_team_features(self) -> int:
+        """Rebuild all team form windows from the match history and refresh predictions"""
+        try:
+            windows_count = await prediction_workers.run(("rebuild-team-features",), rebuild_team_form)
+            await response_cache.invalidate(TEAMS)
+            await self.refresh_predictions(all_fixtures=True)
+            return windows_count
+            
+        except Exception as e:
+            logger.error(f"Error rebuilding team features: {e}")
+            return 0
+            
+        finally:
+            self.db.close()
+    
+    async def refresh_predictions(self, all_fixtures: bool = False) -> int:
+        """Recompute stored predictions for fixtures of teams whose inputs changed
+        
+        The model runs in the prediction worker pool, off the event loop.
+        """
+        if not all_fixtures and not self.affected_team_ids:
+            return 0
+        
+        try:
+            team_ids = None if all_fixtures else sorted(self.affected_team_ids)
+            refreshed_count = await prediction_workers.run(
+                ("refresh-predictions", None if team_ids is None else tuple(team_ids)),
+                refresh_stored_predictions, team_ids
+            )
+            self.affected_team_ids.clear()
+            
+            # Refreshed fixtures carry a new prediction_confidence
+            if refreshed_count:
+                await response_cache.invalidate(MATCHES)
+            
+            logger.info(f"Refreshed {refreshed_count} stored predictions")
+            return refreshed_count
+            
+        except Exception as e:
+            logger.error(f"Error refreshing predictions: {e}")
+            return 0
     
     async def cleanup_old_data(self) -> int:
         """Clean up old data to keep database size manageable"""
@@ -307,10 +691,14 @@ class DataSyncService:
                 self.db.delete(match)
             
             self.db.commit()
+            await response_cache.invalidate(MATCHES)
             logger.info(f"Cleaned up {deleted_count} old matches")
             return deleted_count
             
         except Exception as e:
             logger.error(f"Error cleaning up old data: {e}")
             self.db.rollback()
-            return 0
\ No newline at end of file
+            return 0
+            
+        finally:
+            self.db.close()
\ No newline at end of file
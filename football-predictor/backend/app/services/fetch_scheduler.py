@@ -0,0 +1,190 @@
+"""
+Rate-budgeted scheduler for requests to external data providers
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Lower values are granted first
+PRIORITY_LIVE = 0
+PRIORITY_NEAR_KICKOFF = 1
+PRIORITY_NORMAL = 2
+
+# Request budgets per provider and plan: (requests, per seconds)
+PROVIDER_PLANS: Dict[str, Dict[str, Tuple[int, float]]] = {
+    "football_data": {
+        "free": (10, 60.0),
+        "standard": (60, 60.0),
+        "advanced": (120, 60.0),
+    },
+}
+
+
+class TokenBucket:
+    """Budget of ``capacity`` requests per ``period`` seconds
+    
+    The bucket starts full, so a burst of up to ``capacity`` requests goes
+    out at once. A token comes back ``period`` seconds after the request
+    that spent it finished; the provider counted the request no later than
+    that, so no window of ``period`` seconds on its side ever sees more than
+    ``capacity`` requests, whatever the latency.
+    """
+    
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.period = period
+        self.held = 0  # Tokens spent by requests still in flight
+        self._returns: List[float] = []  # Heap of times finished requests' tokens come back
+        self._paused_until = 0.0
+    
+    def next_token_at(self, now: float) -> float:
+        """Earliest time a token is available; infinite while every token is held in flight"""
+        while self._returns and self._returns[0] <= now:
+            heapq.heappop(self._returns)
+        
+        if self.held + len(self._returns) < self.capacity:
+            ready_at = now
+        elif self._returns:
+            ready_at = self._returns[0]
+        else:
+            return math.inf
+        return max(ready_at, self._paused_until)
+    
+    def take(self):
+        """Spend a token for a request; the caller has checked next_token_at"""
+        self.held += 1
+    
+    def give_back(self, finished_at: float):
+        """The request holding a token finished; the token returns a period later"""
+        self.held -= 1
+        heapq.heappush(self._returns, finished_at + self.period)
+    
+    def pause(self, seconds: float):
+        """Hand out no tokens for the next ``seconds``, e.g. after the provider refused a request"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class FetchScheduler:
+    """Grants request slots from one shared token bucket in priority order
+    
+    Callers hold a slot for the length of their request. At most
+    ``max_concurrency`` requests are in flight, and when callers are waiting
+    the next token goes to the lowest priority value, then the earliest
+    caller.
+    """
+    
+    def __init__(self, bucket: TokenBucket, max_concurrency: int):
+        self.bucket = bucket
+        self.max_concurrency = max_concurrency
+        self.requests = 0
+        self.throttled = 0
+        self.waited_seconds = 0.0
+        self._waiting: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._dispatcher: Optional[asyncio.Task] = None
+    
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_NORMAL) -> AsyncIterator[None]:
+        """Wait for a token and a concurrency slot, and release the slot on exit"""
+        started = time.monotonic()
+        granted = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._sequence), granted))
+        self._wake()
+        
+        try:
+            await granted
+        except asyncio.CancelledError:
+            # Granted just before the cancellation landed: give the slot back
+            if granted.done() and not granted.cancelled():
+                self._release()
+            raise
+        
+        self.requests += 1
+        self.waited_seconds += time.monotonic() - started
+        try:
+            yield
+        finally:
+            self._release()
+    
+    def throttle(self, seconds: Optional[float] = None):
+        """Stop granting tokens for a while after the provider refused a request"""
+        self.throttled += 1
+        self.bucket.pause(self.bucket.period if seconds is None else seconds)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Scheduler counters for monitoring"""
+        return {
+            "capacity": self.bucket.capacity,
+            "period": self.bucket.period,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "waiting": len(self._waiting),
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "average_wait_seconds": round(self.waited_seconds / self.requests, 3) if self.requests else 0.0
+        }
+    
+    def _release(self):
+        self._in_flight -= 1
+        self.bucket.give_back(time.monotonic())
+        self._wake()
+    
+    def _wake(self):
+        """Make sure a dispatcher is running on this event loop"""
+        loop = asyncio.get_running_loop()
+        if self._dispatcher is None or self._dispatcher.done() or self._dispatcher.get_loop() is not loop:
+            self._dispatcher = loop.create_task(self._dispatch())
+    
+    async def _dispatch(self):
+        # Let callers started in the same tick queue up, so the first tokens go by priority
+        await asyncio.sleep(0)
+        
+        while self._waiting:
+            if self._waiting[0][2].cancelled():
+                heapq.heappop(self._waiting)
+                continue
+            
+            now = time.monotonic()
+            ready_at = self.bucket.next_token_at(now)
+            
+            # A finishing request wakes the dispatcher again
+            if self._in_flight >= self.max_concurrency or ready_at == math.inf:
+                return
+            
+            if ready_at > now:
+                await asyncio.sleep(ready_at - now)
+                continue
+            
+            _, _, granted = heapq.heappop(self._waiting)
+            self.bucket.take()
+            self._in_flight += 1
+            granted.set_result(None)
+
+
+def create_fetch_scheduler(provider: str) -> FetchScheduler:
+    """Build the scheduler for a provider from its configured plan"""
+    plan = getattr(settings, f"{provider.upper()}_PLAN").strip().lower()
+    plans = PROVIDER_PLANS[provider]
+    
+    if plan not in plans:
+        raise ValueError(f"Unknown {provider.upper()}_PLAN: {plan} (expected one of {', '.join(plans)})")
+    
+    capacity, period = plans[plan]
+    capacity = getattr(settings, f"{provider.upper()}_RATE_LIMIT") or capacity
+    logger.info(f"{provider} request budget: {capacity} per {period:g}s, {settings.FETCH_MAX_CONCURRENCY} concurrent")
+    return FetchScheduler(TokenBucket(capacity, period), settings.FETCH_MAX_CONCURRENCY)
+
+
+# One budget for every caller in the process
+football_data_scheduler = create_fetch_scheduler("football_data")
\ No newline at end of file
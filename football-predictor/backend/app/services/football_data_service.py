@@ -3,80 +3,295 @@ Football Data API service for fetching match data
 """
 
 import httpx
-import logging
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
 import asyncio
+import hashlib
+import importlib.util
+import logging
+import random
+import re
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, List, Optional, Any
+from datetime import datetime, timedelta, timezone
 
 from app.core.config import settings
+from app.services.fetch_scheduler import PRIORITY_LIVE, PRIORITY_NORMAL, FetchScheduler, football_data_scheduler
 
 logger = logging.getLogger(__name__)
 
+# Worth another attempt: rate limited, or a transient server-side failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def create_http_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """Pooled client for provider requests: keep-alive, and HTTP/2 when enabled and the h2 package is installed"""
+    http2 = settings.FOOTBALL_DATA_HTTP2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("FOOTBALL_DATA_HTTP2 is set but the h2 package is missing; using HTTP/1.1")
+        http2 = False
+    
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.FOOTBALL_DATA_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.FETCH_MAX_CONCURRENCY,
+            max_keepalive_connections=settings.FETCH_MAX_CONCURRENCY,
+            keepalive_expiry=settings.FOOTBALL_DATA_KEEPALIVE
+        ),
+        http2=http2,
+        transport=transport
+    )
+
+
+class ProviderClient:
+    """Process-wide pooled client, opened on first use and closed in the app lifespan
+    
+    Connections belong to the event loop that opened them, so a caller on a
+    different loop (a script calling asyncio.run twice) gets a fresh client.
+    """
+    
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def get(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = create_http_client()
+            self._loop = loop
+        return self._client
+    
+    async def close(self):
+        """Close pooled connections"""
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+
+class EndpointStats:
+    """Per-endpoint request, retry and latency counters"""
+    
+    WINDOW = 512  # Latest latencies kept per endpoint for percentiles
+    
+    def __init__(self):
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+    
+    def _entry(self, endpoint: str) -> Dict[str, Any]:
+        # /competitions/2021/matches and /competitions/2014/matches are one endpoint
+        key = re.sub(r"/\d+", "/{id}", endpoint)
+        if key not in self._endpoints:
+            self._endpoints[key] = {
+                "requests": 0, "not_modified": 0, "retries": 0, "failures": 0, "latencies": deque(maxlen=self.WINDOW)
+            }
+        return self._endpoints[key]
+    
+    def record(self, endpoint: str, seconds: float):
+        entry = self._entry(endpoint)
+        entry["requests"] += 1
+        entry["latencies"].append(seconds)
+    
+    def record_not_modified(self, endpoint: str):
+        """A response skipped unparsed: a 304, or a body identical to the last one"""
+        self._entry(endpoint)["not_modified"] += 1
+    
+    def record_retry(self, endpoint: str):
+        self._entry(endpoint)["retries"] += 1
+    
+    def record_failure(self, endpoint: str):
+        self._entry(endpoint)["failures"] += 1
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Counters and latency percentiles in milliseconds per endpoint"""
+        result = {}
+        for key, entry in sorted(self._endpoints.items()):
+            latencies: Deque[float] = entry["latencies"]
+            ordered = sorted(latencies)
+            result[key] = {
+                "requests": entry["requests"],
+                "not_modified": entry["not_modified"],
+                "retries": entry["retries"],
+                "failures": entry["failures"],
+                "latency_ms_p50": round(ordered[len(ordered) // 2] * 1000, 1) if ordered else None,
+                "latency_ms_p95": round(ordered[int(len(ordered) * 0.95)] * 1000, 1) if ordered else None,
+                "latency_ms_max": round(ordered[-1] * 1000, 1) if ordered else None
+            }
+        return result
+
+
+class ResponseValidators:
+    """What the last response to one request looked like, sent back to skip an unchanged payload
+    
+    The ETag and Last-Modified go out as If-None-Match and If-Modified-Since;
+    a 304, or a 200 whose body digest matches the last one, leaves
+    ``modified`` False and the body unparsed. ``modified`` stays None when
+    no response arrived.
+    """
+    
+    def __init__(
+        self,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        content_hash: Optional[str] = None
+    ):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.modified: Optional[bool] = None
+    
+    def request_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+    
+    def not_modified(self, response: httpx.Response):
+        """A 304: keep the digest, take any refreshed validators"""
+        self.etag = response.headers.get("ETag", self.etag)
+        self.last_modified = response.headers.get("Last-Modified", self.last_modified)
+        self.modified = False
+    
+    def update(self, response: httpx.Response) -> bool:
+        """Record a 200's validators and body digest; return whether the body changed"""
+        content_hash = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+        self.modified = content_hash != self.content_hash
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        self.content_hash = content_hash
+        return self.modified
+
+
+def retry_delay(response: Optional[httpx.Response], attempt: int) -> float:
+    """Seconds before retrying: what the server asked for if it said, else capped exponential backoff with full jitter"""
+    retry_after = None
+    if response is not None:
+        # football-data.org reports when its per-minute counter resets instead
+        retry_after = response.headers.get("Retry-After") or response.headers.get("X-RequestCounter-Reset")
+    
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            try:
+                return max((parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+            except (TypeError, ValueError):
+                pass
+    
+    return random.uniform(0, min(settings.FETCH_BACKOFF_MAX, settings.FETCH_BACKOFF_BASE * 2 ** attempt))
+
+
+football_data_client = ProviderClient()
+football_data_stats = EndpointStats()
+
 
 class FootballDataService:
     """Service for fetching data from Football-Data.org API"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        scheduler: Optional[FetchScheduler] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ):
         self.base_url = settings.FOOTBALL_DATA_BASE_URL
         self.api_key = settings.FOOTBALL_DATA_API_KEY
         self.headers = {
             "X-Auth-Token": self.api_key,
             "Content-Type": "application/json"
         } if self.api_key else {}
-        self.rate_limit_delay = 6  # 10 requests per minute (free tier)
-        self.last_request_time = 0
+        # Shared by every instance unless given, so the plan's quota holds process-wide
+        self.scheduler = scheduler or football_data_scheduler
+        # A client passed in is owned by the caller; otherwise the pooled one is used
+        self.client = client
     
-    async def _rate_limit(self):
-        """Implement rate limiting for free tier"""
-        current_time = asyncio.get_event_loop().time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.rate_limit_delay:
-            await asyncio.sleep(self.rate_limit_delay - time_since_last)
-        
-        self.last_request_time = asyncio.get_event_loop().time()
-    
-    async def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Optional[Dict]:
-        """Make HTTP request with rate limiting"""
-        await self._rate_limit()
+    async def _make_request(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        priority: int = PRIORITY_NORMAL,
+        validators: Optional[ResponseValidators] = None
+    ) -> Optional[Dict]:
+        """Make HTTP request within the provider's request budget, retrying transient failures
         
+        With ``validators`` the request is conditional, and an unchanged
+        payload returns None with ``validators.modified`` False.
+        """
         url = f"{self.base_url}{endpoint}"
+        client = self.client or football_data_client.get()
+        headers = {**self.headers, **validators.request_headers()} if validators else self.headers
         
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, headers=self.headers, params=params)
+        for attempt in range(settings.FOOTBALL_DATA_MAX_RETRIES + 1):
+            response = None
+            try:
+                async with self.scheduler.slot(priority):
+                    started = time.monotonic()
+                    try:
+                        response = await client.get(url, headers=headers, params=params)
+                    finally:
+                        football_data_stats.record(endpoint, time.monotonic() - started)
+                        
+            except httpx.TransportError as e:
+                logger.warning(f"API request error on {endpoint} (attempt {attempt + 1}): {e}")
                 
+            except Exception as e:
+                logger.error(f"API request error: {e}")
+                football_data_stats.record_failure(endpoint)
+                return None
+            
+            if response is not None:
+                if validators is not None and response.status_code == 304:
+                    validators.not_modified(response)
+                    football_data_stats.record_not_modified(endpoint)
+                    return None
                 if response.status_code == 200:
+                    if validators is not None and not validators.update(response):
+                        football_data_stats.record_not_modified(endpoint)
+                        return None
                     return response.json()
-                elif response.status_code == 429:
-                    logger.warning("Rate limit exceeded, waiting longer...")
-                    await asyncio.sleep(60)  # Wait 1 minute
-                    return await self._make_request(endpoint, params)
-                else:
+                if response.status_code not in RETRY_STATUSES:
                     logger.error(f"API request failed: {response.status_code} - {response.text}")
+                    football_data_stats.record_failure(endpoint)
                     return None
-                    
-        except Exception as e:
-            logger.error(f"API request error: {e}")
-            return None
+            
+            if attempt == settings.FOOTBALL_DATA_MAX_RETRIES:
+                break
+            
+            delay = retry_delay(response, attempt)
+            football_data_stats.record_retry(endpoint)
+            
+            if response is not None and response.status_code == 429:
+                # Holds back every caller sharing the budget, not just this one
+                logger.warning(f"Rate limit exceeded, pausing requests for {delay:.1f}s...")
+                self.scheduler.throttle(delay)
+            else:
+                logger.warning(f"Retrying {endpoint} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        
+        status = response.status_code if response is not None else "no response"
+        logger.error(f"API request failed after {settings.FOOTBALL_DATA_MAX_RETRIES + 1} attempts: {endpoint} ({status})")
+        football_data_stats.record_failure(endpoint)
+        return None
     
-    async def get_competitions(self) -> List[Dict]:
-        """Get available competitions/leagues"""
+    async def get_competitions(self, validators: Optional[ResponseValidators] = None) -> Optional[List[Dict]]:
+        """Get available competitions/leagues; None if unchanged since ``validators``"""
         try:
-            data = await self._make_request("/competitions")
+            data = await self._make_request("/competitions", validators=validators)
+            if validators is not None and validators.modified is False:
+                return None
             
             if data and "competitions" in data:
                 competitions = []
                 for comp in data["competitions"]:
-                    # Filter for major leagues only (free tier limitation)
-                    if comp.get("id") in [2021, 2014, 2002, 2019, 2015]:  # Premier League, La Liga, etc.
+                    # Only the configured leagues (by default the free tier's: Premier League, La Liga, etc.)
+                    if comp.get("id") in settings.FOOTBALL_DATA_COMPETITIONS:
                         competitions.append({
                             "external_id": comp["id"],
                             "name": comp["name"],
                             "country": comp.get("area", {}).get("name", ""),
                             "type": comp.get("type", "LEAGUE"),
                             "logo_url": comp.get("emblem"),
-                            "current_season": comp.get("currentSeason", {}).get("startDate"),
+                            "current_season": self._season_year(comp.get("currentSeason") or {}),
                             "is_active": "true",
                             "is_current": "true"
                         })
@@ -91,10 +306,25 @@ class FootballDataService:
             logger.error(f"Error fetching competitions: {e}")
             return []
     
-    async def get_teams(self, competition_id: int) -> List[Dict]:
-        """Get teams for a competition"""
+    @staticmethod
+    def _season_year(season: Dict) -> Optional[int]:
+        """Year a season starts in, from its start date"""
+        start_date = season.get("startDate")
+        return int(start_date[:4]) if start_date else None
+    
+    async def get_teams(
+        self,
+        competition_id: int,
+        priority: int = PRIORITY_NORMAL,
+        validators: Optional[ResponseValidators] = None
+    ) -> Optional[List[Dict]]:
+        """Get teams for a competition; None if unchanged since ``validators``"""
         try:
-            data = await self._make_request(f"/competitions/{competition_id}/teams")
+            data = await self._make_request(
+                f"/competitions/{competition_id}/teams", priority=priority, validators=validators
+            )
+            if validators is not None and validators.modified is False:
+                return None
             
             if data and "teams" in data:
                 teams = []
@@ -126,9 +356,11 @@ class FootballDataService:
         competition_id: int, 
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
-        status: Optional[str] = None
-    ) -> List[Dict]:
-        """Get matches for a competition"""
+        status: Optional[str] = None,
+        priority: int = PRIORITY_NORMAL,
+        validators: Optional[ResponseValidators] = None
+    ) -> Optional[List[Dict]]:
+        """Get matches for a competition; None if unchanged since ``validators``"""
         try:
             params = {}
             if date_from:
@@ -138,7 +370,9 @@ class FootballDataService:
             if status:
                 params["status"] = status
             
-            data = await self._make_request(f"/competitions/{competition_id}/matches", params)
+            data = await self._make_request(f"/competitions/{competition_id}/matches", params, priority, validators)
+            if validators is not None and validators.modified is False:
+                return None
             
             if data and "matches" in data:
                 matches = []
@@ -150,6 +384,8 @@ class FootballDataService:
                     
                     matches.append({
                         "external_id": match["id"],
+                        "home_team_external_id": home_team.get("id"),
+                        "away_team_external_id": away_team.get("id"),
                         "home_team_name": home_team.get("name", ""),
                         "away_team_name": away_team.get("name", ""),
                         "match_date": match.get("utcDate"),
@@ -174,10 +410,19 @@ class FootballDataService:
             logger.error(f"Error fetching matches for competition {competition_id}: {e}")
             return []
     
-    async def get_standings(self, competition_id: int) -> List[Dict]:
-        """Get standings for a competition"""
+    async def get_standings(
+        self,
+        competition_id: int,
+        priority: int = PRIORITY_NORMAL,
+        validators: Optional[ResponseValidators] = None
+    ) -> Optional[List[Dict]]:
+        """Get standings for a competition; None if unchanged since ``validators``"""
         try:
-            data = await self._make_request(f"/competitions/{competition_id}/standings")
+            data = await self._make_request(
+                f"/competitions/{competition_id}/standings", priority=priority, validators=validators
+            )
+            if validators is not None and validators.modified is False:
+                return None
             
             if data and "standings" in data:
                 standings = []
@@ -209,7 +454,12 @@ class FootballDataService:
             logger.error(f"Error fetching standings for competition {competition_id}: {e}")
             return []
     
-    async def get_upcoming_matches(self, competition_id: int, days_ahead: int = 7) -> List[Dict]:
+    async def get_upcoming_matches(
+        self,
+        competition_id: int,
+        days_ahead: int = 7,
+        priority: int = PRIORITY_NORMAL
+    ) -> List[Dict]:
         """Get upcoming matches for the next N days"""
         try:
             today = datetime.now().date()
@@ -220,7 +470,8 @@ class FootballDataService:
                 competition_id=competition_id,
                 date_from=date_from,
                 date_to=date_to,
-                status="SCHEDULED"
+                status="SCHEDULED",
+                priority=priority
             )
             
         except Exception as e:
@@ -232,7 +483,8 @@ class FootballDataService:
         try:
             return await self.get_matches(
                 competition_id=competition_id,
-                status="IN_PLAY"
+                status="IN_PLAY",
+                priority=PRIORITY_LIVE
             )
             
         except Exception as e:
@@ -253,6 +505,8 @@ class FootballDataService:
                     
                     matches.append({
                         "external_id": match["id"],
+                        "home_team_external_id": home_team.get("id"),
+                        "away_team_external_id": away_team.get("id"),
                         "home_team_name": home_team.get("name", ""),
                         "away_team_name": away_team.get("name", ""),
                         "match_date": match.get("utcDate"),
@@ -0,0 +1,477 @@
+"""
+All-time and monthly leaderboards kept in an order-statistic index
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.conditional import last_changed
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.user_stats import UserStats
+from app.services.user_stats_service import month_of
+
+logger = logging.getLogger(__name__)
+
+# Boards
+ALL_TIME = "all-time"
+MONTHLY = "monthly"
+BOARDS = (ALL_TIME, MONTHLY)
+
+MAX_LEVEL = 32  # Skip list levels; enough for 2^32 entries
+ACCURACY_SCALE = 100_000  # Redis score = points * ACCURACY_SCALE + accuracy in hundredths of a percent
+
+# (user ID, points, accuracy) of one user on a board
+Standing = Tuple[int, int, float]
+
+STATS_COLUMNS = (
+    UserStats.user_id, UserStats.total_points, UserStats.overall_accuracy, UserStats.total_predictions,
+    UserStats.monthly_points, UserStats.monthly_accuracy, UserStats.monthly_predictions, UserStats.stats_month
+)
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+    
+    def __init__(self, key, level: int):
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * level
+        self.width = [1] * level
+
+
+class RankIndex:
+    """Indexable skip list: insert, remove, count keys below and fetch by position in O(log n) expected
+    
+    Each link stores how many entries it skips, so walking down from the top
+    level both finds a key and counts the entries before it.
+    """
+    
+    def __init__(self, seed: int = 0x5EED):
+        self._head = _Node(None, MAX_LEVEL)
+        self._size = 0
+        self._random = random.Random(seed)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def _level(self) -> int:
+        level = 1
+        while level < MAX_LEVEL and self._random.random() < 0.5:
+            level += 1
+        return level
+    
+    def insert(self, key):
+        chain = [self._head] * MAX_LEVEL
+        steps_at_level = [0] * MAX_LEVEL
+        node = self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        
+        new = _Node(key, self._level())
+        steps = 0
+        for level in range(len(new.next)):
+            previous = chain[level]
+            new.next[level] = previous.next[level]
+            previous.next[level] = new
+            new.width[level] = previous.width[level] - steps
+            previous.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(len(new.next), MAX_LEVEL):
+            chain[level].width[level] += 1
+        self._size += 1
+    
+    def remove(self, key):
+        chain = [self._head] * MAX_LEVEL
+        node = self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+        
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        for level in range(len(target.next)):
+            previous = chain[level]
+            previous.width[level] += target.width[level] - 1
+            previous.next[level] = target.next[level]
+        for level in range(len(target.next), MAX_LEVEL):
+            chain[level].width[level] -= 1
+        self._size -= 1
+    
+    def count_below(self, key) -> int:
+        """Entries whose key sorts before ``key``; the position ``key`` has or would have"""
+        count = 0
+        node = self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                count += node.width[level]
+                node = node.next[level]
+        return count
+    
+    def slice(self, start: int, stop: int) -> list:
+        """Keys at positions start to stop - 1"""
+        start, stop = max(start, 0), min(stop, self._size)
+        if start >= stop:
+            return []
+        
+        node = self._head
+        remaining = start + 1
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        
+        keys = []
+        while node is not None and len(keys) < stop - start:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class MemoryLeaderboardBackend:
+    """Per-process boards, rebuilt from user_stats the first time a process reads them
+    
+    Another worker's settlement does not reach these boards, so Leaderboard
+    reloads them when user_stats has changed since they were loaded.
+    """
+    
+    name = "memory"
+    shared = False
+    
+    def __init__(self):
+        self._boards: Dict[str, RankIndex] = {}
+        self._keys: Dict[str, Dict[int, tuple]] = {}
+    
+    @staticmethod
+    def _key(user_id: int, points: int, accuracy: float) -> tuple:
+        return (-points, -accuracy, user_id)
+    
+    async def is_loaded(self, board: str) -> bool:
+        return board in self._boards
+    
+    async def replace(self, board: str, standings: Iterable[Standing]):
+        self._boards[board] = RankIndex()
+        self._keys[board] = {}
+        await self.set(board, standings)
+    
+    async def set(self, board: str, standings: Iterable[Standing]):
+        index, keys = self._boards.setdefault(board, RankIndex()), self._keys.setdefault(board, {})
+        for user_id, points, accuracy in standings:
+            key = self._key(user_id, points, accuracy)
+            previous = keys.get(user_id)
+            if previous == key:
+                continue
+            if previous is not None:
+                index.remove(previous)
+            index.insert(key)
+            keys[user_id] = key
+    
+    async def remove(self, board: str, user_ids: Iterable[int]):
+        index, keys = self._boards.get(board), self._keys.get(board, {})
+        for user_id in user_ids:
+            key = keys.pop(user_id, None)
+            if key is not None:
+                index.remove(key)
+    
+    async def count(self, board: str) -> int:
+        return len(self._boards.get(board, ()))
+    
+    async def position(self, board: str, user_id: int) -> Optional[int]:
+        key = self._keys.get(board, {}).get(user_id)
+        return self._boards[board].count_below(key) if key is not None else None
+    
+    async def better(self, board: str, points: int, accuracy: float) -> int:
+        return self._boards[board].count_below((-points, -accuracy)) if board in self._boards else 0
+    
+    async def range(self, board: str, start: int, stop: int) -> List[Standing]:
+        if board not in self._boards:
+            return []
+        return [(user_id, -points, -accuracy) for points, accuracy, user_id in self._boards[board].slice(start, stop)]
+    
+    async def drop(self, board: str):
+        self._boards.pop(board, None)
+        self._keys.pop(board, None)
+    
+    def stats(self) -> Dict[str, int]:
+        return {board: len(index) for board, index in self._boards.items()}
+    
+    async def close(self):
+        self._boards.clear()
+        self._keys.clear()
+
+
+class RedisLeaderboardBackend:
+    """Boards as Redis sorted sets, shared by every worker and kept across restarts"""
+    
+    name = "redis"
+    shared = True
+    
+    def __init__(self, url: str, prefix: str = "fp:leaderboard:"):
+        import redis.asyncio as redis
+        
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+    
+    @staticmethod
+    def _score(points: int, accuracy: float) -> int:
+        return points * ACCURACY_SCALE + round(accuracy * 100)
+    
+    @staticmethod
+    def _standing(member, score) -> Standing:
+        points, accuracy = divmod(int(score), ACCURACY_SCALE)
+        return int(member), points, accuracy / 100
+    
+    async def is_loaded(self, board: str) -> bool:
+        return bool(await self._client.exists(f"{self.prefix}{board}:loaded"))
+    
+    async def replace(self, board: str, standings: Iterable[Standing]):
+        mapping = {str(user_id): self._score(points, accuracy) for user_id, points, accuracy in standings}
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.delete(self.prefix + board)
+            if mapping:
+                pipe.zadd(self.prefix + board, mapping)
+            pipe.set(f"{self.prefix}{board}:loaded", 1)
+            await pipe.execute()
+    
+    async def set(self, board: str, standings: Iterable[Standing]):
+        mapping = {str(user_id): self._score(points, accuracy) for user_id, points, accuracy in standings}
+        if mapping:
+            await self._client.zadd(self.prefix + board, mapping)
+    
+    async def remove(self, board: str, user_ids: Iterable[int]):
+        members = [str(user_id) for user_id in user_ids]
+        if members:
+            await self._client.zrem(self.prefix + board, *members)
+    
+    async def count(self, board: str) -> int:
+        return await self._client.zcard(self.prefix + board)
+    
+    async def position(self, board: str, user_id: int) -> Optional[int]:
+        return await self._client.zrevrank(self.prefix + board, str(user_id))
+    
+    async def better(self, board: str, points: int, accuracy: float) -> int:
+        return await self._client.zcount(self.prefix + board, f"({self._score(points, accuracy)}", "+inf")
+    
+    async def range(self, board: str, start: int, stop: int) -> List[Standing]:
+        if stop <= start:
+            return []
+        members = await self._client.zrevrange(self.prefix + board, max(start, 0), stop - 1, withscores=True)
+        return [self._standing(member, score) for member, score in members]
+    
+    async def drop(self, board: str):
+        await self._client.delete(self.prefix + board, f"{self.prefix}{board}:loaded")
+    
+    def stats(self) -> Dict[str, int]:
+        return {}
+    
+    async def close(self):
+        await self._client.aclose()
+
+
+class Leaderboard:
+    """Users ranked by points, then accuracy, all-time and for the current month
+    
+    Settlement pushes the new standing of every user it touched, and each
+    push, rank lookup and page is O(log n) in the backend's index. Ties on
+    points and accuracy share a rank (1, 2, 2, 4): a user's rank is one more
+    than the users strictly ahead. A board the backend does not have yet (a
+    new process for the memory backend, an emptied Redis) is rebuilt from
+    user_stats on first use, so rankings survive restarts either way. Boards
+    of a per-process backend also reload when user_stats no longer matches
+    the version they were loaded from, checked at most every
+    LEADERBOARD_REFRESH_SECONDS, so results settled by another worker show up.
+    """
+    
+    def __init__(self, backend):
+        self.backend = backend
+        self._load_lock = asyncio.Lock()
+        self._version = None
+        self._checked_at = 0.0
+    
+    @staticmethod
+    def _board_key(board: str, month: str) -> str:
+        if board not in BOARDS:
+            raise ValueError(f"Unknown leaderboard: {board}")
+        return ALL_TIME if board == ALL_TIME else f"{MONTHLY}:{month}"
+    
+    @staticmethod
+    def standings(rows, month: str) -> Dict[str, List[Standing]]:
+        """All-time and monthly standings from user_stats rows; users without results are left off"""
+        standings = {ALL_TIME: [], MONTHLY: []}
+        for row in rows:
+            if row.total_predictions:
+                standings[ALL_TIME].append((row.user_id, row.total_points or 0, round(row.overall_accuracy or 0.0, 2)))
+            if row.stats_month == month and row.monthly_predictions:
+                standings[MONTHLY].append((row.user_id, row.monthly_points or 0, round(row.monthly_accuracy or 0.0, 2)))
+        return standings
+    
+    @staticmethod
+    async def _read_version(db) -> tuple:
+        """Aggregates of user_stats that change whenever any standing does"""
+        return tuple((await db.execute(select(
+            func.count(), func.sum(UserStats.total_predictions), func.sum(UserStats.correct_predictions),
+            func.sum(UserStats.total_points), func.sum(UserStats.monthly_predictions),
+            func.sum(UserStats.monthly_points), func.max(last_changed(UserStats))
+        ))).one())
+    
+    async def _changed_elsewhere(self) -> bool:
+        """Whether user_stats moved on since the per-process boards were loaded"""
+        if self.backend.shared or self._version is None:
+            return False
+        if time.monotonic() - self._checked_at < settings.LEADERBOARD_REFRESH_SECONDS:
+            return False
+        
+        self._checked_at = time.monotonic()
+        async with AsyncSessionLocal() as db:
+            return await self._read_version(db) != self._version
+    
+    async def _ensure_loaded(self, month: str):
+        keys = {board: self._board_key(board, month) for board in BOARDS}
+        if await self._changed_elsewhere():
+            async with self._load_lock:
+                for key in keys.values():
+                    await self.backend.drop(key)
+                self._version = None
+        
+        if all([await self.backend.is_loaded(key) for key in keys.values()]):
+            return
+        
+        async with self._load_lock:
+            missing = [board for board, key in keys.items() if not await self.backend.is_loaded(key)]
+            if missing:
+                await self._load(month, missing)
+    
+    async def _load(self, month: str, boards: Iterable[str]):
+        async with AsyncSessionLocal() as db:
+            # Read before the rows: a write in between only causes one more reload
+            version = await self._read_version(db)
+            rows = (await db.execute(select(*STATS_COLUMNS))).all()
+        
+        self._version, self._checked_at = version, time.monotonic()
+        
+        standings = self.standings(rows, month)
+        for board in boards:
+            await self.backend.replace(self._board_key(board, month), standings[board])
+            logger.info(f"Loaded {len(standings[board])} users into the {board} leaderboard")
+    
+    async def update(self, rows):
+        """Move users to their current standing from their user_stats rows"""
+        month = month_of(datetime.utcnow())
+        await self._ensure_loaded(month)
+        
+        rows = list(rows)
+        standings = self.standings(rows, month)
+        await self.backend.set(ALL_TIME, standings[ALL_TIME])
+        await self.backend.set(self._board_key(MONTHLY, month), standings[MONTHLY])
+        
+        # Users with nothing this month (their row still counts an earlier one) leave the monthly board
+        monthly = {user_id for user_id, _, _ in standings[MONTHLY]}
+        await self.backend.remove(self._board_key(MONTHLY, month), [row.user_id for row in rows if row.user_id not in monthly])
+    
+    async def reload(self) -> int:
+        """Rebuild both boards from user_stats and drop last month's; return users ranked all-time"""
+        now = datetime.utcnow()
+        month = month_of(now)
+        async with self._load_lock:
+            await self.backend.drop(self._board_key(MONTHLY, month_of(now.replace(day=1) - timedelta(days=1))))
+            await self._load(month, BOARDS)
+        return await self.backend.count(ALL_TIME)
+    
+    async def top(self, board: str, limit: int = 10, offset: int = 0) -> List[Dict]:
+        """Entries at ranks offset + 1 to offset + limit"""
+        month = month_of(datetime.utcnow())
+        await self._ensure_loaded(month)
+        return await self._entries(self._board_key(board, month), offset, offset + limit)
+    
+    async def rank(self, board: str, user_id: int) -> Optional[Dict]:
+        """A user's entry, or None if they are not on the board"""
+        entries = await self.around(board, user_id, 0)
+        return entries[0] if entries else None
+    
+    async def around(self, board: str, user_id: int, radius: int = 5) -> List[Dict]:
+        """A user's entry with up to ``radius`` entries on either side; empty if they are not on the board"""
+        month = month_of(datetime.utcnow())
+        await self._ensure_loaded(month)
+        key = self._board_key(board, month)
+        
+        position = await self.backend.position(key, user_id)
+        if position is None:
+            return []
+        return await self._entries(key, position - radius, position + radius + 1)
+    
+    async def _entries(self, key: str, start: int, stop: int) -> List[Dict]:
+        start = max(start, 0)
+        standings = await self.backend.range(key, start, stop)
+        if not standings:
+            return []
+        
+        # Only the first entry needs a count; a new rank starts wherever points or accuracy change
+        entries = []
+        rank = await self.backend.better(key, standings[0][1], standings[0][2]) + 1
+        previous = standings[0][1:]
+        for offset, (user_id, points, accuracy) in enumerate(standings):
+            if (points, accuracy) != previous:
+                rank, previous = start + offset + 1, (points, accuracy)
+            entries.append({"user_id": user_id, "points": points, "accuracy": accuracy, "rank": rank})
+        return entries
+    
+    async def write_ranks(self, db: Session) -> int:
+        """Store every user's current ranks in user_stats.global_rank and monthly_rank; return rows written"""
+        month = month_of(datetime.utcnow())
+        await self._ensure_loaded(month)
+        
+        ranks: Dict[int, Dict[str, Optional[int]]] = {}
+        for board, column in ((ALL_TIME, "global_rank"), (MONTHLY, "monthly_rank")):
+            key = self._board_key(board, month)
+            for entry in await self._entries(key, 0, await self.backend.count(key)):
+                ranks.setdefault(entry["user_id"], {"global_rank": None, "monthly_rank": None})[column] = entry["rank"]
+        
+        table = UserStats.__table__
+        db.execute(update(table).values(global_rank=None, monthly_rank=None))
+        if ranks:
+            db.execute(
+                update(table).where(table.c.user_id == bindparam("ranked_user_id")).values(
+                    global_rank=bindparam("all_time_rank"), monthly_rank=bindparam("this_month_rank")
+                ),
+                [
+                    {"ranked_user_id": user_id, "all_time_rank": columns["global_rank"],
+                     "this_month_rank": columns["monthly_rank"]}
+                    for user_id, columns in ranks.items()
+                ]
+            )
+        db.commit()
+        return len(ranks)
+    
+    def stats(self) -> Dict:
+        return {"backend": self.backend.name, "boards": self.backend.stats()}
+    
+    async def close(self):
+        await self.backend.close()
+
+
+def create_leaderboard() -> Leaderboard:
+    """Build the leaderboard selected by LEADERBOARD_BACKEND ("memory" or "redis")"""
+    backend_name = settings.LEADERBOARD_BACKEND.strip().lower()
+    
+    if backend_name == "redis":
+        backend = RedisLeaderboardBackend(settings.REDIS_URL)
+    elif backend_name == "memory":
+        backend = MemoryLeaderboardBackend()
+    else:
+        raise ValueError(f"Unknown LEADERBOARD_BACKEND: {settings.LEADERBOARD_BACKEND}")
+    
+    return Leaderboard(backend)
+
+
+leaderboard = create_leaderboard()
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+Poisson score-matrix model deriving every market from one goal distribution
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class PoissonScoreModel:
+    """Independent-Poisson goals model evaluated for whole batches of fixtures
+    
+    Attack and defence strengths are computed once per team from goals per
+    game, shrunk toward the league average. Every fixture gets a truncated
+    home x away score matrix, a batch is an (n, G, G) tensor, and 1X2,
+    over/under lines, BTTS, double chance and correct scores are all
+    reductions over that tensor.
+    """
+    
+    VERSION = "poisson-1"
+    RATED_VERSION = "poisson-elo-1"
+    
+    MAX_GOALS = 10  # Matrix covers 0..MAX_GOALS per side, renormalised
+    HOME_GOALS = 1.5  # League-average goals per game for home and away sides
+    AWAY_GOALS = 1.15
+    PRIOR_MATCHES = 5.0  # Weight of the league average in a team's strengths
+    OVER_UNDER_LINES = (0.5, 1.5, 2.5, 3.5, 4.5)
+    TOP_SCORES = 5
+    RATING_WEIGHT = 0.5  # Log goal-rate shift per 400 Elo points of rating gap
+    
+    def __init__(self, use_ratings: bool = False):
+        self.use_ratings = use_ratings
+        self.version = self.RATED_VERSION if use_ratings else self.VERSION
+        goals = np.arange(self.MAX_GOALS + 1)
+        self._goals = goals
+        self._log_factorial = np.cumsum(np.log(np.maximum(goals, 1)))
+        margin = goals[:, None] - goals[None, :]
+        self._home_win = margin > 0
+        self._away_win = margin < 0
+        
+        # One-hot map from each matrix cell to its total goals
+        total = (goals[:, None] + goals[None, :]).ravel()
+        self._total_onehot = (total[:, None] == np.arange(2 * self.MAX_GOALS + 1)).astype(float)
+    
+    def strengths(self, features: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Attack and defence multipliers per team (1.0 = league average)
+        
+        Season totals are used once standings are synced, the recent-results
+        window before that; either way PRIOR_MATCHES of league-average games
+        are mixed in so small samples stay near 1.0.
+        """
+        season = features["matches_played"] > 0
+        games = np.where(season, features["matches_played"], features["recent_played"])
+        scored = np.where(season, features["goals_for"], features["recent_scored"])
+        conceded = np.where(season, features["goals_against"], features["recent_conceded"])
+        
+        average = (self.HOME_GOALS + self.AWAY_GOALS) / 2
+        prior = self.PRIOR_MATCHES * average
+        attack = (scored + prior) / ((games + self.PRIOR_MATCHES) * average)
+        defence = (conceded + prior) / ((games + self.PRIOR_MATCHES) * average)
+        return attack, defence
+    
+    def expected_goals(
+        self, features: Dict[str, np.ndarray], home: np.ndarray, away: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Home and away goal expectations for each fixture"""
+        attack, defence = self.strengths(features)
+        home_goals = self.HOME_GOALS * attack[home] * defence[away]
+        away_goals = self.AWAY_GOALS * attack[away] * defence[home]
+        
+        if self.use_ratings:
+            # Tilt both expectations toward the side with the higher Elo rating
+            shift = np.exp(self.RATING_WEIGHT * (features["rating"][home] - features["rating"][away]) / 400)
+            home_goals, away_goals = home_goals * shift, away_goals / shift
+        
+        return home_goals, away_goals
+    
+    def score_matrices(self, home_goals: np.ndarray, away_goals: np.ndarray) -> np.ndarray:
+        """(n, G, G) tensor of P(home scores i, away scores j) per fixture"""
+        def pmf(expected):
+            log_pmf = np.outer(np.log(expected), self._goals) - expected[:, None] - self._log_factorial
+            return np.exp(log_pmf)
+        
+        matrices = pmf(home_goals)[:, :, None] * pmf(away_goals)[:, None, :]
+        return matrices / matrices.sum(axis=(1, 2), keepdims=True)
+    
+    def markets(self, matrices: np.ndarray) -> Dict[str, np.ndarray]:
+        """Every market as an array over fixtures, read from the score matrices"""
+        n = matrices.shape[0]
+        home_win = (matrices * self._home_win).sum(axis=(1, 2))
+        away_win = (matrices * self._away_win).sum(axis=(1, 2))
+        draw = np.trace(matrices, axis1=1, axis2=2)
+        
+        # P(total goals <= k) for every k, then one column per line
+        flat = matrices.reshape(n, -1)
+        cumulative = np.cumsum(flat @ self._total_onehot, axis=1)
+        under = np.stack([cumulative[:, int(line)] for line in self.OVER_UNDER_LINES], axis=1)
+        
+        # Most likely exact scores, best first
+        top = np.argsort(-flat, axis=1, kind="stable")[:, :self.TOP_SCORES]
+        
+        return {
+            "home_win": home_win,
+            "draw": draw,
+            "away_win": away_win,
+            "under": under,
+            "home_scoring": 1 - matrices[:, 0, :].sum(axis=1),
+            "away_scoring": 1 - matrices[:, :, 0].sum(axis=1),
+            "btts": matrices[:, 1:, 1:].sum(axis=(1, 2)),
+            "top_home_goals": top // (self.MAX_GOALS + 1),
+            "top_away_goals": top % (self.MAX_GOALS + 1),
+            "top_probability": np.take_along_axis(flat, top, axis=1),
+        }
+    
+    def predict(self, features: Dict[str, np.ndarray], home: np.ndarray, away: np.ndarray) -> List[List[Dict]]:
+        """Market entries for each fixture, in the engine's prediction list format"""
+        home_goals, away_goals = self.expected_goals(features, home, away)
+        markets = {key: values.tolist() for key, values in self.markets(self.score_matrices(home_goals, away_goals)).items()}
+        home_goals, away_goals = home_goals.tolist(), away_goals.tolist()
+        
+        return [
+            self._fixture_predictions({key: values[i] for key, values in markets.items()}, home_goals[i], away_goals[i])
+            for i in range(len(home_goals))
+        ]
+    
+    def _fixture_predictions(self, m: Dict, home_goals: float, away_goals: float) -> List[Dict]:
+        """Prediction list for one fixture from its slice of the market arrays"""
+        result = max((m["home_win"], "1"), (m["draw"], "X"), (m["away_win"], "2"))
+        double_chance = {
+            "1X": m["home_win"] + m["draw"],
+            "X2": m["draw"] + m["away_win"],
+            "12": m["home_win"] + m["away_win"],
+        }
+        double_pick = max(double_chance, key=double_chance.get)
+        lines = {
+            str(line): {"over": round(1 - under, 3), "under": round(under, 3)}
+            for line, under in zip(self.OVER_UNDER_LINES, m["under"])
+        }
+        headline_under = m["under"][self.OVER_UNDER_LINES.index(2.5)]
+        btts_yes = m["btts"] > 0.5
+        top_scores = [
+            {"score": f"{h}-{a}", "probability": round(p, 3)}
+            for h, a, p in zip(m["top_home_goals"], m["top_away_goals"], m["top_probability"])
+        ]
+        
+        return [
+            {
+                "type": "WIN_DRAW_WIN",
+                "prediction": result[1],
+                "confidence": result[0],
+                "probabilities": {
+                    "home_win": round(m["home_win"], 3),
+                    "draw": round(m["draw"], 3),
+                    "away_win": round(m["away_win"], 3)
+                }
+            },
+            {
+                "type": "OVER_UNDER",
+                "prediction": "Under 2.5" if headline_under > 0.5 else "Over 2.5",
+                "confidence": max(headline_under, 1 - headline_under),
+                "expected_goals": round(home_goals + away_goals, 2),
+                "lines": lines
+            },
+            {
+                "type": "BOTH_TEAMS_SCORE",
+                "prediction": "Yes" if btts_yes else "No",
+                "confidence": m["btts"] if btts_yes else 1 - m["btts"],
+                "probabilities": {
+                    "home_scoring": round(m["home_scoring"], 3),
+                    "away_scoring": round(m["away_scoring"], 3),
+                    "btts": round(m["btts"], 3)
+                }
+            },
+            {
+                "type": "DOUBLE_CHANCE",
+                "prediction": double_pick,
+                "confidence": double_chance[double_pick],
+                "probabilities": {key: round(value, 3) for key, value in double_chance.items()}
+            },
+            {
+                "type": "CORRECT_SCORE",
+                "prediction": top_scores[0]["score"],
+                "confidence": m["top_probability"][0],
+                "expected_goals": {
+                    "home": round(home_goals, 2),
+                    "away": round(away_goals, 2)
+                },
+                "top_scores": top_scores
+            }
+        ]
\ No newline at end of file
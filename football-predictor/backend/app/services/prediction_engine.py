@@ -2,15 +2,23 @@
 Prediction engine for generating match predictions
 """
 
+import hashlib
 import logging
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session, joinedload
 
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.models.team import Team
+from app.models.team_form import TeamForm
+from app.models.team_rating import TeamRating
 from app.models.match import Match, MatchStatus
 from app.models.prediction import PredictionType
+from app.services.poisson_model import PoissonScoreModel
+from app.services.rating_service import RatingService
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +26,30 @@ logger = logging.getLogger(__name__)
 class PredictionEngine:
     """Engine for generating match predictions based on various factors"""
     
-    def __init__(self):
-        self.db = SessionLocal()
+    # Batch models by name; bump a version whenever its markets change so
+    # stored predictions are recomputed
+    MODEL_VERSIONS = {
+        "heuristic": "heuristic-2",
+        "poisson": PoissonScoreModel.VERSION,
+        "poisson_elo": PoissonScoreModel.RATED_VERSION,
+    }
+    
+    def __init__(self, db: Optional[Session] = None):
+        self.db = db or SessionLocal()
+        self.poisson_models = {
+            "poisson": PoissonScoreModel(),
+            "poisson_elo": PoissonScoreModel(use_ratings=True),
+        }
+    
+    @classmethod
+    def model_version(cls, model: Optional[str] = None) -> str:
+        """Version of a registered model, PREDICTION_MODEL by default"""
+        model = model or settings.PREDICTION_MODEL
+        
+        if model not in cls.MODEL_VERSIONS:
+            raise ValueError(f"Unknown prediction model '{model}', expected one of {sorted(cls.MODEL_VERSIONS)}")
+        
+        return cls.MODEL_VERSIONS[model]
     
     def generate_prediction(self, match_id: int) -> Dict:
         """Generate prediction for a specific match"""
@@ -68,6 +98,314 @@ class PredictionEngine:
             logger.error(f"Error generating prediction for match {match_id}: {e}")
             raise
     
+    def generate_batch(
+        self,
+        match_ids: Optional[List[int]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        league_id: Optional[int] = None,
+        model: Optional[str] = None
+    ) -> List[Dict]:
+        """Generate predictions for a whole slate of scheduled matches
+        
+        Matches are selected by ID, kick-off range and/or league. Team stats and
+        form windows of every team are loaded in two bulk queries and
+        each market is computed with NumPy across all matches at once. With the
+        heuristic model entries have the same shape and values as
+        generate_prediction(); they are ordered by kick-off and matches that
+        are not scheduled are skipped.
+        """
+        try:
+            self.model_version(model)
+            matches = self._load_batch_matches(match_ids, date_from, date_to, league_id)
+            predictions = [prediction for prediction, _ in self.predict_matches(matches, model)]
+            
+            logger.info(f"Generated batch predictions for {len(predictions)} matches")
+            return predictions
+            
+        except Exception as e:
+            logger.error(f"Error generating batch predictions: {e}")
+            raise
+    
+    def predict_matches(self, matches: List[Match], model: Optional[str] = None) -> List[Tuple[Dict, str]]:
+        """Predict already loaded matches, pairing each entry with its input fingerprint
+        
+        The fingerprint hashes every value the entry was computed from, so two
+        runs with the same fingerprint and model version give the same output.
+        """
+        model = model or settings.PREDICTION_MODEL
+        self.model_version(model)
+        
+        if not matches:
+            return []
+        
+        team_ids = sorted({m.home_team_id for m in matches} | {m.away_team_id for m in matches})
+        team_index = {team_id: i for i, team_id in enumerate(team_ids)}
+        features = self._load_team_features(team_ids, team_index)
+        
+        home = np.array([team_index[m.home_team_id] for m in matches])
+        away = np.array([team_index[m.away_team_id] for m in matches])
+        entries = [
+            self._match_entry(match, predictions)
+            for match, predictions in zip(matches, self.predict_features(features, home, away, model))
+        ]
+        
+        return [
+            (entry, self._input_fingerprint(match, features, home[i], away[i]))
+            for i, (match, entry) in enumerate(zip(matches, entries))
+        ]
+    
+    def predict_features(
+        self,
+        features: Dict[str, np.ndarray],
+        home: np.ndarray,
+        away: np.ndarray,
+        model: Optional[str] = None
+    ) -> List[List[Dict]]:
+        """Prediction lists for fixtures given team feature arrays, without touching the database
+        
+        ``features`` holds one value per team row in the _load_team_features
+        layout and ``home``/``away`` index those rows per fixture.
+        """
+        model = model or settings.PREDICTION_MODEL
+        self.model_version(model)
+        
+        if model in self.poisson_models:
+            return self.poisson_models[model].predict(features, home, away)
+        
+        markets = self._batch_markets(features, home, away)
+        return [self._batch_predictions(markets, i) for i in range(len(home))]
+    
+    def _input_fingerprint(self, match: Match, features: Dict[str, np.ndarray], home: int, away: int) -> str:
+        """SHA-256 over the fixture details and both teams' feature values"""
+        parts = [match.home_team.name, match.away_team.name, match.match_date.isoformat()]
+        for name in sorted(features):
+            parts.append(f"{name}={float(features[name][home])!r}/{float(features[name][away])!r}")
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+    
+    def _load_batch_matches(
+        self,
+        match_ids: Optional[List[int]],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        league_id: Optional[int]
+    ) -> List[Match]:
+        """Load the scheduled matches of a batch with both team names"""
+        if match_ids is None and date_from is None and date_to is None and league_id is None:
+            raise ValueError("Select matches by IDs, date range or league")
+        
+        query = select(Match).options(
+            joinedload(Match.home_team), joinedload(Match.away_team)
+        ).where(Match.status.in_([MatchStatus.SCHEDULED, MatchStatus.TIMED]))
+        
+        if match_ids is not None:
+            query = query.where(Match.id.in_(match_ids))
+        
+        if date_from:
+            query = query.where(Match.match_date >= date_from)
+        
+        if date_to:
+            query = query.where(Match.match_date <= date_to)
+        
+        if league_id:
+            query = query.where(Match.league_id == league_id)
+        
+        return self.db.execute(query.order_by(Match.match_date, Match.id)).scalars().all()
+    
+    def _load_team_features(self, team_ids: List[int], team_index: Dict[int, int]) -> Dict[str, np.ndarray]:
+        """Team stats and recent-result aggregates as arrays indexed like team_ids"""
+        n = len(team_ids)
+        
+        # Defaults match _get_team_stats/_calculate_team_strength for unknown values
+        position = np.full(n, 20.0)
+        goals_for = np.zeros(n)
+        goals_against = np.ones(n)
+        avg_goals_scored = np.zeros(n)
+        matches_played = np.zeros(n)
+        rating = np.full(n, RatingService.INITIAL_RATING)
+        
+        teams = self.db.execute(
+            select(
+                Team.id, Team.position, Team.goals_for, Team.goals_against,
+                Team.avg_goals_scored, Team.matches_played, TeamRating.rating
+            ).outerjoin(TeamRating, TeamRating.team_id == Team.id).where(Team.id.in_(team_ids))
+        ).all()
+        
+        for team_id, team_position, team_goals_for, team_goals_against, team_avg, team_played, team_rating in teams:
+            i = team_index[team_id]
+            position[i] = team_position or 20
+            goals_for[i] = team_goals_for or 0
+            goals_against[i] = team_goals_against or 1
+            avg_goals_scored[i] = team_avg or 0
+            matches_played[i] = team_played or 0
+            if team_rating is not None:
+                rating[i] = team_rating
+        
+        # Precomputed form windows: last 5 overall, last 10 overall/home/away
+        windows = {}
+        for window in self.db.execute(
+            select(TeamForm).where(
+                TeamForm.team_id.in_(team_ids),
+                or_(TeamForm.venue == "overall", TeamForm.size == 10)
+            )
+        ).scalars():
+            windows.setdefault((window.venue, window.size), []).append(window)
+        
+        def window_values(venue, size, field):
+            values = np.zeros(n)
+            for window in windows.get((venue, size), []):
+                values[team_index[window.team_id]] = getattr(window, field)
+            return values
+        
+        return {
+            "position": position,
+            "goals_for": goals_for,
+            "goals_against": goals_against,
+            "avg_goals_scored": avg_goals_scored,
+            "matches_played": matches_played,
+            "rating": rating,
+            "form_played": window_values("overall", 5, "played"),
+            "form_wins": window_values("overall", 5, "wins"),
+            "form_draws": window_values("overall", 5, "draws"),
+            "home_played": window_values("home", 10, "played"),
+            "home_goals": window_values("home", 10, "goals_for"),
+            "away_played": window_values("away", 10, "played"),
+            "away_goals": window_values("away", 10, "goals_for"),
+            "recent_played": window_values("overall", 10, "played"),
+            "recent_scored": window_values("overall", 10, "goals_for"),
+            "recent_conceded": window_values("overall", 10, "goals_against"),
+        }
+    
+    def _batch_markets(self, features: Dict[str, np.ndarray], home: np.ndarray, away: np.ndarray) -> Dict[str, np.ndarray]:
+        """All four markets for every match, mirroring the per-match _predict_* rules"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            form_played = features["form_played"]
+            win_rate = np.where(form_played > 0, features["form_wins"] / form_played, 0.0)
+            
+            # Team strength (_calculate_team_strength)
+            position_strength = np.maximum(0.1, (21 - features["position"]) / 20)
+            form_strength = np.where(
+                form_played > 0,
+                (features["form_wins"] + 0.5 * features["form_draws"]) / form_played,
+                0.5
+            )
+            goal_strength = np.minimum(1.0, features["goals_for"] / features["goals_against"] / 2)
+            strength = np.clip(position_strength * 0.4 + form_strength * 0.3 + goal_strength * 0.3, 0.1, 1.0)
+            
+            # Win/Draw/Win
+            home_strength = strength[home] + 0.1
+            away_strength = strength[away]
+            total_strength = home_strength + away_strength
+            home_prob = home_strength / total_strength
+            away_prob = away_strength / total_strength
+            draw_prob = 1 - home_prob - away_prob
+            total_prob = home_prob + draw_prob + away_prob
+            home_prob, draw_prob, away_prob = home_prob / total_prob, draw_prob / total_prob, away_prob / total_prob
+            home_pick = (home_prob > draw_prob) & (home_prob > away_prob)
+            draw_pick = ~home_pick & (draw_prob > home_prob) & (draw_prob > away_prob)
+            
+            # Over/Under 2.5, blending season and home/away scoring rates
+            home_rate = np.where(features["home_played"] > 0, features["home_goals"] / features["home_played"], 0.0)
+            away_rate = np.where(features["away_played"] > 0, features["away_goals"] / features["away_played"], 0.0)
+            home_expected = features["avg_goals_scored"][home]
+            away_expected = features["avg_goals_scored"][away]
+            home_blend = np.where(home_rate[home] > 0, (home_expected + home_rate[home]) / 2, home_expected)
+            away_blend = np.where(away_rate[away] > 0, (away_expected + away_rate[away]) / 2, away_expected)
+            total_goals = home_blend + away_blend
+            over = total_goals > 2.5
+            over_under_confidence = np.where(
+                over,
+                np.minimum(0.9, (total_goals - 2.5) / 2.5 + 0.5),
+                np.minimum(0.9, (2.5 - total_goals) / 2.5 + 0.5)
+            )
+            
+            # Both teams to score
+            home_scoring = np.minimum(0.9, home_expected / 2)
+            away_scoring = np.minimum(0.9, away_expected / 2)
+            home_scoring = np.where(form_played[home] > 0, (home_scoring + win_rate[home]) / 2, home_scoring)
+            away_scoring = np.where(form_played[away] > 0, (away_scoring + win_rate[away]) / 2, away_scoring)
+            btts = home_scoring * away_scoring
+            
+            # Correct score
+            home_goals = np.maximum(0, np.round(home_expected))
+            away_goals = np.maximum(0, np.round(away_expected))
+            score_confidence = np.minimum(
+                0.7,
+                ((1 - np.abs(home_expected - home_goals)) + (1 - np.abs(away_expected - away_goals))) / 2
+            )
+        
+        return {
+            "home_prob": home_prob,
+            "draw_prob": draw_prob,
+            "away_prob": away_prob,
+            "result_pick": np.where(home_pick, "1", np.where(draw_pick, "X", "2")),
+            "result_confidence": np.where(home_pick, home_prob, np.where(draw_pick, draw_prob, away_prob)),
+            "total_goals": total_goals,
+            "over": over,
+            "over_under_confidence": over_under_confidence,
+            "home_scoring": home_scoring,
+            "away_scoring": away_scoring,
+            "btts": btts,
+            "home_goals": home_goals.astype(int),
+            "away_goals": away_goals.astype(int),
+            "score_confidence": score_confidence,
+            "home_expected": home_expected,
+            "away_expected": away_expected,
+        }
+    
+    def _match_entry(self, match: Match, predictions: List[Dict]) -> Dict:
+        """Per-match dict in the generate_prediction() shape"""
+        return {
+            "match_id": match.id,
+            "home_team": match.home_team.name,
+            "away_team": match.away_team.name,
+            "match_date": match.match_date,
+            "predictions": predictions
+        }
+    
+    def _batch_predictions(self, markets: Dict[str, np.ndarray], i: int) -> List[Dict]:
+        """Heuristic markets of the i-th match of a batch"""
+        m = {key: values[i].item() for key, values in markets.items()}
+        btts_yes = m["btts"] > 0.5
+        
+        return [
+            {
+                "type": "WIN_DRAW_WIN",
+                "prediction": m["result_pick"],
+                "confidence": m["result_confidence"],
+                "probabilities": {
+                    "home_win": round(m["home_prob"], 3),
+                    "draw": round(m["draw_prob"], 3),
+                    "away_win": round(m["away_prob"], 3)
+                }
+            },
+            {
+                "type": "OVER_UNDER",
+                "prediction": "Over 2.5" if m["over"] else "Under 2.5",
+                "confidence": m["over_under_confidence"],
+                "expected_goals": round(m["total_goals"], 2)
+            },
+            {
+                "type": "BOTH_TEAMS_SCORE",
+                "prediction": "Yes" if btts_yes else "No",
+                "confidence": m["btts"] if btts_yes else 1 - m["btts"],
+                "probabilities": {
+                    "home_scoring": round(m["home_scoring"], 3),
+                    "away_scoring": round(m["away_scoring"], 3),
+                    "btts": round(m["btts"], 3)
+                }
+            },
+            {
+                "type": "CORRECT_SCORE",
+                "prediction": f"{m['home_goals']}-{m['away_goals']}",
+                "confidence": m["score_confidence"],
+                "expected_goals": {
+                    "home": round(m["home_expected"], 2),
+                    "away": round(m["away_expected"], 2)
+                }
+            }
+        ]
+    
     def _get_team_stats(self, team_id: int) -> Dict:
         """Get team statistics for prediction"""
         team = self.db.query(Team).filter(Team.id == team_id).first()
@@ -75,18 +413,15 @@ class PredictionEngine:
         if not team:
             return {}
         
-        # Get recent matches for form calculation
-        recent_matches = self.db.query(Match).filter(
-            (Match.home_team_id == team_id) | (Match.away_team_id == team_id),
-            Match.status == MatchStatus.FINISHED
-        ).order_by(Match.match_date.desc()).limit(10).all()
-        
-        # Calculate form
-        form = self._calculate_form(team, recent_matches)
-        
-        # Calculate home/away performance
-        home_performance = self._calculate_home_performance(team, recent_matches)
-        away_performance = self._calculate_away_performance(team, recent_matches)
+        # Form and home/away performance come from the precomputed windows
+        windows = {
+            (window.venue, window.size): window
+            for window in self.db.query(TeamForm).filter(
+                TeamForm.team_id == team_id,
+                or_(TeamForm.venue == "overall", TeamForm.size == 10)
+            )
+        }
+        recent_form = windows.get(("overall", 5))
         
         return {
             "team_id": team_id,
@@ -101,81 +436,26 @@ class PredictionEngine:
             "goals_against": team.goals_against,
             "avg_goals_scored": team.avg_goals_scored,
             "avg_goals_conceded": team.avg_goals_conceded,
-            "form": form,
-            "home_performance": home_performance,
-            "away_performance": away_performance,
+            "form": list(recent_form.form) if recent_form else [],
+            "home_performance": self._window_performance(windows.get(("home", 10))),
+            "away_performance": self._window_performance(windows.get(("away", 10))),
             "clean_sheets": team.clean_sheets,
             "failed_to_score": team.failed_to_score
         }
     
-    def _calculate_form(self, team: Team, recent_matches: List[Match]) -> List[str]:
-        """Calculate team form from recent matches"""
-        form = []
-        
-        for match in recent_matches[:5]:  # Last 5 matches
-            if match.home_team_id == team.id:
-                # Home match
-                if match.home_score > match.away_score:
-                    form.append("W")
-                elif match.home_score == match.away_score:
-                    form.append("D")
-                else:
-                    form.append("L")
-            else:
-                # Away match
-                if match.away_score > match.home_score:
-                    form.append("W")
-                elif match.away_score == match.home_score:
-                    form.append("D")
-                else:
-                    form.append("L")
-        
-        return form
-    
-    def _calculate_home_performance(self, team: Team, recent_matches: List[Match]) -> Dict:
-        """Calculate home performance statistics"""
-        home_matches = [m for m in recent_matches if m.home_team_id == team.id]
-        
-        if not home_matches:
-            return {"wins": 0, "draws": 0, "losses": 0, "goals_for": 0, "goals_against": 0}
-        
-        wins = sum(1 for m in home_matches if m.home_score > m.away_score)
-        draws = sum(1 for m in home_matches if m.home_score == m.away_score)
-        losses = sum(1 for m in home_matches if m.home_score < m.away_score)
-        goals_for = sum(m.home_score for m in home_matches)
-        goals_against = sum(m.away_score for m in home_matches)
-        
-        return {
-            "wins": wins,
-            "draws": draws,
-            "losses": losses,
-            "goals_for": goals_for,
-            "goals_against": goals_against,
-            "avg_goals_for": goals_for / len(home_matches),
-            "avg_goals_against": goals_against / len(home_matches)
-        }
-    
-    def _calculate_away_performance(self, team: Team, recent_matches: List[Match]) -> Dict:
-        """Calculate away performance statistics"""
-        away_matches = [m for m in recent_matches if m.away_team_id == team.id]
-        
-        if not away_matches:
+    def _window_performance(self, window: Optional[TeamForm]) -> Dict:
+        """Home or away performance statistics from a form window"""
+        if not window or not window.played:
             return {"wins": 0, "draws": 0, "losses": 0, "goals_for": 0, "goals_against": 0}
         
-        wins = sum(1 for m in away_matches if m.away_score > m.home_score)
-        draws = sum(1 for m in away_matches if m.away_score == m.home_score)
-        losses = sum(1 for m in away_matches if m.away_score < m.home_score)
-        goals_for = sum(m.away_score for m in away_matches)
-        goals_against = sum(m.home_score for m in away_matches)
-        
         return {
-            "wins": wins,
-            "draws": draws,
-            "losses": losses,
-            "goals_for": goals_for,
-            "goals_against": goals_against,
-            "avg_goals_for": goals_for / len(away_matches),
-            "avg_goals_against": goals_against / len(away_matches)
+            "wins": window.wins,
+            "draws": window.draws,
+            "losses": window.losses,
+            "goals_for": window.goals_for,
+            "goals_against": window.goals_against,
+            "avg_goals_for": window.goals_for / window.played,
+            "avg_goals_against": window.goals_against / window.played
         }
     
     def _predict_win_draw_win(self, home_stats: Dict, away_stats: Dict) -> Dict:
@@ -332,8 +612,8 @@ class PredictionEngine:
     
     def _calculate_team_strength(self, team_stats: Dict) -> float:
         """Calculate overall team strength"""
-        # Base strength from league position
-        position = team_stats.get("position", 20)
+        # Base strength from league position (unknown until standings sync)
+        position = team_stats.get("position") or 20
         position_strength = max(0.1, (21 - position) / 20)  # Higher position = stronger
         
         # Form strength
@@ -344,8 +624,8 @@ class PredictionEngine:
             form_strength = 0.5
         
         # Goals ratio strength
-        goals_for = team_stats.get("goals_for", 0)
-        goals_against = team_stats.get("goals_against", 1)  # Avoid division by zero
+        goals_for = team_stats.get("goals_for") or 0
+        goals_against = team_stats.get("goals_against") or 1  # Avoid division by zero
         goal_ratio = goals_for / goals_against
         goal_strength = min(1.0, goal_ratio / 2)  # Normalize
         
@@ -0,0 +1,128 @@
+"""
+Precomputed prediction store kept in step with synced data
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.match import Match, MatchStatus
+from app.models.match_prediction import MatchPrediction
+from app.services.prediction_engine import PredictionEngine
+
+logger = logging.getLogger(__name__)
+
+PREDICTABLE_STATUSES = (MatchStatus.SCHEDULED, MatchStatus.TIMED)
+
+# MEDIUM covers the band just below the HIGH threshold, anything lower is LOW
+MEDIUM_CONFIDENCE_MARGIN = 0.1
+
+
+def confidence_band(confidence: float) -> str:
+    """HIGH, MEDIUM or LOW label for a headline 1X2 confidence"""
+    if confidence >= settings.PREDICTION_CONFIDENCE_THRESHOLD:
+        return "HIGH"
+    if confidence >= settings.PREDICTION_CONFIDENCE_THRESHOLD - MEDIUM_CONFIDENCE_MARGIN:
+        return "MEDIUM"
+    return "LOW"
+
+
+def _json_default(value):
+    """Encode datetimes the way FastAPI renders them in a response"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class PredictionStore:
+    """Stored engine output per fixture, recomputed only when its inputs change"""
+    
+    def __init__(self, db: Optional[Session] = None):
+        self.db = db or SessionLocal()
+        self.engine = PredictionEngine(self.db)
+    
+    def refresh(
+        self,
+        match_ids: Optional[Iterable[int]] = None,
+        team_ids: Optional[Iterable[int]] = None
+    ) -> int:
+        """Recompute stored predictions for scheduled fixtures and return how many changed
+        
+        Fixtures are selected by ID and/or by either team; with no selector
+        every scheduled fixture is considered. The whole selection is
+        predicted in one batch, but a row (and the fixture's
+        prediction_confidence) is only written when its input fingerprint or
+        the model version differs from what is stored.
+        """
+        try:
+            query = select(Match).options(
+                joinedload(Match.home_team),
+                joinedload(Match.away_team),
+                joinedload(Match.stored_prediction)
+            ).where(Match.status.in_(PREDICTABLE_STATUSES))
+            
+            if match_ids is not None:
+                query = query.where(Match.id.in_(list(match_ids)))
+            
+            if team_ids is not None:
+                team_ids = list(team_ids)
+                query = query.where(or_(Match.home_team_id.in_(team_ids), Match.away_team_id.in_(team_ids)))
+            
+            matches = self.db.execute(query.order_by(Match.match_date, Match.id)).unique().scalars().all()
+            model_version = self.engine.model_version()
+            changed = 0
+            
+            for match, (prediction, fingerprint) in zip(matches, self.engine.predict_matches(matches)):
+                stored = match.stored_prediction
+                if stored and stored.input_fingerprint == fingerprint and stored.model_version == model_version:
+                    continue
+                
+                confidence = prediction["predictions"][0]["confidence"]
+                payload = json.dumps(prediction, default=_json_default)
+                
+                if stored is None:
+                    match.stored_prediction = MatchPrediction(
+                        model_version=model_version,
+                        input_fingerprint=fingerprint,
+                        confidence=confidence,
+                        payload=payload
+                    )
+                else:
+                    stored.model_version = model_version
+                    stored.input_fingerprint = fingerprint
+                    stored.confidence = confidence
+                    stored.payload = payload
+                
+                band = confidence_band(confidence)
+                if match.prediction_confidence != band:
+                    match.prediction_confidence = band
+                
+                changed += 1
+            
+            self.db.commit()
+            logger.info(f"Refreshed {changed} of {len(matches)} stored predictions")
+            return changed
+            
+        except Exception as e:
+            logger.error(f"Error refreshing stored predictions: {e}")
+            self.db.rollback()
+            raise
+    
+    def get_prediction(self, match_id: int) -> Dict:
+        """Stored prediction for a scheduled match, computing and storing it on a miss"""
+        self.refresh(match_ids=[match_id])
+        stored = self.db.get(MatchPrediction, match_id)
+        
+        if stored is None:
+            # Same errors generate_prediction raises
+            if self.db.get(Match, match_id) is None:
+                raise ValueError(f"Match {match_id} not found")
+            raise ValueError("Can only predict scheduled matches")
+        
+        return json.loads(stored.payload)
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Worker pool running CPU-heavy prediction work off the event loop
+"""
+
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import orjson
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.serialization import ORJSON_OPTIONS
+from app.services.prediction_store import PredictionStore
+from app.services.prediction_engine import PredictionEngine
+from app.services.rating_service import RatingService
+from app.services.season_simulator import SeasonSimulator
+from app.services.team_feature_service import TeamFeatureService
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionQueueFull(Exception):
+    """Raised when the pool already holds PREDICTION_QUEUE_SIZE jobs"""
+
+
+# Jobs run in a pool worker (possibly another process), so each takes plain
+# arguments and owns its session for exactly the length of the job
+
+def predict_match(match_id: int) -> Dict:
+    """Stored prediction for a scheduled match, computed and stored on a miss"""
+    with SessionLocal() as db:
+        return PredictionStore(db).get_prediction(match_id)
+
+
+def predict_batch(
+    match_ids: Optional[List[int]],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    league_id: Optional[int],
+    model: Optional[str]
+) -> List[Dict]:
+    """Predictions for a slate of scheduled matches"""
+    with SessionLocal() as db:
+        return PredictionEngine(db).generate_batch(
+            match_ids=match_ids, date_from=date_from, date_to=date_to, league_id=league_id, model=model
+        )
+
+
+def predict_batch_json(
+    match_ids: Optional[List[int]],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    league_id: Optional[int],
+    model: Optional[str]
+) -> bytes:
+    """predict_batch as a JSON response body, so encoding a large slate stays off the event loop too"""
+    return orjson.dumps(predict_batch(match_ids, date_from, date_to, league_id, model), option=ORJSON_OPTIONS)
+
+
+def simulate_season(league_id: int, runs: Optional[int], model: Optional[str]) -> Dict:
+    """Monte Carlo projection of a league's final table"""
+    with SessionLocal() as db:
+        return SeasonSimulator(db).simulate(league_id, runs=runs, model=model)
+
+
+def refresh_stored_predictions(team_ids: Optional[List[int]]) -> int:
+    """Recompute stored predictions of the fixtures of team_ids, or of every scheduled fixture"""
+    with SessionLocal() as db:
+        return PredictionStore(db).refresh(team_ids=team_ids)
+
+
+def replay_team_ratings() -> int:
+    """Rebuild all team ratings from the match history"""
+    with SessionLocal() as db:
+        return RatingService(db).replay()
+
+
+def rebuild_team_form() -> int:
+    """Rebuild all team form windows from the match history"""
+    with SessionLocal() as db:
+        return TeamFeatureService(db).rebuild()
+
+
+def _init_process_worker():
+    """Drop connections inherited from the parent so each process opens its own"""
+    engine.dispose(close=False)
+
+
+class PredictionWorkers:
+    """Long-lived thread or process pool with bounded depth and request coalescing
+    
+    A job is identified by a key; while it is queued or running, further
+    submissions with the same key wait for its result instead of computing it
+    again. At most ``max_pending`` distinct jobs are held at once and
+    submissions beyond that raise PredictionQueueFull, so load is shed
+    instead of piling up behind the pool.
+    """
+    
+    def __init__(self, mode: str, workers: int, max_pending: int):
+        self.mode = mode
+        self.workers = workers
+        self.max_pending = max_pending
+        self.completed = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self._executor: Optional[Executor] = None
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+    
+    def _get_executor(self) -> Executor:
+        """Start the pool on first use"""
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_process_worker)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prediction")
+        return self._executor
+    
+    def start(self):
+        """Start the pool's workers now instead of on the event loop at the first request"""
+        self._get_executor().submit(int)
+    
+    async def run(self, key: Hashable, job: Callable[..., Any], *args) -> Any:
+        """Result of job(*args), shared with concurrent callers using the same key"""
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+        
+        if len(self._inflight) >= self.max_pending:
+            self.rejected += 1
+            raise PredictionQueueFull(f"{len(self._inflight)} prediction jobs already pending")
+        
+        future = asyncio.get_running_loop().run_in_executor(self._get_executor(), job, *args)
+        self._inflight[key] = future
+        
+        try:
+            # Shielded so a cancelled request does not cancel the shared job
+            result = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        else:
+            self.completed += 1
+            return result
+        finally:
+            if future.done():
+                self._inflight.pop(key, None)
+            else:
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pool counters for monitoring"""
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": len(self._inflight),
+            "completed": self.completed,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected
+        }
+    
+    def shutdown(self):
+        """Stop the pool, letting running jobs finish"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+def create_prediction_workers() -> PredictionWorkers:
+    """Build the pool selected by PREDICTION_WORKER_MODE ("process" or "thread")
+    
+    Model code is NumPy and Python that holds the GIL, so only process
+    workers keep it from stalling the event loop. An in-memory SQLite
+    database exists only inside this process, so it falls back to threads.
+    """
+    mode = settings.PREDICTION_WORKER_MODE.strip().lower()
+    
+    if mode not in ("thread", "process"):
+        raise ValueError(f"Unknown PREDICTION_WORKER_MODE: {settings.PREDICTION_WORKER_MODE}")
+    
+    if mode == "process" and isinstance(engine.pool, StaticPool):
+        logger.warning("In-memory SQLite cannot be shared with worker processes; running prediction workers as threads")
+        mode = "thread"
+    
+    return PredictionWorkers(mode, settings.PREDICTION_WORKERS, settings.PREDICTION_QUEUE_SIZE)
+
+
+prediction_workers = create_prediction_workers()
\ No newline at end of file
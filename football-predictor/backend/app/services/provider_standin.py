@@ -0,0 +1,412 @@
+"""
+Local football-data.org stand-in for offline sync benchmarks
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# How a refused request says when to come back: Retry-After, football-data.org's
+# X-RequestCounter-Reset, or nothing at all
+LIMIT_HINTS = ("retry-after", "counter-reset", "none")
+
+ROUTE = re.compile(r"^(?:/v\d+)?/competitions(?:/(\d+)/(teams|matches|standings))?/?$")
+
+
+class ProviderData:
+    """Competitions, teams, fixtures and standings in the provider's own JSON shapes"""
+    
+    def __init__(
+        self,
+        competitions: List[Dict[str, Any]],
+        teams: Dict[int, List[Dict[str, Any]]],
+        matches: Dict[int, List[Dict[str, Any]]],
+        standings: Dict[int, List[Dict[str, Any]]],
+        computed_standings: bool = False
+    ):
+        self.competitions = competitions
+        self.teams = teams
+        self.matches = matches
+        self.standings = standings
+        # Synthetic tables follow the results; recorded ones stay as recorded
+        self.computed_standings = computed_standings
+    
+    @classmethod
+    def synthetic(
+        cls,
+        leagues: int,
+        teams: int,
+        fixtures: int,
+        seed: int = 0,
+        season_days: int = 280,
+        now: Optional[datetime] = None
+    ) -> "ProviderData":
+        """A season per league centred on now: fixtures spread evenly, past ones finished"""
+        rng = random.Random(seed)
+        now = (now or datetime.utcnow()).replace(second=0, microsecond=0)
+        season_start = now - timedelta(days=season_days / 2)
+        
+        competitions, league_teams, league_matches = [], {}, {}
+        for league in range(1, leagues + 1):
+            competition_id = 2000 + league
+            competitions.append({
+                "id": competition_id,
+                "name": f"League {league}",
+                "code": f"L{league}",
+                "type": "LEAGUE",
+                "emblem": None,
+                "area": {"id": 2000 + league, "name": f"Country {league}"},
+                "currentSeason": {"startDate": season_start.strftime("%Y-%m-%d"), "currentMatchday": 1},
+                "lastUpdated": now.strftime("%Y-%m-%dT%H:%M:%SZ")
+            })
+            
+            squad = [
+                {
+                    "id": competition_id * 1000 + i,
+                    "name": f"Club {league}-{i}",
+                    "shortName": f"C{league}-{i}",
+                    "tla": f"C{i:02d}",
+                    "crest": None,
+                    "area": {"name": f"Country {league}"},
+                    "founded": 1870 + i,
+                    "venue": f"Ground {league}-{i}",
+                    "website": None
+                }
+                for i in range(teams)
+            ]
+            league_teams[competition_id] = squad
+            
+            league_matches[competition_id] = []
+            spacing = timedelta(days=season_days) / max(fixtures, 1)
+            for i, (home, away) in enumerate(_pairings(teams, fixtures)):
+                kickoff = season_start + spacing * i
+                match = {
+                    "id": competition_id * 100000 + i,
+                    "utcDate": kickoff.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "status": "TIMED",
+                    "matchday": i * 2 // max(teams, 2) + 1,
+                    "stage": "REGULAR_SEASON",
+                    "group": None,
+                    "homeTeam": {key: squad[home][key] for key in ("id", "name", "shortName", "tla", "crest")},
+                    "awayTeam": {key: squad[away][key] for key in ("id", "name", "shortName", "tla", "crest")},
+                    "venue": squad[home]["venue"],
+                    "referees": [{"id": i, "name": f"Referee {i % 40}"}],
+                    "score": {"winner": None, "fullTime": {"home": None, "away": None}},
+                    "lastUpdated": now.strftime("%Y-%m-%dT%H:%M:%SZ")
+                }
+                if kickoff <= now - timedelta(hours=2):
+                    _set_score(match, rng.randint(0, 4), rng.randint(0, 3), "FINISHED")
+                elif kickoff <= now:
+                    _set_score(match, rng.randint(0, 2), rng.randint(0, 1), "IN_PLAY")
+                elif kickoff > now + timedelta(days=14):
+                    match["status"] = "SCHEDULED"
+                league_matches[competition_id].append(match)
+        
+        data = cls(competitions, league_teams, league_matches, {}, computed_standings=True)
+        for competition_id in league_matches:
+            data.standings[competition_id] = data._table(competition_id)
+        return data
+    
+    @classmethod
+    def load(cls, directory: Path) -> "ProviderData":
+        """Read responses saved by ``save`` or ``record``"""
+        directory = Path(directory)
+        competitions = _read(directory / "competitions.json")["competitions"]
+        teams, matches, standings = {}, {}, {}
+        for competition in competitions:
+            folder = directory / str(competition["id"])
+            if not folder.is_dir():
+                continue
+            teams[competition["id"]] = _read(folder / "teams.json").get("teams", [])
+            matches[competition["id"]] = _read(folder / "matches.json").get("matches", [])
+            standings[competition["id"]] = _read(folder / "standings.json").get("standings", [])
+        return cls([c for c in competitions if c["id"] in teams], teams, matches, standings)
+    
+    def save(self, directory: Path):
+        """Write one response file per resource: competitions.json and <id>/{teams,matches,standings}.json"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        _write(directory / "competitions.json", self.body("/competitions", {}))
+        for competition_id in self.teams:
+            for resource in ("teams", "matches", "standings"):
+                _write(directory / str(competition_id) / f"{resource}.json",
+                       self.body(f"/competitions/{competition_id}/{resource}", {}))
+    
+    def body(self, path: str, query: Dict[str, List[str]]) -> Optional[Dict[str, Any]]:
+        """Response body for a GET, or None for an unknown path or competition"""
+        route = ROUTE.match(path)
+        if route is None:
+            return None
+        
+        competition_id, resource = route.groups()
+        if competition_id is None:
+            return {"count": len(self.competitions), "filters": {}, "competitions": self.competitions}
+        
+        competition_id = int(competition_id)
+        if competition_id not in self.teams:
+            return None
+        competition = next(c for c in self.competitions if c["id"] == competition_id)
+        summary = {key: competition.get(key) for key in ("id", "name", "code", "type", "emblem")}
+        
+        if resource == "teams":
+            return {"count": len(self.teams[competition_id]), "competition": summary, "teams": self.teams[competition_id]}
+        if resource == "standings":
+            return {"competition": summary, "standings": self.standings.get(competition_id, [])}
+        
+        date_from = query.get("dateFrom", ["0000-00-00"])[0]
+        date_to = query.get("dateTo", ["9999-99-99"])[0]
+        statuses = set(query["status"][0].split(",")) if "status" in query else None
+        matches = [
+            match for match in self.matches[competition_id]
+            if date_from <= match["utcDate"][:10] <= date_to and (statuses is None or match["status"] in statuses)
+        ]
+        return {"resultSet": {"count": len(matches)}, "competition": summary, "matches": matches}
+    
+    def touch(self, share: float, seed: int = 1, now: Optional[datetime] = None) -> int:
+        """Change a share (at least one) of the fixtures within a week either side of now; return how many
+        
+        Finished fixtures get a corrected score, upcoming ones a later kick-off.
+        """
+        rng = random.Random(seed)
+        now = now or datetime.utcnow()
+        low, high = (now - timedelta(days=7)).strftime("%Y-%m-%d"), (now + timedelta(days=7)).strftime("%Y-%m-%d")
+        candidates = [
+            (competition_id, match) for competition_id, matches in self.matches.items() for match in matches
+            if low <= match["utcDate"][:10] <= high and match["status"] in ("FINISHED", "SCHEDULED", "TIMED")
+        ]
+        if not candidates:
+            return 0
+        
+        chosen = rng.sample(candidates, max(1, round(share * len(candidates))))
+        for competition_id, match in chosen:
+            if match["status"] == "FINISHED":
+                full_time = match["score"]["fullTime"]
+                _set_score(match, full_time["home"] + 1, full_time["away"], "FINISHED")
+            else:
+                kickoff = datetime.strptime(match["utcDate"], "%Y-%m-%dT%H:%M:%SZ") + timedelta(hours=2)
+                match["utcDate"] = kickoff.strftime("%Y-%m-%dT%H:%M:%SZ")
+            match["lastUpdated"] = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+        
+        if self.computed_standings:
+            for competition_id in {competition_id for competition_id, _ in chosen}:
+                self.standings[competition_id] = self._table(competition_id)
+        return len(chosen)
+    
+    def _table(self, competition_id: int) -> List[Dict[str, Any]]:
+        """TOTAL standings from the finished fixtures"""
+        rows = {
+            team["id"]: {"team": {key: team[key] for key in ("id", "name", "shortName", "tla", "crest")},
+                         "playedGames": 0, "won": 0, "draw": 0, "lost": 0, "points": 0, "goalsFor": 0, "goalsAgainst": 0}
+            for team in self.teams[competition_id]
+        }
+        for match in self.matches[competition_id]:
+            if match["status"] != "FINISHED":
+                continue
+            home, away = rows[match["homeTeam"]["id"]], rows[match["awayTeam"]["id"]]
+            home_goals, away_goals = match["score"]["fullTime"]["home"], match["score"]["fullTime"]["away"]
+            for row, scored, conceded in ((home, home_goals, away_goals), (away, away_goals, home_goals)):
+                row["playedGames"] += 1
+                row["goalsFor"] += scored
+                row["goalsAgainst"] += conceded
+                if scored > conceded:
+                    row["won"] += 1
+                    row["points"] += 3
+                elif scored == conceded:
+                    row["draw"] += 1
+                    row["points"] += 1
+                else:
+                    row["lost"] += 1
+        
+        table = sorted(rows.values(), key=lambda r: (-r["points"], r["goalsAgainst"] - r["goalsFor"], -r["goalsFor"]))
+        for position, row in enumerate(table, start=1):
+            row["position"] = position
+            row["goalDifference"] = row["goalsFor"] - row["goalsAgainst"]
+        return [{"stage": "REGULAR_SEASON", "type": "TOTAL", "group": None, "table": table}]
+
+
+class ProviderStandIn:
+    """ASGI app serving ProviderData like football-data.org v4
+    
+    Adds a fixed latency (plus uniform jitter) per request, enforces a
+    sliding-window quota of ``quota`` requests per ``period`` seconds with
+    429s carrying the ``limit_hint`` header, and answers If-None-Match with
+    304 when ``etags`` is on. Runs under uvicorn, or in-process through
+    ``transport()``.
+    """
+    
+    def __init__(
+        self,
+        data: ProviderData,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        quota: Optional[int] = None,
+        period: float = 60.0,
+        limit_hint: str = "counter-reset",
+        etags: bool = True
+    ):
+        if limit_hint not in LIMIT_HINTS:
+            raise ValueError(f"limit_hint must be one of {LIMIT_HINTS}")
+        self.data = data
+        self.latency = latency
+        self.jitter = jitter
+        self.quota = quota
+        self.period = period
+        self.limit_hint = limit_hint
+        self.etags = etags
+        self._arrivals: Deque[float] = deque()
+        self.reset_counters()
+    
+    def reset_counters(self):
+        self.requests = 0
+        self.refused = 0
+        self.not_modified = 0
+        self.log: List[Tuple[float, str]] = []  # (arrival, path) of every request served
+    
+    def transport(self) -> httpx.ASGITransport:
+        """In-process transport for an httpx.AsyncClient, no sockets involved"""
+        return httpx.ASGITransport(app=self)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                await send({"type": message["type"] + ".complete"})
+                if message["type"] == "lifespan.shutdown":
+                    return
+        if scope["type"] != "http":
+            return
+        
+        headers = {key.decode().lower(): value.decode() for key, value in scope["headers"]}
+        status, response_headers, content = await self.respond(
+            scope["path"], parse_qs(scope["query_string"].decode()), headers
+        )
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")] + [
+                (key.encode(), value.encode()) for key, value in response_headers.items()
+            ]
+        })
+        await send({"type": "http.response.body", "body": content})
+    
+    async def respond(self, path: str, query: Dict[str, List[str]], headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """Status, headers and body for one GET"""
+        now = time.monotonic()
+        self.requests += 1
+        
+        while self._arrivals and self._arrivals[0] <= now - self.period:
+            self._arrivals.popleft()
+        if self.quota is not None and len(self._arrivals) >= self.quota:
+            self.refused += 1
+            reset = str(math.ceil(self._arrivals[0] + self.period - now))
+            hint = {"retry-after": {"Retry-After": reset}, "counter-reset": {"X-RequestCounter-Reset": reset}}
+            return 429, hint.get(self.limit_hint, {}), json.dumps({
+                "message": f"You reached your request limit. Wait {reset} seconds.", "errorCode": 429
+            }).encode()
+        
+        self._arrivals.append(now)
+        self.log.append((now, path))
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        
+        limit_headers = {}
+        if self.quota is not None:
+            limit_headers = {
+                "X-Requests-Available-Minute": str(self.quota - len(self._arrivals)),
+                "X-RequestCounter-Reset": str(math.ceil(self._arrivals[0] + self.period - now))
+            }
+        
+        body = self.data.body(path, query)
+        if body is None:
+            return 404, limit_headers, json.dumps({"message": "The resource you are looking for does not exist."}).encode()
+        
+        content = json.dumps(body, sort_keys=True, separators=(",", ":")).encode()
+        if not self.etags:
+            return 200, limit_headers, content
+        
+        etag = f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+        if headers.get("if-none-match") == etag:
+            self.not_modified += 1
+            return 304, {**limit_headers, "ETag": etag}, b""
+        return 200, {**limit_headers, "ETag": etag}, content
+
+
+async def record(directory: Path, competition_ids: Iterable[int], service=None) -> ProviderData:
+    """Fetch competitions, and each competition's teams, season fixtures and standings, and save them
+    
+    Requests go through FootballDataService, so they use the configured API
+    key, request budget and retries.
+    """
+    if service is None:
+        from app.services.football_data_service import FootballDataService
+        service = FootballDataService()
+    
+    listing = await service._make_request("/competitions")
+    if not listing:
+        raise RuntimeError("No competitions received; check FOOTBALL_DATA_API_KEY")
+    
+    wanted = set(competition_ids)
+    competitions = [c for c in listing.get("competitions", []) if c["id"] in wanted]
+    responses = await asyncio.gather(*(
+        service._make_request(f"/competitions/{competition['id']}/{resource}")
+        for competition in competitions
+        for resource in ("teams", "matches", "standings")
+    ))
+    
+    directory = Path(directory)
+    _write(directory / "competitions.json", {**listing, "competitions": competitions})
+    for i, competition in enumerate(competitions):
+        for j, resource in enumerate(("teams", "matches", "standings")):
+            response = responses[i * 3 + j]
+            if response is None:
+                logger.warning(f"No {resource} recorded for competition {competition['id']}")
+                response = {}
+            _write(directory / str(competition["id"]) / f"{resource}.json", response)
+    
+    logger.info(f"Recorded {len(competitions)} competitions to {directory}")
+    return ProviderData.load(directory)
+
+
+def _pairings(teams: int, fixtures: int):
+    """``fixtures`` home/away pairs cycling through a double round robin"""
+    order = list(range(teams if teams % 2 == 0 else teams + 1))
+    rounds = []
+    for _ in range(len(order) - 1):
+        half = len(order) // 2
+        rounds.append([(order[i], order[-1 - i]) for i in range(half)])
+        order = [order[0], order[-1]] + order[1:-1]
+    cycle = [pair for pairs in rounds for pair in pairs] + [(away, home) for pairs in rounds for home, away in pairs]
+    cycle = [(home, away) for home, away in cycle if home < teams and away < teams]
+    return [cycle[i % len(cycle)] for i in range(fixtures)] if cycle else []
+
+
+def _set_score(match: Dict[str, Any], home: int, away: int, status: str):
+    match["status"] = status
+    match["score"] = {
+        "winner": "HOME_TEAM" if home > away else "AWAY_TEAM" if away > home else "DRAW",
+        "duration": "REGULAR",
+        "fullTime": {"home": home, "away": away}
+    }
+
+
+def _read(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def _write(path: Path, payload: Dict[str, Any]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=1))
\ No newline at end of file
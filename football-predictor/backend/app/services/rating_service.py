@@ -0,0 +1,206 @@
+"""
+Elo team ratings updated as results are synced
+"""
+
+import logging
+from typing import Dict, Iterable, Optional, Set
+
+import numpy as np
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.match import Match, MatchStatus
+from app.models.team_rating import TeamRating, TeamRatingHistory
+
+logger = logging.getLogger(__name__)
+
+
+class RatingService:
+    """Elo ratings with home advantage and a goal-difference multiplier
+    
+    A finished match moves the two ratings by the same amount in opposite
+    directions; every move is recorded in team_rating_history, which also
+    marks the match as rated so a result is never applied twice.
+    """
+    
+    INITIAL_RATING = 1500.0
+    K_FACTOR = 20.0
+    HOME_ADVANTAGE = 65.0  # Rating points added to the home side's expectation
+    
+    def __init__(self, db: Optional[Session] = None):
+        self.db = db or SessionLocal()
+    
+    @classmethod
+    def expected_home(cls, home_rating, away_rating):
+        """Expected score of the home side (1 win, 0.5 draw, 0 loss); scalars or arrays"""
+        return 1 / (1 + 10 ** ((away_rating - home_rating - cls.HOME_ADVANTAGE) / 400))
+    
+    @classmethod
+    def rating_change(cls, home_rating, away_rating, home_score, away_score):
+        """Points the home side gains and the away side loses; scalars or arrays"""
+        margin = np.abs(home_score - away_score)
+        outcome = np.sign(home_score - away_score) / 2 + 0.5
+        multiplier = np.where(margin <= 1, 1.0, np.where(margin == 2, 1.5, (11 + margin) / 8))
+        return cls.K_FACTOR * multiplier * (outcome - cls.expected_home(home_rating, away_rating))
+    
+    def apply_results(self, match_ids: Iterable[int]) -> Set[int]:
+        """Apply finished, not yet rated matches in kick-off order; return the teams that moved
+        
+        Ratings of the teams involved are loaded in one query and each match
+        is then an O(1) update, so cost follows the number of new results
+        rather than the size of the history.
+        """
+        match_ids = list(match_ids)
+        if not match_ids:
+            return set()
+        
+        try:
+            rated = exists().where(TeamRatingHistory.match_id == Match.id)
+            matches = self.db.execute(
+                select(
+                    Match.id, Match.home_team_id, Match.away_team_id,
+                    Match.match_date, Match.home_score, Match.away_score
+                ).where(
+                    Match.id.in_(match_ids),
+                    Match.status == MatchStatus.FINISHED,
+                    Match.home_score.isnot(None),
+                    Match.away_score.isnot(None),
+                    ~rated
+                ).order_by(Match.match_date, Match.id)
+            ).all()
+            
+            if not matches:
+                return set()
+            
+            team_ids = {m.home_team_id for m in matches} | {m.away_team_id for m in matches}
+            ratings: Dict[int, TeamRating] = {
+                rating.team_id: rating
+                for rating in self.db.execute(
+                    select(TeamRating).where(TeamRating.team_id.in_(team_ids))
+                ).scalars()
+            }
+            
+            for match in matches:
+                home = self._rating_for(ratings, match.home_team_id)
+                away = self._rating_for(ratings, match.away_team_id)
+                change = float(self.rating_change(home.rating, away.rating, match.home_score, match.away_score))
+                
+                for rating, delta in ((home, change), (away, -change)):
+                    self.db.add(TeamRatingHistory(
+                        team_id=rating.team_id,
+                        match_id=match.id,
+                        match_date=match.match_date,
+                        rating_before=rating.rating,
+                        rating_after=rating.rating + delta
+                    ))
+                    rating.rating += delta
+                    rating.matches_rated += 1
+                    rating.last_match_date = match.match_date
+            
+            self.db.commit()
+            logger.info(f"Applied {len(matches)} results to {len(team_ids)} team ratings")
+            return team_ids
+            
+        except Exception as e:
+            logger.error(f"Error applying results to ratings: {e}")
+            self.db.rollback()
+            raise
+    
+    def _rating_for(self, ratings: Dict[int, TeamRating], team_id: int) -> TeamRating:
+        """Current rating row of a team, created at INITIAL_RATING on first use"""
+        if team_id not in ratings:
+            ratings[team_id] = TeamRating(team_id=team_id, rating=self.INITIAL_RATING, matches_rated=0)
+            self.db.add(ratings[team_id])
+        return ratings[team_id]
+    
+    def replay(self) -> int:
+        """Rebuild every rating and the history from all finished matches; return matches rated
+        
+        Matches are split into waves in which no team plays twice, keeping each
+        team's matches in kick-off order. Matches within a wave touch disjoint
+        ratings, so each wave is one NumPy update and the result equals a
+        sequential replay while the Python work stays a single pass over the rows.
+        """
+        try:
+            rows = self.db.execute(
+                select(
+                    Match.id, Match.home_team_id, Match.away_team_id,
+                    Match.match_date, Match.home_score, Match.away_score
+                ).where(
+                    Match.status == MatchStatus.FINISHED,
+                    Match.home_score.isnot(None),
+                    Match.away_score.isnot(None)
+                ).order_by(Match.match_date, Match.id)
+            ).all()
+            
+            self.db.execute(delete(TeamRatingHistory))
+            self.db.execute(delete(TeamRating))
+            
+            if not rows:
+                self.db.commit()
+                return 0
+            
+            team_ids = sorted({r.home_team_id for r in rows} | {r.away_team_id for r in rows})
+            team_index = {team_id: i for i, team_id in enumerate(team_ids)}
+            n = len(rows)
+            
+            home = np.array([team_index[r.home_team_id] for r in rows])
+            away = np.array([team_index[r.away_team_id] for r in rows])
+            home_score = np.array([r.home_score for r in rows], dtype=float)
+            away_score = np.array([r.away_score for r in rows], dtype=float)
+            
+            # A match goes in the wave after the latest one either team played in
+            wave = np.empty(n, dtype=np.int64)
+            last_wave = [-1] * len(team_ids)
+            for i, (h, a) in enumerate(zip(home.tolist(), away.tolist())):
+                last_wave[h] = last_wave[a] = wave[i] = max(last_wave[h], last_wave[a]) + 1
+            
+            ratings = np.full(len(team_ids), self.INITIAL_RATING)
+            home_before = np.empty(n)
+            away_before = np.empty(n)
+            change = np.empty(n)
+            
+            order = np.argsort(wave, kind="stable")
+            bounds = np.searchsorted(wave[order], np.arange(wave.max() + 2))
+            for start, end in zip(bounds[:-1], bounds[1:]):
+                idx = order[start:end]
+                home_before[idx] = ratings[home[idx]]
+                away_before[idx] = ratings[away[idx]]
+                change[idx] = self.rating_change(home_before[idx], away_before[idx], home_score[idx], away_score[idx])
+                ratings[home[idx]] += change[idx]
+                ratings[away[idx]] -= change[idx]
+            
+            history = []
+            last_played = {}
+            for i, row in enumerate(rows):
+                history.append({
+                    "team_id": row.home_team_id, "match_id": row.id, "match_date": row.match_date,
+                    "rating_before": home_before[i].item(), "rating_after": (home_before[i] + change[i]).item()
+                })
+                history.append({
+                    "team_id": row.away_team_id, "match_id": row.id, "match_date": row.match_date,
+                    "rating_before": away_before[i].item(), "rating_after": (away_before[i] - change[i]).item()
+                })
+                last_played[row.home_team_id] = last_played[row.away_team_id] = row.match_date
+            
+            played = np.bincount(np.concatenate([home, away]), minlength=len(team_ids))
+            self.db.execute(insert(TeamRatingHistory), history)
+            self.db.execute(insert(TeamRating), [
+                {
+                    "team_id": team_id,
+                    "rating": ratings[i].item(),
+                    "matches_rated": played[i].item(),
+                    "last_match_date": last_played[team_id]
+                }
+                for i, team_id in enumerate(team_ids)
+            ])
+            
+            self.db.commit()
+            logger.info(f"Replayed {n} matches into {len(team_ids)} team ratings over {wave.max() + 1} waves")
+            return n
+            
+        except Exception as e:
+            logger.error(f"Error replaying team ratings: {e}")
+            self.db.rollback()
+            raise
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""
+Monte Carlo projection of a league's final table
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.league import League
+from app.models.match import Match, MatchStatus
+from app.models.team import Team
+from app.services.prediction_engine import PredictionEngine
+
+logger = logging.getLogger(__name__)
+
+# Points for a home win, draw and away win, indexed by simulated outcome
+HOME_POINTS = np.array([3, 1, 0], dtype=np.float32)
+AWAY_POINTS = np.array([0, 1, 3], dtype=np.float32)
+
+
+class SeasonSimulator:
+    """Plays a league's remaining fixtures many times over from the current standings
+    
+    Each fixture's result is drawn from the engine's 1X2 probabilities. Runs
+    are simulated in chunks as (runs, fixtures) outcome arrays: points are
+    added to the table with two matrix products per chunk and every run is ranked with
+    one argsort, so cost grows with runs x fixtures without a Python loop
+    per run. Teams level on points are separated by their current goal
+    difference and goals scored, then at random.
+    """
+    
+    TOP_PLACES = 4
+    RELEGATION_PLACES = 3
+    CHUNK_RUNS = 10000  # Bounds memory to CHUNK_RUNS x fixtures draws at a time
+    
+    def __init__(self, db: Optional[Session] = None):
+        self.db = db or SessionLocal()
+        self.engine = PredictionEngine(self.db)
+    
+    def simulate(
+        self,
+        league_id: int,
+        runs: Optional[int] = None,
+        model: Optional[str] = None,
+        seed: Optional[int] = None
+    ) -> Dict:
+        """Probability of every finishing position, the title, top places and relegation per team"""
+        runs = runs or settings.SIMULATION_RUNS
+        model = model or settings.SIMULATION_MODEL
+        self.engine.model_version(model)
+        
+        league = self.db.get(League, league_id)
+        if league is None:
+            raise ValueError(f"League {league_id} not found")
+        
+        teams = self.db.execute(
+            select(Team).where(Team.league_id == league_id)
+            .order_by(Team.position.is_(None), Team.position, Team.id)
+        ).scalars().all()
+        team_index = {team.id: i for i, team in enumerate(teams)}
+        
+        fixtures = self._remaining_fixtures(league, team_index)
+        home_win, draw = self._outcome_probabilities(fixtures, model)
+        
+        n = len(teams)
+        points = np.array([team.points or 0 for team in teams], dtype=np.float64)
+        
+        # Static tie-break in [0, 1): current goal difference, then goals scored
+        tie_keys = [((team.goals_for or 0) - (team.goals_against or 0), team.goals_for or 0) for team in teams]
+        distinct = sorted(set(tie_keys))
+        tie_break = np.array([distinct.index(key) / max(n, 1) for key in tie_keys])
+        
+        # Fixture -> team incidence, so a chunk's points are two matrix products
+        home_teams = np.zeros((len(fixtures), n), dtype=np.float32)
+        away_teams = np.zeros((len(fixtures), n), dtype=np.float32)
+        for f, match in enumerate(fixtures):
+            home_teams[f, team_index[match.home_team_id]] = 1
+            away_teams[f, team_index[match.away_team_id]] = 1
+        
+        home_win, not_away = home_win.astype(np.float32), (home_win + draw).astype(np.float32)
+        rng = np.random.default_rng(seed)
+        position_counts = np.zeros((n, n), dtype=np.int64)
+        total_points = np.zeros(n)
+        
+        for start in range(0, runs, self.CHUNK_RUNS):
+            chunk = min(self.CHUNK_RUNS, runs - start)
+            # Outcome per run and fixture: 0 home win, 1 draw, 2 away win
+            draws = rng.random((chunk, len(fixtures)), dtype=np.float32)
+            outcomes = (draws >= home_win).astype(np.int8) + (draws >= not_away)
+            final_points = points + HOME_POINTS[outcomes] @ home_teams + AWAY_POINTS[outcomes] @ away_teams
+            total_points += final_points.sum(axis=0)
+            
+            # Random jitter smaller than one tie-break step only orders exact ties
+            key = final_points + tie_break + rng.random((chunk, n)) / (2 * max(n, 1))
+            ranking = np.argsort(-key, axis=1)
+            positions = np.empty_like(ranking)
+            np.put_along_axis(positions, ranking, np.arange(n), axis=1)
+            position_counts += np.bincount(
+                (np.arange(n) * n + positions).ravel(), minlength=n * n
+            ).reshape(n, n)
+        
+        probabilities = position_counts / runs
+        relegation_from = max(n - self.RELEGATION_PLACES, 0)
+        
+        logger.info(f"Simulated {runs} runs of {len(fixtures)} remaining fixtures in league {league_id}")
+        return {
+            "league": {
+                "id": league.id,
+                "name": league.name,
+                "country": league.country,
+                "season": league.current_season
+            },
+            "model": self.engine.model_version(model),
+            "runs": runs,
+            "remaining_fixtures": len(fixtures),
+            "teams": [
+                {
+                    "id": team.id,
+                    "name": team.name,
+                    "position": team.position,
+                    "points": team.points or 0,
+                    "matches_played": team.matches_played or 0,
+                    "expected_points": round(float(total_points[i] / runs), 2),
+                    "positions": [round(float(p), 4) for p in probabilities[i]],
+                    "title": round(float(probabilities[i, 0]), 4),
+                    "top_4": round(float(probabilities[i, :self.TOP_PLACES].sum()), 4),
+                    "relegation": round(float(probabilities[i, relegation_from:].sum()), 4)
+                }
+                for i, team in enumerate(teams)
+            ]
+        }
+    
+    def _remaining_fixtures(self, league: League, team_index: Dict[int, int]) -> List[Match]:
+        """Scheduled league fixtures between two of its teams, within the season when its end is known"""
+        query = select(Match).options(
+            joinedload(Match.home_team), joinedload(Match.away_team)
+        ).where(
+            Match.league_id == league.id,
+            Match.status.in_([MatchStatus.SCHEDULED, MatchStatus.TIMED])
+        )
+        
+        if league.season_end:
+            query = query.where(Match.match_date <= league.season_end)
+        
+        matches = self.db.execute(query.order_by(Match.match_date, Match.id)).scalars().all()
+        return [m for m in matches if m.home_team_id in team_index and m.away_team_id in team_index]
+    
+    def _outcome_probabilities(self, fixtures: List[Match], model: str):
+        """Home-win and draw probability arrays for the fixtures, renormalised to sum to 1"""
+        home_win = np.zeros(len(fixtures))
+        draw = np.zeros(len(fixtures))
+        
+        for f, (entry, _) in enumerate(self.engine.predict_matches(fixtures, model)):
+            result = next(p for p in entry["predictions"] if p["type"] == "WIN_DRAW_WIN")["probabilities"]
+            total = result["home_win"] + result["draw"] + result["away_win"]
+            home_win[f] = result["home_win"] / total
+            draw[f] = result["draw"] / total
+        
+        return home_win, draw
\ No newline at end of file
@@ -0,0 +1,219 @@
+"""
+Settlement of pending user predictions once their matches are decided
+"""
+
+import logging
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from sqlalchemy import distinct, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.match import Match, MatchStatus
+from app.models.prediction import Prediction, PredictionResult, PredictionType
+from app.services.user_stats_service import UserStatsService
+
+logger = logging.getLogger(__name__)
+
+# Statuses that decide a prediction: graded on the final score, or void
+SETTLED_STATUSES = (MatchStatus.FINISHED, MatchStatus.POSTPONED, MatchStatus.CANCELED)
+VOID_STATUSES = (MatchStatus.POSTPONED, MatchStatus.CANCELED)
+
+# Grades as array codes, in the order of RESULTS
+LOST, WON, VOID = 0, 1, 2
+RESULTS = (PredictionResult.LOST, PredictionResult.WON, PredictionResult.VOID)
+IS_CORRECT = {PredictionResult.LOST: "false", PredictionResult.WON: "true", PredictionResult.VOID: None}
+
+# Outcome of a match as sign(home - away): 1 home win, 0 draw, -1 away win
+WIN_DRAW_WIN = {"1": 1, "X": 0, "2": -1}
+DOUBLE_CHANCE = {"1X": -1, "X1": -1, "12": 0, "21": 0, "X2": 1, "2X": 1}  # The one outcome that loses
+BOTH_TEAMS_SCORE = {"YES": 1, "NO": 0}
+OVER_UNDER = re.compile(r"^(OVER|UNDER)\s*(\d+(?:\.\d+)?)$")
+CORRECT_SCORE = re.compile(r"^(\d+)\s*[-:]\s*(\d+)$")
+
+BATCH_SIZE = 500  # IDs per IN list
+
+
+def _parse(values: np.ndarray, parse, width: int = 1) -> np.ndarray:
+    """Parse each distinct prediction value once into ``width`` numbers; values that do not parse are NaN"""
+    distinct_values, inverse = np.unique(values, return_inverse=True)
+    parsed = np.full((len(distinct_values), width), np.nan)
+    for i, value in enumerate(distinct_values):
+        result = parse(str(value).strip().upper())
+        if result is not None:
+            parsed[i] = result
+    return parsed[inverse.reshape(-1)]
+
+
+def _over_under(value: str):
+    match = OVER_UNDER.match(value)
+    return (1.0 if match.group(1) == "OVER" else -1.0, float(match.group(2))) if match else None
+
+
+def _correct_score(value: str):
+    match = CORRECT_SCORE.match(value)
+    return (float(match.group(1)), float(match.group(2))) if match else None
+
+
+def grade(prediction_type: PredictionType, values: np.ndarray, home: np.ndarray, away: np.ndarray) -> np.ndarray:
+    """LOST, WON or VOID codes for predictions of one type against final scores
+    
+    Values that cannot be read for their type are VOID, as are over/under
+    predictions on a whole-number line the total lands on exactly.
+    """
+    outcome = np.sign(home - away)
+    
+    if prediction_type == PredictionType.WIN_DRAW_WIN:
+        pick = _parse(values, WIN_DRAW_WIN.get)[:, 0]
+        won = pick == outcome
+    elif prediction_type == PredictionType.DOUBLE_CHANCE:
+        pick = _parse(values, DOUBLE_CHANCE.get)[:, 0]
+        won = pick != outcome
+    elif prediction_type == PredictionType.BOTH_TEAMS_SCORE:
+        pick = _parse(values, BOTH_TEAMS_SCORE.get)[:, 0]
+        won = pick == ((home > 0) & (away > 0))
+    elif prediction_type == PredictionType.OVER_UNDER:
+        side, line = _parse(values, _over_under, 2).T
+        margin = side * (home + away - line)
+        pick = np.where(margin == 0, np.nan, side)
+        won = margin > 0
+    elif prediction_type == PredictionType.CORRECT_SCORE:
+        score = _parse(values, _correct_score, 2)
+        pick = score[:, 0]
+        won = (score[:, 0] == home) & (score[:, 1] == away)
+    else:
+        return np.full(len(values), VOID, dtype=np.int8)
+    
+    return np.where(np.isnan(pick), VOID, np.where(won, WON, LOST)).astype(np.int8)
+
+
+class SettlementService:
+    """Moves pending predictions to WON, LOST or VOID as matches are decided
+    
+    The pending predictions of the given matches are read in one query
+    through the match_id index and graded as arrays per prediction type;
+    each outcome is then written with one UPDATE guarded on the prediction
+    still being pending, so settling a match twice changes nothing and the
+    cost follows the matches settled rather than the predictions table. The
+    predictions an UPDATE returns are counted in user_stats in the same
+    transaction.
+    """
+    
+    def __init__(self, db: Optional[Session] = None):
+        self.db = db or SessionLocal()
+        # Users whose stats the last settle changed
+        self.settled_user_ids: Set[int] = set()
+    
+    def settle(self, match_ids: Iterable[int]) -> Dict[str, int]:
+        """Settle the pending predictions of decided matches among match_ids; return counts per result"""
+        match_ids = sorted(set(match_ids))
+        counts = {result.value: 0 for result in RESULTS}
+        self.settled_user_ids = set()
+        if not match_ids:
+            return counts
+        
+        try:
+            rows = []
+            for start in range(0, len(match_ids), BATCH_SIZE):
+                rows += self.db.execute(
+                    select(
+                        Prediction.id, Prediction.prediction_type, Prediction.prediction_value,
+                        Match.status, Match.home_score, Match.away_score, Prediction.user_id, Match.match_date
+                    ).join(Match, Match.id == Prediction.match_id).where(
+                        Prediction.match_id.in_(match_ids[start:start + BATCH_SIZE]),
+                        or_(Prediction.result == PredictionResult.PENDING, Prediction.result.is_(None)),
+                        Match.status.in_(SETTLED_STATUSES)
+                    )
+                ).all()
+            
+            if not rows:
+                return counts
+            
+            graded = self.grade_rows(rows)
+            changed = {}
+            # One timestamp for the whole batch
+            settled_at = datetime.utcnow()
+            for code, result in enumerate(RESULTS):
+                for prediction_id in self._write(graded[code], result, settled_at):
+                    changed[prediction_id] = result
+                    counts[result.value] += 1
+            
+            # Users' stats count exactly the predictions this transaction settled, in kick-off order
+            rows.sort(key=lambda row: (row.match_date, row.id))
+            self.settled_user_ids = UserStatsService(self.db).apply([
+                (row.user_id, PredictionType(row.prediction_type), changed[row.id]) for row in rows if row.id in changed
+            ])
+            
+            self.db.commit()
+            logger.info(f"Settled {sum(counts.values())} predictions of {len(match_ids)} matches: {counts}")
+            return counts
+            
+        except Exception as e:
+            logger.error(f"Error settling predictions: {e}")
+            self.db.rollback()
+            raise
+    
+    def settle_pending(self) -> Dict[str, int]:
+        """Settle every pending prediction whose match is already decided, e.g. after downtime"""
+        match_ids = self.db.scalars(
+            select(distinct(Prediction.match_id)).join(Match, Match.id == Prediction.match_id).where(
+                or_(Prediction.result == PredictionResult.PENDING, Prediction.result.is_(None)),
+                Match.status.in_(SETTLED_STATUSES)
+            )
+        ).all()
+        return self.settle(match_ids)
+    
+    @staticmethod
+    def grade_rows(rows) -> Dict[int, List[int]]:
+        """Prediction IDs per grade code for rows starting (id, type, value, status, home score, away score)
+        
+        Predictions of finished matches still missing a score stay pending.
+        """
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        types = np.array([PredictionType(row[1]).value for row in rows])
+        values = np.array([row[2] or "" for row in rows])
+        void = np.array([row[3] in VOID_STATUSES for row in rows])
+        home = np.array([np.nan if row[4] is None else row[4] for row in rows], dtype=float)
+        away = np.array([np.nan if row[5] is None else row[5] for row in rows], dtype=float)
+        
+        codes = np.full(len(rows), -1, dtype=np.int8)
+        codes[void] = VOID
+        scored = ~void & ~np.isnan(home) & ~np.isnan(away)
+        
+        for prediction_type in PredictionType:
+            selected = scored & (types == prediction_type.value)
+            if selected.any():
+                codes[selected] = grade(prediction_type, values[selected], home[selected], away[selected])
+        
+        return {code: ids[codes == code].tolist() for code in (LOST, WON, VOID)}
+    
+    def _write(self, prediction_ids: List[int], result: PredictionResult, settled_at: datetime) -> List[int]:
+        """Set one result on still-pending predictions; return the IDs changed
+        
+        Dialects without UPDATE ... RETURNING (MySQL) first lock the still-pending
+        rows with SELECT ... FOR UPDATE under the same guard, then update those.
+        """
+        pending = or_(Prediction.result == PredictionResult.PENDING, Prediction.result.is_(None))
+        returning = self.db.get_bind().dialect.update_returning
+        changed = []
+        for start in range(0, len(prediction_ids), BATCH_SIZE):
+            batch = prediction_ids[start:start + BATCH_SIZE]
+            if not returning:
+                batch = self.db.scalars(
+                    select(Prediction.id).where(Prediction.id.in_(batch), pending).with_for_update()
+                ).all()
+                if not batch:
+                    continue
+            
+            statement = update(Prediction).where(Prediction.id.in_(batch), pending).values(
+                result=result, is_correct=IS_CORRECT[result], updated_at=settled_at
+            ).execution_options(synchronize_session=False)
+            if returning:
+                changed += self.db.scalars(statement.returning(Prediction.id)).all()
+            else:
+                self.db.execute(statement)
+                changed += batch
+        return changed
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""
+Sync watermarks: what each provider resource looked like when it was last synced
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.sync_watermark import SyncWatermark
+from app.services.football_data_service import ResponseValidators
+
+logger = logging.getLogger(__name__)
+
+ALL_COMPETITIONS = 0  # Watermark scope of the competitions list
+
+
+class SyncWatermarks:
+    """One sync run's watermarks, loaded once and written along with the rows they describe
+    
+    Fetches take validators for a request and report the response back with
+    ``seen``; the sync step that stores those payloads calls ``save`` before
+    its commit, so a watermark never moves past data that was not written.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self._rows: Optional[Dict[Tuple[int, str], SyncWatermark]] = None
+        self._seen: Dict[str, List[Tuple[int, str, ResponseValidators]]] = defaultdict(list)
+    
+    def get(self, competition_id: int, resource: str) -> Optional[SyncWatermark]:
+        if self._rows is None:
+            self._rows = {(row.competition_id, row.resource): row for row in self.db.query(SyncWatermark).all()}
+        return self._rows.get((competition_id, resource))
+    
+    def checked_at(self, competition_id: int, resource: str) -> Optional[datetime]:
+        row = self.get(competition_id, resource)
+        return row.checked_at if row is not None else None
+    
+    def due(self, competition_id: int, resource: str, max_age: timedelta, params: str = "") -> bool:
+        """Whether a resource was never synced, was synced for another request, or longer than max_age ago"""
+        row = self.get(competition_id, resource)
+        if row is None or row.checked_at is None or (row.params or "") != params:
+            return True
+        return row.checked_at <= datetime.utcnow() - max_age
+    
+    def validators(self, competition_id: int, resource: str, params: str = "") -> ResponseValidators:
+        """Validators to send with a request; empty if the last response was for another request"""
+        row = self.get(competition_id, resource)
+        if row is None or (row.params or "") != params:
+            return ResponseValidators()
+        return ResponseValidators(row.etag, row.last_modified, row.content_hash)
+    
+    def seen(self, competition_id: int, resource: str, params: str, validators: ResponseValidators):
+        """Note a response for ``save``; requests that got no response are left out"""
+        if validators.modified is not None:
+            self._seen[resource].append((competition_id, params, validators))
+    
+    def save(self, resource: str, skip: FrozenSet[int] = frozenset()) -> int:
+        """Move the watermarks of responses seen for ``resource``, except competitions in ``skip``; the caller commits"""
+        now = datetime.utcnow()
+        saved = 0
+        
+        for competition_id, params, validators in self._seen.pop(resource, []):
+            if competition_id in skip:
+                continue
+            
+            row = self.get(competition_id, resource)
+            if row is None:
+                row = SyncWatermark(competition_id=competition_id, resource=resource)
+                self.db.add(row)
+                self._rows[(competition_id, resource)] = row
+            
+            row.params = params
+            row.etag = validators.etag
+            row.last_modified = validators.last_modified
+            row.content_hash = validators.content_hash
+            row.checked_at = now
+            if validators.modified:
+                row.changed_at = now
+            saved += 1
+        
+        return saved
+    
+    def reset(self):
+        """Forget loaded rows and unsaved responses, e.g. after the caller rolled back"""
+        self._rows = None
+        self._seen.clear()
\ No newline at end of file
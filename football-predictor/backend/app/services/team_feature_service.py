@@ -0,0 +1,238 @@
+"""
+Rolling team form windows updated as results are synced
+"""
+
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, insert, literal, or_, select, union_all, update
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.match import Match, MatchStatus
+from app.models.team import Team
+from app.models.team_form import TeamForm
+
+logger = logging.getLogger(__name__)
+
+VENUES = ("overall", "home", "away")
+WINDOW_SIZES = (5, 10)
+
+# Window behind Team.avg_goals_*, clean_sheets and failed_to_score
+TEAM_STATS_WINDOW = 10
+
+WindowKey = Tuple[int, str, int]
+
+
+def summarise(results: List[list]) -> Dict:
+    """Window aggregates from [match_id, kick-off, scored, conceded] entries, newest first"""
+    outcomes = ["W" if scored > conceded else "D" if scored == conceded else "L" for _, _, scored, conceded in results]
+    return {
+        "played": len(results),
+        "wins": outcomes.count("W"),
+        "draws": outcomes.count("D"),
+        "losses": outcomes.count("L"),
+        "goals_for": sum(entry[2] for entry in results),
+        "goals_against": sum(entry[3] for entry in results),
+        "clean_sheets": sum(1 for entry in results if entry[3] == 0),
+        "failed_to_score": sum(1 for entry in results if entry[2] == 0),
+        "form": "".join(outcomes),
+    }
+
+
+class TeamFeatureService:
+    """Keeps every team's last 5 and 10 results overall, at home and away
+    
+    Each window stores its matches next to the aggregates, so a new result is
+    an O(1) insert into at most four small windows per team. The Team form
+    and advanced-statistics columns are filled from the same windows.
+    """
+    
+    def __init__(self, db: Optional[Session] = None):
+        self.db = db or SessionLocal()
+    
+    def apply_results(self, match_ids: Iterable[int]) -> Set[int]:
+        """Fold finished matches into their teams' windows; return the teams that changed
+        
+        Applying a match twice is a no-op, a corrected score replaces the old
+        one, and a late result only enters windows it is recent enough for.
+        """
+        match_ids = list(match_ids)
+        if not match_ids:
+            return set()
+        
+        try:
+            matches = self.db.execute(
+                select(
+                    Match.id, Match.home_team_id, Match.away_team_id,
+                    Match.match_date, Match.home_score, Match.away_score
+                ).where(
+                    Match.id.in_(match_ids),
+                    Match.status == MatchStatus.FINISHED,
+                    Match.home_score.isnot(None),
+                    Match.away_score.isnot(None)
+                ).order_by(Match.match_date, Match.id)
+            ).all()
+            
+            if not matches:
+                return set()
+            
+            team_ids = {m.home_team_id for m in matches} | {m.away_team_id for m in matches}
+            windows: Dict[WindowKey, TeamForm] = {
+                (row.team_id, row.venue, row.size): row
+                for row in self.db.execute(select(TeamForm).where(TeamForm.team_id.in_(team_ids))).scalars()
+            }
+            changed = set()
+            
+            for match in matches:
+                kickoff = match.match_date.isoformat()
+                sides = (
+                    (match.home_team_id, "home", match.home_score, match.away_score),
+                    (match.away_team_id, "away", match.away_score, match.home_score),
+                )
+                for team_id, venue, scored, conceded in sides:
+                    entry = [match.id, kickoff, scored, conceded]
+                    for window_venue in ("overall", venue):
+                        for size in WINDOW_SIZES:
+                            if self._insert_result(self._window_for(windows, team_id, window_venue, size), entry):
+                                changed.add(team_id)
+            
+            if changed:
+                self._update_teams([
+                    self._team_columns(team_id, {key[1:]: row for key, row in windows.items() if key[0] == team_id})
+                    for team_id in changed
+                ])
+            
+            self.db.commit()
+            logger.info(f"Applied {len(matches)} results to the form of {len(changed)} teams")
+            return changed
+            
+        except Exception as e:
+            logger.error(f"Error applying results to team form: {e}")
+            self.db.rollback()
+            raise
+    
+    def _window_for(self, windows: Dict[WindowKey, TeamForm], team_id: int, venue: str, size: int) -> TeamForm:
+        """Window row of a team, created empty on first use"""
+        key = (team_id, venue, size)
+        if key not in windows:
+            windows[key] = TeamForm(team_id=team_id, venue=venue, size=size, results="[]", **summarise([]))
+            self.db.add(windows[key])
+        return windows[key]
+    
+    def _insert_result(self, window: TeamForm, entry: list) -> bool:
+        """Put a result into a window, keeping its newest `size` matches; True if it changed"""
+        current = json.loads(window.results or "[]")
+        results = [result for result in current if result[0] != entry[0]] + [entry]
+        results.sort(key=lambda result: (result[1], result[0]), reverse=True)
+        results = results[:window.size]
+        
+        if results == current:
+            return False
+        
+        window.results = json.dumps(results)
+        for field, value in summarise(results).items():
+            setattr(window, field, value)
+        return True
+    
+    def _team_columns(self, team_id: int, windows: Dict[Tuple[str, int], object]) -> Dict:
+        """Team form and advanced-statistics columns from its windows (rows or dicts)"""
+        def value(venue, size, field, default=None):
+            window = windows.get((venue, size))
+            if window is None:
+                return default
+            return window[field] if isinstance(window, dict) else getattr(window, field)
+        
+        played = value("overall", TEAM_STATS_WINDOW, "played", 0)
+        return {
+            "id": team_id,
+            "overall_form": value("overall", 5, "form") or None,
+            "home_form": value("home", 5, "form") or None,
+            "away_form": value("away", 5, "form") or None,
+            "avg_goals_scored": round(value("overall", TEAM_STATS_WINDOW, "goals_for", 0) / played, 2) if played else 0.0,
+            "avg_goals_conceded": round(value("overall", TEAM_STATS_WINDOW, "goals_against", 0) / played, 2) if played else 0.0,
+            "clean_sheets": value("overall", TEAM_STATS_WINDOW, "clean_sheets", 0),
+            "failed_to_score": value("overall", TEAM_STATS_WINDOW, "failed_to_score", 0),
+        }
+    
+    def _update_teams(self, columns: List[Dict]) -> None:
+        """Bulk UPDATE of the Team columns by primary key"""
+        if columns:
+            self.db.execute(update(Team), columns)
+    
+    def rebuild(self) -> int:
+        """Recompute every window and Team column from the match history; return windows written
+        
+        One query ranks each team's finished appearances newest first, both
+        overall and per venue, and keeps the ten most recent of each.
+        """
+        try:
+            finished = [Match.status == MatchStatus.FINISHED, Match.home_score.isnot(None), Match.away_score.isnot(None)]
+            appearances = union_all(
+                select(
+                    Match.id, Match.match_date, Match.home_team_id.label("team_id"), literal("home").label("venue"),
+                    Match.home_score.label("scored"), Match.away_score.label("conceded")
+                ).where(*finished),
+                select(
+                    Match.id, Match.match_date, Match.away_team_id, literal("away"),
+                    Match.away_score, Match.home_score
+                ).where(*finished)
+            ).subquery()
+            
+            newest_first = (appearances.c.match_date.desc(), appearances.c.id.desc())
+            ranked = select(
+                appearances,
+                func.row_number().over(partition_by=appearances.c.team_id, order_by=newest_first).label("overall_rank"),
+                func.row_number().over(
+                    partition_by=(appearances.c.team_id, appearances.c.venue), order_by=newest_first
+                ).label("venue_rank")
+            ).subquery()
+            
+            largest = max(WINDOW_SIZES)
+            rows = self.db.execute(
+                select(ranked)
+                .where(or_(ranked.c.overall_rank <= largest, ranked.c.venue_rank <= largest))
+                .order_by(ranked.c.team_id, ranked.c.match_date.desc(), ranked.c.id.desc())
+            ).all()
+            
+            recent: Dict[int, Dict[str, List[list]]] = {}
+            for row in rows:
+                entry = [row.id, row.match_date.isoformat(), row.scored, row.conceded]
+                team = recent.setdefault(row.team_id, {venue: [] for venue in VENUES})
+                if row.overall_rank <= largest:
+                    team["overall"].append(entry)
+                if row.venue_rank <= largest:
+                    team[row.venue].append(entry)
+            
+            windows = []
+            team_columns = []
+            for team_id, by_venue in recent.items():
+                team_windows = {}
+                for venue, results in by_venue.items():
+                    for size in WINDOW_SIZES:
+                        window = summarise(results[:size])
+                        team_windows[(venue, size)] = window
+                        windows.append({
+                            "team_id": team_id, "venue": venue, "size": size,
+                            "results": json.dumps(results[:size]), **window
+                        })
+                team_columns.append(self._team_columns(team_id, team_windows))
+            
+            # Teams without finished matches go back to empty form
+            idle = self.db.execute(select(Team.id).where(Team.id.notin_(list(recent)))).scalars().all()
+            team_columns.extend(self._team_columns(team_id, {}) for team_id in idle)
+            
+            self.db.execute(delete(TeamForm))
+            if windows:
+                self.db.execute(insert(TeamForm), windows)
+            self._update_teams(team_columns)
+            
+            self.db.commit()
+            logger.info(f"Rebuilt {len(windows)} form windows for {len(recent)} teams")
+            return len(windows)
+            
+        except Exception as e:
+            logger.error(f"Error rebuilding team form: {e}")
+            self.db.rollback()
+            raise
\ No newline at end of file
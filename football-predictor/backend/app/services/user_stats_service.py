@@ -0,0 +1,144 @@
+"""
+User statistics kept up to date as predictions settle
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.match import Match
+from app.models.prediction import Prediction, PredictionResult, PredictionType
+from app.models.user_stats import UserStats
+
+logger = logging.getLogger(__name__)
+
+# Points for a won prediction; longer odds score more
+POINTS = {
+    PredictionType.WIN_DRAW_WIN: 10,
+    PredictionType.OVER_UNDER: 10,
+    PredictionType.BOTH_TEAMS_SCORE: 10,
+    PredictionType.CORRECT_SCORE: 30,
+    PredictionType.DOUBLE_CHANCE: 5,
+}
+OUTCOMES = {PredictionResult.WON: True, PredictionResult.LOST: False, PredictionResult.VOID: None}
+
+BATCH_SIZE = 500  # IDs per IN list
+
+# (user ID, prediction type, result) of one settled prediction
+Settled = Tuple[int, PredictionType, PredictionResult]
+
+
+def month_of(moment: datetime) -> str:
+    return moment.strftime("%Y-%m")
+
+
+def new_stats(user_id: int, month: str) -> UserStats:
+    """An empty stats row with every counter at zero, ready for record_result"""
+    return UserStats(
+        user_id=user_id, total_predictions=0, correct_predictions=0, incorrect_predictions=0,
+        void_predictions=0, overall_accuracy=0.0, win_rate=0.0, current_streak=0, longest_winning_streak=0,
+        longest_losing_streak=0, recent_accuracy=0.0, recent_results=0, recent_count=0, stats_month=month,
+        monthly_predictions=0, monthly_correct=0, monthly_accuracy=0.0, total_points=0, monthly_points=0
+    )
+
+
+class UserStatsService:
+    """Folds settled predictions into user_stats, one O(1) update each
+    
+    Settlement calls ``apply`` in its own transaction, so a prediction is
+    counted exactly when it leaves PENDING. Monthly columns reset lazily when
+    a user's first result of a new month arrives and for everyone at once
+    with ``rollover``; ``rebuild`` replays every settled prediction.
+    """
+    
+    def __init__(self, db: Optional[Session] = None):
+        self.db = db or SessionLocal()
+    
+    def apply(self, settled: Sequence[Settled], now: Optional[datetime] = None) -> Set[int]:
+        """Count settled predictions, in order, in their users' stats; return the users; the caller commits"""
+        if not settled:
+            return set()
+        
+        month = month_of(now or datetime.utcnow())
+        user_ids = {user_id for user_id, _, _ in settled}
+        stats = self._load(user_ids)
+        
+        for user_id, prediction_type, result in settled:
+            row = stats.get(user_id)
+            if row is None:
+                row = stats[user_id] = new_stats(user_id, month)
+                self.db.add(row)
+            row.record_result(OUTCOMES[result], POINTS.get(prediction_type, 0), month)
+        
+        return user_ids
+    
+    def rollover(self, now: Optional[datetime] = None) -> int:
+        """Reset the monthly columns of every user still counting an earlier month; return rows reset"""
+        month = month_of(now or datetime.utcnow())
+        try:
+            reset = self.db.execute(
+                update(UserStats).where(or_(UserStats.stats_month.is_(None), UserStats.stats_month != month)).values(
+                    stats_month=month, monthly_predictions=0, monthly_correct=0, monthly_accuracy=0.0, monthly_points=0
+                ).execution_options(synchronize_session=False)
+            ).rowcount
+            self.db.commit()
+            logger.info(f"Rolled {reset} user stats over to {month}")
+            return reset
+            
+        except Exception as e:
+            logger.error(f"Error rolling user stats over: {e}")
+            self.db.rollback()
+            raise
+    
+    def rebuild(self, now: Optional[datetime] = None) -> int:
+        """Recompute every user's stats from all settled predictions; return rows written
+        
+        Predictions are replayed per user in kick-off order, the order
+        settlement hands them to ``apply``, and counted in their kick-off
+        month; unlike ``updated_at``, neither changes when a settled
+        prediction is written to again.
+        """
+        month = month_of(now or datetime.utcnow())
+        try:
+            rows = self.db.execute(
+                select(Prediction.user_id, Prediction.prediction_type, Prediction.result, Match.match_date)
+                .join(Match, Match.id == Prediction.match_id)
+                .where(Prediction.result.in_(list(OUTCOMES)))
+                .order_by(Prediction.user_id, Match.match_date, Prediction.id)
+                .execution_options(yield_per=10000)
+            )
+            
+            stats: Dict[int, UserStats] = {}
+            for user_id, prediction_type, result, kick_off in rows:
+                settled_month = month_of(kick_off) if kick_off else month
+                row = stats.get(user_id)
+                if row is None:
+                    row = stats[user_id] = new_stats(user_id, settled_month)
+                row.record_result(OUTCOMES[result], POINTS.get(prediction_type, 0), settled_month)
+            
+            for row in stats.values():
+                if row.stats_month != month:
+                    row.reset_month(month)
+            
+            self.db.execute(delete(UserStats))
+            self.db.add_all(stats.values())
+            self.db.commit()
+            logger.info(f"Rebuilt stats of {len(stats)} users")
+            return len(stats)
+            
+        except Exception as e:
+            logger.error(f"Error rebuilding user stats: {e}")
+            self.db.rollback()
+            raise
+    
+    def _load(self, user_ids: Iterable[int]) -> Dict[int, UserStats]:
+        user_ids = sorted(user_ids)
+        stats = {}
+        for start in range(0, len(user_ids), BATCH_SIZE):
+            for row in self.db.scalars(select(UserStats).where(UserStats.user_id.in_(user_ids[start:start + BATCH_SIZE]))):
+                stats[row.user_id] = row
+        return stats
\ No newline at end of file
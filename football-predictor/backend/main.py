@@ -10,8 +10,13 @@ import uvicorn
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.cache import response_cache
+from app.core.database import init_db, async_engine
+from app.core.pagination import NEXT_CURSOR_HEADER
 from app.api.v1.api import api_router
+from app.services.football_data_service import football_data_client
+from app.services.leaderboard import leaderboard
+from app.services.prediction_workers import prediction_workers
 
 
 @asynccontextmanager
@@ -19,10 +24,16 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     await init_db()
+    prediction_workers.start()
     
     yield
     
     # Shutdown
+    prediction_workers.shutdown()
+    await football_data_client.close()
+    await response_cache.close()
+    await leaderboard.close()
+    await async_engine.dispose()
 
 
 # Create FastAPI app
@@ -42,6 +53,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Include API routes
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Backtest the prediction models over historical results, fully offline.
+
+Replays finished matches in kick-off order and predicts each one from the
+team features that were available before it kicked off, then reports
+accuracy, Brier score and log-loss per model and market. League seasons run
+as independent shards in a process pool. Per-prediction rows are written to
+a compressed .npz file with one array per column.
+
+Input is either a SQLite snapshot of the application database or a CSV
+fixture set with columns date, home_team, away_team, home_score, away_score
+and optionally league and match_id.
+
+Usage:
+    python scripts/backtest.py --sqlite snapshot.db [--models heuristic poisson]
+    python scripts/backtest.py --csv results.csv [--seasons 2023 2024] [--workers 4]
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from harness import use_backend
+
+# The backtest reads only its input file, never the configured database
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["DEBUG"] = "false"
+
+START_DIR = Path.cwd()
+
+use_backend()
+
+from app.services.backtest import load_csv, load_sqlite, market_summary, run_backtest, save_results, shards  # noqa: E402
+from app.services.prediction_engine import PredictionEngine  # noqa: E402
+
+
+def main_backtest(args):
+    started = time.perf_counter()
+    if args.sqlite:
+        fixtures = load_sqlite(str(START_DIR / args.sqlite))
+    else:
+        fixtures = load_csv(str(START_DIR / args.csv))
+    league_seasons = shards(fixtures, args.seasons)
+    print(f"{len(fixtures['match_id'])} finished matches, {len(league_seasons)} league seasons to backtest")
+
+    results = run_backtest(fixtures, args.models, args.seasons, args.workers)
+    seconds = time.perf_counter() - started
+
+    output = START_DIR / args.output
+    save_results(results, str(output))
+    print(f"{len(results['match_id'])} prediction rows written to {output} in {seconds:.2f}s\n")
+
+    print(f"{'model':<12} {'market':<18} {'fixtures':>9} {'accuracy':>9} {'brier':>7} {'log-loss':>9}")
+    for row in market_summary(results):
+        print(
+            f"{row['model']:<12} {row['market']:<18} {row['fixtures']:>9} "
+            f"{row['accuracy']:>9.1%} {row['brier']:>7.3f} {row['log_loss']:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--sqlite", help="SQLite snapshot of the application database")
+    source.add_argument("--csv", help="CSV fixture set")
+    parser.add_argument("--models", nargs="+", choices=sorted(PredictionEngine.MODEL_VERSIONS))
+    parser.add_argument("--seasons", nargs="+", type=int, help="Seasons to score, by starting year")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes; 1 runs in-process")
+    parser.add_argument("--output", default="backtest-results.npz")
+    main_backtest(parser.parse_args())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-match vs batch prediction generation on a synthetic slate.
+
+Seeds leagues, teams with season stats, a finished-match history and an
+upcoming slate of fixtures, then generates predictions for the whole slate
+with PredictionEngine.generate_prediction (one match at a time) and with
+PredictionEngine.generate_batch. Reports wall time and SQL statements for
+both and checks that every market comes out the same.
+
+Usage:
+    python scripts/bench-batch-predictions.py [--fixtures 500] [--teams 200] [--history 20]
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+
+from harness import history_and_slate, seed_league, seed_teams, use_temp_database
+
+use_temp_database("batch")
+
+import asyncio  # noqa: E402
+
+from sqlalchemy import event  # noqa: E402
+
+from app.core.database import SessionLocal, engine, init_db  # noqa: E402
+from app.services.prediction_engine import PredictionEngine  # noqa: E402
+from app.services.team_feature_service import TeamFeatureService  # noqa: E402
+
+
+def seed(fixtures: int, teams_count: int, history: int):
+    """Teams with standings, `history` finished matches per team and the upcoming slate"""
+    rng = random.Random(7)
+    db = SessionLocal()
+
+    leagues = [seed_league(db, f"League {i}", i) for i in range(max(1, teams_count // 20))]
+
+    def standings(i):
+        goals_for = rng.randint(10, 60)
+        goals_against = rng.randint(10, 60)
+        return {"position": i % 20 + 1, "goals_for": goals_for, "goals_against": goals_against,
+                "avg_goals_scored": round(goals_for / 30, 2), "avg_goals_conceded": round(goals_against / 30, 2)}
+
+    teams = seed_teams(db, leagues, teams_count, fields=standings)
+    past, upcoming = history_and_slate(teams, teams_count * history // 2, fixtures, rng)
+    db.add_all(past + upcoming)
+    db.commit()
+    ids = [match.id for match in upcoming]
+    TeamFeatureService(db).rebuild()
+    db.close()
+    return ids
+
+
+def same(a, b) -> bool:
+    """Deep equality with float tolerance"""
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12)
+    return a == b
+
+
+def main_bench(fixtures: int, teams_count: int, history: int):
+    asyncio.run(init_db())
+    match_ids = seed(fixtures, teams_count, history)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    statements.clear()
+    started = time.perf_counter()
+    prediction_engine = PredictionEngine()
+    single = [prediction_engine.generate_prediction(match_id) for match_id in match_ids]
+    prediction_engine.db.close()
+    single_seconds = time.perf_counter() - started
+    single_queries = len(statements)
+
+    statements.clear()
+    started = time.perf_counter()
+    prediction_engine = PredictionEngine()
+    batch = prediction_engine.generate_batch(match_ids=match_ids)
+    prediction_engine.db.close()
+    batch_seconds = time.perf_counter() - started
+    batch_queries = len(statements)
+
+    mismatches = [s["match_id"] for s, b in zip(single, batch) if not same(s, b)]
+
+    print(f"{fixtures} fixtures, {teams_count} teams, {history} finished matches per team\n")
+    print(f"{'mode':<24} {'seconds':>8} {'queries':>8} {'fixtures/s':>11}")
+    print(f"{'generate_prediction x N':<24} {single_seconds:>8.2f} {single_queries:>8} {fixtures / single_seconds:>11,.0f}")
+    print(f"{'generate_batch':<24} {batch_seconds:>8.2f} {batch_queries:>8} {fixtures / batch_seconds:>11,.0f}")
+    print(f"\nspeedup {single_seconds / batch_seconds:.1f}x")
+
+    if len(batch) != len(single) or mismatches:
+        print(f"MISMATCH in {len(mismatches)} fixtures, e.g. {mismatches[:5]}")
+        sys.exit(1)
+    print("OK: batch output matches per-match output")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=int, default=500)
+    parser.add_argument("--teams", type=int, default=200)
+    parser.add_argument("--history", type=int, default=20)
+    args = parser.parse_args()
+    main_bench(args.fixtures, args.teams, args.history)
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Benchmark and check the bulk upsert path of DataSyncService.
+
+Builds provider payloads for a few leagues with several thousand fixtures
+and feeds them to sync_teams, sync_matches and update_standings, and to
+the per-row loop they replaced (one SELECT per row, two team-name lookups
+per match, attribute-by-attribute updates) on a second database. Three
+rounds run: a first sync into empty tables, the same payloads again, and
+payloads where a slice of fixtures finished, standings moved and a club
+was renamed. Then:
+
+  * reports wall time, SQL statements and rows inserted, updated and
+    unchanged per round for both paths,
+  * checks both databases end up with the same teams, standings and
+    fixtures,
+  * checks an unchanged re-sync writes nothing, and only the changed
+    fixtures' teams are marked for a prediction refresh,
+  * checks fixtures resolve their teams by provider ID without a single
+    team query, unknown teams are skipped and logged in one warning, and
+    update_match_results finds results by match ID after a rename,
+  * checks the upsert renders as ON CONFLICT DO UPDATE for PostgreSQL too.
+
+Usage:
+    python scripts/bench-bulk-upsert.py [--leagues 5] [--fixtures 800]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from harness import fail, seed_league, use_temp_database
+
+DB_DIR = use_temp_database("upsert")
+
+from sqlalchemy import create_engine, event, select  # noqa: E402
+from sqlalchemy.orm import aliased, sessionmaker  # noqa: E402
+
+from app.core.database import Base, SessionLocal, async_engine, engine, init_db  # noqa: E402
+from app.models import League, Match, Team  # noqa: E402
+from app.services.bulk_upsert import conflict_upsert_statement  # noqa: E402
+from app.services.data_sync_service import MATCH_COLUMNS, DataSyncService  # noqa: E402
+
+TEAMS_PER_LEAGUE = 20
+
+
+def payloads(leagues: int, fixtures: int, finished_share: float, seed: int = 5):
+    """Teams, fixtures and standings per league external ID, shaped like FootballDataService output"""
+    rng = random.Random(seed)
+    start = datetime(2026, 8, 1)
+    teams, matches, standings = {}, {}, {}
+
+    for league in range(1, leagues + 1):
+        names = [f"Club {league}-{i}" for i in range(TEAMS_PER_LEAGUE)]
+        teams[league] = [
+            {"external_id": league * 1000 + i, "name": name, "short_name": name[-4:], "country": f"Country {league}",
+             "founded": 1880 + i, "venue": f"Ground {league}-{i}", "website": None, "logo_url": None}
+            for i, name in enumerate(names)
+        ]
+
+        matches[league] = []
+        for f in range(fixtures):
+            home, away = rng.sample(range(TEAMS_PER_LEAGUE), 2)
+            finished = rng.random() < finished_share
+            matches[league].append({
+                "external_id": league * 100000 + f, "home_team_external_id": league * 1000 + home,
+                "away_team_external_id": league * 1000 + away, "home_team_name": names[home], "away_team_name": names[away],
+                "match_date": (start + timedelta(hours=f * 7)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "status": "FINISHED" if finished else "SCHEDULED", "matchday": f // 10 + 1, "stage": "REGULAR_SEASON",
+                "group": None, "home_score": rng.randint(0, 4) if finished else None,
+                "away_score": rng.randint(0, 3) if finished else None, "venue": f"Ground {league}-{home}", "referee": None
+            })
+
+        standings[league] = [
+            {"team_external_id": league * 1000 + i, "position": i + 1, "points": rng.randint(0, 40),
+             "matches_played": 14, "wins": 5, "draws": 3, "losses": 6, "goals_for": rng.randint(10, 30),
+             "goals_against": rng.randint(10, 30)}
+            for i in range(TEAMS_PER_LEAGUE)
+        ]
+    return teams, matches, standings
+
+
+def legacy_sync(db, league_ids, teams, matches, standings):
+    """The per-row loop bulk upserts replaced"""
+    for external_id, league_id in league_ids.items():
+        for team_data in teams[external_id]:
+            existing = db.query(Team).filter(Team.external_id == team_data["external_id"]).first()
+            if existing:
+                for key, value in team_data.items():
+                    setattr(existing, key, value)
+                existing.league_id = league_id
+                existing.updated_at = datetime.utcnow()
+            else:
+                db.add(Team(**team_data, league_id=league_id))
+    db.commit()
+
+    for external_id, league_id in league_ids.items():
+        for match_data in matches[external_id]:
+            home_team = db.query(Team).filter(Team.name == match_data["home_team_name"], Team.league_id == league_id).first()
+            away_team = db.query(Team).filter(Team.name == match_data["away_team_name"], Team.league_id == league_id).first()
+            existing = db.query(Match).filter(Match.external_id == match_data["external_id"]).first()
+            if existing:
+                existing.home_score = match_data["home_score"]
+                existing.away_score = match_data["away_score"]
+                existing.status = match_data["status"]
+                existing.venue = match_data["venue"]
+                existing.referee = match_data["referee"]
+                existing.updated_at = datetime.utcnow()
+            else:
+                db.add(Match(
+                    external_id=match_data["external_id"], home_team_id=home_team.id, away_team_id=away_team.id,
+                    league_id=league_id, match_date=datetime.fromisoformat(match_data["match_date"].replace("Z", "")),
+                    status=match_data["status"], matchday=match_data["matchday"], stage=match_data["stage"],
+                    group=match_data["group"], home_score=match_data["home_score"],
+                    away_score=match_data["away_score"], venue=match_data["venue"], referee=match_data["referee"]
+                ))
+    db.commit()
+
+    for external_id in league_ids:
+        for standing in standings[external_id]:
+            team = db.query(Team).filter(Team.external_id == standing["team_external_id"]).first()
+            for key, value in standing.items():
+                if key != "team_external_id":
+                    setattr(team, key, value)
+            team.updated_at = datetime.utcnow()
+    db.commit()
+
+
+def snapshot(db):
+    """Teams with standings and fixtures, keyed by provider IDs so both databases compare"""
+    home, away = aliased(Team), aliased(Team)
+    teams = db.execute(
+        select(Team.external_id, Team.name, League.external_id, Team.position, Team.points, Team.goals_for,
+               Team.goals_against).join(League, Team.league_id == League.id).order_by(Team.external_id)
+    ).all()
+    matches = db.execute(
+        select(Match.external_id, home.external_id, away.external_id, Match.match_date, Match.status,
+               Match.home_score, Match.away_score, Match.venue)
+        .join(home, Match.home_team_id == home.id).join(away, Match.away_team_id == away.id)
+        .order_by(Match.external_id)
+    ).all()
+    return [tuple(row) for row in teams], [tuple(str(v) for v in row) for row in matches]
+
+
+def seed_leagues(db, count):
+    league_ids = {i: seed_league(db, f"League {i}", i).id for i in range(1, count + 1)}
+    db.commit()
+    return league_ids
+
+
+def count_statements(bind):
+    counter = {"statements": 0}
+
+    @event.listens_for(bind, "before_cursor_execute")
+    def count(*_):
+        counter["statements"] += 1
+
+    return counter
+
+
+class TeamQueries:
+    """Counts statements reading the teams table"""
+
+    def __init__(self):
+        self.statements = 0
+
+    def count(self, conn, cursor, statement, *_):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM teams" in statement:
+            self.statements += 1
+
+
+def count_team_queries(bind):
+    counter = TeamQueries()
+    event.listen(bind, "before_cursor_execute", counter.count)
+    return counter
+
+
+class StubProvider:
+    """Returns fixed fixtures for any get_matches call"""
+
+    def __init__(self, matches):
+        self.matches = matches
+
+    async def get_matches(self, competition_id, **_):
+        return self.matches
+
+
+async def check_resolution(fixture):
+    """Unknown teams skipped with one warning; results found by match ID whatever the team names say"""
+    warnings = []
+    handler = logging.Handler(logging.WARNING)
+    handler.emit = warnings.append
+    logging.getLogger("app.services.data_sync_service").addHandler(handler)
+
+    service = DataSyncService()
+    strangers = [
+        {**fixture, "external_id": 900000 + i, "home_team_external_id": 990000 + i, "home_team_name": f"Stranger {i}"}
+        for i in range(3)
+    ]
+    synced = await service.sync_matches({service.db.scalar(select(League.id)): [fixture] + strangers})
+    if synced != 1 or len(warnings) != 1 or "3 unknown teams" not in warnings[0].getMessage():
+        fail(f"unknown teams not skipped and logged once: {synced} synced, {[w.getMessage() for w in warnings]}")
+    print(f"\nunknown teams: {warnings[0].getMessage()}")
+
+    match = service.db.scalar(select(Match).where(Match.external_id == fixture["external_id"]))
+    match.status, match.home_score, match.away_score = "FINISHED", None, None
+    service.db.commit()
+    result = {**fixture, "status": "FINISHED", "home_score": 2, "away_score": 1,
+              "home_team_name": "Someone Else", "away_team_name": "Another Name"}
+    service.football_data_service = StubProvider([result])
+    if await service.update_match_results() != 1:
+        fail("update_match_results did not find the result by match ID")
+    # The job closed the service's session; read the match afresh
+    match = service.db.get(Match, match.id)
+    if (match.home_score, match.away_score) != (2, 1):
+        fail(f"result not applied: {match.home_score}-{match.away_score}")
+    print("update_match_results matched a fixture whose team names changed by its provider ID")
+    service.db.close()
+
+
+async def main_bench(leagues: int, fixtures: int):
+    legacy_engine = create_engine(f"sqlite:///{os.path.join(DB_DIR, 'legacy.db')}")
+    Base.metadata.create_all(legacy_engine)
+    legacy_db = sessionmaker(bind=legacy_engine)()
+
+    league_ids = seed_leagues(SessionLocal(), leagues)
+    legacy_league_ids = seed_leagues(legacy_db, leagues)
+    bulk_counter, legacy_counter = count_statements(engine), count_statements(legacy_engine)
+
+    first = payloads(leagues, fixtures, finished_share=0.5)
+    changed = payloads(leagues, fixtures, finished_share=0.5)
+    # A slice of scheduled fixtures finish and standings move
+    rng = random.Random(9)
+    changed_fixtures = set()
+    for league, rows in changed[1].items():
+        for row in rows:
+            if row["status"] == "SCHEDULED" and rng.random() < 0.05:
+                row.update(status="FINISHED", home_score=rng.randint(0, 4), away_score=rng.randint(0, 3))
+                changed_fixtures.add(row["external_id"])
+    for rows in changed[2].values():
+        rows[0]["points"] += 3
+    # The provider renames a club; fixtures still carry its ID
+    renamed = changed[0][1][0]
+    renamed["name"] = "Renamed Club"
+    for row in changed[1][1]:
+        for side in ("home", "away"):
+            if row[f"{side}_team_external_id"] == renamed["external_id"]:
+                row[f"{side}_team_name"] = renamed["name"]
+
+    print(f"{leagues} leagues, {leagues * TEAMS_PER_LEAGUE} teams, {leagues * fixtures} fixtures\n")
+    print("bulk statements include folding newly finished results into ratings and form\n")
+    print(f"{'round':<12} {'path':<8} {'seconds':>8} {'statements':>11}  rows (teams / matches / standings)")
+
+    for name, (teams, matches, standings) in (("first sync", first), ("unchanged", first), ("changed", changed)):
+        by_id = lambda data: {league_ids[external_id]: rows for external_id, rows in data.items()}  # noqa: E731
+
+        legacy_counter["statements"] = 0
+        started = time.perf_counter()
+        legacy_sync(legacy_db, legacy_league_ids, teams, matches, standings)
+        legacy_seconds = time.perf_counter() - started
+
+        service = DataSyncService()
+        bulk_counter["statements"] = 0
+        started = time.perf_counter()
+        await service.sync_teams(by_id(teams))
+        team_queries = count_team_queries(engine)
+        await service.sync_matches(by_id(matches))
+        event.remove(engine, "before_cursor_execute", team_queries.count)
+        await service.update_standings(by_id(standings))
+        bulk_seconds = time.perf_counter() - started
+        counts = service.row_counts
+
+        rows = " / ".join(
+            f"{c['inserted']}+ {c['updated']}~ {c['unchanged']}=" for c in (counts["teams"], counts["matches"], counts["standings"])
+        )
+        print(f"{name:<12} {'per-row':<8} {legacy_seconds:>8.2f} {legacy_counter['statements']:>11}")
+        print(f"{'':<12} {'bulk':<8} {bulk_seconds:>8.2f} {bulk_counter['statements']:>11}  {rows}")
+
+        if snapshot(service.db) != snapshot(legacy_db):
+            fail(f"{name}: bulk and per-row syncs disagree")
+        if team_queries.statements:
+            fail(f"{name}: match ingestion queried teams {team_queries.statements} times")
+
+        if name == "unchanged":
+            if any(c["inserted"] or c["updated"] for c in counts.values()) or service.affected_team_ids:
+                fail(f"an unchanged re-sync wrote rows: {counts}")
+        if name == "changed":
+            if counts["matches"]["updated"] != len(changed_fixtures) or counts["standings"]["updated"] != leagues:
+                fail(f"expected {len(changed_fixtures)} updated fixtures and {leagues} standings rows: {counts}")
+            db = service.db
+            expected = {team_id for pair in db.execute(
+                select(Match.home_team_id, Match.away_team_id).where(Match.external_id.in_(changed_fixtures))
+            ) for team_id in pair}
+            expected |= set(db.scalars(select(Team.id).where(
+                Team.external_id.in_([rows[0]["team_external_id"] for rows in changed[2].values()])
+            )))
+            expected.add(db.scalar(select(Team.id).where(Team.external_id == renamed["external_id"])))
+            if service.affected_team_ids != expected:
+                fail("teams marked for a prediction refresh differ from the teams whose fixtures or standings changed")
+        service.db.close()
+
+    await check_resolution(changed[1][1][0])
+
+    from sqlalchemy.dialects import postgresql
+    row = {column: None for column in MATCH_COLUMNS} | {"external_id": 1, "sync_hash": "0" * 32}
+    statement = conflict_upsert_statement(Match, [row], list(MATCH_COLUMNS) + ["sync_hash"], "postgresql")
+    if "ON CONFLICT (external_id) DO UPDATE" not in str(statement.compile(dialect=postgresql.dialect())):
+        fail("PostgreSQL upsert does not render ON CONFLICT DO UPDATE")
+    print("\nPostgreSQL renders INSERT ... ON CONFLICT (external_id) DO UPDATE")
+
+    legacy_db.close()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leagues", type=int, default=5)
+    parser.add_argument("--fixtures", type=int, default=800)
+    args = parser.parse_args()
+
+    asyncio.run(init_db())
+    asyncio.run(main_bench(args.leagues, args.fixtures))
+    print("\nOK: bulk upserts match the per-row sync, skip unchanged rows and count every outcome")
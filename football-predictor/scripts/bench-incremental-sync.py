@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Benchmark and check incremental, change-driven data syncs.
+
+Runs DataSyncService.sync_all_data against a simulated football-data.org
+that answers If-None-Match with 304 (standings carry no ETag, so those go
+through the body digest instead), then:
+
+  * a first sync into an empty database fetches everything,
+  * a quiet day (24 hourly runs, no fixtures kicking off) fetches only
+    what is due and writes no provider rows; compared with fetching
+    everything every run, as syncs did before,
+  * a match day fetches only the live league's results window and
+    standings, and stores the score as it goes live and finishes,
+  * a full sync of unchanged data gets every payload back as 304 or an
+    identical body and writes nothing.
+
+Time passing is simulated by moving the stored watermarks back.
+
+Usage:
+    python scripts/bench-incremental-sync.py [--teams 20]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+from datetime import datetime, timedelta
+
+from harness import fail, use_temp_database
+
+use_temp_database("incremental")
+
+import httpx  # noqa: E402
+from sqlalchemy import event, select, update  # noqa: E402
+
+from app.core.database import SessionLocal, async_engine, engine, init_db  # noqa: E402
+from app.models import Match, SyncWatermark, Team  # noqa: E402
+from app.services.data_sync_service import DataSyncService  # noqa: E402
+from app.services.fetch_scheduler import FetchScheduler, TokenBucket  # noqa: E402
+from app.services.football_data_service import FootballDataService, football_data_stats  # noqa: E402
+
+COMPETITIONS = [2021, 2014, 2002, 2019, 2015]  # The competitions get_competitions keeps
+
+
+class Provider:
+    """football-data.org stand-in: a season of fixtures, ETags on everything but standings"""
+
+    def __init__(self, teams: int):
+        now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        self.requests = 0
+        self.teams = {c: [{"id": c * 100 + i, "name": f"Club {c}-{i}"} for i in range(teams)] for c in COMPETITIONS}
+        self.matches = {}
+        for c in COMPETITIONS:
+            self.matches[c] = []
+            for k in range(-8, 16):
+                # Two rounds a week; none kicks off within a day of now
+                kickoff = now + timedelta(days=2 + k * 3.5) if k >= 0 else now - timedelta(days=2 - (k + 1) * 3.5)
+                for i in range(0, teams, 2):
+                    home, away = self.teams[c][(i + k) % teams], self.teams[c][(i + k + 1) % teams]
+                    finished = kickoff < now
+                    self.matches[c].append({
+                        "id": c * 10000 + (k + 8) * 100 + i, "utcDate": kickoff.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                        "status": "FINISHED" if finished else "TIMED", "matchday": k + 9, "stage": "REGULAR_SEASON",
+                        "group": None, "homeTeam": dict(home), "awayTeam": dict(away), "venue": None, "referees": [],
+                        "score": {"fullTime": {"home": 1 if finished else None, "away": 0 if finished else None}}
+                    })
+        self.points = {team["id"]: 10 for c in COMPETITIONS for team in self.teams[c]}
+
+    def body(self, path: str, params) -> dict:
+        competition = re.match(r"/v4/competitions/(\d+)", path)
+        if path == "/v4/competitions":
+            return {"competitions": [
+                {"id": c, "name": f"League {c}", "area": {"name": "Area"}, "type": "LEAGUE",
+                 "currentSeason": {"startDate": "2026-08-01"}} for c in COMPETITIONS
+            ]}
+        c = int(competition.group(1))
+        if path.endswith("/teams"):
+            return {"teams": [{**team, "shortName": team["name"][-4:], "area": {"name": "Area"}} for team in self.teams[c]]}
+        if path.endswith("/standings"):
+            table = sorted(self.teams[c], key=lambda team: -self.points[team["id"]])
+            return {"standings": [{"type": "TOTAL", "table": [
+                {"team": team, "position": i + 1, "points": self.points[team["id"]], "playedGames": 8}
+                for i, team in enumerate(table)
+            ]}]}
+        date_from, date_to = params.get("dateFrom", "0000"), params.get("dateTo", "9999") + "T99"
+        return {"matches": [m for m in self.matches[c] if date_from <= m["utcDate"] <= date_to]}
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        content = json.dumps(self.body(request.url.path, request.url.params), sort_keys=True).encode()
+        if request.url.path.endswith("/standings"):
+            return httpx.Response(200, content=content)
+        etag = f'"{hashlib.sha1(content).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, content=content, headers={"ETag": etag})
+
+    def fixture(self, competition: int):
+        return self.matches[competition][8 * len(self.teams[competition]) // 2]  # The first fixture ahead
+
+
+class Writes:
+    """Counts INSERT, UPDATE and DELETE statements on provider data, not on the watermarks"""
+
+    def __init__(self):
+        self.statements = 0
+        event.listen(engine, "before_cursor_execute", self.count)
+
+    def count(self, conn, cursor, statement, *_):
+        if statement.lstrip().split(" ")[0].upper() in ("INSERT", "UPDATE", "DELETE") and "sync_watermarks" not in statement:
+            self.statements += 1
+
+
+def skipped() -> int:
+    """Responses skipped unparsed so far: 304s and bodies identical to the last one"""
+    return sum(entry["not_modified"] for entry in football_data_stats.snapshot().values())
+
+
+def age(hours: float):
+    """Pretend ``hours`` passed since every watermark was taken"""
+    with SessionLocal() as db:
+        for watermark in db.query(SyncWatermark):
+            watermark.checked_at -= timedelta(hours=hours)
+        db.commit()
+
+
+async def run(provider: Provider, client: httpx.AsyncClient, writes: Writes, full: bool = False):
+    """One sync; requests, responses skipped unparsed and provider-data writes it caused"""
+    before = provider.requests, skipped(), writes.statements
+    service = FootballDataService(scheduler=FetchScheduler(TokenBucket(1000, 60.0), 4), client=client)
+    results = await DataSyncService(football_data_service=service).sync_all_data(full=full)
+    if results["errors"]:
+        fail(f"sync failed: {results['errors']}")
+    return provider.requests - before[0], skipped() - before[1], writes.statements - before[2], results
+
+
+async def main_bench(teams: int):
+    provider = Provider(teams)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(provider.handle))
+    writes = Writes()
+
+    print(f"{'scenario':<28} {'requests':>9} {'unchanged':>10} {'writes':>7}  full-fetch requests")
+    requests, _, written, results = await run(provider, client, writes)
+    full_requests = requests
+    with SessionLocal() as db:
+        stored = db.scalar(select(Match.id).limit(1)) is not None and db.query(Team).count() == teams * len(COMPETITIONS)
+    if not stored or results["matches_synced"] == 0:
+        fail(f"first sync stored nothing: {results}")
+    print(f"{'first sync':<28} {requests:>9} {'':>10} {written:>7}  {full_requests}")
+
+    quiet = [0, 0, 0]
+    for _ in range(24):
+        age(1)
+        for i, value in enumerate((await run(provider, client, writes))[:3]):
+            quiet[i] += value
+    print(f"{'quiet day, 24 hourly runs':<28} {quiet[0]:>9} {quiet[1]:>10} {quiet[2]:>7}  {24 * full_requests}")
+    if quiet[2]:
+        fail(f"a quiet day wrote {quiet[2]} provider rows")
+    if quiet[0] * 10 > 24 * full_requests:
+        fail(f"a quiet day made {quiet[0]} requests, not an order of magnitude below {24 * full_requests}")
+
+    # A fixture in the first league kicks off and finishes
+    competition = COMPETITIONS[0]
+    fixture = provider.fixture(competition)
+    kickoff = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=50)
+    fixture.update(utcDate=kickoff.strftime("%Y-%m-%dT%H:%M:%SZ"), status="IN_PLAY", score={"fullTime": {"home": 1, "away": 0}})
+    with SessionLocal() as db:
+        db.execute(update(Match).where(Match.external_id == fixture["id"]).values(match_date=kickoff))
+        db.commit()
+
+    live = await run(provider, client, writes)
+    with SessionLocal() as db:
+        match = db.scalar(select(Match).where(Match.external_id == fixture["id"]))
+        if (match.status, match.home_score) != ("IN_PLAY", 1):
+            fail(f"live score not stored: {match.status} {match.home_score}")
+    print(f"{'match day: kick-off':<28} {live[0]:>9} {live[1]:>10} {live[2]:>7}  {full_requests}")
+    if live[0] > 2:
+        fail(f"a live fixture in one league made {live[0]} requests, expected its results window and standings")
+
+    age(1)
+    fixture.update(status="FINISHED", score={"fullTime": {"home": 2, "away": 1}})
+    provider.points[fixture["homeTeam"]["id"]] += 3
+    finished = await run(provider, client, writes)
+    with SessionLocal() as db:
+        match = db.scalar(select(Match).where(Match.external_id == fixture["id"]))
+        home = db.scalar(select(Team).where(Team.external_id == fixture["homeTeam"]["id"]))
+        if (match.status, match.home_score, match.away_score, home.points) != ("FINISHED", 2, 1, 13):
+            fail(f"final result or standings not stored: {match.status} {match.home_score}-{match.away_score}, {home.points} pts")
+    print(f"{'match day: full time':<28} {finished[0]:>9} {finished[1]:>10} {finished[2]:>7}  {full_requests}")
+    if finished[0] > 2:
+        fail(f"a finished fixture in one league made {finished[0]} requests")
+
+    age(4)
+    settled = await run(provider, client, writes)
+    print(f"{'match day: settled':<28} {settled[0]:>9} {settled[1]:>10} {settled[2]:>7}  {full_requests}")
+
+    # The match day moved the first league's windows; the second full sync sees no change at all
+    for name in ("full sync", "full sync again"):
+        full = await run(provider, client, writes, full=True)
+        print(f"{name:<28} {full[0]:>9} {full[1]:>10} {full[2]:>7}  {full_requests}")
+    if full[0] != full_requests or full[1] != full_requests or full[2]:
+        fail(f"an unchanged full sync: {full[1]} of {full[0]} responses skipped, {full[2]} writes")
+
+    await client.aclose()
+    await async_engine.dispose()
+    print(f"\nquiet day: {quiet[0]} requests instead of {24 * full_requests} "
+          f"({24 * full_requests / max(quiet[0], 1):.0f}x fewer)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(init_db())
+    asyncio.run(main_bench(args.teams))
+    print("\nOK: syncs fetch only what may have changed and skip unchanged payloads unparsed and unwritten")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark offset vs keyset (cursor) pagination on the predictions feed.
+
+Seeds a scratch database with users x matches predictions, then times
+GET /api/v1/predictions/ for page 1 and for a deep page, once with
+?skip= (offset) and once with ?cursor= (keyset). Offset latency grows with
+the page number; cursor latency should stay flat. Also checks that a
+cursor whose anchor row was deleted resumes where its page ended.
+
+Usage:
+    python scripts/bench-pagination.py [--users 100] [--matches 2000] [--limit 20] [--page 10000]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from harness import use_temp_database
+
+use_temp_database("pages")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import delete, select, text  # noqa: E402
+
+import main  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.core.pagination import encode_cursor  # noqa: E402
+from app.models import Prediction  # noqa: E402
+
+
+def seed(users: int, matches: int):
+    """Bulk insert users, matches and one prediction per (user, match)"""
+    start = datetime(2024, 1, 1)
+
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO leagues (id, external_id, name) VALUES (1, 1, 'Bench League')"))
+        conn.execute(text(
+            "INSERT INTO teams (id, external_id, name, league_id) "
+            "VALUES (1, 1, 'Home', 1), (2, 2, 'Away', 1)"
+        ))
+        conn.execute(
+            text("INSERT INTO users (id, username) VALUES (:id, :username)"),
+            [{"id": i, "username": f"user{i}"} for i in range(1, users + 1)],
+        )
+        conn.execute(
+            text("INSERT INTO matches (id, external_id, home_team_id, away_team_id, league_id, match_date, status) "
+                 "VALUES (:id, :id, 1, 2, 1, :date, 'FINISHED')"),
+            [{"id": i, "date": str(start + timedelta(hours=i))} for i in range(1, matches + 1)],
+        )
+        # Second-resolution timestamps, as CURRENT_TIMESTAMP writes them, so
+        # many rows share a created_at and the id tie-break is exercised
+        conn.execute(
+            text("INSERT INTO predictions (user_id, match_id, prediction_type, prediction_value, "
+                 "confidence, result, created_at) "
+                 "VALUES (:user, :match, 'WIN_DRAW_WIN', '1', 0.5, 'PENDING', :created)"),
+            [
+                {
+                    "user": u,
+                    "match": m,
+                    "created": (start + timedelta(seconds=(m * users + u) // 7)).strftime("%Y-%m-%d %H:%M:%S"),
+                }
+                for m in range(1, matches + 1)
+                for u in range(1, users + 1)
+            ],
+        )
+
+
+def anchor_row(offset: int):
+    """(id, created_at) of the row just before the page starting at offset"""
+    with engine.connect() as conn:
+        return conn.execute(
+            select(Prediction.id, Prediction.created_at)
+            .order_by(Prediction.created_at.desc(), Prediction.id.desc())
+            .limit(1).offset(offset - 1)
+        ).one()
+
+
+def time_request(client, params: dict, repeat: int) -> float:
+    """Median latency of a predictions page in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get("/api/v1/predictions/", params=params)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return statistics.median(samples)
+
+
+def main_bench(users: int, matches: int, limit: int, page: int, repeat: int):
+    total = users * matches
+    deep_offset = (page - 1) * limit
+    if deep_offset + limit > total:
+        sys.exit(f"page {page} of {limit} rows needs at least {deep_offset + limit} predictions, have {total}")
+
+    with TestClient(main.app) as client:
+        started = time.perf_counter()
+        seed(users, matches)
+        print(f"seeded {total:,} predictions in {time.perf_counter() - started:.1f}s\n")
+
+        anchor = anchor_row(deep_offset)
+        deep_cursor = encode_cursor(Prediction.created_at, anchor)
+        cases = [
+            ("offset", 1, {"limit": limit}),
+            ("offset", page, {"limit": limit, "skip": deep_offset}),
+            ("cursor", 1, {"limit": limit}),
+            ("cursor", page, {"limit": limit, "cursor": deep_cursor}),
+        ]
+
+        # Both deep pages must return the same rows
+        offset_ids = [p["id"] for p in client.get("/api/v1/predictions/", params=cases[1][2]).json()]
+        cursor_ids = [p["id"] for p in client.get("/api/v1/predictions/", params=cases[3][2]).json()]
+        assert offset_ids == cursor_ids, "offset and cursor pages differ"
+
+        print(f"{'mode':<8} {'page':>8} {'median ms':>10}")
+        for mode, number, params in cases:
+            print(f"{mode:<8} {number:>8,} {time_request(client, params, repeat):>10.2f}")
+
+        # Deleting the anchor row must not move the page its cursor starts
+        with engine.begin() as conn:
+            conn.execute(delete(Prediction).where(Prediction.id == anchor.id))
+        offset_ids = [p["id"] for p in client.get(
+            "/api/v1/predictions/", params={"limit": limit, "skip": deep_offset - 1}
+        ).json()]
+        cursor_ids = [p["id"] for p in client.get("/api/v1/predictions/", params=cases[3][2]).json()]
+        assert offset_ids == cursor_ids, "cursor of a deleted row does not resume after it"
+        print("\ncursor of a deleted row: same page as before")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--matches", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--page", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+    main_bench(args.users, args.matches, args.limit, args.page, args.repeat)
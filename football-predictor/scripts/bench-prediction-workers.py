@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Benchmark and check the prediction worker pool.
+
+Seeds teams, a finished-match history and a slate of fixtures, then:
+
+  * runs batch predictions inline on the event loop, through the default
+    worker pool and through a thread pool, reports the longest event-loop
+    stall of each and checks the default pool at least halves it,
+  * holds one prediction job until fifty identical requests have joined it
+    and checks they were served by a single computation,
+  * shrinks the queue bound and checks excess batch requests get 503,
+  * checks process and thread workers give the same predictions,
+  * checks no database connection is left checked out.
+
+Usage:
+    python scripts/bench-prediction-workers.py [--fixtures 200] [--teams 100]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+from harness import fail, history_and_slate, seed_league, seed_teams, use_temp_database
+
+use_temp_database("workers")
+
+import httpx  # noqa: E402
+from sqlalchemy import delete  # noqa: E402
+
+from app.core.database import SessionLocal, async_engine, engine, init_db  # noqa: E402
+from app.models import MatchPrediction  # noqa: E402
+from app.services.prediction_workers import (  # noqa: E402
+    PredictionWorkers, predict_batch, predict_match, prediction_workers
+)
+from app.services.team_feature_service import TeamFeatureService  # noqa: E402
+from main import app  # noqa: E402
+
+
+def seed(fixtures: int, teams_count: int):
+    """Teams with standings, a finished-match history and the upcoming slate"""
+    rng = random.Random(13)
+    db = SessionLocal()
+
+    league = seed_league(db, "Worker League")
+    teams = seed_teams(db, league, teams_count, fields=lambda i: {
+        "position": i % 20 + 1, "goals_for": rng.randint(10, 60), "goals_against": rng.randint(10, 60)
+    })
+    past, upcoming = history_and_slate(teams, teams_count * 5, fixtures, rng)
+    db.add_all(past + upcoming)
+    db.commit()
+    ids = [match.id for match in upcoming]
+    TeamFeatureService(db).rebuild()
+    db.close()
+    return ids
+
+
+def clear_store():
+    with SessionLocal() as db:
+        db.execute(delete(MatchPrediction))
+        db.commit()
+
+
+async def heartbeat(stop: asyncio.Event, lags: list):
+    """Record how late a 1 ms sleep wakes up, i.e. how long the loop was blocked"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - started - 0.001)
+
+
+async def stall(work) -> float:
+    """Worst event-loop lag while the work runs"""
+    stop, lags = asyncio.Event(), []
+    beat = asyncio.create_task(heartbeat(stop, lags))
+    await asyncio.sleep(0.01)
+    await work()
+    stop.set()
+    await beat
+    return max(lags)
+
+
+def gated(gate: threading.Event, match_id: int):
+    """predict_match once the gate opens, so a test can queue requests behind it"""
+    gate.wait()
+    return predict_match(match_id)
+
+
+async def main_bench(match_ids):
+    # ASGITransport skips the lifespan, which starts the pool
+    prediction_workers.start()
+    transport = httpx.ASGITransport(app=app)
+    slates = [match_ids[:len(match_ids) - i] for i in range(8)]
+    threads = PredictionWorkers("thread", prediction_workers.workers, 64)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def inline():
+            # What an async handler calling the engine directly does
+            for slate in slates:
+                predict_batch(slate, None, None, None, None)
+                await asyncio.sleep(0)
+
+        async def pooled():
+            responses = await asyncio.gather(*(
+                client.get("/api/v1/predictions/generate/batch", params={"match_ids": slate}) for slate in slates
+            ))
+            if any(response.status_code != 200 for response in responses):
+                fail("a pooled batch request failed")
+
+        async def threaded():
+            await asyncio.gather(*(
+                threads.run(("batch", i), predict_batch, slate, None, None, None, None) for i, slate in enumerate(slates)
+            ))
+
+        timings = []
+        for name, work in (("inline on event loop", inline), (f"{prediction_workers.mode} pool (default)", pooled),
+                           ("thread pool", threaded)):
+            started = time.perf_counter()
+            worst = await stall(work)
+            timings.append((name, time.perf_counter() - started, worst))
+
+        print(f"{len(slates)} batches of ~{len(match_ids)} fixtures   total   worst event-loop stall")
+        for name, seconds, worst in timings:
+            print(f"{name:<22} {seconds:8.2f}s  {worst * 1000:10.1f} ms")
+        inline_stall, pooled_stall = timings[0][2], timings[1][2]
+        if pooled_stall > inline_stall / 2:
+            fail(f"the {prediction_workers.mode} pool stalled the event loop {pooled_stall * 1000:.1f} ms, "
+                 f"not well below {inline_stall * 1000:.1f} ms inline")
+
+        # Identical concurrent requests share one computation: the job waits
+        # until every request has joined it, so none can start a second one
+        gate = threading.Event()
+        before = threads.stats()
+        waiting = [asyncio.create_task(threads.run(("match", match_ids[0]), gated, gate, match_ids[0])) for _ in range(50)]
+        await asyncio.sleep(0)
+        gate.set()
+        results = await asyncio.gather(*waiting)
+        after = threads.stats()
+        computed = after["completed"] - before["completed"]
+        if computed != 1 or after["coalesced"] - before["coalesced"] != 49:
+            fail(f"50 identical requests ran {computed} computations")
+        if len({json.dumps(result, default=str) for result in results}) != 1:
+            fail("coalesced requests got different answers")
+        print(f"\n50 identical requests  {computed} computation, {after['coalesced'] - before['coalesced']} coalesced")
+
+        clear_store()
+        responses = await asyncio.gather(
+            *(client.get(f"/api/v1/predictions/generate/{match_ids[0]}") for _ in range(50))
+        )
+        if any(response.status_code != 200 for response in responses) or len({r.text for r in responses}) != 1:
+            fail("identical requests through the API got errors or different answers")
+
+        # Bounded depth: excess distinct jobs are refused, not queued
+        prediction_workers.max_pending = 2
+        responses = await asyncio.gather(*(
+            client.get("/api/v1/predictions/generate/batch", params={"match_ids": match_ids[:i + 1]})
+            for i in range(20)
+        ))
+        prediction_workers.max_pending = 64
+        statuses = [response.status_code for response in responses]
+        if 503 not in statuses or set(statuses) - {200, 503}:
+            fail(f"unexpected statuses with a queue bound of 2: {sorted(set(statuses))}")
+        print(f"queue bound 2          {statuses.count(200)} served, {statuses.count(503)} refused with 503")
+
+    # Process and thread workers give the same answers
+    clear_store()
+    results = await asyncio.gather(*(threads.run(("match", i), predict_match, i) for i in match_ids[:20]))
+    threaded_results = [json.dumps(result, default=str) for result in results]
+    clear_store()
+    processes = PredictionWorkers("process", 2, 64)
+    results = await asyncio.gather(*(processes.run(("match", i), predict_match, i) for i in match_ids[:20]))
+    processes.shutdown()
+    threads.shutdown()
+    if [json.dumps(result, default=str) for result in results] != threaded_results:
+        fail("process workers returned different predictions")
+    print("process pool           20 predictions, same as threads")
+
+    prediction_workers.shutdown()
+    await async_engine.dispose()
+    if engine.pool.checkedout():
+        fail(f"{engine.pool.checkedout()} database connections left checked out")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=int, default=200)
+    parser.add_argument("--teams", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(init_db())
+    asyncio.run(main_bench(seed(args.fixtures, args.teams)))
+    print("\nOK: predictions run off the event loop, coalesce, respect the queue bound and release sessions")
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Benchmark and check the pooled provider HTTP client and its retries.
+
+Starts a local HTTP server standing in for football-data.org, then:
+
+  * fetches the same endpoints with a new client per request (the old
+    behaviour) and with FootballDataService's pooled client, and reports
+    wall-clock time and how many TCP connections the server saw,
+  * checks 5xx responses and connection errors are retried and succeed,
+    a 429's Retry-After is honoured and pauses the shared budget, other
+    4xx are not retried, and a failing endpoint gives up after
+    FOOTBALL_DATA_MAX_RETRIES retries,
+  * checks backoff delays grow exponentially, stay capped and are jittered,
+  * checks per-endpoint request, retry and latency counters,
+  * checks the app lifespan closes the pooled client.
+
+Usage:
+    python scripts/bench-provider-client.py [--requests 200]
+"""
+
+import argparse
+import asyncio
+import socket
+import threading
+import time
+
+from harness import fail, use_temp_database
+
+with socket.socket() as probe:
+    probe.bind(("127.0.0.1", 0))
+    PORT = probe.getsockname()[1]
+
+use_temp_database(
+    "client",
+    FOOTBALL_DATA_BASE_URL=f"http://127.0.0.1:{PORT}/v4",
+    FOOTBALL_DATA_PLAN="advanced",
+    FOOTBALL_DATA_HTTP2="false",  # The local server speaks HTTP/1.1 only
+    FOOTBALL_DATA_MAX_RETRIES="3",
+    FETCH_BACKOFF_BASE="0.01",
+    FETCH_BACKOFF_MAX="0.08",
+)
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services.fetch_scheduler import FetchScheduler, TokenBucket  # noqa: E402
+from app.services.football_data_service import (  # noqa: E402
+    FootballDataService, football_data_client, football_data_stats, retry_delay
+)
+from main import app, lifespan  # noqa: E402
+
+STANDINGS = b'{"standings": [{"type": "TOTAL", "table": []}]}'
+
+
+class Provider:
+    """Minimal ASGI app recording the client address of every request"""
+
+    def __init__(self):
+        self.peers = []
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        self.peers.append(scope["client"])
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": STANDINGS})
+
+
+def scripted(responses):
+    """Client whose transport plays back ``responses``: status codes, (status, headers) or exceptions"""
+    calls = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        step = responses[min(len(calls), len(responses) - 1)]
+        calls.append(time.monotonic())
+        if isinstance(step, Exception):
+            raise step
+        status, headers = step if isinstance(step, tuple) else (step, {})
+        return httpx.Response(status, headers=headers, json={"standings": []})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handle)), calls
+
+
+async def compare_clients(provider: Provider, requests: int):
+    url = f"{settings.FOOTBALL_DATA_BASE_URL}/competitions/2021/standings"
+    limit = asyncio.Semaphore(settings.FETCH_MAX_CONCURRENCY)
+
+    async def one_off():
+        async with limit:
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                (await client.get(url)).raise_for_status()
+
+    provider.peers.clear()
+    started = time.perf_counter()
+    await asyncio.gather(*(one_off() for _ in range(requests)))
+    one_off_seconds, one_off_connections = time.perf_counter() - started, len(set(provider.peers))
+
+    service = FootballDataService(scheduler=FetchScheduler(TokenBucket(requests, 60.0), settings.FETCH_MAX_CONCURRENCY))
+    provider.peers.clear()
+    started = time.perf_counter()
+    results = await asyncio.gather(*(service._make_request("/competitions/2021/standings") for _ in range(requests)))
+    pooled_seconds, pooled_connections = time.perf_counter() - started, len(set(provider.peers))
+    if any(result is None for result in results):
+        fail("pooled requests failed")
+
+    print(f"{requests} requests, {settings.FETCH_MAX_CONCURRENCY} concurrent   seconds   TCP connections")
+    print(f"new client per request      {one_off_seconds:7.2f}   {one_off_connections:15}")
+    print(f"pooled client               {pooled_seconds:7.2f}   {pooled_connections:15}")
+    if pooled_connections > settings.FETCH_MAX_CONCURRENCY:
+        fail(f"pooled client opened {pooled_connections} connections")
+
+
+async def check_retries():
+    scheduler = FetchScheduler(TokenBucket(100, 60.0), 4)
+    attempts = settings.FOOTBALL_DATA_MAX_RETRIES + 1
+
+    async def run(responses, endpoint):
+        client, calls = scripted(responses)
+        result = await FootballDataService(scheduler=scheduler, client=client)._make_request(endpoint)
+        await client.aclose()
+        return result, calls
+
+    result, calls = await run([503, 502, 200], "/competitions/1/standings")
+    if result is None or len(calls) != 3:
+        fail(f"transient 5xx not retried to success ({len(calls)} calls)")
+
+    result, calls = await run([httpx.ConnectError("refused"), 200], "/competitions/2/standings")
+    if result is None or len(calls) != 2:
+        fail("connection error not retried")
+
+    result, calls = await run([(429, {"Retry-After": "0.3"}), 200], "/competitions/3/standings")
+    if result is None or calls[1] - calls[0] < 0.3 or scheduler.throttled != 1:
+        fail("Retry-After not honoured through the shared budget")
+
+    result, calls = await run([404], "/competitions/4/standings")
+    if result is not None or len(calls) != 1:
+        fail("a 404 was retried")
+
+    result, calls = await run([500], "/competitions/5/standings")
+    if result is not None or len(calls) != attempts:
+        fail(f"a failing endpoint made {len(calls)} attempts, expected {attempts}")
+
+    print(f"\n5xx, connection error, 429 + Retry-After: retried to success; "
+          f"404 not retried; persistent 500 gave up after {attempts} attempts")
+
+    ceilings = [min(settings.FETCH_BACKOFF_MAX, settings.FETCH_BACKOFF_BASE * 2 ** k) for k in range(6)]
+    samples = [[retry_delay(None, k) for _ in range(2000)] for k in range(6)]
+    means = [sum(sample) / len(sample) for sample in samples]
+    if any(max(sample) > ceiling for sample, ceiling in zip(samples, ceilings)):
+        fail("a backoff delay exceeded its cap")
+    if any(len({round(d, 6) for d in sample}) < 1000 for sample in samples):
+        fail("backoff delays are not jittered")
+    if not means[3] > 2 * means[1]:
+        fail("backoff does not grow")
+    print("mean backoff per retry (ms): " + " ".join(f"{mean * 1000:.0f}" for mean in means))
+
+    snapshot = football_data_stats.snapshot()
+    entry = snapshot.get("/competitions/{id}/standings")
+    if entry is None or entry["retries"] < 4 or entry["failures"] != 2 or entry["latency_ms_p95"] is None:
+        fail(f"endpoint counters are off: {entry}")
+    print(f"counters for /competitions/{{id}}/standings: {entry}")
+
+
+async def check_lifespan():
+    async with lifespan(app):
+        client = football_data_client.get()
+        if client.is_closed:
+            fail("pooled client closed too early")
+    if not client.is_closed:
+        fail("lifespan left the pooled client open")
+    print("\nlifespan shutdown closes the pooled client")
+
+
+async def main_bench(provider: Provider, requests: int):
+    await compare_clients(provider, requests)
+    await check_retries()
+    await check_lifespan()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    provider = Provider()
+    server = uvicorn.Server(uvicorn.Config(provider, host="127.0.0.1", port=PORT, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    asyncio.run(main_bench(provider, args.requests))
+    server.should_exit = True
+    thread.join()
+    print("\nOK: one pool of connections, bounded jittered retries honouring Retry-After, closed on shutdown")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Benchmark and check the Monte Carlo season simulator.
+
+Seeds a league halfway through a double round robin (standings taken from
+the played half, the other half scheduled), then:
+
+  * checks every team's position probabilities and every position's
+    probabilities sum to 1 and expected points stay within reach,
+  * compares title, top-4 and relegation odds with a plain per-run Python
+    loop over the same fixture probabilities,
+  * times SeasonSimulator.simulate at several run counts,
+  * checks /leagues/{id}/projection is served from the cache until a
+    standings change invalidates it, and that /leagues/{id}/table is filled.
+
+Usage:
+    python scripts/bench-season-simulator.py [--teams 20] [--runs 100000]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from harness import fail, seed_league, seed_teams, use_temp_database
+
+use_temp_database("simulator")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.cache import TEAMS, response_cache  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.database import SessionLocal  # noqa: E402
+from app.models import League, Match, Team  # noqa: E402
+from app.models.match import MatchStatus  # noqa: E402
+from app.services.season_simulator import SeasonSimulator  # noqa: E402
+from app.services.team_feature_service import TeamFeatureService  # noqa: E402
+from main import app  # noqa: E402
+
+
+def seed(teams_count: int) -> int:
+    """First half of a double round robin played, second half scheduled"""
+    rng = random.Random(8)
+    db = SessionLocal()
+
+    league = seed_league(db, "Simulated League", current_season=2024)
+    strength = [rng.uniform(0.6, 2.2) for _ in range(teams_count)]
+    teams = seed_teams(db, league, teams_count)
+
+    # Circle-method round robin; the second half swaps home and away
+    rotation = list(range(teams_count))
+    rounds = []
+    for _ in range(teams_count - 1):
+        rounds.append([(rotation[i], rotation[-1 - i]) for i in range(teams_count // 2)])
+        rotation = [rotation[0]] + [rotation[-1]] + rotation[1:-1]
+    rounds += [[(away, home) for home, away in fixtures] for fixtures in rounds]
+
+    table = {i: [0, 0, 0, 0, 0, 0] for i in range(teams_count)}  # W D L GF GA points
+    now = datetime.utcnow()
+    for number, fixtures in enumerate(rounds):
+        played = number < len(rounds) // 2
+        kickoff = now + timedelta(days=7 * (number - len(rounds) // 2) + (0 if played else 1))
+        for home, away in fixtures:
+            home_score = away_score = None
+            if played:
+                home_score = np.random.default_rng(number * 100 + home).poisson(strength[home] * 0.8 + 0.4)
+                away_score = np.random.default_rng(number * 100 + away + 50).poisson(strength[away] * 0.7 + 0.3)
+                home_score, away_score = int(home_score), int(away_score)
+                for team, scored, conceded in ((home, home_score, away_score), (away, away_score, home_score)):
+                    row = table[team]
+                    row[0 if scored > conceded else 1 if scored == conceded else 2] += 1
+                    row[3] += scored
+                    row[4] += conceded
+                    row[5] += 3 if scored > conceded else 1 if scored == conceded else 0
+            db.add(Match(
+                home_team_id=teams[home].id, away_team_id=teams[away].id, league_id=league.id, match_date=kickoff,
+                status=MatchStatus.FINISHED if played else MatchStatus.SCHEDULED,
+                home_score=home_score, away_score=away_score,
+            ))
+
+    standings = sorted(table, key=lambda i: (-table[i][5], table[i][4] - table[i][3], -table[i][3]))
+    for position, i in enumerate(standings, start=1):
+        wins, draws, losses, goals_for, goals_against, points = table[i]
+        team = teams[i]
+        team.position, team.points = position, points
+        team.matches_played, team.wins, team.draws, team.losses = wins + draws + losses, wins, draws, losses
+        team.goals_for, team.goals_against = goals_for, goals_against
+    db.commit()
+    league_id = league.id
+    TeamFeatureService(db).rebuild()
+    db.close()
+    return league_id
+
+
+def loop_reference(simulator: SeasonSimulator, league_id: int, runs: int):
+    """Title, top-4 and relegation counts from a per-run, per-fixture Python loop"""
+    league = simulator.db.get(League, league_id)
+    teams = simulator.db.query(Team).filter(Team.league_id == league_id).order_by(Team.position, Team.id).all()
+    team_index = {team.id: i for i, team in enumerate(teams)}
+    fixtures = simulator._remaining_fixtures(league, team_index)
+    home_win, draw = simulator._outcome_probabilities(fixtures, settings.SIMULATION_MODEL)
+    rng = random.Random(4)
+
+    n = len(teams)
+    title, top, relegated = [0] * n, [0] * n, [0] * n
+    for _ in range(runs):
+        points = [team.points for team in teams]
+        for f, match in enumerate(fixtures):
+            u = rng.random()
+            home, away = team_index[match.home_team_id], team_index[match.away_team_id]
+            if u < home_win[f]:
+                points[home] += 3
+            elif u < home_win[f] + draw[f]:
+                points[home] += 1
+                points[away] += 1
+            else:
+                points[away] += 3
+        order = sorted(range(n), key=lambda i: (-points[i], -teams[i].goal_difference, -teams[i].goals_for, rng.random()))
+        title[order[0]] += 1
+        for i in order[:SeasonSimulator.TOP_PLACES]:
+            top[i] += 1
+        for i in order[n - SeasonSimulator.RELEGATION_PLACES:]:
+            relegated[i] += 1
+    return [team.id for team in teams], title, top, relegated
+
+
+def main_bench(teams_count: int, runs: int):
+    with TestClient(app) as client:
+        league_id = seed(teams_count)
+        simulator = SeasonSimulator()
+
+        result = simulator.simulate(league_id, runs=runs, seed=1)
+        probabilities = np.array([team["positions"] for team in result["teams"]])
+        if not np.allclose(probabilities.sum(axis=1), 1, atol=0.002) or not np.allclose(probabilities.sum(axis=0), 1, atol=0.002):
+            fail("position probabilities do not sum to 1 per team and per position")
+        remaining = {team["id"]: 0 for team in result["teams"]}
+        for match in simulator._remaining_fixtures(simulator.db.get(League, league_id), remaining):
+            remaining[match.home_team_id] += 1
+            remaining[match.away_team_id] += 1
+        for team in result["teams"]:
+            if not team["points"] <= team["expected_points"] <= team["points"] + 3 * remaining[team["id"]]:
+                fail(f"{team['name']} expected points {team['expected_points']} out of reach")
+        print(f"{result['remaining_fixtures']} remaining fixtures, {teams_count} teams, model {result['model']}\n")
+
+        reference_runs = 4000
+        team_ids, title, top, relegated = loop_reference(simulator, league_id, reference_runs)
+        vectorized = simulator.simulate(league_id, runs=reference_runs * 10, seed=2)
+        by_id = {team["id"]: team for team in vectorized["teams"]}
+        worst = 0.0
+        for i, team_id in enumerate(team_ids):
+            for key, counts in (("title", title), ("top_4", top), ("relegation", relegated)):
+                worst = max(worst, abs(by_id[team_id][key] - counts[i] / reference_runs))
+        print(f"largest title/top-4/relegation gap to the Python loop: {worst:.3f}")
+        if worst > 0.04:
+            fail("vectorized odds differ from the per-run loop")
+
+        print(f"\n{'runs':>9} {'seconds':>8} {'runs/s':>11}")
+        for count in sorted({10000, runs}):
+            started = time.perf_counter()
+            simulator.simulate(league_id, runs=count, seed=3)
+            seconds = time.perf_counter() - started
+            print(f"{count:>9,} {seconds:>8.2f} {count / seconds:>11,.0f}")
+
+        started = time.perf_counter()
+        client.get(f"/api/v1/leagues/{league_id}/projection", params={"runs": runs})
+        miss_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        cached = client.get(f"/api/v1/leagues/{league_id}/projection", params={"runs": runs})
+        hit_seconds = time.perf_counter() - started
+        print(f"\nprojection endpoint  miss {miss_seconds * 1000:8.1f} ms   hit {hit_seconds * 1000:6.1f} ms")
+
+        team = simulator.db.query(Team).filter(Team.league_id == league_id, Team.position == 1).one()
+        team.points += 30
+        simulator.db.commit()
+        asyncio.run(response_cache.invalidate(TEAMS))
+        refreshed = client.get(f"/api/v1/leagues/{league_id}/projection", params={"runs": runs}).json()
+        before = next(t for t in cached.json()["teams"] if t["id"] == team.id)["title"]
+        after = next(t for t in refreshed["teams"] if t["id"] == team.id)["title"]
+        if not after > before:
+            fail("projection was not recomputed after a standings change")
+        print(f"after +30 points     leader's title odds {before:.3f} -> {after:.3f}")
+
+        table = client.get(f"/api/v1/leagues/{league_id}/table").json()
+        if [row["position"] for row in table["standings"]] != list(range(1, teams_count + 1)):
+            fail("league table is not filled in position order")
+        simulator.db.close()
+
+    print("\nOK: projections are consistent, match the per-run loop and follow invalidation")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=100000)
+    args = parser.parse_args()
+    main_bench(args.teams, args.runs)
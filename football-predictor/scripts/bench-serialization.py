@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark list response serialization: response_model path vs the orjson fast path.
+
+Seeds a scratch database, loads a page of matches and predictions with the
+same eager loading the endpoints use, and serializes it repeatedly the way
+FastAPI does for a response_model (validate from attributes, encode to JSON
+types, json.dumps) and through app.core.serialization.fast_json_response.
+Both outputs are decoded and compared so the fast path stays schema-compatible.
+
+Usage:
+    python scripts/bench-serialization.py [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from harness import seed_league, seed_teams, use_temp_database
+
+use_temp_database("json")
+
+from fastapi import Response  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.api.v1.endpoints.matches import MATCH_RELATIONS  # noqa: E402
+from app.api.v1.endpoints.predictions import PREDICTION_RELATIONS  # noqa: E402
+from app.core.database import SessionLocal, init_db  # noqa: E402
+from app.core.serialization import fast_json_response  # noqa: E402
+from app.models import Match, Prediction, User  # noqa: E402
+from app.models.match import MatchStatus  # noqa: E402
+from app.models.prediction import PredictionType  # noqa: E402
+from app.schemas.match import MatchResponse  # noqa: E402
+from app.schemas.prediction import PredictionResponse  # noqa: E402
+
+
+def seed(rows: int):
+    """Insert a page worth of finished matches, each with one prediction"""
+    db = SessionLocal()
+    league = seed_league(db, "Bench League", country="Nowhere")
+    teams = seed_teams(db, league, 20, fields=lambda i: {"short_name": f"T{i}"})
+    user = User(username="bench", full_name="Bench User")
+    db.add_all([user])
+    db.flush()
+
+    start = datetime(2024, 8, 1, 15, 0)
+    matches = [
+        Match(
+            external_id=1000 + i,
+            home_team_id=teams[i % 20].id,
+            away_team_id=teams[(i + 7) % 20].id,
+            league_id=league.id,
+            match_date=start + timedelta(hours=i, microseconds=i),
+            status=MatchStatus.FINISHED,
+            matchday=i // 10 + 1,
+            home_score=i % 4,
+            away_score=i % 3,
+            venue=f"Stadium {i % 20}",
+            referee="A. Referee",
+            prediction_confidence="MEDIUM",
+        )
+        for i in range(rows)
+    ]
+    db.add_all(matches)
+    db.flush()
+
+    db.add_all([
+        Prediction(
+            user_id=user.id,
+            match_id=match.id,
+            prediction_type=PredictionType.WIN_DRAW_WIN,
+            prediction_value="1",
+            confidence=0.61,
+            odds=1.9,
+        )
+        for match in matches
+    ])
+    db.commit()
+    db.close()
+
+
+def load(model, relations):
+    """Load every row with the endpoint's eager loading"""
+    db = SessionLocal()
+    rows = db.execute(select(model).options(*relations).order_by(model.id)).scalars().all()
+    db.close()
+    return rows
+
+
+async def response_model_body(field, rows) -> bytes:
+    """What FastAPI does with a returned list: validate, encode, json.dumps"""
+    content = await serialize_response(field=field, response_content=rows, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+def measure(label: str, rows, schema, repeat: int):
+    field = create_response_field(name=f"Response_{schema.__name__}", type_=List[schema])
+
+    standard = asyncio.run(response_model_body(field, rows))
+    fast = fast_json_response(rows, schema, Response()).body
+    assert json.loads(standard) == json.loads(fast), f"{label}: fast path output differs"
+
+    async def time_standard():
+        started = time.perf_counter()
+        for _ in range(repeat):
+            await response_model_body(field, rows)
+        return time.perf_counter() - started
+
+    standard_seconds = asyncio.run(time_standard())
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fast_json_response(rows, schema, Response())
+    fast_seconds = time.perf_counter() - started
+
+    total = len(rows) * repeat
+    print(f"{label:<12} {total / standard_seconds:>14,.0f} {total / fast_seconds:>14,.0f} "
+          f"{standard_seconds / fast_seconds:>8.1f}x")
+
+
+def main_bench(rows: int, repeat: int):
+    asyncio.run(init_db())
+    seed(rows)
+
+    matches = load(Match, MATCH_RELATIONS)
+    predictions = load(Prediction, PREDICTION_RELATIONS)
+
+    print(f"{rows} rows per page, {repeat} pages\n")
+    print(f"{'schema':<12} {'response_model':>14} {'orjson path':>14} {'speedup':>8}")
+    print(f"{'':<12} {'rows/s':>14} {'rows/s':>14}")
+    measure("matches", matches, MatchResponse, repeat)
+    measure("predictions", predictions, PredictionResponse, repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main_bench(args.rows, args.repeat)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark SQLite read throughput against the number of reader processes.
+
+Compares the legacy storage mode (one StaticPool connection, rollback
+journal) with the pooled WAL mode built by app.core.database.create_db_engine,
+each on its own database file, first read-only and then with a writer
+process committing the whole time. Readers are processes, each with its own
+engine, so the Python side of a query does not serialize them on one GIL.
+
+Fails unless pooled WAL reads scale with the readers (given at least two
+CPUs) and, with the writer committing, keep at least half the read-only rate
+the remaining CPU allows and read faster than the legacy mode.
+
+Usage:
+    python scripts/bench-sqlite-concurrency.py [--rows 20000] [--seconds 3] [--workers 1 2 4 8]
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+
+from harness import fail, use_temp_database
+
+use_temp_database("bench", keep_url=True)
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.engine import make_url  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core.database import create_db_engine  # noqa: E402
+
+DB_PATH = make_url(os.environ["DATABASE_URL"]).database
+LEGACY_PATH = os.path.splitext(DB_PATH)[0] + "-legacy.db"
+
+READ_QUERY = text(
+    "SELECT id, home_score, away_score FROM bench_matches "
+    "WHERE league_id = :league ORDER BY match_date DESC LIMIT 50"
+)
+
+# Reads per second at min(workers, CPUs) readers over one reader, where there are CPUs to scale onto
+MIN_SCALING = 1.5
+# Share of its read-only rate pooled WAL must keep with the writer running, of what the
+# CPUs left to the readers allow (one reader and the writer on one CPU get half each)
+MIN_WRITER_SHARE = 0.5
+
+
+def legacy_engine(path: str):
+    """The single shared connection the app used before the pool, with SQLite's default journal"""
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+def wal_engine(path: str):
+    return create_db_engine(f"sqlite:///{path}")
+
+
+MODES = {
+    "shared connection (StaticPool, rollback journal)": (legacy_engine, LEGACY_PATH),
+    "pooled WAL": (wal_engine, DB_PATH),
+}
+
+
+def seed(engine, rows: int):
+    """Create and fill the benchmark table"""
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS bench_matches"))
+        conn.execute(text(
+            "CREATE TABLE bench_matches ("
+            "id INTEGER PRIMARY KEY, league_id INTEGER, match_date TEXT, "
+            "home_score INTEGER, away_score INTEGER)"
+        ))
+        conn.execute(text("CREATE INDEX ix_bench_league_date ON bench_matches (league_id, match_date)"))
+        conn.execute(
+            text("INSERT INTO bench_matches (league_id, match_date, home_score, away_score) "
+                 "VALUES (:league, :date, :home, :away)"),
+            [
+                {"league": i % 20, "date": f"2024-01-01 00:{i % 60:02d}:{i % 60:02d}", "home": i % 4, "away": i % 3}
+                for i in range(rows)
+            ],
+        )
+
+
+def reader(make_engine, path: str, slot: int, start, stop, count, errors):
+    """Read until stopped, counting reads made after start"""
+    engine = make_engine(path)
+    league = slot % 20
+    start.wait()
+    while not stop.is_set():
+        try:
+            with engine.connect() as conn:
+                conn.execute(READ_QUERY, {"league": league}).fetchall()
+            count.value += 1
+        except Exception:  # SQLITE_BUSY once the busy timeout runs out
+            errors.value += 1
+    engine.dispose()
+
+
+def writer(make_engine, path: str, start, stop, errors):
+    engine = make_engine(path)
+    start.wait()
+    i = 0
+    while not stop.is_set():
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text("UPDATE bench_matches SET home_score = home_score + 1 WHERE id = :id"),
+                    {"id": i % 1000 + 1},
+                )
+        except Exception:
+            errors.value += 1
+        i += 1
+    engine.dispose()
+
+
+def run_readers(mode: str, workers: int, seconds: float, with_writer: bool) -> float:
+    """Run reader processes for a fixed time and return total reads per second"""
+    make_engine, path = MODES[mode]
+    ctx = multiprocessing.get_context("fork")
+    start, stop = ctx.Event(), ctx.Event()
+    counts = [ctx.Value("q", 0, lock=False) for _ in range(workers)]
+    errors = ctx.Value("q", 0)
+
+    processes = [
+        ctx.Process(target=reader, args=(make_engine, path, slot, start, stop, counts[slot], errors))
+        for slot in range(workers)
+    ]
+    if with_writer:
+        processes.append(ctx.Process(target=writer, args=(make_engine, path, start, stop, errors)))
+
+    for process in processes:
+        process.start()
+    time.sleep(0.5)  # let every process open its engine before the clock starts
+    start.set()
+    time.sleep(seconds)
+    stop.set()
+    for process in processes:
+        process.join()
+
+    if errors.value:
+        print(f"    ({errors.value} errors)")
+
+    return sum(count.value for count in counts) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    workers = sorted(set(args.workers))
+    cpus = os.cpu_count() or 1
+    for make_engine, path in MODES.values():
+        engine = make_engine(path)
+        seed(engine, args.rows)
+        engine.dispose()
+
+    print(f"database: {DB_PATH}  legacy: {LEGACY_PATH}  rows: {args.rows}  cpus: {cpus}")
+    rates = {}
+    for with_writer in (False, True):
+        for mode in MODES:
+            print(f"\n{mode}, {'with' if with_writer else 'no'} writer")
+            for count in workers:
+                rate = run_readers(mode, count, args.seconds, with_writer)
+                rates[mode, with_writer, count] = rate
+                print(f"  {count:>2} readers: {rate:>10.0f} reads/s  (x{rate / rates[mode, with_writer, workers[0]]:.2f})")
+
+    legacy, wal = MODES
+    print()
+    scaled = max((count for count in workers if count <= cpus), default=workers[0])
+    if scaled > workers[0]:
+        ratio = rates[wal, False, scaled] / rates[wal, False, workers[0]]
+        if ratio < MIN_SCALING:
+            fail(f"pooled WAL reads x{ratio:.2f} from {workers[0]} to {scaled} readers on {cpus} CPUs, "
+                 f"expected at least x{MIN_SCALING}")
+    else:
+        print(f"note: {cpus} CPU, read scaling not checked")
+
+    for count in workers:
+        cpu_share = min(count, cpus * count / (count + 1)) / min(count, cpus)
+        share = rates[wal, True, count] / rates[wal, False, count]
+        if share < MIN_WRITER_SHARE * cpu_share:
+            fail(f"pooled WAL with {count} readers kept {share:.0%} of its reads with a writer, "
+                 f"expected at least {MIN_WRITER_SHARE * cpu_share:.0%}")
+        if rates[wal, True, count] <= rates[legacy, True, count]:
+            fail(f"pooled WAL with {count} readers and a writer read no faster than the shared connection")
+
+    print("OK: pooled WAL reads scale with readers and keep going while a writer commits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Benchmark end-to-end data syncs against the local provider stand-in.
+
+For each scale (leagues x teams x fixtures per league) a fresh database is
+synced by DataSyncService.sync_all_data from a synthetic season, or from a
+recording made with scripts/provider-standin.py record, served by
+ProviderStandIn in-process (or over local HTTP with --http). Four runs are
+measured per scale:
+
+  * first sync into an empty database,
+  * full sync with nothing changed,
+  * incremental sync straight after, with only live fixtures due,
+  * full sync after --change of the fixtures within a week of today changed,
+
+reporting wall time, requests, 429s, 304s and DB writes (statements and
+rows). Each scale runs in its own process with its own database, and the
+suite fails if a sync errors, an unchanged full sync is not all 304s, or a
+changed one writes nothing.
+
+Usage:
+    python scripts/bench-sync.py [--scales 2x10x100 5x20x380 10x20x760] [--latency 0.05]
+    python scripts/bench-sync.py --recorded recordings/ [--plan free --quota 10 --limit-hint retry-after]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from harness import fail, use_temp_database
+
+START_DIR = Path.cwd()
+
+DB_DIR = use_temp_database("sync", keep_url=True)
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.core.database import async_engine, engine, init_db  # noqa: E402
+from app.services.data_sync_service import DataSyncService  # noqa: E402
+from app.services.fetch_scheduler import create_fetch_scheduler  # noqa: E402
+from app.services.football_data_service import FootballDataService, football_data_client  # noqa: E402
+from app.services.provider_standin import LIMIT_HINTS, ProviderData, ProviderStandIn  # noqa: E402
+
+RESULT = "RESULT "
+RUNS = (("first sync", False, False), ("full, unchanged", True, False), ("incremental", False, False),
+        ("full, changed", True, True))
+
+
+class Writes:
+    """INSERT, UPDATE and DELETE statements and the rows they touched"""
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+        event.listen(engine, "after_cursor_execute", self.count)
+
+    def count(self, conn, cursor, statement, *_):
+        if statement.lstrip().split(" ")[0].upper() in ("INSERT", "UPDATE", "DELETE"):
+            self.statements += 1
+            self.rows += max(cursor.rowcount, 0)
+
+
+def provider_data(args, scale: str) -> ProviderData:
+    if args.recorded:
+        return ProviderData.load(START_DIR / args.recorded)
+    leagues, teams, fixtures = (int(part) for part in scale.split("x"))
+    return ProviderData.synthetic(leagues, teams, fixtures, seed=args.seed)
+
+
+async def bench_scale(args) -> list:
+    """The four runs of one scale, in this process's database"""
+    data = provider_data(args, args.scale)
+    standin = ProviderStandIn(
+        data, latency=args.latency, jitter=args.jitter, quota=args.quota, period=args.period,
+        limit_hint=args.limit_hint
+    )
+
+    server = None
+    if args.http:
+        import uvicorn
+        port = int(os.environ["FOOTBALL_DATA_BASE_URL"].rsplit(":", 1)[1].split("/")[0])
+        server = uvicorn.Server(uvicorn.Config(standin, host="127.0.0.1", port=port, log_level="warning"))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.01)
+        client = None  # The pooled client, as in production
+    else:
+        client = httpx.AsyncClient(transport=standin.transport())
+
+    writes = Writes()
+    runs = []
+    for name, full, change in RUNS:
+        touched = data.touch(args.change, seed=args.seed) if change else 0
+        standin.reset_counters()
+        writes.statements = writes.rows = 0
+
+        # Syncs are spaced apart, so each starts with the plan's full request budget
+        service = FootballDataService(scheduler=create_fetch_scheduler("football_data"), client=client)
+        started = time.perf_counter()
+        results = await DataSyncService(service).sync_all_data(full=full)
+        seconds = time.perf_counter() - started
+
+        runs.append({
+            "run": name, "seconds": seconds, "requests": standin.requests, "refused": standin.refused,
+            "not_modified": standin.not_modified, "statements": writes.statements, "rows": writes.rows,
+            "touched": touched, "matches": results["matches_synced"], "errors": results["errors"]
+        })
+
+    if client is not None:
+        await client.aclose()
+    await football_data_client.close()
+    await async_engine.dispose()
+    if server is not None:
+        server.should_exit = True
+    return runs
+
+
+def run_scale(args, scale: str) -> list:
+    """Run one scale in a child process with a database and settings of its own"""
+    data = provider_data(args, scale)
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(DB_DIR, scale + '.db')}",
+        "FOOTBALL_DATA_COMPETITIONS": json.dumps([c["id"] for c in data.competitions]),
+        "FOOTBALL_DATA_PLAN": args.plan,
+        "FOOTBALL_DATA_HTTP2": "false",
+        "FOOTBALL_DATA_BASE_URL": "http://standin/v4",
+    }
+    if args.http:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            env["FOOTBALL_DATA_BASE_URL"] = f"http://127.0.0.1:{probe.getsockname()[1]}/v4"
+
+    command = [sys.executable, str(Path(__file__).resolve()), "--scale", scale] + sys.argv[1:]
+    child = subprocess.run(command, cwd=START_DIR, env=env, capture_output=True, text=True)
+    for line in child.stdout.splitlines():
+        if line.startswith(RESULT):
+            return json.loads(line[len(RESULT):])
+    fail(f"scale {scale} did not finish:\n{child.stdout[-2000:]}{child.stderr[-2000:]}")
+
+
+def main(args):
+    scales = [Path(args.recorded).name] if args.recorded else args.scales
+    print(f"{'scale':<14} {'run':<16} {'seconds':>8} {'requests':>9} {'429s':>5} {'304s':>5} "
+          f"{'statements':>11} {'rows':>7}  fixtures synced")
+
+    for scale in scales:
+        runs = run_scale(args, scale)
+        for run in runs:
+            changed = f" ({run['touched']} changed)" if run["touched"] else ""
+            print(f"{scale:<14} {run['run']:<16} {run['seconds']:>8.2f} {run['requests']:>9} {run['refused']:>5} "
+                  f"{run['not_modified']:>5} {run['statements']:>11} {run['rows']:>7}  {run['matches']}{changed}")
+
+        first, unchanged, incremental, changed = runs
+        if any(run["errors"] for run in runs):
+            fail(f"{scale}: sync errors {[run['errors'] for run in runs]}")
+        if incremental["requests"] >= first["requests"]:
+            fail(f"{scale}: an incremental sync right after a full one made {incremental['requests']} requests")
+        if unchanged["not_modified"] != unchanged["requests"] - unchanged["refused"]:
+            fail(f"{scale}: an unchanged full sync parsed {unchanged['requests'] - unchanged['not_modified']} payloads")
+        if changed["touched"] and not changed["rows"]:
+            fail(f"{scale}: {changed['touched']} changed fixtures were not written")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", default=["2x10x100", "5x20x380", "10x20x760"],
+                        help="leagues x teams x fixtures per league")
+    parser.add_argument("--recorded", help="replay a recording instead of synthetic leagues")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--change", type=float, default=0.05, help="share of fixtures near today changed")
+    parser.add_argument("--latency", type=float, default=0.05, help="stand-in seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--plan", default="advanced", help="request budget the app assumes")
+    parser.add_argument("--quota", type=int, help="stand-in requests per period before 429s")
+    parser.add_argument("--period", type=float, default=60.0)
+    parser.add_argument("--limit-hint", choices=LIMIT_HINTS, default="counter-reset")
+    parser.add_argument("--http", action="store_true", help="serve over local HTTP instead of in-process")
+    parser.add_argument("--scale", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scale:
+        asyncio.run(init_db())
+        print(RESULT + json.dumps(asyncio.run(bench_scale(args))))
+    else:
+        main(args)
+        print("OK: syncs at every scale completed, skipped unchanged payloads and wrote changed ones")
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Check the leaderboards against a reference ranking of user_stats.
+
+First checks the indexable skip list behind the memory backend against a
+sorted list under random inserts and removals, and times rank lookups and
+moves on boards of growing size, which must stay logarithmic. Then seeds
+users who predict a season of fixtures and lets DataSyncService settle it
+round by round: after each round the all-time and monthly boards, a user's
+rank and the users around them must equal a ranking of user_stats by points,
+then accuracy, with ties sharing a rank. So must the boards of a second
+leaderboard that settles nothing (another worker), which has to notice the
+changes in user_stats and reload. A fresh leaderboard (a restarted
+process) must rebuild the same boards from user_stats, write_ranks must store
+the same ranks, and the leaderboard endpoints must serve them. The Redis
+score encoding is checked to sort like the memory keys; the Redis backend
+itself needs a server and is not run here.
+
+Usage:
+    python scripts/check-leaderboard.py [--users 300] [--rounds 12]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+
+from harness import (
+    fail, seed_fixtures, seed_league, seed_predictions, seed_teams, seed_users, use_temp_database
+)
+
+use_temp_database("leaderboard", LEADERBOARD_BACKEND="memory")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import select, update  # noqa: E402
+
+import main  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.database import SessionLocal, async_engine, init_db  # noqa: E402
+from app.models import Match, UserStats  # noqa: E402
+from app.models.prediction import PredictionType  # noqa: E402
+from app.services.data_sync_service import DataSyncService  # noqa: E402
+from app.services.leaderboard import (  # noqa: E402
+    ALL_TIME, MONTHLY, STATS_COLUMNS, Leaderboard, MemoryLeaderboardBackend, RankIndex, RedisLeaderboardBackend,
+    leaderboard
+)
+from app.services.user_stats_service import month_of  # noqa: E402
+
+TEAMS = 20
+PER_ROUND = 10
+VALUES = {
+    PredictionType.WIN_DRAW_WIN: ["1", "X", "2"],
+    PredictionType.DOUBLE_CHANCE: ["1X", "12", "X2"],
+    PredictionType.BOTH_TEAMS_SCORE: ["Yes", "No"],
+    PredictionType.OVER_UNDER: ["Over 1.5", "Over 2.5", "Under 2.5"],
+    PredictionType.CORRECT_SCORE: ["1-0", "1-1", "2-1", "0-0"],
+}
+
+
+def check_index(rng: random.Random, operations: int = 20000):
+    """RankIndex against a sorted list"""
+    index, reference = RankIndex(), []
+    for _ in range(operations):
+        if reference and rng.random() < 0.4:
+            key = reference.pop(rng.randrange(len(reference)))
+            index.remove(key)
+        else:
+            key = (-rng.randint(0, 500), -rng.randint(0, 100), rng.randint(1, 10 ** 9))
+            if key in reference:
+                continue
+            insort(reference, key)
+            index.insert(key)
+
+        probe = (-rng.randint(0, 500), -rng.randint(0, 100))
+        if index.count_below(probe) != bisect_left(reference, probe) or len(index) != len(reference):
+            fail(f"count_below{probe} = {index.count_below(probe)}, expected {bisect_left(reference, probe)}")
+        start = rng.randrange(len(reference) + 1)
+        if index.slice(start, start + 7) != reference[start:start + 7]:
+            fail(f"slice({start}, {start + 7}) differs from the sorted list")
+
+    if index.slice(0, len(reference)) != reference:
+        fail("the index does not hold the sorted keys")
+    try:
+        index.remove((1, 1, 1))
+        fail("removing a missing key succeeded")
+    except KeyError:
+        pass
+    print(f"RankIndex: {operations} random inserts and removals match a sorted list")
+
+
+async def time_board(users: int, rng: random.Random, lookups: int = 2000) -> float:
+    """Microseconds per move, rank lookup and page of ten on a board of ``users``"""
+    board = Leaderboard(MemoryLeaderboardBackend())
+    await board.backend.replace(ALL_TIME, [(user_id, rng.randint(0, 3000), rng.randint(0, 10000) / 100)
+                                           for user_id in range(1, users + 1)])
+
+    started = time.perf_counter()
+    for _ in range(lookups):
+        user_id = rng.randint(1, users)
+        await board.backend.set(ALL_TIME, [(user_id, rng.randint(0, 3000), rng.randint(0, 10000) / 100)])
+        position = await board.backend.position(ALL_TIME, user_id)
+        await board._entries(ALL_TIME, position - 5, position + 6)
+        offset = rng.randrange(users - 10)
+        await board._entries(ALL_TIME, offset, offset + 10)
+    return (time.perf_counter() - started) / lookups * 1e6
+
+
+def check_redis_scores(rng: random.Random):
+    """Redis scores sort standings like the memory keys and decode back to them"""
+    standings = [(user_id, rng.randint(0, 5000), rng.randint(0, 10000) / 100) for user_id in range(1, 2001)]
+    for user_id, points, accuracy in standings:
+        decoded = RedisLeaderboardBackend._standing(str(user_id), float(RedisLeaderboardBackend._score(points, accuracy)))
+        if decoded != (user_id, points, accuracy):
+            fail(f"Redis score of {(user_id, points, accuracy)} decodes to {decoded}")
+
+    by_score = sorted(standings, key=lambda s: -RedisLeaderboardBackend._score(s[1], s[2]))
+    by_key = sorted(standings, key=lambda s: MemoryLeaderboardBackend._key(*s))
+    if [s[1:] for s in by_score] != [s[1:] for s in by_key]:
+        fail("Redis scores order standings differently from the memory backend")
+    print("Redis scores: round-trip and order like the memory keys (no server run)")
+
+
+def reference():
+    """Each board as [(user_id, points, accuracy, rank)] ranked from user_stats, ties sharing a rank"""
+    month = month_of(datetime.utcnow())
+    with SessionLocal() as db:
+        rows = db.execute(select(*STATS_COLUMNS)).all()
+
+    boards = {ALL_TIME: [], MONTHLY: []}
+    for row in rows:
+        if row.total_predictions:
+            boards[ALL_TIME].append((row.user_id, row.total_points, round(row.overall_accuracy, 2)))
+        if row.stats_month == month and row.monthly_predictions:
+            boards[MONTHLY].append((row.user_id, row.monthly_points, round(row.monthly_accuracy, 2)))
+
+    ranked = {}
+    for board, standings in boards.items():
+        standings.sort(key=lambda s: (-s[1], -s[2], s[0]))
+        ranked[board] = []
+        for position, (user_id, points, accuracy) in enumerate(standings):
+            tied = position and standings[position - 1][1:] == (points, accuracy)
+            rank = ranked[board][-1][3] if tied else position + 1
+            ranked[board].append((user_id, points, accuracy, rank))
+    return ranked
+
+
+def as_tuples(entries):
+    return [(e["user_id"], e["points"], e["accuracy"], e["rank"]) for e in entries]
+
+
+async def compare(name: str, board: Leaderboard, want, rng: random.Random):
+    for board_name, expected in want.items():
+        got = as_tuples(await board.top(board_name, len(expected) + 5))
+        if got != expected:
+            first = next((i for i, (g, w) in enumerate(zip(got, expected)) if g != w), min(len(got), len(expected)))
+            fail(f"{name}: {board_name} board differs at position {first}: "
+                 f"{got[first:first + 2]} vs {expected[first:first + 2]} ({len(got)} vs {len(expected)} entries)")
+
+        page = as_tuples(await board.top(board_name, 10, 20))
+        if page != expected[20:30]:
+            fail(f"{name}: {board_name} page at offset 20 differs")
+
+        for position in rng.sample(range(len(expected)), min(20, len(expected))):
+            user_id = expected[position][0]
+            rank = await board.rank(board_name, user_id)
+            if rank is None or rank["rank"] != expected[position][3]:
+                fail(f"{name}: {board_name} rank of user {user_id} = {rank}, expected {expected[position][3]}")
+            around = as_tuples(await board.around(board_name, user_id, 3))
+            if around != expected[max(position - 3, 0):position + 4]:
+                fail(f"{name}: users around {user_id} on the {board_name} board differ")
+
+
+def seed(users: int, fixtures: int, rng: random.Random):
+    """League, users, a season of scheduled fixtures and one prediction per user per fixture"""
+    with SessionLocal() as db:
+        league = seed_league(db, country="Nowhere")
+        teams = seed_teams(db, league, TEAMS, external_id=1000, name="Club {i}")
+        user_ids = seed_users(db, users)
+        match_ids = seed_fixtures(db, teams, fixtures, datetime.utcnow() + timedelta(days=1))
+
+        # Some users sit rounds out, so the boards differ in size and users tie
+        pairs = (
+            (user_id, match_id)
+            for user_id in user_ids for match_id in rng.sample(match_ids, rng.randint(1, len(match_ids)))
+        )
+        predictions = seed_predictions(db, pairs, VALUES, rng)
+        db.commit()
+    return match_ids, predictions
+
+
+def decide(match_ids, rng: random.Random):
+    with SessionLocal() as db:
+        for match_id in match_ids:
+            status = "POSTPONED" if rng.random() < 0.05 else "FINISHED"
+            scores = (rng.randint(0, 4), rng.randint(0, 3)) if status == "FINISHED" else (None, None)
+            db.execute(update(Match).where(Match.id == match_id).values(
+                status=status, home_score=scores[0], away_score=scores[1]
+            ))
+        db.commit()
+
+
+def check_endpoints(want):
+    """The leaderboard endpoints and /users/{id}/stats serve the reference ranks"""
+    with TestClient(main.app) as client:
+        for board in (ALL_TIME, MONTHLY):
+            body = client.get("/api/v1/predictions/leaderboard/", params={"limit": 15, "offset": 5, "board": board}).json()
+            if [(r["user_id"], r["points"], r["accuracy"], r["rank"]) for r in body] != want[board][5:20]:
+                fail(f"GET /predictions/leaderboard/?board={board} differs from the reference")
+            if any(not r["username"] or r["total_predictions"] <= 0 for r in body):
+                fail("leaderboard rows are missing user names or prediction counts")
+
+        user_id, _, _, rank = want[ALL_TIME][len(want[ALL_TIME]) // 2]
+        body = client.get(f"/api/v1/predictions/leaderboard/users/{user_id}", params={"radius": 2}).json()
+        position = len(want[ALL_TIME]) // 2
+        if body["rank"] != rank or [r["user_id"] for r in body["around"]] != \
+                [u for u, _, _, _ in want[ALL_TIME][position - 2:position + 3]]:
+            fail(f"GET /predictions/leaderboard/users/{user_id} = {body}")
+
+        stats = client.get(f"/api/v1/users/{user_id}/stats").json()
+        monthly = next((r for u, _, _, r in want[MONTHLY] if u == user_id), None)
+        if (stats["global_rank"], stats["monthly_rank"]) != (rank, monthly):
+            fail(f"/users/{user_id}/stats ranks {stats['global_rank']}, {stats['monthly_rank']}, expected {rank}, {monthly}")
+
+        missing = client.get("/api/v1/predictions/leaderboard/users/999999").json()
+        if missing["rank"] is not None or missing["around"]:
+            fail(f"an unranked user has a leaderboard position: {missing}")
+        if client.get("/api/v1/predictions/leaderboard/", params={"board": "weekly"}).status_code != 422:
+            fail("an unknown board was accepted")
+    print(f"endpoints: pages, user {user_id}'s rank {rank} and neighbours, and /users/{user_id}/stats ranks match")
+
+
+async def main_check(users: int, rounds: int):
+    rng = random.Random(25)
+    check_index(rng)
+
+    sizes = (1000, 10000, 100000)
+    timings = [await time_board(size, rng) for size in sizes]
+    print("move + rank + around + page: " + ", ".join(f"{t:.0f} us at {n} users" for n, t in zip(sizes, timings)))
+    if timings[-1] > timings[0] * 4:
+        fail(f"board operations grew {timings[-1] / timings[0]:.1f}x over 100x more users; expected logarithmic")
+    check_redis_scores(rng)
+
+    match_ids, predictions = seed(users, rounds * PER_ROUND, rng)
+    print(f"\n{users} users, {len(match_ids)} fixtures, {predictions} predictions")
+
+    # Check user_stats on every read, so another worker's boards catch up at once
+    settings.LEADERBOARD_REFRESH_SECONDS = 0
+    other_worker = Leaderboard(MemoryLeaderboardBackend())
+    await other_worker.top(ALL_TIME)
+
+    service = DataSyncService()
+    for r in range(rounds):
+        decide(match_ids[r * PER_ROUND:(r + 1) * PER_ROUND], rng)
+        await service.settle_predictions()
+        want = reference()
+        await compare(f"after round {r + 1}", leaderboard, want, rng)
+        await compare(f"another worker after round {r + 1}", other_worker, want, rng)
+    want = reference()
+    ties = len(want[ALL_TIME]) - len({rank for _, _, _, rank in want[ALL_TIME]})
+    print(f"{rounds} rounds: both boards, pages, ranks and neighbours match the reference after each "
+          f"({len(want[ALL_TIME])} users ranked, {ties} sharing a rank)")
+    print("another worker: its boards reload from user_stats and match too")
+
+    # A restarted process rebuilds the same boards from user_stats
+    restarted = Leaderboard(MemoryLeaderboardBackend())
+    await compare("after a restart", restarted, want, rng)
+    if await leaderboard.reload() != len(want[ALL_TIME]):
+        fail("reload ranked a different number of users")
+    await compare("after reload", leaderboard, want, rng)
+    print("restart: a fresh leaderboard rebuilds identical boards from user_stats")
+
+    # Users still counting an earlier month leave the monthly board
+    stale = [user_id for user_id, _, _, _ in want[MONTHLY][::3]]
+    with SessionLocal() as db:
+        db.execute(update(UserStats).where(UserStats.user_id.in_(stale)).values(stats_month="2000-01"))
+        db.commit()
+        await leaderboard.update(db.execute(select(*STATS_COLUMNS).where(UserStats.user_id.in_(stale))).all())
+    want = reference()
+    await compare("after a stale month", leaderboard, want, rng)
+    print(f"monthly: {len(stale)} users with no results this month left the monthly board, all-time kept")
+
+    with SessionLocal() as db:
+        written = await leaderboard.write_ranks(db)
+        stored = {row.user_id: (row.global_rank, row.monthly_rank) for row in db.execute(
+            select(UserStats.user_id, UserStats.global_rank, UserStats.monthly_rank))}
+    monthly = {user_id: rank for user_id, _, _, rank in want[MONTHLY]}
+    expected = {user_id: (rank, monthly.get(user_id)) for user_id, _, _, rank in want[ALL_TIME]}
+    if written != len(expected) or {u: r for u, r in stored.items() if r != (None, None)} != expected:
+        fail("write_ranks stored different ranks")
+    print(f"write_ranks: {written} users' global_rank and monthly_rank stored")
+
+    service.db.close()
+    await async_engine.dispose()
+    check_endpoints(want)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    asyncio.run(init_db())
+    asyncio.run(main_check(args.users, args.rounds))
+    print("\nOK: leaderboards match a ranking of user_stats with logarithmic lookups and survive restarts")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Check the precomputed prediction store and time /predictions/generate/{id}.
+
+Seeds teams with season stats, a finished-match history and a slate of
+upcoming fixtures, then:
+
+  * fills the store and checks every stored payload matches what
+    PredictionEngine.generate_prediction returns for the fixture,
+  * refreshes again and checks nothing is rewritten,
+  * changes one team's standing and checks only that team's fixtures are
+    rewritten and that their prediction_confidence is set,
+  * times the endpoint serving from the store against recomputing.
+
+Usage:
+    python scripts/check-prediction-store.py [--fixtures 300] [--teams 100] [--requests 300]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from harness import fail, history_and_slate, seed_league, seed_teams, use_temp_database
+
+use_temp_database("store")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import or_, select  # noqa: E402
+
+from app.core.database import SessionLocal  # noqa: E402
+from app.models import Match, MatchPrediction, Team  # noqa: E402
+from app.models.match import MatchStatus  # noqa: E402
+from app.services.prediction_engine import PredictionEngine  # noqa: E402
+from app.services.prediction_store import PredictionStore  # noqa: E402
+from app.services.team_feature_service import TeamFeatureService  # noqa: E402
+from main import app  # noqa: E402
+
+
+def seed(fixtures: int, teams_count: int):
+    """Teams with standings, ten finished matches per team and the upcoming slate"""
+    rng = random.Random(11)
+    db = SessionLocal()
+
+    league = seed_league(db, "Store League")
+
+    def standings(i):
+        goals_for = rng.randint(10, 60)
+        return {"position": i % 20 + 1, "goals_for": goals_for, "goals_against": rng.randint(10, 60),
+                "avg_goals_scored": round(goals_for / 30, 2)}
+
+    teams = seed_teams(db, league, teams_count, fields=standings)
+    past, upcoming = history_and_slate(teams, teams_count * 5, fixtures, rng)
+    db.add_all(past + upcoming)
+    db.commit()
+    ids = [match.id for match in upcoming]
+    TeamFeatureService(db).rebuild()
+    db.close()
+    return ids
+
+
+def main_check(fixtures: int, teams_count: int, requests: int):
+    with TestClient(app) as client:
+        match_ids = seed(fixtures, teams_count)
+
+        store = PredictionStore()
+        written = store.refresh()
+        print(f"initial fill         {written} rows")
+        if written != fixtures:
+            fail(f"expected {fixtures} rows, wrote {written}")
+
+        engine = PredictionEngine()
+        for match_id in match_ids[:50]:
+            expected = json.loads(json.dumps(jsonable_encoder(engine.generate_prediction(match_id))))
+            stored = json.loads(store.db.get(MatchPrediction, match_id).payload)
+            if stored != expected:
+                fail(f"stored payload for match {match_id} differs from generate_prediction")
+        engine.db.close()
+
+        written = store.refresh()
+        print(f"unchanged refresh    {written} rows")
+        if written:
+            fail("a refresh with unchanged inputs rewrote rows")
+
+        team = store.db.execute(select(Team).order_by(Team.id)).scalars().first()
+        team.position, team.goals_for = 1, 99
+        store.db.commit()
+        affected = store.db.execute(
+            select(Match.id).where(
+                Match.status == MatchStatus.SCHEDULED,
+                or_(Match.home_team_id == team.id, Match.away_team_id == team.id)
+            )
+        ).scalars().all()
+        written = store.refresh(team_ids=[team.id])
+        print(f"one team changed     {written} rows ({len(affected)} fixtures involve it)")
+        if written != len(affected):
+            fail("refresh did not rewrite exactly the changed team's fixtures")
+
+        unlabelled = store.db.scalar(
+            select(Match.id).where(Match.status == MatchStatus.SCHEDULED, Match.prediction_confidence.is_(None))
+        )
+        if unlabelled is not None:
+            fail(f"match {unlabelled} has no prediction_confidence")
+        store.db.close()
+
+        sample = [match_ids[i % len(match_ids)] for i in range(requests)]
+
+        started = time.perf_counter()
+        for match_id in sample:
+            response = client.get(f"/api/v1/predictions/generate/{match_id}")
+            if response.status_code != 200:
+                fail(f"GET generate/{match_id} returned {response.status_code}")
+        stored_seconds = time.perf_counter() - started
+
+        engine = PredictionEngine()
+        started = time.perf_counter()
+        for match_id in sample:
+            jsonable_encoder(engine.generate_prediction(match_id))
+        computed_seconds = time.perf_counter() - started
+        engine.db.close()
+
+    print(f"\n{requests} requests")
+    print(f"served from store    {stored_seconds * 1000 / requests:8.2f} ms/request (HTTP included)")
+    print(f"recomputed           {computed_seconds * 1000 / requests:8.2f} ms/request (engine only)")
+    print("OK: store matches the engine and refreshes only changed fixtures")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=int, default=300)
+    parser.add_argument("--teams", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+    main_check(args.fixtures, args.teams, args.requests)
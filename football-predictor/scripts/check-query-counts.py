@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Check that list endpoints issue a constant number of queries per request.
+
+Seeds a scratch SQLite database, then requests each list endpoint with a
+small and a large page size while counting the statements the request sends
+to the database. Any endpoint whose count grows with the page size (an N+1
+lazy load on a nested team, league, user or match) is reported and the script
+exits non-zero.
+
+Usage:
+    python scripts/check-query-counts.py [--small 5] [--large 100]
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from harness import seed_league, seed_teams, seed_users, use_temp_database
+
+use_temp_database("queries")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+import main  # noqa: E402
+from app.core.database import SessionLocal, async_engine  # noqa: E402
+from app.models import Match, Prediction  # noqa: E402
+from app.models.match import MatchStatus  # noqa: E402
+from app.models.prediction import PredictionType  # noqa: E402
+
+LIST_ENDPOINTS = [
+    "/api/v1/matches/?limit={limit}",
+    "/api/v1/matches/upcoming?limit={limit}",
+    "/api/v1/predictions/?limit={limit}",
+    "/api/v1/predictions/user/1?limit={limit}",
+    "/api/v1/teams/?limit={limit}",
+    "/api/v1/leagues/?limit={limit}",
+    "/api/v1/users/?limit={limit}",
+]
+
+
+def seed(rows: int):
+    """Insert enough leagues, teams, matches and predictions to fill a large page"""
+    db = SessionLocal()
+    leagues = [seed_league(db, f"League {i}", i) for i in range(rows // 20 + 1)]
+    teams = seed_teams(db, leagues, rows)
+    user_ids = seed_users(db, rows)
+
+    now = datetime.utcnow()
+    matches = [
+        Match(
+            external_id=10000 + i,
+            home_team_id=teams[i % rows].id,
+            away_team_id=teams[(i + 1) % rows].id,
+            league_id=leagues[i % len(leagues)].id,
+            match_date=now + timedelta(hours=i + 1),
+            status=MatchStatus.SCHEDULED,
+        )
+        for i in range(rows)
+    ]
+    db.add_all(matches)
+    db.flush()
+
+    db.add_all([
+        Prediction(
+            user_id=user_ids[0],
+            match_id=match.id,
+            prediction_type=PredictionType.WIN_DRAW_WIN,
+            prediction_value="1",
+            confidence=0.5,
+        )
+        for match in matches
+    ])
+    db.commit()
+    db.close()
+
+
+def main_check(small: int, large: int) -> int:
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    failures = []
+
+    with TestClient(main.app) as client:
+        seed(large)
+        event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+        print(f"{'endpoint':<45} {'limit=' + str(small):>10} {'limit=' + str(large):>10}")
+        for template in LIST_ENDPOINTS:
+            counts = []
+            for limit in (small, large):
+                statements.clear()
+                response = client.get(template.format(limit=limit))
+                response.raise_for_status()
+                counts.append(len(statements))
+
+            path = template.split("?")[0]
+            flag = "" if counts[0] == counts[1] else "  <-- grows with page size"
+            print(f"{path:<45} {counts[0]:>10} {counts[1]:>10}{flag}")
+            if flag:
+                failures.append(path)
+
+    if failures:
+        print(f"\nN+1 queries in: {', '.join(failures)}")
+        return 1
+
+    print("\nOK: query count is independent of page size")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--small", type=int, default=5)
+    parser.add_argument("--large", type=int, default=100)
+    args = parser.parse_args()
+    sys.exit(main_check(args.small, args.large))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Fail if a hot API query falls back to a full table scan.
+
+Builds a scratch SQLite database through the Alembic migrations, seeds a
+small fixture set, calls the hot endpoints (and the prediction engine's team
+history query), captures every SELECT they emit and runs EXPLAIN QUERY PLAN on
+it. A plan step of the form ``SCAN <table>`` without an index is reported and
+the script exits non-zero.
+
+Usage:
+    python scripts/check-query-plans.py [--verbose]
+"""
+
+import argparse
+import re
+import sys
+from datetime import datetime, timedelta
+
+from harness import seed_league, seed_teams, seed_users, use_temp_database
+
+use_temp_database("plans")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+import main  # noqa: E402
+from app.core.database import SessionLocal, async_engine, engine  # noqa: E402
+from app.models import Match, Prediction  # noqa: E402
+from app.models.match import MatchStatus  # noqa: E402
+from app.models.prediction import PredictionType  # noqa: E402
+from app.services.prediction_engine import PredictionEngine  # noqa: E402
+
+HOT_ENDPOINTS = [
+    "/api/v1/matches/?league_id=1",
+    "/api/v1/matches/?status=FINISHED",
+    "/api/v1/matches/?team_id=3",
+    "/api/v1/matches/upcoming",
+    "/api/v1/matches/upcoming?league_id=1",
+    "/api/v1/matches/live",
+    "/api/v1/predictions/?user_id=1",
+    "/api/v1/predictions/?match_id=5",
+    "/api/v1/predictions/user/1",
+    "/api/v1/predictions/match/5",
+]
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def seed():
+    """Insert a small league, fixtures and predictions"""
+    db = SessionLocal()
+    league = seed_league(db, country="Nowhere")
+    teams = seed_teams(db, league, 10)
+    user_ids = seed_users(db, 5)
+
+    now = datetime.utcnow()
+    matches = []
+    for i in range(60):
+        finished = i < 40
+        matches.append(Match(
+            external_id=1000 + i,
+            home_team_id=teams[i % 10].id,
+            away_team_id=teams[(i + 3) % 10].id,
+            league_id=league.id,
+            match_date=now + timedelta(days=i - 40),
+            status=MatchStatus.FINISHED if finished else MatchStatus.SCHEDULED,
+            home_score=i % 3 if finished else None,
+            away_score=i % 2 if finished else None,
+        ))
+    db.add_all(matches)
+    db.flush()
+
+    for user_id in user_ids:
+        for match in matches[::3]:
+            db.add(Prediction(
+                user_id=user_id,
+                match_id=match.id,
+                prediction_type=PredictionType.WIN_DRAW_WIN,
+                prediction_value="1",
+                confidence=0.5,
+            ))
+    db.commit()
+    db.close()
+
+
+def capture_selects():
+    """Record every SELECT emitted through the sync and async engines"""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+
+    return captured
+
+
+def explain(statement, parameters):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement"""
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[3] for row in cursor.fetchall()]
+    finally:
+        raw.close()
+
+
+def main_check(verbose: bool) -> int:
+    failures = []
+
+    with TestClient(main.app, raise_server_exceptions=False) as client:
+        seed()
+        captured = capture_selects()
+
+        sources = []
+        for path in HOT_ENDPOINTS:
+            start = len(captured)
+            client.get(path)
+            sources.extend((path, stmt) for stmt in captured[start:])
+
+        start = len(captured)
+        prediction_engine = PredictionEngine()
+        prediction_engine._get_team_stats(3)
+        prediction_engine.db.close()
+        sources.extend(("PredictionEngine._get_team_stats", stmt) for stmt in captured[start:])
+
+    for source, (statement, parameters) in sources:
+        plan = explain(statement, parameters)
+        scans = [step for step in plan if FULL_SCAN.match(step.strip())]
+
+        if verbose or scans:
+            print(f"\n{source}\n  {' '.join(statement.split())[:160]}")
+            for step in plan:
+                print(f"    {step}")
+
+        if scans:
+            failures.append((source, scans))
+
+    print()
+    if failures:
+        for source, scans in failures:
+            print(f"FULL SCAN  {source}: {', '.join(scans)}")
+        return 1
+
+    print(f"OK: {len(sources)} queries from {len(HOT_ENDPOINTS) + 1} hot paths use indexes")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not only failures")
+    args = parser.parse_args()
+    sys.exit(main_check(args.verbose))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Check incremental Elo updates against the vectorized replay.
+
+Seeds teams and a season of finished matches, then:
+
+  * feeds the results to RatingService.apply_results in kick-off-ordered
+    chunks, the way syncs deliver them, timing each chunk,
+  * applies the last chunk again and checks nothing moves,
+  * rebuilds everything with RatingService.replay and checks ratings and
+    history match the incremental run exactly,
+  * compares the replay against a plain per-match Python loop.
+
+Usage:
+    python scripts/check-ratings.py [--teams 200] [--rounds 76] [--chunk 100]
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import time
+from datetime import datetime
+
+from harness import fail, round_robin, seed_league, seed_teams, use_temp_database
+
+use_temp_database("ratings")
+
+from sqlalchemy import select  # noqa: E402
+
+from app.core.database import SessionLocal, init_db  # noqa: E402
+from app.models import Match, TeamRating, TeamRatingHistory  # noqa: E402
+from app.services.rating_service import RatingService  # noqa: E402
+
+
+def seed(teams_count: int, rounds: int):
+    """Round-robin style season: every round pairs all teams once"""
+    rng = random.Random(3)
+    db = SessionLocal()
+
+    league = seed_league(db, "Rating League")
+    teams = seed_teams(db, league, teams_count)
+    matches = round_robin(teams, rounds, datetime(2024, 8, 1, 15, 0), rng, max_scores=(5, 4))
+    db.add_all(matches)
+    db.commit()
+    ids = [match.id for match in matches]
+    db.close()
+    return ids
+
+
+def snapshot(db):
+    ratings = {r.team_id: (r.rating, r.matches_rated) for r in db.execute(select(TeamRating)).scalars()}
+    history = {
+        (h.match_id, h.team_id): (h.rating_before, h.rating_after)
+        for h in db.execute(select(TeamRatingHistory)).scalars()
+    }
+    return ratings, history
+
+
+def close(a, b) -> bool:
+    return math.isclose(a, b, rel_tol=0, abs_tol=1e-6)
+
+
+def main_check(teams_count: int, rounds: int, chunk: int):
+    asyncio.run(init_db())
+    match_ids = seed(teams_count, rounds)
+    print(f"{len(match_ids)} finished matches, {teams_count} teams\n")
+
+    rating_service = RatingService()
+    chunks = [match_ids[i:i + chunk] for i in range(0, len(match_ids), chunk)]
+    started = time.perf_counter()
+    for ids in chunks:
+        rating_service.apply_results(ids)
+    incremental_seconds = time.perf_counter() - started
+    print(f"incremental   {incremental_seconds:8.2f}s  {incremental_seconds * 1000 / len(chunks):7.2f} ms per {chunk}-result sync")
+
+    before = snapshot(rating_service.db)
+    if rating_service.apply_results(chunks[-1]):
+        fail("re-applying rated matches moved ratings")
+    if snapshot(rating_service.db) != before:
+        fail("re-applying rated matches changed the tables")
+
+    started = time.perf_counter()
+    rating_service.replay()
+    replay_seconds = time.perf_counter() - started
+    print(f"replay        {replay_seconds:8.2f}s")
+    replayed = snapshot(rating_service.db)
+
+    incremental_ratings, incremental_history = before
+    replay_ratings, replay_history = replayed
+    if incremental_ratings.keys() != replay_ratings.keys() or incremental_history.keys() != replay_history.keys():
+        fail("replay rated a different set of teams or matches")
+    for team_id, (rating, rated) in incremental_ratings.items():
+        if not close(rating, replay_ratings[team_id][0]) or rated != replay_ratings[team_id][1]:
+            fail(f"team {team_id}: incremental {rating:.6f} vs replay {replay_ratings[team_id][0]:.6f}")
+    for key, (rating_before, rating_after) in incremental_history.items():
+        if not (close(rating_before, replay_history[key][0]) and close(rating_after, replay_history[key][1])):
+            fail(f"history {key} differs between incremental and replay")
+
+    # Reference: the textbook sequential loop over the same rows
+    rows = rating_service.db.execute(
+        select(Match.home_team_id, Match.away_team_id, Match.home_score, Match.away_score)
+        .order_by(Match.match_date, Match.id)
+    ).all()
+    started = time.perf_counter()
+    reference = {}
+    for home, away, home_score, away_score in rows:
+        home_rating = reference.get(home, RatingService.INITIAL_RATING)
+        away_rating = reference.get(away, RatingService.INITIAL_RATING)
+        change = float(RatingService.rating_change(home_rating, away_rating, home_score, away_score))
+        reference[home], reference[away] = home_rating + change, away_rating - change
+    loop_seconds = time.perf_counter() - started
+    print(f"python loop   {loop_seconds:8.2f}s  (ratings math only, no database writes)")
+    rating_service.db.close()
+
+    for team_id, rating in reference.items():
+        if not close(rating, replay_ratings[team_id][0]):
+            fail(f"team {team_id}: replay differs from the sequential loop")
+
+    print("\nOK: incremental updates, replay and the sequential loop agree")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=76)
+    parser.add_argument("--chunk", type=int, default=100)
+    args = parser.parse_args()
+    main_check(args.teams, args.rounds, args.chunk)
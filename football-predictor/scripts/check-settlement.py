@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Check that pending predictions are settled as matches are decided.
+
+Seeds a league whose users predict every fixture with every prediction type
+(including values that cannot be graded), then lets DataSyncService sync a
+round in which fixtures finish, are postponed or canceled, and one finishes
+without a score. Every prediction must end up as a scalar reference grader
+says: WON, LOST or VOID for decided matches and still PENDING otherwise. It
+then checks that settling again changes nothing, that a late score is settled
+by update_match_results, that settlement reads predictions only through the
+match_id index, and reports how settling one round scales with the size of
+the predictions table.
+
+Usage:
+    python scripts/check-settlement.py [--users 200] [--fixtures 380]
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import time
+from datetime import datetime, timedelta
+
+from harness import fail, seed_league, seed_predictions, seed_teams, seed_users, use_temp_database
+
+use_temp_database("settlement")
+
+from sqlalchemy import event, insert, select, text, update  # noqa: E402
+
+from app.core.database import SessionLocal, async_engine, engine, init_db  # noqa: E402
+from app.models import Match, Prediction  # noqa: E402
+from app.models.prediction import PredictionResult, PredictionType  # noqa: E402
+from app.services.data_sync_service import DataSyncService  # noqa: E402
+from app.services.settlement_service import SettlementService  # noqa: E402
+
+TEAMS = 20
+VALUES = {
+    PredictionType.WIN_DRAW_WIN: ["1", "X", "2", "x", "3"],
+    PredictionType.DOUBLE_CHANCE: ["1X", "12", "X2", "x2", "11"],
+    PredictionType.BOTH_TEAMS_SCORE: ["Yes", "No", "yes", "Maybe"],
+    PredictionType.OVER_UNDER: ["Over 0.5", "Over 1.5", "Over 2.5", "Under 2.5", "Under 3.5", "Over 2", "Under 3", "Over"],
+    PredictionType.CORRECT_SCORE: ["0-0", "1-0", "2-1", "1-1", "0-2", "3:1", "1-"],
+}
+
+
+def expected(prediction_type: PredictionType, value: str, status: str, home, away) -> PredictionResult:
+    """Reference grade of one prediction, one branch per type"""
+    if status in ("POSTPONED", "CANCELED"):
+        return PredictionResult.VOID
+    if status != "FINISHED" or home is None or away is None:
+        return PredictionResult.PENDING
+
+    value = value.strip().upper()
+    outcome = "1" if home > away else "X" if home == away else "2"
+    if prediction_type == PredictionType.WIN_DRAW_WIN:
+        if value not in ("1", "X", "2"):
+            return PredictionResult.VOID
+        won = value == outcome
+    elif prediction_type == PredictionType.DOUBLE_CHANCE:
+        if value not in ("1X", "12", "X2"):
+            return PredictionResult.VOID
+        won = outcome in value
+    elif prediction_type == PredictionType.BOTH_TEAMS_SCORE:
+        if value not in ("YES", "NO"):
+            return PredictionResult.VOID
+        won = (value == "YES") == (home > 0 and away > 0)
+    elif prediction_type == PredictionType.OVER_UNDER:
+        parsed = re.fullmatch(r"(OVER|UNDER) (\d+(?:\.\d+)?)", value)
+        if parsed is None or home + away == float(parsed.group(2)):
+            return PredictionResult.VOID
+        won = (home + away > float(parsed.group(2))) == (parsed.group(1) == "OVER")
+    else:
+        parsed = re.fullmatch(r"(\d+)[-:](\d+)", value)
+        if parsed is None:
+            return PredictionResult.VOID
+        won = (int(parsed.group(1)), int(parsed.group(2))) == (home, away)
+    return PredictionResult.WON if won else PredictionResult.LOST
+
+
+class Selects:
+    """SELECT statements that read the predictions table"""
+
+    def __init__(self):
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self.capture)
+
+    def capture(self, conn, cursor, statement, parameters, *_):
+        if statement.lstrip().upper().startswith("SELECT") and "predictions" in statement:
+            self.statements.append((statement, parameters))
+
+
+class StubProvider:
+    """Returns fixed fixtures for any get_matches call"""
+
+    def __init__(self, matches):
+        self.matches = matches
+
+    async def get_matches(self, competition_id, **_):
+        return self.matches
+
+
+def seed(users: int, fixtures: int, rng: random.Random):
+    """League, teams and users in the database; fixture payloads as FootballDataService returns them"""
+    with SessionLocal() as db:
+        league = seed_league(db, country="Nowhere")
+        seed_teams(db, league, TEAMS, external_id=1000, name="Club {i}")
+        seed_users(db, users)
+        db.commit()
+        league_id = league.id
+
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    payloads = []
+    for f in range(fixtures):
+        home, away = rng.sample(range(TEAMS), 2)
+        payloads.append({
+            "external_id": 100000 + f, "home_team_external_id": 1000 + home, "away_team_external_id": 1000 + away,
+            "home_team_name": f"Club {home}", "away_team_name": f"Club {away}",
+            "match_date": (start + timedelta(hours=f * 7)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "status": "SCHEDULED", "matchday": f // 10 + 1, "stage": "REGULAR_SEASON", "group": None,
+            "home_score": None, "away_score": None, "venue": None, "referee": None
+        })
+    return league_id, payloads
+
+
+def predict(users: int, rng: random.Random, match_ids):
+    """Every user predicts each fixture with a random type and value"""
+    with SessionLocal() as db:
+        count = seed_predictions(
+            db, ((user_id, match_id) for user_id in range(1, users + 1) for match_id in match_ids), VALUES, rng
+        )
+        db.commit()
+    return count
+
+
+def verify(payloads):
+    """Compare every prediction of the given fixtures with the reference grader; return results counted"""
+    by_external_id = {payload["external_id"]: payload for payload in payloads}
+    counts = {result: 0 for result in PredictionResult}
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(Prediction, Match.external_id).join(Match, Match.id == Prediction.match_id)
+            .where(Match.external_id.in_(by_external_id))
+        ).all()
+        for prediction, external_id in rows:
+            payload = by_external_id[external_id]
+            want = expected(
+                prediction.prediction_type, prediction.prediction_value, payload["status"],
+                payload["home_score"], payload["away_score"]
+            )
+            if prediction.result != want:
+                fail(f"{prediction.prediction_type.value} '{prediction.prediction_value}' on {payload['status']} "
+                     f"{payload['home_score']}-{payload['away_score']}: {prediction.result.value}, expected {want.value}")
+            correct = {PredictionResult.WON: "true", PredictionResult.LOST: "false"}.get(want)
+            if prediction.is_correct != correct:
+                fail(f"prediction {prediction.id} is_correct {prediction.is_correct}, expected {correct}")
+            counts[want] += 1
+    return counts
+
+
+def decide(payloads, rng: random.Random):
+    """A round: most fixtures finish, one is postponed, one canceled, one finishes with no score yet"""
+    for payload in payloads:
+        payload.update(status="FINISHED", home_score=rng.randint(0, 4), away_score=rng.randint(0, 3))
+    payloads[0].update(status="POSTPONED", home_score=None, away_score=None)
+    payloads[1].update(status="CANCELED", home_score=None, away_score=None)
+    payloads[2].update(home_score=None, away_score=None)
+
+
+def check_plans(statements):
+    """Settlement must reach predictions through an index, never by scanning the table"""
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            for step in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+                detail = step[-1]
+                if re.match(r"^SCAN predictions\b", detail):
+                    fail(f"settlement scans the predictions table: {detail}\n{statement}")
+
+
+async def main_check(users: int, fixtures: int):
+    rng = random.Random(7)
+    league_id, payloads = seed(users, fixtures, rng)
+
+    service = DataSyncService()
+    await service.sync_matches({league_id: payloads})
+    service.db.close()
+    with SessionLocal() as db:
+        match_ids = dict(db.execute(select(Match.external_id, Match.id)).all())
+    predictions = predict(users, rng, match_ids.values())
+    print(f"{users} users, {fixtures} fixtures, {predictions} pending predictions\n")
+
+    # A round of ten fixtures is decided
+    round_payloads = payloads[:10]
+    decide(round_payloads, rng)
+    selects = Selects()
+    service = DataSyncService()
+    started = time.perf_counter()
+    await service.sync_matches({league_id: payloads})
+    seconds = time.perf_counter() - started
+    service.db.close()
+
+    counts = verify(payloads)
+    settled = counts[PredictionResult.WON] + counts[PredictionResult.LOST] + counts[PredictionResult.VOID]
+    if service.predictions_settled != settled:
+        fail(f"sync reported {service.predictions_settled} predictions settled, {settled} were")
+    print(f"round synced in {seconds:.3f}s: " + ", ".join(f"{n} {result.value}" for result, n in counts.items()))
+    check_plans(selects.statements)
+
+    # Settling again, by match or by a full sweep, changes nothing
+    with SessionLocal() as db:
+        again = SettlementService(db).settle(match_ids.values())
+        sweep = SettlementService(db).settle_pending()
+    if any(again.values()) or any(sweep.values()):
+        fail(f"settling again changed predictions: {again}, {sweep}")
+    if verify(payloads) != counts:
+        fail("settling again changed results")
+    print("settling again: nothing changed")
+
+    # The fixture that finished without a score gets one
+    late = round_payloads[2]
+    late.update(home_score=2, away_score=2)
+    service = DataSyncService(football_data_service=StubProvider([late]))
+    updated = await service.update_match_results()
+    service.db.close()
+    if updated != 1:
+        fail(f"late result not stored: {updated} matches updated")
+    late_counts = verify(payloads)
+    if late_counts[PredictionResult.PENDING] != counts[PredictionResult.PENDING] - users:
+        fail("predictions of the late result were not settled")
+    print(f"late result: {users} predictions settled by update_match_results")
+
+    # Settlement cost follows the matches settled, not the predictions table
+    with SessionLocal() as db:
+        other = [payload for payload in payloads[10:20]]
+        db.execute(update(Match).where(Match.external_id.in_([p["external_id"] for p in other])).values(
+            status="FINISHED", home_score=1, away_score=0
+        ))
+        db.commit()
+        started = time.perf_counter()
+        SettlementService(db).settle([match_ids[p["external_id"]] for p in other])
+        small = time.perf_counter() - started
+
+    extra_ids = list(range(max(match_ids.values()) + 1, max(match_ids.values()) + 1 + 4 * fixtures))
+    with SessionLocal() as db:
+        db.execute(insert(Match), [
+            {"id": match_id, "home_team_id": 1, "away_team_id": 2, "league_id": league_id,
+             "match_date": datetime(2030, 1, 1), "status": "SCHEDULED"}
+            for match_id in extra_ids
+        ])
+        db.commit()
+    grown = predictions + predict(users, rng, extra_ids)
+    with SessionLocal() as db:
+        other = payloads[20:30]
+        db.execute(update(Match).where(Match.external_id.in_([p["external_id"] for p in other])).values(
+            status="FINISHED", home_score=1, away_score=0
+        ))
+        db.commit()
+        started = time.perf_counter()
+        SettlementService(db).settle([match_ids[p["external_id"]] for p in other])
+        large = time.perf_counter() - started
+        pending = db.scalar(text("SELECT count(*) FROM predictions WHERE result = 'PENDING'"))
+
+    print(f"\nsettling 10 matches ({10 * users} predictions): {small * 1000:.1f} ms with {predictions} predictions "
+          f"stored, {large * 1000:.1f} ms with {grown} ({pending} still pending)")
+    if large > max(small * 3, small + 0.05):
+        fail("settlement time grew with the predictions table")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--fixtures", type=int, default=380)
+    args = parser.parse_args()
+
+    asyncio.run(init_db())
+    asyncio.run(main_check(args.users, args.fixtures))
+    print("\nOK: decided matches settle every pending prediction once, through the match_id index")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Check incremental team form windows against a rebuild and a brute-force scan.
+
+Seeds teams and a season of finished matches, then:
+
+  * feeds the results to TeamFeatureService.apply_results in shuffled
+    chunks (late results included), timing each chunk,
+  * applies a chunk again and checks nothing changes,
+  * rebuilds every window with TeamFeatureService.rebuild and checks the
+    windows and Team columns match the incremental run,
+  * recomputes the windows of a sample of teams straight from their
+    matches and checks the store agrees.
+
+Usage:
+    python scripts/check-team-features.py [--teams 100] [--rounds 40] [--chunk 100]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime
+
+from harness import fail, round_robin, seed_league, seed_teams, use_temp_database
+
+use_temp_database("form")
+
+from sqlalchemy import or_, select  # noqa: E402
+
+from app.core.database import SessionLocal, init_db  # noqa: E402
+from app.models import Match, Team, TeamForm  # noqa: E402
+from app.models.match import MatchStatus  # noqa: E402
+from app.services.team_feature_service import WINDOW_SIZES, TeamFeatureService, summarise  # noqa: E402
+
+TEAM_COLUMNS = (
+    "overall_form", "home_form", "away_form", "avg_goals_scored",
+    "avg_goals_conceded", "clean_sheets", "failed_to_score",
+)
+WINDOW_COLUMNS = (
+    "played", "wins", "draws", "losses", "goals_for", "goals_against",
+    "clean_sheets", "failed_to_score", "form", "results",
+)
+
+
+def seed(teams_count: int, rounds: int):
+    """Every round pairs all teams once"""
+    rng = random.Random(9)
+    db = SessionLocal()
+
+    league = seed_league(db, "Form League")
+    teams = seed_teams(db, league, teams_count)
+    matches = round_robin(teams, rounds, datetime(2024, 8, 1, 15, 0), rng)
+    db.add_all(matches)
+    db.commit()
+    ids = [match.id for match in matches]
+    db.close()
+    return ids
+
+
+def snapshot(db):
+    windows = {
+        (w.team_id, w.venue, w.size): tuple(getattr(w, column) for column in WINDOW_COLUMNS)
+        for w in db.execute(select(TeamForm)).scalars()
+    }
+    teams = {
+        team.id: tuple(getattr(team, column) for column in TEAM_COLUMNS)
+        for team in db.execute(select(Team).execution_options(populate_existing=True)).scalars()
+    }
+    return windows, teams
+
+
+def scanned_windows(db, team_id: int):
+    """Windows of one team computed directly from its finished matches"""
+    matches = db.execute(
+        select(Match).where(
+            or_(Match.home_team_id == team_id, Match.away_team_id == team_id),
+            Match.status == MatchStatus.FINISHED
+        ).order_by(Match.match_date.desc(), Match.id.desc())
+    ).scalars().all()
+
+    by_venue = {"overall": [], "home": [], "away": []}
+    for match in matches:
+        at_home = match.home_team_id == team_id
+        entry = [
+            match.id, match.match_date.isoformat(),
+            match.home_score if at_home else match.away_score,
+            match.away_score if at_home else match.home_score,
+        ]
+        by_venue["overall"].append(entry)
+        by_venue["home" if at_home else "away"].append(entry)
+
+    return {
+        (venue, size): summarise(results[:size])
+        for venue, results in by_venue.items()
+        for size in WINDOW_SIZES
+    }
+
+
+def main_check(teams_count: int, rounds: int, chunk: int):
+    asyncio.run(init_db())
+    match_ids = seed(teams_count, rounds)
+    print(f"{len(match_ids)} finished matches, {teams_count} teams\n")
+
+    # Deliver results out of order, the way late corrections and backfills arrive
+    delivered = match_ids[:]
+    random.Random(1).shuffle(delivered)
+    chunks = [delivered[i:i + chunk] for i in range(0, len(delivered), chunk)]
+
+    service = TeamFeatureService()
+    started = time.perf_counter()
+    for ids in chunks:
+        service.apply_results(ids)
+    incremental_seconds = time.perf_counter() - started
+    print(f"incremental   {incremental_seconds:8.2f}s  {incremental_seconds * 1000 / len(chunks):7.2f} ms per {chunk}-result sync")
+
+    incremental = snapshot(service.db)
+    if service.apply_results(chunks[0]):
+        fail("re-applying results changed team form")
+
+    started = time.perf_counter()
+    service.rebuild()
+    rebuild_seconds = time.perf_counter() - started
+    print(f"rebuild       {rebuild_seconds:8.2f}s")
+
+    rebuilt = snapshot(service.db)
+    if incremental[0] != rebuilt[0]:
+        differing = [key for key in rebuilt[0] if incremental[0].get(key) != rebuilt[0][key]]
+        fail(f"{len(differing)} windows differ between incremental and rebuild, e.g. {differing[:3]}")
+    if incremental[1] != rebuilt[1]:
+        fail("Team columns differ between incremental and rebuild")
+
+    for team_id in random.Random(2).sample(sorted(rebuilt[1]), min(20, teams_count)):
+        for (venue, size), expected in scanned_windows(service.db, team_id).items():
+            window = rebuilt[0][(team_id, venue, size)]
+            if dict(zip(WINDOW_COLUMNS, window[:-1])) != expected:
+                fail(f"team {team_id} {venue}/{size} differs from a scan of its matches")
+    service.db.close()
+
+    print("\nOK: incremental windows, rebuild and match scans agree")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=40)
+    parser.add_argument("--chunk", type=int, default=100)
+    args = parser.parse_args()
+    main_check(args.teams, args.rounds, args.chunk)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Check that user statistics follow settlement incrementally.
+
+Seeds users who predict every fixture of a season, then settles it round by
+round. After every round the incrementally maintained user_stats rows must
+equal a from-scratch reference computed from each user's settled
+predictions: totals, accuracy, signed current streak, longest streaks, the
+recent-results window, points and monthly columns. UserStatsService.rebuild
+must reproduce them exactly, even after settled predictions are written to
+again. Also checks the lazy and the scheduled monthly
+rollover and that GET /users/{id}/stats is a single query once the
+leaderboard is loaded.
+
+Usage:
+    python scripts/check-user-stats.py [--users 100] [--rounds 30]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+from harness import (
+    fail, seed_fixtures, seed_league, seed_predictions, seed_teams, seed_users, use_temp_database
+)
+
+use_temp_database("user_stats")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, select, update  # noqa: E402
+
+import main  # noqa: E402
+from app.core.database import SessionLocal, async_engine, init_db  # noqa: E402
+from app.models import Match, Prediction, UserStats  # noqa: E402
+from app.models.prediction import PredictionResult, PredictionType  # noqa: E402
+from app.models.user_stats import RECENT_WINDOW  # noqa: E402
+from app.services.settlement_service import SettlementService  # noqa: E402
+from app.services.user_stats_service import POINTS, UserStatsService, month_of  # noqa: E402
+
+TEAMS = 20
+PER_ROUND = 10
+VALUES = {
+    PredictionType.WIN_DRAW_WIN: ["1", "X", "2"],
+    PredictionType.DOUBLE_CHANCE: ["1X", "12", "X2"],
+    PredictionType.BOTH_TEAMS_SCORE: ["Yes", "No"],
+    PredictionType.OVER_UNDER: ["Over 1.5", "Over 2.5", "Under 2.5", "Over 2"],
+    PredictionType.CORRECT_SCORE: ["1-0", "1-1", "2-1", "0-0"],
+}
+COLUMNS = (
+    "total_predictions", "correct_predictions", "incorrect_predictions", "void_predictions", "overall_accuracy",
+    "win_rate", "current_streak", "longest_winning_streak", "longest_losing_streak", "recent_accuracy",
+    "monthly_predictions", "monthly_correct", "monthly_accuracy", "total_points", "monthly_points"
+)
+
+
+def reference(results):
+    """Stats of one user from their settled (type, result) predictions in settlement order"""
+    won = [r == PredictionResult.WON for _, r in results]
+    lost = [r == PredictionResult.LOST for _, r in results]
+    decided = [r == PredictionResult.WON for _, r in results if r != PredictionResult.VOID]
+    total, correct, incorrect = len(results), sum(won), sum(lost)
+
+    streak, longest_won, longest_lost = 0, 0, 0
+    for outcome in decided:
+        streak = (streak + 1 if streak > 0 else 1) if outcome else (streak - 1 if streak < 0 else -1)
+        longest_won, longest_lost = max(longest_won, streak), max(longest_lost, -streak)
+
+    recent = decided[-RECENT_WINDOW:]
+    points = sum(POINTS[t] for t, r in results if r == PredictionResult.WON)
+    return {
+        "total_predictions": total, "correct_predictions": correct, "incorrect_predictions": incorrect,
+        "void_predictions": total - correct - incorrect,
+        "overall_accuracy": correct / total * 100 if total else 0.0,
+        "win_rate": correct / (correct + incorrect) * 100 if correct + incorrect else 0.0,
+        "current_streak": streak, "longest_winning_streak": longest_won, "longest_losing_streak": longest_lost,
+        "recent_accuracy": sum(recent) / len(recent) * 100 if recent else 0.0,
+        "monthly_predictions": total, "monthly_correct": correct,
+        "monthly_accuracy": correct / total * 100 if total else 0.0,
+        "total_points": points, "monthly_points": points
+    }
+
+
+def snapshot():
+    with SessionLocal() as db:
+        return {row.user_id: {column: getattr(row, column) for column in COLUMNS} for row in db.scalars(select(UserStats))}
+
+
+def compare(name: str, got, want):
+    if set(got) != set(want):
+        fail(f"{name}: stats rows for {len(got)} users, expected {len(want)}")
+    for user_id, expected in want.items():
+        for column, value in expected.items():
+            if abs(got[user_id][column] - value) > 1e-9:
+                fail(f"{name}: user {user_id} {column} = {got[user_id][column]}, expected {value}")
+
+
+def expected_stats():
+    """Reference stats of every user with a settled prediction"""
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(Prediction.user_id, Prediction.prediction_type, Prediction.result)
+            .join(Match, Match.id == Prediction.match_id)
+            .where(Prediction.result != PredictionResult.PENDING)
+            .order_by(Match.match_date, Prediction.id)
+        ).all()
+    per_user = {}
+    for user_id, prediction_type, result in rows:
+        per_user.setdefault(user_id, []).append((prediction_type, result))
+    return {user_id: reference(results) for user_id, results in per_user.items()}
+
+
+def seed(users: int, fixtures: int, rng: random.Random):
+    """League, users, a season of fixtures and one prediction per user per fixture
+
+    The fixtures kick off between the start of this month and now, as
+    matches settled this month would.
+    """
+    with SessionLocal() as db:
+        league = seed_league(db, country="Nowhere")
+        teams = seed_teams(db, league, TEAMS, external_id=1000, name="Club {i}")
+        user_ids = seed_users(db, users)
+
+        now = datetime.utcnow()
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        interval = max((now - month_start) / (fixtures + 1), timedelta(microseconds=1))
+        match_ids = seed_fixtures(db, teams, fixtures, month_start + interval, interval)
+
+        predictions = seed_predictions(
+            db, ((user_id, match_id) for user_id in user_ids for match_id in match_ids), VALUES, rng
+        )
+        db.commit()
+    return match_ids, predictions
+
+
+def play(match_ids, rng: random.Random) -> float:
+    """Decide a round of fixtures and settle it; return seconds spent settling"""
+    with SessionLocal() as db:
+        for match_id in match_ids:
+            status = "POSTPONED" if rng.random() < 0.05 else "FINISHED"
+            scores = (rng.randint(0, 4), rng.randint(0, 3)) if status == "FINISHED" else (None, None)
+            db.execute(update(Match).where(Match.id == match_id).values(
+                status=status, home_score=scores[0], away_score=scores[1]
+            ))
+        db.commit()
+        started = time.perf_counter()
+        SettlementService(db).settle(match_ids)
+        return time.perf_counter() - started
+
+
+def check_endpoint(user_id: int, want):
+    """GET /users/{id}/stats reads one row"""
+    statements = []
+
+    def count_statement(conn, cursor, statement, *_):
+        statements.append(statement)
+
+    with TestClient(main.app) as client:
+        # The first request loads the leaderboard the ranks come from
+        client.get(f"/api/v1/users/{user_id}/stats")
+        event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+        body = client.get(f"/api/v1/users/{user_id}/stats").json()
+        missing = client.get("/api/v1/users/999999/stats")
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    queries = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    if len(queries) != 2:
+        fail(f"stats of a user and of a missing user took {len(queries)} queries, expected one each")
+    if missing.status_code != 404:
+        fail(f"stats of a missing user answered {missing.status_code}")
+    for column, key in (("total_points", "total_points"), ("current_streak", "current_streak"),
+                        ("overall_accuracy", "accuracy"), ("monthly_points", "monthly_points")):
+        if abs(body[key] - want[column]) > 1e-9:
+            fail(f"endpoint {key} = {body[key]}, expected {want[column]}")
+    print(f"GET /users/{user_id}/stats: one query, {body['total_points']} points, streak {body['current_streak']}")
+
+
+async def main_check(users: int, rounds: int):
+    rng = random.Random(11)
+    match_ids, predictions = seed(users, rounds * PER_ROUND, rng)
+    print(f"{users} users, {len(match_ids)} fixtures, {predictions} predictions\n")
+
+    settling = 0.0
+    for r in range(rounds):
+        settling += play(match_ids[r * PER_ROUND:(r + 1) * PER_ROUND], rng)
+        if r % 10 == 9 or r == rounds - 1:
+            compare(f"after round {r + 1}", snapshot(), expected_stats())
+    settled = predictions
+    print(f"{rounds} rounds: stats match the reference after each, "
+          f"{settling / settled * 1e6:.1f} us per settled prediction including stats")
+
+    # Settling again counts nothing twice
+    with SessionLocal() as db:
+        SettlementService(db).settle(match_ids)
+    incremental = snapshot()
+    compare("after settling again", incremental, expected_stats())
+
+    # A later write to settled predictions must not change the order a rebuild replays them in
+    with SessionLocal() as db:
+        db.execute(update(Prediction).where(Prediction.match_id.in_(match_ids[:PER_ROUND])).values(
+            updated_at=datetime.utcnow() + timedelta(days=1)
+        ))
+        db.commit()
+        rebuilt_users = UserStatsService(db).rebuild()
+    compare("after rebuild", snapshot(), incremental)
+    print(f"rebuild: {rebuilt_users} users, identical to the incremental rows")
+
+    user_id = next(iter(incremental))
+    check_endpoint(user_id, incremental[user_id])
+
+    # Next month: the scheduled rollover resets monthly columns only
+    next_month = datetime.utcnow().replace(day=28) + timedelta(days=7)
+    with SessionLocal() as db:
+        reset = UserStatsService(db).rollover(now=next_month)
+        again = UserStatsService(db).rollover(now=next_month)
+    after = snapshot()
+    if reset != len(incremental) or again:
+        fail(f"rollover reset {reset} rows, then {again}")
+    for user_id, stats in after.items():
+        if stats["monthly_predictions"] or stats["monthly_points"]:
+            fail(f"user {user_id} still has monthly counts after the rollover")
+        if stats["total_points"] != incremental[user_id]["total_points"]:
+            fail(f"rollover changed user {user_id}'s all-time points")
+
+    # A user whose month is stale starts over on their first result of the new one
+    with SessionLocal() as db:
+        db.execute(update(UserStats).values(stats_month="2000-01", monthly_predictions=5, monthly_points=50))
+        db.commit()
+        UserStatsService(db).apply([(user_id, PredictionType.CORRECT_SCORE, PredictionResult.WON)])
+        db.commit()
+        row = db.scalar(select(UserStats).where(UserStats.user_id == user_id))
+        if (row.stats_month, row.monthly_predictions, row.monthly_points) != (month_of(datetime.utcnow()), 1, 30):
+            fail(f"stale month not reset: {row.stats_month} {row.monthly_predictions} {row.monthly_points}")
+    print(f"rollover: {reset} users reset once, all-time columns kept; a stale month resets on the next result")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=30)
+    args = parser.parse_args()
+
+    asyncio.run(init_db())
+    asyncio.run(main_check(args.users, args.rounds))
+    print("\nOK: user stats follow settlement in O(1) per prediction and match a full rebuild")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Compare the registered prediction models on a synthetic slate.
+
+Seeds teams with season stats, a finished-match history and upcoming
+fixtures, replays Elo ratings and rebuilds form windows over the history,
+then runs PredictionEngine.generate_batch once per registered model.
+Reports wall time, how often each model picks the same outcome as the
+heuristic per market and the mean confidences. Also checks that the Poisson
+markets are coherent:
+
+  * 1X2 probabilities sum to 1,
+  * double chance equals the matching 1X2 sums,
+  * over probabilities fall as the line rises,
+  * top correct scores are sorted.
+
+Usage:
+    python scripts/compare-prediction-models.py [--fixtures 2000] [--teams 200]
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import sys
+import time
+from datetime import datetime
+
+from harness import history_and_slate, seed_league, seed_teams, use_temp_database
+
+use_temp_database("models")
+
+from app.core.database import SessionLocal, init_db  # noqa: E402
+from app.services.prediction_engine import PredictionEngine  # noqa: E402
+from app.services.rating_service import RatingService  # noqa: E402
+from app.services.team_feature_service import TeamFeatureService  # noqa: E402
+
+
+def seed(fixtures: int, teams_count: int):
+    """Teams with standings, ten finished matches per team and the upcoming slate"""
+    rng = random.Random(5)
+    db = SessionLocal()
+
+    league = seed_league(db, "Model League")
+
+    def standings(i):
+        played = rng.randint(0, 38)
+        goals_for = int(played * rng.uniform(0.6, 2.4))
+        goals_against = int(played * rng.uniform(0.6, 2.4))
+        return {"position": i % 20 + 1, "matches_played": played, "goals_for": goals_for,
+                "goals_against": goals_against, "avg_goals_scored": round(goals_for / played, 2) if played else 0}
+
+    teams = seed_teams(db, league, teams_count, fields=standings)
+    past, upcoming = history_and_slate(teams, teams_count * 5, fixtures, rng)
+    db.add_all(past + upcoming)
+    db.commit()
+    db.close()
+
+
+def check_poisson(entry) -> str:
+    """Return a description of the first incoherent market, or an empty string"""
+    markets = {market["type"]: market for market in entry["predictions"]}
+    result = markets["WIN_DRAW_WIN"]["probabilities"]
+    if not math.isclose(sum(result.values()), 1, abs_tol=0.002):
+        return "1X2 probabilities do not sum to 1"
+
+    double = markets["DOUBLE_CHANCE"]["probabilities"]
+    if not math.isclose(double["1X"], result["home_win"] + result["draw"], abs_tol=0.002):
+        return "double chance 1X differs from home + draw"
+
+    overs = [line["over"] for line in markets["OVER_UNDER"]["lines"].values()]
+    if any(a < b for a, b in zip(overs, overs[1:])):
+        return "over probabilities rise with the line"
+
+    top = [score["probability"] for score in markets["CORRECT_SCORE"]["top_scores"]]
+    if top != sorted(top, reverse=True):
+        return "top correct scores are not sorted"
+    return ""
+
+
+def main_compare(fixtures: int, teams_count: int):
+    asyncio.run(init_db())
+    seed(fixtures, teams_count)
+    rating_service = RatingService()
+    rating_service.replay()
+    TeamFeatureService(rating_service.db).rebuild()
+    rating_service.db.close()
+    date_from = datetime.utcnow()
+
+    runs = {}
+    print(f"{fixtures} fixtures, {teams_count} teams\n")
+    print(f"{'model':<12} {'version':<14} {'seconds':>8} {'fixtures/s':>11}")
+    for model in PredictionEngine.MODEL_VERSIONS:
+        engine = PredictionEngine()
+        started = time.perf_counter()
+        runs[model] = engine.generate_batch(date_from=date_from, model=model)
+        seconds = time.perf_counter() - started
+        engine.db.close()
+        print(f"{model:<12} {PredictionEngine.model_version(model):<14} {seconds:>8.2f} {fixtures / seconds:>11,.0f}")
+
+    for model in ("poisson", "poisson_elo"):
+        for entry in runs[model]:
+            problem = check_poisson(entry)
+            if problem:
+                print(f"FAIL: {model} match {entry['match_id']}: {problem}")
+                sys.exit(1)
+
+    heuristic = runs["heuristic"]
+    print(f"\n{'model':<12} {'market':<18} {'agreement':>9} {'heuristic conf':>15} {'model conf':>11}")
+    for model, entries in runs.items():
+        if model == "heuristic":
+            continue
+        for market in ("WIN_DRAW_WIN", "OVER_UNDER", "BOTH_TEAMS_SCORE", "CORRECT_SCORE"):
+            picks = []
+            for h_entry, m_entry in zip(heuristic, entries):
+                h = next(m for m in h_entry["predictions"] if m["type"] == market)
+                p = next(m for m in m_entry["predictions"] if m["type"] == market)
+                picks.append((h["prediction"] == p["prediction"], h["confidence"], p["confidence"]))
+            agreement = sum(same for same, _, _ in picks) / len(picks)
+            h_conf = sum(conf for _, conf, _ in picks) / len(picks)
+            m_conf = sum(conf for _, _, conf in picks) / len(picks)
+            print(f"{model:<12} {market:<18} {agreement:>9.1%} {h_conf:>15.3f} {m_conf:>11.3f}")
+
+    print("\nOK: Poisson markets are coherent")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=int, default=2000)
+    parser.add_argument("--teams", type=int, default=200)
+    args = parser.parse_args()
+    main_compare(args.fixtures, args.teams)
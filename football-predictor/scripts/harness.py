@@ -0,0 +1,177 @@
+"""
+Shared setup of the check and bench scripts.
+
+A script imports this before anything from the backend and calls
+use_temp_database (or use_backend, to work on the configured database);
+backend imports follow that call. The seed helpers build the leagues,
+teams, fixtures, users and predictions most scripts start from, and leave
+the request-specific data to each script.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+
+def use_backend():
+    """Make the backend importable and run from its directory, as the app does"""
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.append(str(BACKEND_DIR))
+    os.chdir(BACKEND_DIR)
+
+
+def use_temp_database(name: str, keep_url: bool = False, **env: str) -> str:
+    """Point DATABASE_URL at a SQLite file in a fresh temp directory; return the directory
+
+    keep_url leaves a DATABASE_URL already in the environment alone. Extra
+    keyword arguments are set as environment variables, so settings read
+    them when the backend is first imported.
+    """
+    db_dir = tempfile.mkdtemp(prefix=f"fp-{name}-")
+    url = f"sqlite:///{os.path.join(db_dir, name + '.db')}"
+    if keep_url:
+        os.environ.setdefault("DATABASE_URL", url)
+    else:
+        os.environ["DATABASE_URL"] = url
+    os.environ["DEBUG"] = "false"
+    os.environ.update(env)
+    use_backend()
+    return db_dir
+
+
+def fail(message: str):
+    print(f"FAIL: {message}")
+    sys.exit(1)
+
+
+def seed_league(db, name: str = "Test League", external_id: int = 1, **fields):
+    """One league, flushed so it has an ID"""
+    from app.models import League
+
+    league = League(external_id=external_id, name=name, **fields)
+    db.add(league)
+    db.flush()
+    return league
+
+
+def seed_teams(db, leagues, count: int, external_id: int = 100, name: str = "Team {i}", fields=None):
+    """count teams spread over leagues in turn, flushed so they have IDs
+
+    fields(i) may add columns to team i, e.g. standings; it is called in
+    order, so a seeded generator behind it is consumed as before.
+    """
+    from app.models import Team
+
+    leagues = leagues if isinstance(leagues, (list, tuple)) else [leagues]
+    teams = [
+        Team(external_id=external_id + i, name=name.format(i=i), league_id=leagues[i % len(leagues)].id,
+             **(fields(i) if fields else {}))
+        for i in range(count)
+    ]
+    db.add_all(teams)
+    db.flush()
+    return teams
+
+
+def round_robin(teams, rounds: int, start: datetime, rng, interval: timedelta = timedelta(days=3),
+                stagger: timedelta = timedelta(minutes=1), max_scores=(4, 3), external_id: int = 1):
+    """Finished matches of rounds in which every team plays once, in a random pairing each round
+
+    Round r kicks off at start + r * interval, its matches stagger apart.
+    """
+    from app.models import Match
+    from app.models.match import MatchStatus
+
+    matches = []
+    for round_number in range(rounds):
+        order = rng.sample(teams, len(teams))
+        for pair in range(len(order) // 2):
+            home, away = order[2 * pair], order[2 * pair + 1]
+            matches.append(Match(
+                external_id=external_id + len(matches), home_team_id=home.id, away_team_id=away.id,
+                league_id=home.league_id, match_date=start + interval * round_number + stagger * pair,
+                status=MatchStatus.FINISHED,
+                home_score=rng.randint(0, max_scores[0]), away_score=rng.randint(0, max_scores[1]),
+            ))
+    return matches
+
+
+def history_and_slate(teams, history: int, fixtures: int, rng, now=None):
+    """history finished matches a minute apart up to now, then fixtures scheduled a minute apart from now + 1h"""
+    from app.models import Match
+    from app.models.match import MatchStatus
+
+    now = now or datetime.utcnow()
+    past = []
+    for i in range(history):
+        home, away = rng.sample(teams, 2)
+        past.append(Match(
+            external_id=10000 + i, home_team_id=home.id, away_team_id=away.id, league_id=home.league_id,
+            match_date=now - timedelta(minutes=i + 1), status=MatchStatus.FINISHED,
+            home_score=rng.randint(0, 4), away_score=rng.randint(0, 3),
+        ))
+
+    upcoming = []
+    for i in range(fixtures):
+        home, away = rng.sample(teams, 2)
+        upcoming.append(Match(
+            external_id=900000 + i, home_team_id=home.id, away_team_id=away.id, league_id=home.league_id,
+            match_date=now + timedelta(hours=1, minutes=i), status=MatchStatus.SCHEDULED,
+        ))
+    return past, upcoming
+
+
+def seed_fixtures(db, teams, count: int, start: datetime, interval: timedelta = timedelta(hours=1),
+                  external_id: int = 100000):
+    """count scheduled fixtures interval apart from start, team i hosting team i + 7; return their IDs by kick-off"""
+    from sqlalchemy import insert, select
+
+    from app.models import Match
+
+    db.execute(insert(Match), [
+        {"external_id": external_id + f, "home_team_id": teams[f % len(teams)].id,
+         "away_team_id": teams[(f + 7) % len(teams)].id, "league_id": teams[f % len(teams)].league_id,
+         "match_date": start + interval * f, "status": "SCHEDULED"}
+        for f in range(count)
+    ])
+    return db.scalars(
+        select(Match.id).where(Match.external_id.between(external_id, external_id + count - 1)).order_by(Match.match_date)
+    ).all()
+
+
+def seed_users(db, count: int):
+    """count users named user0, user1, ...; return their IDs"""
+    from sqlalchemy import insert, select
+
+    from app.models import User
+
+    db.execute(insert(User), [{"username": f"user{i}", "email": f"user{i}@example.com"} for i in range(count)])
+    return db.scalars(select(User.id).order_by(User.id.desc()).limit(count)).all()[::-1]
+
+
+def seed_predictions(db, pairs, values, rng) -> int:
+    """A pending prediction of a random type and value for each (user ID, match ID); return how many
+
+    values maps each prediction type to the values to draw from.
+    """
+    from sqlalchemy import insert
+
+    from app.models import Prediction
+    from app.models.prediction import PredictionResult
+
+    types = list(values)
+    rows = []
+    for user_id, match_id in pairs:
+        prediction_type = rng.choice(types)
+        rows.append({
+            "user_id": user_id, "match_id": match_id, "prediction_type": prediction_type,
+            "prediction_value": rng.choice(values[prediction_type]), "confidence": 0.5,
+            "result": PredictionResult.PENDING
+        })
+    for start in range(0, len(rows), 5000):
+        db.execute(insert(Prediction), rows[start:start + 5000])
+    return len(rows)
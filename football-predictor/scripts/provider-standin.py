@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Serve a local football-data.org stand-in, or record real responses for it.
+
+serve: answers /v4/competitions and /v4/competitions/{id}/teams, /matches
+(dateFrom, dateTo and status filters) and /standings from a recording or
+from synthetic leagues, with configurable latency, a per-period request
+quota and the header a 429 carries. Point the backend at it with the
+FOOTBALL_DATA_BASE_URL and FOOTBALL_DATA_COMPETITIONS it prints.
+
+record: fetches the competitions list and each competition's teams, season
+fixtures and standings from the real API (FOOTBALL_DATA_API_KEY, within the
+configured plan's request budget) into a directory serve can replay.
+
+Usage:
+    python scripts/provider-standin.py serve [--leagues 5 --teams 20 --fixtures 380] [--port 8090]
+    python scripts/provider-standin.py serve --recorded recordings/ [--latency 0.2 --quota 10 --limit-hint counter-reset]
+    python scripts/provider-standin.py record --out recordings/ [--competitions 2021 2014]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+from harness import use_backend
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ["DEBUG"] = "false"
+
+START_DIR = Path.cwd()
+
+use_backend()
+
+from app.core.config import settings  # noqa: E402
+from app.services.provider_standin import LIMIT_HINTS, ProviderData, ProviderStandIn, record  # noqa: E402
+
+
+def serve(args):
+    import uvicorn
+
+    if args.recorded:
+        data = ProviderData.load(START_DIR / args.recorded)
+    else:
+        data = ProviderData.synthetic(args.leagues, args.teams, args.fixtures, seed=args.seed)
+    if args.save:
+        data.save(START_DIR / args.save)
+
+    standin = ProviderStandIn(
+        data, latency=args.latency, jitter=args.jitter, quota=args.quota, period=args.period,
+        limit_hint=args.limit_hint, etags=not args.no_etags
+    )
+    fixtures = sum(len(matches) for matches in data.matches.values())
+    print(f"{len(data.competitions)} competitions, {fixtures} fixtures")
+    print(f"FOOTBALL_DATA_BASE_URL=http://{args.host}:{args.port}/v4")
+    print(f"FOOTBALL_DATA_COMPETITIONS={json.dumps([c['id'] for c in data.competitions])}")
+    uvicorn.run(standin, host=args.host, port=args.port, log_level="warning")
+
+
+def record_responses(args):
+    if not settings.FOOTBALL_DATA_API_KEY:
+        print("FOOTBALL_DATA_API_KEY is not set")
+        sys.exit(1)
+    competitions = args.competitions or settings.FOOTBALL_DATA_COMPETITIONS
+    data = asyncio.run(record(START_DIR / args.out, competitions))
+    fixtures = sum(len(matches) for matches in data.matches.values())
+    print(f"Recorded {len(data.competitions)} competitions and {fixtures} fixtures to {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="serve recorded or synthetic responses")
+    serve_parser.add_argument("--recorded", help="directory written by record (default: synthetic data)")
+    serve_parser.add_argument("--leagues", type=int, default=5)
+    serve_parser.add_argument("--teams", type=int, default=20)
+    serve_parser.add_argument("--fixtures", type=int, default=380, help="fixtures per league")
+    serve_parser.add_argument("--seed", type=int, default=0)
+    serve_parser.add_argument("--save", help="also write the served data to this directory")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8090)
+    serve_parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    serve_parser.add_argument("--jitter", type=float, default=0.0, help="extra seconds, uniformly random")
+    serve_parser.add_argument("--quota", type=int, help="requests per period before 429s (default: unlimited)")
+    serve_parser.add_argument("--period", type=float, default=60.0, help="quota window in seconds")
+    serve_parser.add_argument("--limit-hint", choices=LIMIT_HINTS, default="counter-reset",
+                              help="header a 429 carries")
+    serve_parser.add_argument("--no-etags", action="store_true", help="never answer 304")
+    serve_parser.set_defaults(run=serve)
+
+    record_parser = commands.add_parser("record", help="capture real responses to disk")
+    record_parser.add_argument("--out", required=True)
+    record_parser.add_argument("--competitions", type=int, nargs="+",
+                               help="competition IDs (default: FOOTBALL_DATA_COMPETITIONS)")
+    record_parser.set_defaults(run=record_responses)
+
+    args = parser.parse_args()
+    args.run(args)
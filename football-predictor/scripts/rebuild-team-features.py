@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Rebuild rolling team form windows from the full match history.
+
+Recomputes the last 5 and 10 results of every team (overall, home and away)
+in the configured database (DATABASE_URL / backend .env), fills the Team
+form and advanced-statistics columns from them and refreshes the stored
+predictions that read them. Run it once after upgrading, or after
+correcting historical results.
+
+Usage:
+    python scripts/rebuild-team-features.py
+"""
+
+import argparse
+import time
+
+from harness import use_backend
+
+use_backend()
+
+from app.core.database import run_migrations  # noqa: E402
+from app.services.prediction_store import PredictionStore  # noqa: E402
+from app.services.team_feature_service import TeamFeatureService  # noqa: E402
+
+
+def main_rebuild():
+    run_migrations()
+
+    team_feature_service = TeamFeatureService()
+    started = time.perf_counter()
+    windows = team_feature_service.rebuild()
+    seconds = time.perf_counter() - started
+    print(f"Rebuilt {windows} form windows in {seconds:.2f}s")
+
+    prediction_store = PredictionStore(team_feature_service.db)
+    refreshed = prediction_store.refresh()
+    print(f"Refreshed {refreshed} stored predictions")
+    team_feature_service.db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+    main_rebuild()
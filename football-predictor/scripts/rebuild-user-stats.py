@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Rebuild every user's statistics from their settled predictions.
+
+Replays all WON, LOST and VOID predictions in the configured database
+(DATABASE_URL / backend .env) in the order they settled and rewrites the
+user_stats table: totals, accuracy, streaks, the recent-results window,
+points and this month's columns, then rebuilds the leaderboards (the shared
+Redis ones with LEADERBOARD_BACKEND=redis) and stores each user's ranks.
+Settlement keeps all of these up to date on its own; run this once after
+upgrading, or to repair them.
+
+Usage:
+    python scripts/rebuild-user-stats.py
+"""
+
+import argparse
+import asyncio
+import time
+
+from harness import use_backend
+
+use_backend()
+
+from app.core.database import async_engine, run_migrations  # noqa: E402
+from app.services.leaderboard import leaderboard  # noqa: E402
+from app.services.user_stats_service import UserStatsService  # noqa: E402
+
+
+def main_rebuild():
+    run_migrations()
+
+    user_stats_service = UserStatsService()
+    started = time.perf_counter()
+    users = user_stats_service.rebuild()
+    seconds = time.perf_counter() - started
+    print(f"Rebuilt stats of {users} users in {seconds:.2f}s")
+
+    async def rank():
+        ranked = await leaderboard.reload()
+        await leaderboard.write_ranks(user_stats_service.db)
+        await leaderboard.close()
+        await async_engine.dispose()
+        return ranked
+
+    print(f"Ranked {asyncio.run(rank())} users on the leaderboards")
+    user_stats_service.db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+    main_rebuild()
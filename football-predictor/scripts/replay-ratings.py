@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Rebuild team Elo ratings from the full match history.
+
+Clears team_ratings and team_rating_history and replays every finished match
+of the configured database (DATABASE_URL / backend .env) in kick-off
+order, then refreshes the stored predictions that read the ratings. Run it
+once after upgrading, or after correcting historical results.
+
+Usage:
+    python scripts/replay-ratings.py
+"""
+
+import argparse
+import time
+
+from harness import use_backend
+
+use_backend()
+
+from app.core.database import run_migrations  # noqa: E402
+from app.services.prediction_store import PredictionStore  # noqa: E402
+from app.services.rating_service import RatingService  # noqa: E402
+
+
+def main_replay():
+    run_migrations()
+
+    rating_service = RatingService()
+    started = time.perf_counter()
+    replayed = rating_service.replay()
+    seconds = time.perf_counter() - started
+    print(f"Replayed {replayed} matches in {seconds:.2f}s")
+
+    prediction_store = PredictionStore(rating_service.db)
+    refreshed = prediction_store.refresh()
+    print(f"Refreshed {refreshed} stored predictions")
+    rating_service.db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+    main_replay()
@@ -12,6 +12,7 @@ from apscheduler.triggers.cron import CronTrigger
 from config import config
 from services.user_service import UserService
 from services.match_service import MatchService
+from services.api_client import APIClient
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +49,14 @@ async def setup_scheduler(application: Application):
             replace_existing=True
         )
         
+        scheduler.add_job(
+            rollover_user_stats,
+            CronTrigger(day=1, hour=0, minute=5),  # First of the month, 00:05 UTC
+            id="rollover_user_stats",
+            name="Roll monthly user stats over",
+            replace_existing=True
+        )
+        
         scheduler.add_job(
             cleanup_old_data,
             CronTrigger(hour=2, minute=0),  # 2:00 AM UTC daily
@@ -103,9 +112,13 @@ async def update_match_results():
     try:
         logger.info("Starting match results update job")
         
-        # Get finished matches and update results
-        match_service = MatchService()
-        # This would typically update match results and resolve predictions
+        # The backend syncs what may have changed, results included, and
+        # settles pending predictions of matches that finished or were called off
+        api_client = APIClient()
+        started = await api_client.sync_data()
+        if started is None:
+            logger.error("Backend did not start the data sync")
+            return
         
         logger.info("Match results update job completed")
         
@@ -113,6 +126,24 @@ async def update_match_results():
         logger.error(f"Error in match results update job: {e}")
 
 
+async def rollover_user_stats():
+    """Start the new month's user statistics and standings"""
+    
+    try:
+        logger.info("Starting monthly stats rollover job")
+        
+        api_client = APIClient()
+        started = await api_client.rollover_user_stats()
+        if started is None:
+            logger.error("Backend did not start the user stats rollover")
+            return
+        
+        logger.info("Monthly stats rollover job completed")
+        
+    except Exception as e:
+        logger.error(f"Error in monthly stats rollover job: {e}")
+
+
 async def cleanup_old_data():
     """Cleanup old data and logs"""
     
@@ -4,19 +4,58 @@ API client for communicating with the backend
 
 import httpx
 import logging
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple
 from config import config
 
 logger = logging.getLogger(__name__)
 
+# Responses kept for conditional GETs (ETag / Last-Modified revalidation)
+MAX_VALIDATED_RESPONSES = 256
+
 
 class APIClient:
     """Client for making API requests to the backend"""
     
+    # (url, params) -> (validator headers, last body), replayed on 304. Shared
+    # by every client in the process since services build a client per call
+    _validated: "OrderedDict[Tuple, Tuple[Dict[str, str], Any]]" = OrderedDict()
+    
     def __init__(self):
         self.base_url = f"{config.API_BASE_URL}{config.API_V1_STR}"
         self.timeout = 30.0
     
+    def _conditional_headers(self, cache_key: Tuple) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since for a previously seen response"""
+        entry = self._validated.get(cache_key)
+        if not entry:
+            return {}
+        
+        validators, _ = entry
+        headers = {}
+        if "etag" in validators:
+            headers["If-None-Match"] = validators["etag"]
+        if "last-modified" in validators:
+            headers["If-Modified-Since"] = validators["last-modified"]
+        return headers
+    
+    def _store_validated(self, cache_key: Tuple, response: httpx.Response, body: Any):
+        """Remember a response's validators and body for the next poll"""
+        validators = {
+            name: response.headers[name]
+            for name in ("etag", "last-modified")
+            if name in response.headers
+        }
+        
+        if not validators:
+            self._validated.pop(cache_key, None)
+            return
+        
+        self._validated[cache_key] = (validators, body)
+        self._validated.move_to_end(cache_key)
+        while len(self._validated) > MAX_VALIDATED_RESPONSES:
+            self._validated.popitem(last=False)
+    
     async def _make_request(
         self, 
         method: str, 
@@ -28,17 +67,28 @@ class APIClient:
         
         url = f"{self.base_url}{endpoint}"
         
+        # Only GETs are revalidated; the key covers the query string
+        cache_key = (url, tuple(sorted((params or {}).items()))) if method == "GET" else None
+        headers = self._conditional_headers(cache_key) if cache_key else {}
+        
         try:
             async with httpx.AsyncClient(timeout=self.timeout) as client:
                 response = await client.request(
                     method=method,
                     url=url,
                     json=data,
-                    params=params
+                    params=params,
+                    headers=headers
                 )
                 
-                if response.status_code == 200:
-                    return response.json()
+                if response.status_code == 304 and cache_key in self._validated:
+                    self._validated.move_to_end(cache_key)
+                    return self._validated[cache_key][1]
+                elif response.status_code == 200:
+                    body = response.json()
+                    if cache_key:
+                        self._store_validated(cache_key, response, body)
+                    return body
                 else:
                     logger.error(f"API request failed: {response.status_code} - {response.text}")
                     return None
@@ -60,6 +110,10 @@ class APIClient:
         """Update user"""
         return await self._make_request("PUT", f"/users/{user_id}", data=user_data)
     
+    async def get_user_stats(self, user_id: int) -> Optional[Dict]:
+        """Get user statistics"""
+        return await self._make_request("GET", f"/users/{user_id}/stats")
+    
     # Match endpoints
     async def get_matches(
         self, 
@@ -146,4 +200,13 @@ class APIClient:
     
     async def get_team_stats(self, team_id: int) -> Optional[Dict]:
         """Get team statistics"""
-        return await self._make_request("GET", f"/teams/{team_id}/stats")
\ No newline at end of file
+        return await self._make_request("GET", f"/teams/{team_id}/stats")
+    
+    # Admin endpoints
+    async def sync_data(self) -> Optional[Dict]:
+        """Start an incremental data sync, which also settles predictions of decided matches"""
+        return await self._make_request("POST", "/admin/sync-data")
+    
+    async def rollover_user_stats(self) -> Optional[Dict]:
+        """Start the new month's user statistics"""
+        return await self._make_request("POST", "/admin/rollover-user-stats")
\ No newline at end of file
@@ -75,10 +75,10 @@ class UserService:
         """Get user statistics"""
         
         try:
-            # Get user predictions
-            predictions = await self.api_client.get_user_predictions(user_id, limit=100)
+            # The backend keeps them up to date as predictions settle
+            stats = await self.api_client.get_user_stats(user_id)
             
-            if not predictions:
+            if not stats:
                 return {
                     "total_predictions": 0,
                     "correct_predictions": 0,
@@ -92,69 +92,7 @@ class UserService:
                     "total_points": 0
                 }
             
-            # Calculate statistics
-            total_predictions = len(predictions)
-            correct_predictions = sum(1 for p in predictions if p.get('result') == 'WON')
-            incorrect_predictions = sum(1 for p in predictions if p.get('result') == 'LOST')
-            
-            accuracy = (correct_predictions / total_predictions * 100) if total_predictions > 0 else 0.0
-            
-            # Calculate streaks
-            current_streak = 0
-            longest_winning_streak = 0
-            longest_losing_streak = 0
-            
-            # Sort predictions by date (newest first)
-            sorted_predictions = sorted(predictions, key=lambda x: x.get('created_at', ''), reverse=True)
-            
-            # Calculate current streak
-            for pred in sorted_predictions:
-                result = pred.get('result')
-                if result == 'WON':
-                    current_streak += 1
-                elif result == 'LOST':
-                    current_streak -= 1
-                else:
-                    break
-            
-            # Calculate longest streaks
-            temp_winning_streak = 0
-            temp_losing_streak = 0
-            
-            for pred in sorted_predictions:
-                result = pred.get('result')
-                if result == 'WON':
-                    temp_winning_streak += 1
-                    temp_losing_streak = 0
-                    longest_winning_streak = max(longest_winning_streak, temp_winning_streak)
-                elif result == 'LOST':
-                    temp_losing_streak += 1
-                    temp_winning_streak = 0
-                    longest_losing_streak = max(longest_losing_streak, temp_losing_streak)
-                else:
-                    temp_winning_streak = 0
-                    temp_losing_streak = 0
-            
-            # Calculate recent accuracy (last 10 predictions)
-            recent_predictions = sorted_predictions[:10]
-            recent_correct = sum(1 for p in recent_predictions if p.get('result') == 'WON')
-            recent_accuracy = (recent_correct / len(recent_predictions) * 100) if recent_predictions else 0.0
-            
-            # Calculate points (simple scoring system)
-            total_points = correct_predictions * 10  # 10 points per correct prediction
-            
-            return {
-                "total_predictions": total_predictions,
-                "correct_predictions": correct_predictions,
-                "incorrect_predictions": incorrect_predictions,
-                "accuracy": accuracy,
-                "current_streak": current_streak,
-                "longest_winning_streak": longest_winning_streak,
-                "longest_losing_streak": longest_losing_streak,
-                "recent_accuracy": recent_accuracy,
-                "global_rank": None,  # Would be calculated from leaderboard
-                "total_points": total_points
-            }
+            return stats
             
         except Exception as e:
             logger.error(f"Error in get_user_stats: {e}")